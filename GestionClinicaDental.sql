@@ -41,6 +41,7 @@ CREATE TABLE ClinicaDental.Horario (
 	Hora_Inicio TIME NOT NULL,
 	Hora_Fin TIME NOT NULL,
 	Disponible BOOL DEFAULT TRUE,
+	Version INTEGER NOT NULL DEFAULT 0, -- SE INCREMENTA CON CADA CITA RESERVADA EN ESTE HORARIO (CONTROL DE CONCURRENCIA)
 	FOREIGN KEY (ID_Doctor) REFERENCES Doctor(ID_Doctor) ON DELETE CASCADE
 );
 
@@ -125,6 +126,8 @@ CREATE TABLE ClinicaDental.Asistente_Factura (
   	FOREIGN KEY (ID_Factura) REFERENCES Factura(ID_Factura) ON DELETE CASCADE
 );
 
+-- LOS INDICES PARA LAS CONSULTAS FRECUENTES SE AGREGAN CON Main/Migraciones.py (QUEDAN REGISTRADOS EN Version_Esquema)
+
 -- INGRESO DE REGISTROS - SEGUNDA PARTE
 INSERT INTO ClinicaDental.Paciente (Nombre, Apellido, Fecha_Nacimiento, DUI, Telefono, Correo) VALUES
 ('Laura', 'Mendoza', '1991-04-12', '12345678-9', '70112233', 'laura.mendoza@correo.com'),
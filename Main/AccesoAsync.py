@@ -0,0 +1,398 @@
+import asyncio
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import aiomysql
+except ImportError:     # aiomysql es opcional; sin él se usa el sustituto con SQLite
+    aiomysql = None
+
+from SqlReservas import (DURACION_CITA, ESTADO_CANCELADA, ConflictoReservaError, HorarioNoDisponibleError,
+                         es_conflicto, sentencias_reserva)
+
+
+class _VersionCambiada(Exception):
+    """Otra reserva del mismo horario se guardó durante la transacción; se deshace y se reintenta"""
+
+
+# ----------------------- Drivers -----------------------
+
+class DriverAiomysql:
+    """Driver async para MariaDB con un pool de aiomysql (mismos datos de conexión que DbClinica)"""
+    marcador = '%s'
+
+    def __init__(self, config: Dict[str, object], min_conexiones: int = 1, max_conexiones: int = 10):
+        if aiomysql is None:
+            raise RuntimeError("aiomysql no está instalado (pip install aiomysql)")
+        self.config = dict(config)
+        self.min_conexiones = min_conexiones
+        self.max_conexiones = max_conexiones
+        self._pool = None
+
+    async def abrir(self):
+        if self._pool is None:
+            config = dict(self.config)
+            config['db'] = config.pop('database', None)
+            self._pool = await aiomysql.create_pool(minsize=self.min_conexiones, maxsize=self.max_conexiones,
+                                                    autocommit=False, **config)
+        return self
+
+    @asynccontextmanager
+    async def transaccion(self):
+        await self.abrir()
+        async with self._pool.acquire() as conexion:
+            try:
+                yield _TransaccionAiomysql(conexion)
+                await conexion.commit()
+            except BaseException:
+                await conexion.rollback()
+                raise
+
+    async def cerrar(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+
+class _TransaccionAiomysql:
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    async def consultar(self, sql: str, parametros: Sequence = ()) -> List[tuple]:
+        async with self._conexion.cursor() as cursor:
+            await cursor.execute(sql, tuple(parametros))
+            return list(await cursor.fetchall())
+
+    async def ejecutar(self, sql: str, parametros: Sequence = ()) -> int:
+        """Ejecuta un UPDATE/DELETE; devuelve las filas afectadas"""
+        async with self._conexion.cursor() as cursor:
+            await cursor.execute(sql, tuple(parametros))
+            return cursor.rowcount
+
+    async def insertar(self, sql: str, parametros: Sequence = ()) -> int:
+        """Ejecuta un INSERT; devuelve el id generado"""
+        async with self._conexion.cursor() as cursor:
+            await cursor.execute(sql, tuple(parametros))
+            return cursor.lastrowid
+
+
+class DriverSqlite:
+    """
+    Sustituto local para pruebas y carga: una conexión sqlite3 atendida por un solo hilo.
+    Las transacciones se turnan con un asyncio.Lock; las corrutinas esperan sin bloquear el event loop.
+    """
+    marcador = '?'
+
+    def __init__(self, ruta: str = ":memory:"):
+        self.ruta = ruta
+        self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conexion: Optional[sqlite3.Connection] = None
+        self._turno: Optional[asyncio.Lock] = None
+
+    async def _en_hilo(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._hilo, funcion, *args)
+
+    async def abrir(self):
+        if self._conexion is None:
+            self._conexion = await self._en_hilo(lambda: sqlite3.connect(self.ruta, check_same_thread=False))
+            self._turno = asyncio.Lock()
+        return self
+
+    @staticmethod
+    def _adaptar(parametros: Sequence) -> tuple:
+        # sqlite3 guarda las fechas como texto ISO, que se compara bien con < y >
+        return tuple(p.isoformat(' ') if isinstance(p, datetime) else
+                     p.isoformat() if isinstance(p, date) else p for p in parametros)
+
+    def _consultar(self, sql: str, parametros: Sequence) -> List[tuple]:
+        return self._conexion.execute(sql, self._adaptar(parametros)).fetchall()
+
+    def _ejecutar(self, sql: str, parametros: Sequence) -> int:
+        return self._conexion.execute(sql, self._adaptar(parametros)).rowcount
+
+    def _insertar(self, sql: str, parametros: Sequence) -> int:
+        return self._conexion.execute(sql, self._adaptar(parametros)).lastrowid
+
+    async def ejecutar_script(self, script: str):
+        await self.abrir()
+        await self._en_hilo(self._conexion.executescript, script)
+
+    @asynccontextmanager
+    async def transaccion(self):
+        await self.abrir()
+        async with self._turno:
+            try:
+                yield _TransaccionSqlite(self)
+                await self._en_hilo(self._conexion.commit)
+            except BaseException:
+                await self._en_hilo(self._conexion.rollback)
+                raise
+
+    async def cerrar(self):
+        if self._conexion is not None:
+            await self._en_hilo(self._conexion.close)
+            self._conexion = None
+        self._hilo.shutdown(wait=False)
+
+
+class _TransaccionSqlite:
+    def __init__(self, driver: DriverSqlite):
+        self._driver = driver
+
+    async def consultar(self, sql: str, parametros: Sequence = ()) -> List[tuple]:
+        return await self._driver._en_hilo(self._driver._consultar, sql, parametros)
+
+    async def ejecutar(self, sql: str, parametros: Sequence = ()) -> int:
+        return await self._driver._en_hilo(self._driver._ejecutar, sql, parametros)
+
+    async def insertar(self, sql: str, parametros: Sequence = ()) -> int:
+        return await self._driver._en_hilo(self._driver._insertar, sql, parametros)
+
+
+# ----------------------- Servicio de citas -----------------------
+
+class ServicioCitasAsync:
+    """
+    Reserva de citas sin interfaz (para el portal en línea), con la misma regla que CitaWindow.crear_cita:
+    la cita debe caer dentro de un horario del doctor y no chocar con otra cita activa del mismo doctor.
+    Las citas duran DURACION_CITA. Entre procesos (varios servidores del portal, o el portal y las
+    ventanas) las reservas se protegen con la columna Horario.Version, igual que en MotorReservas: la
+    cita se guarda solo si la versión del horario no cambió desde que se leyó; si cambió se deshace y se
+    reintenta. Dentro del proceso las reservas del mismo doctor además se turnan con un asyncio.Lock,
+    para no gastar reintentos compitiendo entre corrutinas propias.
+    """
+    def __init__(self, driver, max_reintentos: int = 8, espera_base: float = 0.002):
+        self.driver = driver
+        self.max_reintentos = max_reintentos
+        self.espera_base = espera_base
+        m = driver.marcador
+        self._bloqueos: Dict[int, asyncio.Lock] = {}
+        reserva = sentencias_reserva(m)
+        self.sql_horario, self.sql_version, self.sql_choque = reserva.horario, reserva.version, reserva.choque
+        self.sql_insertar, self.sql_cancelar = reserva.insertar, reserva.cancelar
+        self.sql_obtener = f"SELECT ID_Cita, ID_Paciente, ID_Doctor, Fecha, Estado, Costo FROM Cita WHERE ID_Cita = {m}"
+        self.sql_citas_dia = (f"SELECT Fecha FROM Cita WHERE ID_Doctor = {m} AND Estado <> '{ESTADO_CANCELADA}' "
+                              f"AND Fecha >= {m} AND Fecha < {m} ORDER BY Fecha")
+        self.sql_insertar_horario = (f"INSERT INTO Horario (ID_Doctor, Dia, Hora_Inicio, Hora_Fin, Disponible) "
+                                     f"VALUES ({m}, {m}, {m}, {m}, 1)")
+        self.sql_horarios_dia = (f"SELECT ID_Horario, Hora_Inicio, Hora_Fin FROM Horario "
+                                 f"WHERE ID_Doctor = {m} AND Dia = {m} AND Disponible = 1 ORDER BY Hora_Inicio")
+
+    def _bloqueo(self, id_doctor: int) -> asyncio.Lock:
+        bloqueo = self._bloqueos.get(id_doctor)
+        if bloqueo is None:
+            bloqueo = self._bloqueos[id_doctor] = asyncio.Lock()
+        return bloqueo
+
+    @staticmethod
+    def _hora(valor: datetime) -> str:
+        return valor.strftime('%H:%M:%S')
+
+    # ---- Horarios ----
+
+    async def crear_horario(self, id_doctor: int, dia: date, hora_inicio: str, hora_fin: str) -> int:
+        """Registra un bloque de atención; las horas van como 'HH:MM:SS'"""
+        if hora_fin <= hora_inicio:
+            raise ValueError("La hora de fin debe ser posterior a la hora de inicio")
+        async with self.driver.transaccion() as tx:
+            return await tx.insertar(self.sql_insertar_horario, (id_doctor, dia, hora_inicio, hora_fin))
+
+    async def cupos_libres(self, id_doctor: int, dia: date) -> List[datetime]:
+        """Inicios de cita libres del doctor ese día, cada DURACION_CITA dentro de sus horarios"""
+        inicio_dia = datetime.combine(dia, datetime.min.time())
+        async with self.driver.transaccion() as tx:
+            horarios = await tx.consultar(self.sql_horarios_dia, (id_doctor, dia))
+            ocupadas = {self._como_fecha(f) for (f,) in await tx.consultar(
+                self.sql_citas_dia, (id_doctor, inicio_dia, inicio_dia + timedelta(days=1)))}
+        libres = []
+        for _, hora_inicio, hora_fin in horarios:
+            cupo = inicio_dia + self._como_duracion(hora_inicio)
+            fin = inicio_dia + self._como_duracion(hora_fin)
+            while cupo + DURACION_CITA <= fin:
+                if not any(abs(cupo - o) < DURACION_CITA for o in ocupadas):
+                    libres.append(cupo)
+                cupo += DURACION_CITA
+        return libres
+
+    @staticmethod
+    def _como_fecha(valor) -> datetime:
+        return valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor))
+
+    @staticmethod
+    def _como_duracion(valor) -> timedelta:
+        # MariaDB devuelve TIME como timedelta; SQLite como texto 'HH:MM:SS'
+        if isinstance(valor, timedelta):
+            return valor
+        h, m, *s = (int(parte) for parte in str(valor).split(':'))
+        return timedelta(hours=h, minutes=m, seconds=s[0] if s else 0)
+
+    # ---- Citas ----
+
+    async def _intentar_cita(self, id_paciente: int, id_doctor: int, fecha: datetime, costo: float) -> int:
+        """Un intento en una transacción; lanza _VersionCambiada si otra reserva del horario ganó la carrera"""
+        fin = fecha + DURACION_CITA
+        async with self.driver.transaccion() as tx:
+            horario = await tx.consultar(self.sql_horario, (id_doctor, fecha.date(), self._hora(fecha),
+                                                            self._hora(fin)))
+            if fin.date() != fecha.date() or not horario:
+                raise HorarioNoDisponibleError("El doctor no atiende en ese horario")
+            id_horario, version = horario[0]
+            if await tx.consultar(self.sql_choque, (id_doctor, fecha - DURACION_CITA, fin)):
+                raise HorarioNoDisponibleError("El doctor ya tiene una cita en ese horario")
+            id_cita = await tx.insertar(self.sql_insertar, (id_paciente, id_doctor, fecha, costo))
+            if await tx.ejecutar(self.sql_version, (id_horario, version)) != 1:
+                raise _VersionCambiada()
+            return id_cita
+
+    async def crear_cita(self, id_paciente: int, id_doctor: int, fecha: datetime, costo: float) -> int:
+        """
+        Reserva una cita; lanza HorarioNoDisponibleError si no hay horario o el espacio está tomado, y
+        ConflictoReservaError si después de max_reintentos seguía perdiendo la carrera contra otros procesos.
+        """
+        if costo < 0:
+            raise ValueError("El costo no puede ser negativo")
+        for intento in range(self.max_reintentos):
+            try:
+                async with self._bloqueo(id_doctor):
+                    return await self._intentar_cita(id_paciente, id_doctor, fecha, costo)
+            except _VersionCambiada:
+                pass
+            except Exception as e:
+                if not es_conflicto(e):
+                    raise
+            await asyncio.sleep(random.uniform(0, self.espera_base * (2 ** intento)))
+        raise ConflictoReservaError(f"No se pudo reservar después de {self.max_reintentos} intentos")
+
+    async def cancelar_cita(self, id_cita: int) -> bool:
+        """Cancela la cita y libera el espacio; False si no existe o ya estaba cancelada"""
+        async with self.driver.transaccion() as tx:
+            return await tx.ejecutar(self.sql_cancelar, (id_cita,)) > 0
+
+    async def obtener_cita(self, id_cita: int) -> Optional[tuple]:
+        async with self.driver.transaccion() as tx:
+            filas = await tx.consultar(self.sql_obtener, (id_cita,))
+        return filas[0] if filas else None
+
+
+def crear_servicio_mariadb(max_conexiones: int = 10) -> ServicioCitasAsync:
+    """Servicio contra la base real con los datos de conexión de DbClinica"""
+    from DbClinica import CONFIG_DB
+    return ServicioCitasAsync(DriverAiomysql(CONFIG_DB, max_conexiones=max_conexiones))
+
+
+async def _prueba_de_carga(solicitudes: int = 5000, doctores: int = 20, dias: int = 5):
+    """
+    Simula muchas reservas simultáneas desde el portal contra el sustituto SQLite
+    (que no haya dobles reservas se prueba en tests/test_acceso_async.py)
+    """
+    import random
+    from Repositorios import ESQUEMA_SQLITE
+
+    random.seed(13)
+    driver = DriverSqlite(":memory:")
+    await driver.ejecutar_script(ESQUEMA_SQLITE)
+    servicio = ServicioCitasAsync(driver)
+    async with driver.transaccion() as tx:
+        for i in range(doctores):
+            await tx.ejecutar("INSERT INTO Doctor (Nombre, Apellido, Especialidad, Telefono, Correo, Contrasena) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", (f"Doc{i}", "A", "General", "70000000", f"d{i}@c.com", "x"))
+        for i in range(1000):
+            await tx.ejecutar("INSERT INTO Paciente (Nombre, Apellido, Fecha_Nacimiento, DUI, Telefono, Correo) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", (f"Pac{i}", "B", "1990-01-01", None, None, f"p{i}@c.com"))
+    lunes = date(2025, 3, 3)
+    for id_doctor in range(1, doctores + 1):
+        for d in range(dias):
+            await servicio.crear_horario(id_doctor, lunes + timedelta(days=d), "08:00:00", "12:00:00")
+
+    # 8 cupos por día x 5 días x 20 doctores = 800 cupos; 5000 solicitudes, así que la mayoría choca
+    latencias = []
+    resultados = {'reservadas': 0, 'rechazadas': 0}
+
+    async def reservar():
+        fecha = datetime.combine(lunes + timedelta(days=random.randrange(dias)), datetime.min.time()) + \
+            timedelta(hours=8, minutes=30 * random.randrange(8))
+        inicio = time.perf_counter()
+        try:
+            await servicio.crear_cita(random.randint(1, 1000), random.randint(1, doctores), fecha, 25.0)
+            resultados['reservadas'] += 1
+        except HorarioNoDisponibleError:
+            resultados['rechazadas'] += 1
+        latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(reservar() for _ in range(solicitudes)))
+    duracion = time.perf_counter() - inicio
+
+    async with driver.transaccion() as tx:
+        dobles = await tx.consultar("SELECT ID_Doctor, Fecha, COUNT(*) FROM Cita WHERE Estado <> 'Cancelada' "
+                                    "GROUP BY ID_Doctor, Fecha HAVING COUNT(*) > 1")
+        (guardadas,), = await tx.consultar("SELECT COUNT(*) FROM Cita")
+    libres = await servicio.cupos_libres(1, lunes)
+
+    latencias.sort()
+    print(f"{solicitudes:,} reservas simultáneas en {duracion:.2f} s ({solicitudes / duracion:,.0f} solicitudes/s)")
+    print(f"Reservadas {resultados['reservadas']}, rechazadas {resultados['rechazadas']}, guardadas {guardadas}, "
+          f"dobles reservas {len(dobles)}")
+    print(f"Latencia: p50 {latencias[len(latencias) // 2] * 1000:.1f} ms, "
+          f"p95 {latencias[int(len(latencias) * 0.95)] * 1000:.1f} ms, máx {latencias[-1] * 1000:.1f} ms")
+    print(f"Cupos libres del doctor 1 el {lunes}: {len(libres)}")
+    await driver.cerrar()
+
+
+async def _prueba_entre_procesos(solicitudes: int = 2000, servidores: int = 4):
+    """
+    Varios servidores del portal sobre la misma base: cada servicio tiene su propia conexión y sus propios
+    asyncio.Lock, así que solo Horario.Version impide que dos tomen el mismo espacio
+    """
+    import os
+    import tempfile
+    from Repositorios import ESQUEMA_SQLITE
+
+    random.seed(31)
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_portal.db")
+    drivers = [DriverSqlite(ruta) for _ in range(servidores)]
+    await drivers[0].ejecutar_script(ESQUEMA_SQLITE + "PRAGMA journal_mode=WAL;")
+    async with drivers[0].transaccion() as tx:
+        await tx.ejecutar("INSERT INTO Doctor (Nombre, Apellido, Especialidad, Telefono, Correo, Contrasena) "
+                          "VALUES ('Doc', 'A', 'General', '70000000', 'd@c.com', 'x')")
+        await tx.ejecutar("INSERT INTO Paciente (Nombre, Apellido, Fecha_Nacimiento, Correo) "
+                          "VALUES ('Pac', 'B', '1990-01-01', 'p@c.com')")
+    lunes = date(2025, 3, 3)
+    servicios = [ServicioCitasAsync(driver) for driver in drivers]
+    await servicios[0].crear_horario(1, lunes, "08:00:00", "12:00:00")
+    resultados = {'reservadas': 0, 'rechazadas': 0, 'agotadas': 0}
+
+    async def reservar(servicio):
+        fecha = datetime.combine(lunes, datetime.min.time()) + timedelta(hours=8, minutes=30 * random.randrange(8))
+        try:
+            await servicio.crear_cita(1, 1, fecha, 25.0)
+            resultados['reservadas'] += 1
+        except HorarioNoDisponibleError:
+            resultados['rechazadas'] += 1
+        except ConflictoReservaError:
+            resultados['agotadas'] += 1
+
+    await asyncio.gather(*(reservar(servicios[i % servidores]) for i in range(solicitudes)))
+    async with drivers[0].transaccion() as tx:
+        (guardadas,), = await tx.consultar("SELECT COUNT(*) FROM Cita")
+        (version,), = await tx.consultar("SELECT Version FROM Horario")
+    print(f"{servidores} servidores, {solicitudes:,} reservas del mismo doctor: reservadas {resultados['reservadas']}, "
+          f"rechazadas {resultados['rechazadas']}, reintentos agotados {resultados['agotadas']}, guardadas {guardadas}, "
+          f"versión del horario {version}")
+    for driver in drivers:
+        await driver.cerrar()
+
+
+def main():
+    asyncio.run(_prueba_de_carga())
+    asyncio.run(_prueba_entre_procesos())
+
+
+if __name__ == "__main__":
+    main()
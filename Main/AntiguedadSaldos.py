@@ -0,0 +1,339 @@
+import csv
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PoolConexiones import PoolConexiones
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modelos'))
+from Dominio import ESTADOS_POR_COBRAR
+from ImportacionDiferida import cargar_numpy  # NumPy es opcional; sin él se agrupa con un dict
+
+# Tramos de antigüedad: 0-30, 31-60, 61-90 y más de 90 días desde la emisión
+LIMITES_TRAMOS = (30, 60, 90)
+NOMBRES_TRAMOS = ("0-30", "31-60", "61-90", "90+")
+SIN_DOCTOR = 0      # Facturas sin tratamientos ni citas enlazados
+
+
+def tramo(dias: int) -> int:
+    """Índice del tramo de una factura con `dias` de antigüedad (las de fecha futura van al primero)"""
+    return bisect_left(LIMITES_TRAMOS, dias)
+
+
+def repartir(facturas: array, montos: array, costos: array) -> array:
+    """
+    Reparte el monto de cada factura entre sus filas en proporción al costo de cada una, en centavos
+    enteros. Lo que sobra del redondeo hacia abajo se le da a la primera fila de la factura, así que
+    las partes siempre suman exactamente el Monto_Total. Si todos los costos son 0 se reparte por igual.
+    """
+    if not len(facturas):
+        return array('q')
+    np = cargar_numpy()
+    if np is not None:
+        unicas, primera, posicion = np.unique(np.frombuffer(facturas, dtype=np.int64), return_index=True,
+                                              return_inverse=True)
+        monto = np.frombuffer(montos, dtype=np.int64)
+        costo = np.frombuffer(costos, dtype=np.int64).copy()
+        suma = np.bincount(posicion, weights=costo, minlength=len(unicas)).astype(np.int64)
+        sin_costo = suma[posicion] == 0
+        costo[sin_costo] = 1
+        suma = np.bincount(posicion, weights=costo, minlength=len(unicas)).astype(np.int64)
+        partes = monto * costo // suma[posicion]
+        sobrante = monto[primera] - np.bincount(posicion, weights=partes, minlength=len(unicas)).astype(np.int64)
+        partes[primera] += sobrante
+        return array('q', partes.tobytes())
+
+    sumas: Dict[int, int] = {}
+    conteos: Dict[int, int] = {}
+    for factura, costo in zip(facturas, costos):
+        sumas[factura] = sumas.get(factura, 0) + costo
+        conteos[factura] = conteos.get(factura, 0) + 1
+    partes = array('q')
+    primeras: Dict[int, int] = {}
+    repartido: Dict[int, int] = {}
+    for fila, (factura, monto, costo) in enumerate(zip(facturas, montos, costos)):
+        suma = sumas[factura]
+        parte = monto * costo // suma if suma else monto // conteos[factura]
+        partes.append(parte)
+        primeras.setdefault(factura, fila)
+        repartido[factura] = repartido.get(factura, 0) + parte
+    for factura, fila in primeras.items():
+        partes[fila] += montos[fila] - repartido[factura]
+    return partes
+
+
+def agrupar(claves: array, dias: array, centavos: array) -> Tuple[Sequence[int], Sequence[Sequence[int]]]:
+    """
+    Suma los centavos por clave y tramo. Devuelve (claves ordenadas, [centavos por tramo] de cada clave).
+    Con NumPy los tramos salen de searchsorted y las sumas de un solo bincount sobre clave * 4 + tramo;
+    los centavos caben enteros en el float64 de bincount mientras cada suma sea menor que 2**53.
+    El resultado se queda en arrays de NumPy: pasarlo a listas tardaba más que agrupar.
+    """
+    if not len(claves):
+        return [], []
+    np = cargar_numpy()
+    if np is not None:
+        # np.frombuffer no copia los datos del array
+        k = np.frombuffer(claves, dtype=np.int64)
+        tramos = np.searchsorted(np.array(LIMITES_TRAMOS), np.frombuffer(dias, dtype=np.int64), side='left')
+        unicas, posicion = np.unique(k, return_inverse=True)
+        columnas = len(NOMBRES_TRAMOS)
+        sumas = np.bincount(posicion * columnas + tramos, weights=np.frombuffer(centavos, dtype=np.int64),
+                            minlength=len(unicas) * columnas)
+        return unicas, np.rint(sumas).astype(np.int64).reshape(-1, columnas)
+
+    por_clave: Dict[int, List[int]] = {}
+    for clave, antiguedad, monto in zip(claves, dias, centavos):
+        fila = por_clave.get(clave)
+        if fila is None:
+            fila = por_clave[clave] = [0] * len(NOMBRES_TRAMOS)
+        fila[bisect_left(LIMITES_TRAMOS, antiguedad)] += monto
+    ordenadas = sorted(por_clave)
+    return ordenadas, [por_clave[clave] for clave in ordenadas]
+
+
+class ReporteAntiguedad:
+    """Saldo por cobrar de cada paciente o doctor, repartido en los tramos de antigüedad (en centavos)"""
+    def __init__(self, agrupado_por: str, hoy: date, claves: Sequence[int], tramos: Sequence[Sequence[int]],
+                 registros: int, segundos: float):
+        self.agrupado_por = agrupado_por        # 'Paciente' o 'Doctor'
+        self.hoy = hoy
+        self.claves = claves                    # Listas, o arrays de NumPy si agrupar() lo usó
+        self.tramos = tramos
+        self.registros = registros              # Filas leídas: facturas, o tratamientos y citas por doctor
+        self.segundos = segundos
+        self.nombres: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.claves)
+
+    def totales_centavos(self) -> List[int]:
+        if not len(self.tramos):
+            return [0] * len(NOMBRES_TRAMOS)
+        if isinstance(self.tramos, list):
+            return [sum(columna) for columna in zip(*self.tramos)]
+        return self.tramos.sum(axis=0).tolist()
+
+    def totales(self) -> List[Decimal]:
+        return [Decimal(centavos).scaleb(-2) for centavos in self.totales_centavos()]
+
+    def mayores(self, cantidad: int = 20) -> List[int]:
+        """Posiciones de las claves con más saldo, de mayor a menor"""
+        if isinstance(self.tramos, list):
+            return sorted(range(len(self.claves)), key=lambda i: sum(self.tramos[i]), reverse=True)[:cantidad]
+        return (-self.tramos.sum(axis=1)).argsort(kind='stable')[:cantidad].tolist()
+
+    def nombre(self, clave: int) -> str:
+        if self.agrupado_por == 'Doctor' and clave == SIN_DOCTOR:
+            return "Sin asignar"
+        return self.nombres.get(clave, f"#{clave}")
+
+    def exportar_csv(self, ruta: str) -> int:
+        """Una fila por paciente o doctor; los montos en dólares con dos decimales. Devuelve las filas escritas"""
+        with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow([f"ID_{self.agrupado_por}", "Nombre", *NOMBRES_TRAMOS, "Total"])
+            for clave, fila in zip(self.claves, self.tramos):
+                clave, fila = int(clave), [int(centavos) for centavos in fila]
+                escritor.writerow([clave, self.nombre(clave),
+                                   *(f"{centavos / 100:.2f}" for centavos in fila), f"{sum(fila) / 100:.2f}"])
+        return len(self.claves)
+
+    def texto(self, cantidad: int = 20) -> str:
+        encabezado = f"{self.agrupado_por:<28}" + "".join(f"{nombre:>14}" for nombre in NOMBRES_TRAMOS) + f"{'Total':>15}"
+        lineas = [f"📅 ANTIGÜEDAD DE SALDOS POR {self.agrupado_por.upper()} al {self.hoy:%d/%m/%Y} "
+                  f"({len(self):,} con saldo, {self.registros:,} registros)", encabezado, "-" * len(encabezado)]
+        for i in self.mayores(cantidad):
+            fila = [int(centavos) for centavos in self.tramos[i]]
+            lineas.append(f"{self.nombre(int(self.claves[i]))[:27]:<28}" + "".join(f"{c / 100:>14,.2f}" for c in fila)
+                          + f"{sum(fila) / 100:>15,.2f}")
+        totales = self.totales_centavos()
+        lineas.append("-" * len(encabezado))
+        lineas.append(f"{'TOTAL':<28}" + "".join(f"{c / 100:>14,.2f}" for c in totales) + f"{sum(totales) / 100:>15,.2f}")
+        return "\n".join(lineas)
+
+
+class AntiguedadSaldos:
+    """
+    Arma el reporte de antigüedad de saldos leyendo solo las columnas necesarias de las facturas por
+    cobrar (Pendiente y Vencida). La base calcula los días y los centavos enteros; las filas llegan
+    por bloques de fetchmany a tres arrays de enteros, sin crear un objeto por factura.
+    Por doctor, el Monto_Total de cada factura se reparte en proporción al costo de los tratamientos
+    (Tratamiento_Factura) y las citas (Cita_Factura, migración 5) que cobra, así que el total por doctor
+    es el mismo que por paciente; las facturas sin ninguno quedan en "Sin asignar".
+    Los índices de la migración 8 buscan esos enlaces desde la factura.
+    """
+    def __init__(self, pool: PoolConexiones, marcador: str = '%s', tamano_bloque: int = 50_000):
+        self.pool = pool
+        self.marcador = marcador
+        self.tamano_bloque = tamano_bloque
+        self.texto = marcador == '?'    # sqlite3 recibe las fechas como texto
+        m = marcador
+        if self.texto:
+            dias = f"CAST(julianday({m}) - julianday(f.Fecha_Emision) AS INTEGER)"
+            centavos = "CAST(ROUND({} * 100) AS INTEGER)"
+        else:
+            dias = f"DATEDIFF({m}, f.Fecha_Emision)"
+            centavos = "CAST(ROUND({} * 100) AS SIGNED)"
+        por_cobrar = "f.Estado_Pago IN (" + ", ".join(f"'{estado}'" for estado in ESTADOS_POR_COBRAR) + ")"
+        self.sql_paciente = f"SELECT f.ID_Paciente, {dias}, {centavos.format('f.Monto_Total')} FROM Factura f WHERE {por_cobrar}"
+        # Tres partes con el mismo parámetro de fecha: (factura, doctor, días, monto de la factura, costo del enlace)
+        monto = centavos.format('f.Monto_Total')
+        self.sql_doctor = (
+            f"SELECT f.ID_Factura, t.ID_Doctor, {dias}, {monto}, {centavos.format('t.Costo')} FROM Factura f "
+            f"JOIN Tratamiento_Factura tf ON tf.ID_Factura = f.ID_Factura "
+            f"JOIN Tratamiento t ON t.ID_Tratamiento = tf.ID_Tratamiento WHERE {por_cobrar} "
+            f"UNION ALL "
+            f"SELECT f.ID_Factura, c.ID_Doctor, {dias}, {monto}, {centavos.format('c.Costo')} FROM Factura f "
+            f"JOIN Cita_Factura cf ON cf.ID_Factura = f.ID_Factura "
+            f"JOIN Cita c ON c.ID_Cita = cf.ID_Cita WHERE {por_cobrar} "
+            f"UNION ALL "
+            f"SELECT f.ID_Factura, {SIN_DOCTOR}, {dias}, {monto}, {monto} FROM Factura f WHERE {por_cobrar} "
+            f"AND NOT EXISTS (SELECT 1 FROM Tratamiento_Factura tf WHERE tf.ID_Factura = f.ID_Factura) "
+            f"AND NOT EXISTS (SELECT 1 FROM Cita_Factura cf WHERE cf.ID_Factura = f.ID_Factura)")
+        self.sql_nombres = {'Paciente': "SELECT ID_Paciente, Nombre, Apellido FROM Paciente",
+                            'Doctor': "SELECT ID_Doctor, Nombre, Apellido FROM Doctor"}
+
+    def _leer(self, sql: str, parametros: tuple, cantidad: int) -> List[array]:
+        """Una columna de enteros (array 'q') por cada una de las `cantidad` columnas del SELECT"""
+        columnas = [array('q') for _ in range(cantidad)]
+        with self.pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(sql, parametros)
+                while True:
+                    filas = cursor.fetchmany(self.tamano_bloque)
+                    if not filas:
+                        break
+                    for columna, valores in zip(columnas, zip(*filas)):
+                        columna.extend(map(int, valores))
+            finally:
+                cursor.close()
+        return columnas
+
+    def _parametro(self, hoy: date):
+        return hoy.isoformat() if self.texto else hoy
+
+    def por_paciente(self, hoy: Optional[date] = None) -> ReporteAntiguedad:
+        inicio = time.perf_counter()
+        hoy = hoy or date.today()
+        pacientes, dias, centavos = self._leer(self.sql_paciente, (self._parametro(hoy),), 3)
+        ids, tramos = agrupar(pacientes, dias, centavos)
+        return ReporteAntiguedad('Paciente', hoy, ids, tramos, len(pacientes), time.perf_counter() - inicio)
+
+    def por_doctor(self, hoy: Optional[date] = None) -> ReporteAntiguedad:
+        inicio = time.perf_counter()
+        hoy = hoy or date.today()
+        facturas, doctores, dias, montos, costos = self._leer(self.sql_doctor, (self._parametro(hoy),) * 3, 5)
+        ids, tramos = agrupar(doctores, dias, repartir(facturas, montos, costos))
+        return ReporteAntiguedad('Doctor', hoy, ids, tramos, len(doctores), time.perf_counter() - inicio)
+
+    def cargar_nombres(self, reporte: ReporteAntiguedad):
+        """Nombres para el texto y el CSV; se leen aparte porque el cálculo no los necesita"""
+        with self.pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(self.sql_nombres[reporte.agrupado_por])
+                while True:
+                    filas = cursor.fetchmany(self.tamano_bloque)
+                    if not filas:
+                        break
+                    reporte.nombres.update((clave, f"{nombre} {apellido}") for clave, nombre, apellido in filas)
+            finally:
+                cursor.close()
+
+
+def main():
+    # Uso: python AntiguedadSaldos.py [paciente|doctor] [salida.csv]  -> reporte de MariaDB (DbClinica)
+    #      python AntiguedadSaldos.py prueba [N]                     -> ~N facturas en SQLite (por defecto 1,000,000)
+    import sqlite3
+    import tempfile
+
+    if len(sys.argv) < 2 or sys.argv[1] != "prueba":
+        from DbClinica import obtener_pool
+        antiguedad = AntiguedadSaldos(obtener_pool())
+        reporte = antiguedad.por_doctor() if len(sys.argv) > 1 and sys.argv[1] == "doctor" else antiguedad.por_paciente()
+        antiguedad.cargar_nombres(reporte)
+        print(reporte.texto())
+        if len(sys.argv) > 2:
+            print(f"\n{reporte.exportar_csv(sys.argv[2]):,} filas exportadas a {sys.argv[2]}")
+        return
+
+    from DatosSinteticos import GeneradorClinica
+    from Migraciones import migrar
+    from Repositorios import crear_esquema_sqlite, crear_repositorios
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    generador = GeneradorClinica(total * 4)     # Una factura por cada dos tratamientos, y dos tratamientos por cada cuatro citas
+
+    carpeta = tempfile.mkdtemp()
+    ruta = os.path.join(carpeta, "clinica_antiguedad.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    migrar(inicial, marcador='?')
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=1)
+    repositorios = crear_repositorios(pool, marcador='?')
+    inicio = time.perf_counter()
+    for tabla, filas in generador.tablas().items():
+        if tabla in ('Paciente', 'Doctor', 'Tratamiento', 'Factura', 'Tratamiento_Factura'):
+            repositorios[tabla].insertar_lote(filas, tamano_lote=20_000)
+    print(f"Datos cargados en {time.perf_counter() - inicio:.1f} s: {generador.num_facturas:,} facturas, "
+          f"{generador.num_pacientes:,} pacientes, {generador.num_doctores:,} doctores")
+    # Algunas facturas con recargo: su monto ya no es la suma de sus tratamientos
+    with pool.conexion() as conexion:
+        conexion.execute("UPDATE Factura SET Monto_Total = Monto_Total + 0.07 WHERE ID_Factura % 7 = 0")
+        conexion.commit()
+
+    hoy = generador.dia(generador.num_dias + 10)     # Las facturas quedan entre 10 y ~95 días de antigüedad
+    antiguedad = AntiguedadSaldos(pool, marcador='?')
+    for consulta, cantidad in ((antiguedad.sql_paciente, 3), (antiguedad.sql_doctor, 5)):
+        antiguedad._leer(consulta + " LIMIT 1", (hoy.isoformat(),) * consulta.count('?'), cantidad)  # Calienta la caché de páginas
+
+    import ImportacionDiferida
+    np = cargar_numpy()
+    motor = 'NumPy' if np is not None else 'Python'
+    print(f"\n{'Reporte':<20} {'registros':>10} {'filas':>9} {'total':>9}")
+    reportes = {}
+    for nombre, generar in (("Por paciente", antiguedad.por_paciente), ("Por doctor", antiguedad.por_doctor)):
+        tiempos = []
+        for _ in range(3):
+            reporte = generar(hoy)
+            tiempos.append(reporte.segundos)
+        reportes[nombre] = reporte
+        print(f"{nombre:<20} {reporte.registros:>10,} {len(reporte):>9,} {min(tiempos) * 1000:>7.0f} ms ({motor})")
+
+    # Lo que cuesta la lectura contra lo que cuesta agrupar
+    claves, dias, centavos = antiguedad._leer(antiguedad.sql_paciente, (hoy.isoformat(),), 3)
+    inicio = time.perf_counter()
+    agrupar(claves, dias, centavos)
+    vectorizado = time.perf_counter() - inicio
+    print(f"Agrupar {len(claves):,} facturas: {vectorizado * 1000:.0f} ms con {motor}", end="")
+    if np is not None:
+        ImportacionDiferida._numpy = None
+        inicio = time.perf_counter()
+        agrupar(claves, dias, centavos)
+        en_python = time.perf_counter() - inicio
+        ImportacionDiferida._numpy = np
+        print(f", {en_python * 1000:.0f} ms con un dict en Python ({en_python / vectorizado:.1f}x)")
+    else:
+        print()
+
+    # Que los tramos cuadren con SQL y que NumPy y Python den lo mismo se prueba en tests/test_antiguedad_saldos.py
+    por_paciente, por_doctor = reportes["Por paciente"], reportes["Por doctor"]
+    antiguedad.cargar_nombres(por_doctor)
+    print("\n" + por_doctor.texto(10))
+    inicio = time.perf_counter()
+    antiguedad.cargar_nombres(por_paciente)
+    ruta_csv = os.path.join(carpeta, "antiguedad_pacientes.csv")
+    filas = por_paciente.exportar_csv(ruta_csv)
+    print(f"\nCSV: {filas:,} pacientes con nombre en {time.perf_counter() - inicio:.2f} s -> {ruta_csv}")
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
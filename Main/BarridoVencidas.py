@@ -0,0 +1,212 @@
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, NamedTuple, Optional
+
+from PoolConexiones import PoolConexiones
+
+PLAZO_PAGO_DIAS = 30        # Días desde la emisión para pagar una factura antes de que venza
+ESTADO_PENDIENTE = 'Pendiente'
+ESTADO_VENCIDA = 'Vencida'
+
+
+class ResumenBarrido(NamedTuple):
+    """Resultado de una pasada del barrido"""
+    corte: date                 # Vencen las facturas emitidas antes de esta fecha
+    vencidas: int
+    lotes: int
+    monto_vencido: Decimal
+    mas_antigua: Optional[date]
+    segundos: float
+
+    @property
+    def por_segundo(self) -> float:
+        return self.vencidas / self.segundos if self.segundos else 0.0
+
+
+def fecha_corte(hoy: date, plazo_dias: int = PLAZO_PAGO_DIAS) -> date:
+    """Una factura está vencida si se emitió antes de esta fecha"""
+    return hoy - timedelta(days=plazo_dias)
+
+
+class BarridoVencidas:
+    """
+    Pasa a Vencida las facturas Pendiente con más de plazo_dias desde su emisión.
+    Trabaja por lotes de tamano_lote facturas, cada uno en su propia transacción corta: se buscan las
+    más antiguas con el índice (Estado_Pago, Fecha_Emision) de la migración 7, se actualizan y se
+    confirma. Las que ya cambiaron dejan de ser Pendiente, así que el siguiente lote vuelve a leer
+    desde el principio del índice sin recordar posiciones y nunca hay más de un lote en memoria.
+    """
+    def __init__(self, pool: PoolConexiones, marcador: str = '%s', plazo_dias: int = PLAZO_PAGO_DIAS,
+                 tamano_lote: int = 5000, pausa: float = 0.0):
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser mayor que cero")
+        self.pool = pool
+        self.marcador = marcador
+        self.plazo_dias = plazo_dias
+        self.tamano_lote = tamano_lote
+        self.pausa = pausa                  # Segundos entre lotes para dejar pasar a otras transacciones
+        self.texto = marcador == '?'        # sqlite3 recibe las fechas como texto
+        # En MariaDB FOR UPDATE bloquea las filas leídas hasta el UPDATE; SQLite ya bloquea la base al escribir
+        bloqueo = "" if self.texto else " FOR UPDATE"
+        self.sql_lote = (f"SELECT ID_Factura, Fecha_Emision, Monto_Total FROM Factura "
+                         f"WHERE Estado_Pago = '{ESTADO_PENDIENTE}' AND Fecha_Emision < {marcador} "
+                         f"ORDER BY Fecha_Emision LIMIT {int(tamano_lote)}{bloqueo}")
+
+    def _sql_actualizar(self, cantidad: int) -> str:
+        return (f"UPDATE Factura SET Estado_Pago = '{ESTADO_VENCIDA}' WHERE Estado_Pago = '{ESTADO_PENDIENTE}' "
+                f"AND ID_Factura IN ({', '.join(self.marcador for _ in range(cantidad))})")
+
+    def _lote(self, corte) -> tuple:
+        """
+        Una transacción: (facturas leídas, facturas vencidas, monto de las vencidas, emisión más antigua
+        de las vencidas). Si otra transacción cambió alguna factura entre la lectura y el UPDATE, el lote
+        se deshace y se repite factura por factura, para que el monto cuente solo las que sí vencieron.
+        """
+        with self.pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(self.sql_lote, (corte,))
+                filas = cursor.fetchall()
+                if not filas:
+                    conexion.rollback()
+                    return 0, 0, Decimal(0), None
+                cursor.execute(self._sql_actualizar(len(filas)), [fila[0] for fila in filas])
+                if cursor.rowcount == len(filas):
+                    vencidas = filas
+                else:
+                    conexion.rollback()
+                    sql_una = self._sql_actualizar(1)
+                    vencidas = []
+                    for fila in filas:
+                        cursor.execute(sql_una, (fila[0],))
+                        if cursor.rowcount == 1:
+                            vencidas.append(fila)
+                conexion.commit()
+                monto = sum((m if isinstance(m, Decimal) else Decimal(str(m)) for _, _, m in vencidas), Decimal(0))
+                return len(filas), len(vencidas), monto, vencidas[0][1] if vencidas else None
+            except Exception:
+                conexion.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def barrer(self, hoy: Optional[date] = None) -> ResumenBarrido:
+        inicio = time.perf_counter()
+        corte = fecha_corte(hoy or date.today(), self.plazo_dias)
+        parametro = corte.isoformat() if self.texto else corte
+        vencidas, lotes, monto, mas_antigua = 0, 0, Decimal(0), None
+        while True:
+            # Se sigue mientras la consulta traiga facturas: un lote en el que otra transacción ya cambió
+            # todas no vence ninguna, pero todavía puede haber pendientes detrás
+            leidas, cantidad, monto_lote, primera = self._lote(parametro)
+            if not leidas:
+                break
+            vencidas += cantidad
+            lotes += 1
+            monto += monto_lote
+            if mas_antigua is None and primera is not None:     # Los lotes salen en orden de emisión
+                mas_antigua = primera if isinstance(primera, date) else date.fromisoformat(str(primera)[:10])
+            if self.pausa:
+                time.sleep(self.pausa)
+        return ResumenBarrido(corte, vencidas, lotes, monto, mas_antigua, time.perf_counter() - inicio)
+
+    def programar(self, intervalo: float, al_terminar: Optional[Callable[[ResumenBarrido], None]] = None,
+                  al_fallar: Optional[Callable[[Exception], None]] = None) -> threading.Event:
+        """
+        Corre barrer() en un hilo cada `intervalo` segundos (por ejemplo 86400: una vez al día) hasta que
+        se llame set() sobre el Event devuelto. Un error en una pasada no detiene las siguientes.
+        """
+        detener = threading.Event()
+
+        def ciclo():
+            while not detener.is_set():
+                try:
+                    resumen = self.barrer()
+                    if al_terminar:
+                        al_terminar(resumen)
+                except Exception as e:
+                    if al_fallar:
+                        al_fallar(e)
+                detener.wait(intervalo)
+
+        threading.Thread(target=ciclo, name="barrido_vencidas", daemon=True).start()
+        return detener
+
+
+def imprimir_resumen(resumen: ResumenBarrido):
+    print(f"⏰ Barrido de facturas vencidas (emitidas antes del {resumen.corte:%d/%m/%Y})")
+    if not resumen.vencidas:
+        print("   No había facturas pendientes fuera de plazo")
+        return
+    print(f"   {resumen.vencidas:,} facturas pasaron a {ESTADO_VENCIDA} en {resumen.lotes:,} lotes | "
+          f"monto vencido: ${resumen.monto_vencido:,.2f} | la más antigua: {resumen.mas_antigua:%d/%m/%Y}")
+    print(f"   {resumen.segundos:.2f} s ({resumen.por_segundo:,.0f} facturas/s)")
+
+
+def main():
+    # Uso: python BarridoVencidas.py              -> barre la base de MariaDB (DbClinica)
+    #      python BarridoVencidas.py prueba [N]   -> N facturas pendientes en SQLite (por defecto 1,000,000)
+    import os
+    import random
+    import sqlite3
+    import sys
+    import tempfile
+    import tracemalloc
+    from Migraciones import migrar
+
+    if len(sys.argv) < 2 or sys.argv[1] != "prueba":
+        from DbClinica import obtener_pool
+        imprimir_resumen(BarridoVencidas(obtener_pool()).barrer())
+        return
+
+    from DatosSinteticos import GeneradorClinica
+    from Repositorios import crear_esquema_sqlite, crear_repositorios
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    hoy = date(2025, 7, 1)
+    plazo = PLAZO_PAGO_DIAS
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_vencidas.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    migrar(inicial, marcador='?')
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=1)
+    repositorios = crear_repositorios(pool, marcador='?')
+    generador = GeneradorClinica(40_000)
+    repositorios['Paciente'].insertar_lote(generador.pacientes())
+
+    # Facturas pendientes emitidas a lo largo de un año, más un 20% ya pagadas que el barrido no toca
+    aleatorio = random.Random(23)
+    inicio = time.perf_counter()
+    repositorios['Factura'].insertar_lote(
+        ((aleatorio.randint(1, generador.num_pacientes), (hoy - timedelta(days=aleatorio.randrange(365))).isoformat(),
+          aleatorio.choice((20.0, 35.5, 45.0, 120.0, 250.0)), ESTADO_PENDIENTE if i < total else 'Pagada')
+         for i in range(total + total // 5)), tamano_lote=20_000)
+    print(f"{total:,} facturas pendientes cargadas en {time.perf_counter() - inicio:.1f} s")
+
+    corte = fecha_corte(hoy, plazo).isoformat()
+    with pool.conexion() as conexion:
+        conexion.execute("ANALYZE")
+        barrido = BarridoVencidas(pool, marcador='?', plazo_dias=plazo)
+        plan = " | ".join(fila[-1] for fila in conexion.execute("EXPLAIN QUERY PLAN " + barrido.sql_lote, (corte,)))
+        esperadas, monto_esperado = conexion.execute(
+            "SELECT COUNT(*), SUM(Monto_Total) FROM Factura WHERE Estado_Pago = ? AND Fecha_Emision < ?",
+            (ESTADO_PENDIENTE, corte)).fetchone()
+    print(f"Plan de cada lote: {plan}")
+    # Que vencen exactamente estas facturas y ninguna otra se prueba en tests/test_barrido_vencidas.py
+    print(f"Pendientes fuera de plazo: {esperadas:,} por ${monto_esperado:,.2f}")
+
+    tracemalloc.start()
+    resumen = barrido.barrer(hoy)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    imprimir_resumen(resumen)
+    print(f"   Memoria máxima durante el barrido: {pico / 2**20:.1f} MB")
+
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
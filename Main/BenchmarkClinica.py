@@ -0,0 +1,214 @@
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from DatosSinteticos import GeneradorClinica
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modelos'))
+
+ESCALAS = (1_000, 100_000, 1_000_000)
+CONSULTAS = 10_000          # Operaciones medidas por ruta después de cargar los datos
+DURACION_CITA = timedelta(minutes=30)
+
+
+def _resultado(ruta: str, generador: GeneradorClinica, operaciones: int, segundos: float, **detalle) -> dict:
+    return {
+        'ruta': ruta, 'escala': generador.escala, 'operaciones': operaciones,
+        'segundos': round(segundos, 6),
+        'ops_por_segundo': round(operaciones / segundos, 1) if segundos else None,
+        'detalle': detalle,
+    }
+
+
+def _cronometrar(funcion: Callable, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def _fecha(texto: str) -> datetime:
+    return datetime.strptime(texto, '%Y-%m-%d %H:%M:%S')
+
+
+def medir_crear_cita(generador: GeneradorClinica) -> dict:
+    """Verificación de choque de CitaWindow.crear_cita: AlmacenCitas.agregar sobre la agenda ya cargada"""
+    from AlmacenCitas import AlmacenCitas
+    from Cita import Cita
+
+    def cita(id_cita, id_paciente, id_doctor, inicio, costo, estado="Pendiente"):
+        nueva = Cita(id_cita, id_paciente, id_doctor, inicio, inicio + DURACION_CITA, costo)
+        nueva.estado = estado
+        return nueva
+
+    almacen = AlmacenCitas()
+    existentes = [cita(f"C{i}", id_paciente, id_doctor, _fecha(fecha), costo, estado)
+                  for i, (id_paciente, id_doctor, fecha, estado, costo) in enumerate(generador.citas(), 1)]
+    rechazadas_carga, carga = _cronometrar(lambda: sum(not almacen.agregar(c) for c in existentes))
+    del existentes
+
+    aleatorio = random.Random(generador.semilla)
+    candidatas = []
+    for i in range(CONSULTAS):
+        dia = datetime.combine(generador.dia(aleatorio.randrange(generador.num_dias)), datetime.min.time())
+        inicio = dia + timedelta(hours=aleatorio.randrange(8, 17), minutes=aleatorio.choice((0, 15, 30, 45)))
+        candidatas.append(cita(f"N{i}", 1, aleatorio.randint(1, generador.num_doctores), inicio, 25.0))
+    aceptadas, segundos = _cronometrar(lambda: sum(almacen.agregar(c) for c in candidatas))
+    return _resultado('crear_cita', generador, CONSULTAS, segundos, carga_segundos=round(carga, 4),
+                      citas_cargadas=len(almacen) - aceptadas, rechazadas_en_carga=rechazadas_carga,
+                      aceptadas=aceptadas, rechazadas=CONSULTAS - aceptadas)
+
+
+def medir_horario_ocupado(generador: GeneradorClinica) -> dict:
+    """Traslape de horarios: IndiceHorarios.esta_ocupado y, como referencia, horario_ocupado contra el día"""
+    from Horario import Doctor, Horario
+    from IndiceHorarios import IndiceHorarios
+
+    doctores = {i: Doctor(i, f"Doctor{i}", "General") for i in range(1, generador.num_doctores + 1)}
+    indice = IndiceHorarios()
+    horarios = [Horario(f"H{i}", dia, inicio[:5], fin[:5], doctores[id_doctor])
+                for i, (id_doctor, dia, inicio, fin, _) in enumerate(generador.horarios(), 1)]
+    rechazados_carga, carga = _cronometrar(lambda: sum(not indice.agregar(h) for h in horarios))
+    del horarios
+
+    aleatorio = random.Random(generador.semilla)
+    candidatos = []
+    for i in range(CONSULTAS):
+        inicio = aleatorio.randrange(7 * 60, 18 * 60, 30)
+        candidatos.append(Horario(f"X{i}", generador.dia(aleatorio.randrange(generador.num_dias)).isoformat(),
+                                  f"{inicio // 60:02d}:{inicio % 60:02d}",
+                                  f"{(inicio + 60) // 60:02d}:{(inicio + 60) % 60:02d}",
+                                  doctores[aleatorio.randint(1, generador.num_doctores)]))
+    ocupados, segundos = _cronometrar(lambda: sum(indice.esta_ocupado(c) for c in candidatos))
+
+    # Recorrido del día completo con horario_ocupado, como antes del índice (muestra más chica)
+    muestra = candidatos[:1000]
+    ocupados_lineal, lineal = _cronometrar(
+        lambda: sum(any(h.horario_ocupado(c) for h in indice.horarios_del_dia(c.dia)) for c in muestra))
+    assert ocupados_lineal == sum(indice.esta_ocupado(c) for c in muestra)
+    return _resultado('horario_ocupado', generador, CONSULTAS, segundos, carga_segundos=round(carga, 4),
+                      horarios_cargados=len(indice), rechazados_en_carga=rechazados_carga, ocupados=ocupados,
+                      lineal_ops_por_segundo=round(len(muestra) / lineal, 1))
+
+
+def medir_dedupe_dui(generador: GeneradorClinica) -> dict:
+    """Carga masiva en RegistroUnico con 1% de DUIs repetidos; deben rechazarse exactamente esos"""
+    from RegistroUnico import RegistroUnico
+
+    registros = [{'nombre': nombre, 'apellido': apellido, 'dui': dui, 'telefono': telefono, 'correo': correo}
+                 for nombre, apellido, _, dui, telefono, correo in generador.pacientes() if dui]
+    aleatorio = random.Random(generador.semilla)
+    repetidos = [{**registro, 'correo': f"otro{i}@correo.com"}
+                 for i, registro in enumerate(aleatorio.sample(registros, max(1, len(registros) // 100)))]
+    lote = registros + repetidos
+    aleatorio.shuffle(lote)
+
+    registro = RegistroUnico(('dui', 'correo'))
+    (agregados, rechazados), segundos = _cronometrar(registro.agregar_lote, lote)
+    assert agregados == len(registros) and len(rechazados) == len(repetidos)
+    return _resultado('dedupe_dui', generador, len(lote), segundos, agregados=agregados, rechazados=len(rechazados))
+
+
+def medir_reporte(generador: GeneradorClinica) -> dict:
+    """Historial de todos los pacientes con ReporteHistorial.secciones_historial, consumido sección por sección"""
+    from ReporteHistorial import secciones_historial
+
+    doctores = [SimpleNamespace(nombre=nombre, apellido=apellido) for nombre, apellido, *_ in generador.doctores()]
+    pacientes = [{'nombre': nombre, 'apellido': apellido, 'edad': 2025 - int(nacimiento[:4]), 'dui': dui or "",
+                  'telefono': int(telefono), 'correo': correo, 'saldo_pendiente': 0.0,
+                  'fecha_registro': "06/01/2025 - 08:00:00", 'historial_medico': [], 'citas': []}
+                 for nombre, apellido, nacimiento, dui, telefono, correo in generador.pacientes()]
+    for id_paciente, id_doctor, descripcion, costo, fecha, estado in generador.tratamientos():
+        pacientes[id_paciente - 1]['historial_medico'].append(SimpleNamespace(
+            descripcion=descripcion, costo=costo, fecha_realizacion=fecha[:10], estado=estado,
+            doctor=doctores[id_doctor - 1]))
+    for i, (id_paciente, id_doctor, fecha, estado, costo) in enumerate(generador.citas(), 1):
+        pacientes[id_paciente - 1]['citas'].append(SimpleNamespace(
+            id_cita=f"C{i}", hora_inicio=fecha, hora_fin=fecha, costo_cita=costo, estado=estado,
+            doctor=doctores[id_doctor - 1]))
+
+    gc.collect()
+    inicio = time.perf_counter()
+    secciones = secciones_historial(pacientes)
+    caracteres = len(next(secciones)) + len(next(secciones))
+    primer_paciente = time.perf_counter() - inicio
+    for seccion in secciones:
+        caracteres += len(seccion)
+    segundos = time.perf_counter() - inicio
+    return _resultado('reporte_historial', generador, len(pacientes), segundos,
+                      primer_paciente_ms=round(primer_paciente * 1000, 3), caracteres=caracteres)
+
+
+def medir_totales_facturas(generador: GeneradorClinica) -> dict:
+    """Total general y por estado de pago de FacturaWindow, más el listado preparado para la tabla"""
+    from Factura import Factura, Paciente, _preparar_listado
+    from decimal import Decimal
+    from LineasFactura import a_centavos, a_decimal
+
+    pacientes = [Paciente(nombre, apellido, dui=dui or "") for nombre, apellido, _, dui, *_ in generador.pacientes()]
+    facturas = []
+    for k, (id_paciente, fecha, _, estado) in enumerate(generador.facturas()):
+        primero, segundo = generador.tratamiento(2 * k), generador.tratamiento(2 * k + 1)
+        facturas.append(Factura(f"F{k + 1}", pacientes[id_paciente - 1], [primero[2], segundo[2]],
+                                [primero[3], segundo[3]], datetime.strptime(fecha, '%Y-%m-%d'), estado))
+
+    def totales():
+        por_estado: Dict[str, Decimal] = {}
+        for factura in facturas:
+            por_estado[factura.estado_pago] = por_estado.get(factura.estado_pago, Decimal(0)) + factura.monto_total
+        return por_estado
+
+    por_estado, segundos = _cronometrar(totales)
+    (_, total_general, _), listado = _cronometrar(_preparar_listado, facturas)
+    esperado = a_decimal(sum(a_centavos(monto) for _, _, monto, _ in generador.facturas()))
+    assert total_general == esperado        # Montos en centavos: sin tolerancia
+    return _resultado('totales_facturas', generador, len(facturas), segundos,
+                      total_general=float(total_general),
+                      por_estado={estado: float(total) for estado, total in sorted(por_estado.items())},
+                      listado_segundos=round(listado, 4))
+
+
+RUTAS = (medir_crear_cita, medir_horario_ocupado, medir_dedupe_dui, medir_reporte, medir_totales_facturas)
+
+
+def ejecutar(escalas=ESCALAS, semilla: int = 16) -> dict:
+    """Corre todas las rutas en cada escala y devuelve el documento JSON con los resultados"""
+    resultados: List[dict] = []
+    for escala in escalas:
+        generador = GeneradorClinica(escala, semilla)
+        for ruta in RUTAS:
+            resultado = ruta(generador)
+            resultados.append(resultado)
+            print(f"{escala:>10,} | {resultado['ruta']:<18} | {resultado['operaciones']:>9,} ops en "
+                  f"{resultado['segundos']:9.4f} s | {resultado['ops_por_segundo'] or 0:>14,.0f} ops/s",
+                  file=sys.stderr)
+            gc.collect()
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'plataforma': platform.platform(),
+        'semilla': semilla, 'resultados': resultados,
+    }
+
+
+def main():
+    # Uso: python BenchmarkClinica.py [escalas separadas por coma] [archivo.json]
+    #      python BenchmarkClinica.py 1000,100000 resultados.json
+    escalas = [int(e) for e in sys.argv[1].split(',')] if len(sys.argv) > 1 else ESCALAS
+    documento = ejecutar(escalas)
+    texto = json.dumps(documento, ensure_ascii=False, indent=2)
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+        print(f"Resultados guardados en {sys.argv[2]}", file=sys.stderr)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from DatosSinteticos import GeneradorClinica
+from Migraciones import migrar, revertir
+from PoolConexiones import PoolConexiones
+from Repositorios import crear_esquema_sqlite, crear_repositorios
+
+# Consultas de la aplicación que cubren los índices de Migraciones.py: (nombre, sql, generador de parámetros)
+CONSULTAS = [
+    ("Choque de citas (MotorReservas)",
+     "SELECT ID_Cita FROM Cita WHERE ID_Doctor = ? AND Estado <> 'Cancelada' AND Fecha > ? AND Fecha < ? LIMIT 1",
+     'choque'),
+    ("Agenda del día de un doctor",
+     "SELECT ID_Cita, ID_Paciente, Fecha, Estado FROM Cita WHERE ID_Doctor = ? AND Fecha >= ? AND Fecha < ? "
+     "ORDER BY Fecha",
+     'agenda'),
+    ("Horario disponible de un doctor",
+     "SELECT ID_Horario, Version FROM Horario WHERE ID_Doctor = ? AND Dia = ? AND Hora_Inicio <= ? "
+     "AND Hora_Fin >= ? AND Disponible = 1 LIMIT 1",
+     'horario'),
+    ("Facturas pendientes de un paciente",
+     "SELECT ID_Factura, Monto_Total FROM Factura WHERE ID_Paciente = ? AND Estado_Pago = 'Pendiente'",
+     'factura'),
+    ("Últimos tratamientos de un paciente",
+     "SELECT ID_Tratamiento, Descripcion, Fecha FROM Tratamiento WHERE ID_Paciente = ? ORDER BY Fecha DESC LIMIT 20",
+     'tratamiento'),
+]
+
+
+def _parametros(tipo: str, aleatorio: random.Random, generador: GeneradorClinica) -> tuple:
+    dia = generador.dia(aleatorio.randrange(generador.num_dias))
+    inicio = datetime.combine(dia, datetime.min.time()) + timedelta(hours=8 + aleatorio.randrange(8))
+    doctor = aleatorio.randint(1, generador.num_doctores)
+    if tipo == 'choque':
+        return doctor, (inicio - timedelta(minutes=30)).isoformat(' '), (inicio + timedelta(minutes=30)).isoformat(' ')
+    if tipo == 'agenda':
+        return doctor, dia.isoformat(), (dia + timedelta(days=1)).isoformat()
+    if tipo == 'horario':
+        return (doctor, dia.isoformat(), inicio.strftime('%H:%M:%S'),
+                (inicio + timedelta(minutes=30)).strftime('%H:%M:%S'))
+    return (aleatorio.randint(1, generador.num_pacientes),)
+
+
+def medir(conexion, repeticiones: int, generador: GeneradorClinica) -> List[Tuple[str, str, float, float]]:
+    """Por consulta: (nombre, plan, mediana_ms, p95_ms) con los mismos parámetros en cada corrida"""
+    resultados = []
+    for nombre, sql, tipo in CONSULTAS:
+        aleatorio = random.Random(nombre)
+        plan = " | ".join(fila[-1] for fila in conexion.execute("EXPLAIN QUERY PLAN " + sql,
+                                                                _parametros(tipo, aleatorio, generador)))
+        latencias = []
+        for _ in range(repeticiones):
+            parametros = _parametros(tipo, aleatorio, generador)
+            inicio = time.perf_counter()
+            conexion.execute(sql, parametros).fetchall()
+            latencias.append(time.perf_counter() - inicio)
+        latencias.sort()
+        resultados.append((nombre, plan, latencias[len(latencias) // 2] * 1000,
+                           latencias[int(len(latencias) * 0.95)] * 1000))
+    return resultados
+
+
+def main():
+    # Uso: python BenchmarkIndices.py [escala] -> EXPLAIN y latencias antes y después de las migraciones (SQLite)
+    escala = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    repeticiones = 200
+    generador = GeneradorClinica(escala)
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_indices.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=1)
+    inicio = time.perf_counter()
+    filas = generador.cargar(crear_repositorios(pool, marcador='?'))
+    pool.cerrar()
+    print(f"Datos sintéticos cargados en {time.perf_counter() - inicio:.1f} s: "
+          + ", ".join(f"{tabla} {filas[tabla]:,}" for tabla in ("Paciente", "Horario", "Cita", "Tratamiento",
+                                                                 "Factura")))
+
+    conexion = sqlite3.connect(ruta)
+    revertir(conexion, 0, marcador='?')
+    antes = medir(conexion, repeticiones, generador)
+    aplicadas = migrar(conexion, marcador='?')
+    conexion.execute("ANALYZE")
+    despues = medir(conexion, repeticiones, generador)
+    print(f"Migraciones aplicadas: {', '.join(f'{m.version:03d}' for m in aplicadas)}\n")
+
+    for (nombre, plan_antes, mediana_antes, p95_antes), (_, plan_despues, mediana_despues, p95_despues) \
+            in zip(antes, despues):
+        print(nombre)
+        print(f"   antes:   {plan_antes}")
+        print(f"            mediana {mediana_antes:8.3f} ms | p95 {p95_antes:8.3f} ms")
+        print(f"   después: {plan_despues}")
+        print(f"            mediana {mediana_despues:8.3f} ms | p95 {p95_despues:8.3f} ms "
+              f"({mediana_antes / max(mediana_despues, 1e-6):,.0f}x)")
+    conexion.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modelos'))
+from AlmacenCitas import AlmacenCitas, ESTADO_CANCELADA
+from Dominio import ESTADO_PAGADA, ESTADOS_POR_COBRAR
+from Entidades import Cita, Factura, Horario
+from EstadisticasClinica import EstadisticasClinica, totales_paciente
+from IndiceHorarios import IndiceHorarios
+from LibroSaldos import ConciliacionPreparada, LibroSaldos, ResumenConciliacion
+from LineasFactura import a_centavos, a_decimal
+from RegistroUnico import ClaveDuplicadaError, RegistroUnico
+from ReporteHistorial import secciones_historial
+from ValidacionPacientes import validar_correo, validar_dui, validar_telefono
+
+ESTADO_ASISTIDA = "Asistida"
+ESTADOS_PAGADOS = (ESTADO_PAGADA, "Pagado")     # "Pagado" es el texto del combo de FacturaWindow
+
+
+class ErrorValidacion(ValueError):
+    """
+    Una regla de negocio rechazó la operación. El mensaje está listo para mostrarse al usuario;
+    titulo es el encabezado que usan las ventanas para el aviso.
+    """
+    def __init__(self, mensaje: str, titulo: str = "❌ Error"):
+        super().__init__(mensaje)
+        self.titulo = titulo
+
+
+def _error_formato(mensaje: str) -> ErrorValidacion:
+    return ErrorValidacion(mensaje, "❌ Error de Formato")
+
+
+class ControladorClinica:
+    """
+    Capa de servicio de la clínica, sin PyQt6: guarda pacientes, doctores, citas, horarios y
+    facturas y aplica las reglas (validación de DUI, correo y teléfono, choque de citas y de
+    horarios, totales de facturas y saldos). Las ventanas solo leen los campos, llaman a estos
+    métodos y muestran el resultado o el ErrorValidacion; los procesos por lotes y los
+    benchmarks usan la misma clase sin abrir ninguna ventana. Las reglas se prueban sin pantalla
+    en tests/test_controlador_clinica.py.
+    """
+    def __init__(self):
+        self.pacientes = RegistroUnico(('dui', 'correo'))
+        self.doctores = RegistroUnico(('dui', 'correo'))
+        self.citas = AlmacenCitas()
+        self.horarios = IndiceHorarios()
+        self._secuencias_horario: Dict[str, int] = {}   # Último número de horario usado por prefijo (DUI)
+        self.facturas: Dict[str, Factura] = {}      # Por ID, en orden de creación
+        self.estadisticas = EstadisticasClinica()   # Totales de la clínica, se actualizan con cada cambio
+        self.saldos = LibroSaldos()                 # Saldo de cada paciente (por DUI), se actualiza con cada cambio
+
+    # ----------------------- Validación de personas -----------------------
+
+    def _validar_persona(self, registro: RegistroUnico, tipo: str, dui: str, telefono: str, correo: str) -> int:
+        """Reglas comunes de pacientes y doctores; devuelve el teléfono como número (0 si no trae)"""
+        if not validar_dui(dui):
+            raise _error_formato("El DUI debe tener el formato: 12345678-9")
+        if dui in registro:
+            raise ErrorValidacion(f"Ya existe un {tipo} registrado con el DUI: {dui}")
+        if telefono and not validar_telefono(telefono):
+            raise _error_formato("El teléfono debe contener al menos 8 dígitos")
+        if correo and not validar_correo(correo):
+            raise _error_formato("El email no tiene un formato válido")
+        if correo and registro.buscar('correo', correo) is not None:
+            raise ErrorValidacion(f"Ya existe un {tipo} registrado con el correo: {correo}")
+        return int(telefono) if telefono else 0
+
+    # ----------------------- Pacientes -----------------------
+
+    def crear_paciente(self, nombre: str, apellido: str, edad: int, dui: str, telefono: str = "",
+                       correo: str = "", saldo_pendiente: float = 0.0) -> dict:
+        """Valida y registra un paciente; devuelve su registro (dict como los de PacienteWindow)"""
+        nombre, apellido = nombre.strip().title(), apellido.strip().title()
+        dui, telefono, correo = dui.strip(), telefono.strip(), correo.strip().lower()
+        if not all([nombre, apellido, dui]):
+            raise ErrorValidacion("Nombre, Apellido y DUI son campos obligatorios")
+        telefono_num = self._validar_persona(self.pacientes, "paciente", dui, telefono, correo)
+        if edad <= 0:
+            raise ErrorValidacion("La edad debe ser mayor a 0")
+
+        paciente = {
+            'nombre': nombre,
+            'apellido': apellido,
+            'edad': edad,
+            'dui': dui,
+            'telefono': telefono_num,
+            'correo': correo,
+            'saldo_pendiente': saldo_pendiente,
+            'historial_medico': [],
+            'citas': [],
+            'fecha_registro': datetime.now().strftime('%d/%m/%Y - %H:%M:%S')
+        }
+        self.pacientes.agregar(paciente)
+        self.estadisticas.registrar_paciente(paciente)
+        self.saldos.abrir(dui, saldo_pendiente)
+        return paciente
+
+    def obtener_paciente(self, dui: str) -> dict:
+        paciente = self.pacientes.obtener(dui)
+        if paciente is None:
+            raise ErrorValidacion(f"No se encontró ningún paciente con el DUI: {dui}")
+        return paciente
+
+    def agregar_tratamiento_paciente(self, dui: str, tratamiento) -> dict:
+        """Agrega un tratamiento (con .costo) al historial del paciente"""
+        paciente = self.obtener_paciente(dui)
+        paciente['historial_medico'].append(tratamiento)
+        self.estadisticas.registrar_tratamiento(tratamiento.costo)
+        self.saldos.registrar_tratamiento(dui, tratamiento.costo)
+        return paciente
+
+    def agregar_cita_paciente(self, dui: str, cita) -> dict:
+        """Agrega una cita (con .costo_cita) a la lista del paciente"""
+        paciente = self.obtener_paciente(dui)
+        paciente['citas'].append(cita)
+        self.estadisticas.registrar_cita(cita.costo_cita)
+        self.saldos.registrar_cita(dui, cita.costo_cita)
+        return paciente
+
+    def totales_paciente(self, dui: str) -> Tuple[float, float]:
+        """(total de tratamientos, total de citas) del paciente"""
+        return totales_paciente(self.obtener_paciente(dui))
+
+    def balance_paciente(self, dui: str) -> float:
+        """Tratamientos + citas + saldo pendiente, como el 'Balance Final' del historial"""
+        paciente = self.obtener_paciente(dui)
+        total_tratamientos, total_citas = totales_paciente(paciente)
+        return total_tratamientos + total_citas + paciente['saldo_pendiente']
+
+    def saldo_paciente(self, dui: str) -> Decimal:
+        """Saldo actual del paciente, ya mantenido por el libro: no recorre sus listas"""
+        self.obtener_paciente(dui)
+        return self.saldos.saldo(dui)
+
+    def _saldos_esperados(self, pacientes: Iterable[dict] = None, facturas: Iterable[Factura] = None
+                          ) -> Iterator[Tuple[str, Tuple[int, int, int, int]]]:
+        """
+        (anterior, tratamientos, citas, pagos) de cada paciente recalculados desde sus listas y las
+        facturas pagadas, en centavos, con la misma regla que sigue el libro
+        """
+        # Los costos se repiten mucho (precios de catálogo): cada valor distinto se convierte una sola vez
+        convertidos: Dict[object, int] = {}
+
+        def centavos(monto) -> int:
+            valor = convertidos.get(monto)
+            if valor is None:
+                valor = convertidos[monto] = a_centavos(monto)
+            return valor
+
+        pagos: Dict[str, int] = {}
+        for factura in self.facturas.values() if facturas is None else facturas:
+            dui = getattr(factura.paciente, 'dui', None)
+            if dui is not None and factura.estado_pago in ESTADOS_PAGADOS:
+                pagos[dui] = pagos.get(dui, 0) + centavos(factura.monto_total)
+        for paciente in self.pacientes if pacientes is None else pacientes:
+            dui = paciente['dui']
+            yield dui, (centavos(paciente['saldo_pendiente']),
+                        sum(centavos(t.costo) for t in paciente['historial_medico']),
+                        sum(centavos(c.costo_cita) for c in paciente['citas']),
+                        pagos.pop(dui, 0))
+        for dui, pagado in pagos.items():   # Facturas de pacientes que no se registraron en PacienteWindow
+            yield dui, (0, 0, 0, pagado)
+
+    def preparar_conciliacion(self, pacientes: Sequence[dict], facturas: Sequence[Factura],
+                              movimientos: int) -> ConciliacionPreparada:
+        """
+        Recalcula los saldos sin modificar nada, para correrla en un hilo de trabajo. Recibe copias de
+        las listas y los movimientos del libro tomados juntos en el hilo que registra los cambios.
+        """
+        return self.saldos.preparar_conciliacion(self._saldos_esperados(pacientes, facturas), movimientos)
+
+    def instantanea_saldos(self) -> Tuple[List[dict], List[Factura], int]:
+        """Argumentos de preparar_conciliacion(), tomados en el hilo que registra los movimientos"""
+        return list(self.pacientes), list(self.facturas.values()), self.saldos.movimientos
+
+    def conciliar_saldos(self, corregir: bool = True) -> ResumenConciliacion:
+        """Revisión completa del libro de saldos en el hilo que llama"""
+        return self.saldos.conciliar(self._saldos_esperados(), corregir)
+
+    def secciones_historial(self) -> Iterator[str]:
+        """Reporte de todos los pacientes, sección por sección, con los totales ya mantenidos"""
+        return secciones_historial(list(self.pacientes), self.estadisticas.copia())
+
+    # ----------------------- Doctores -----------------------
+
+    def crear_doctor(self, nombre: str, apellido: str, dui: str, especialidad: str,
+                     telefono: str = "", correo: str = "") -> dict:
+        """Valida y registra un doctor; devuelve su registro (dict como los de DoctorWindow)"""
+        nombre, apellido, especialidad = nombre.strip().title(), apellido.strip().title(), especialidad.strip().title()
+        dui, telefono, correo = dui.strip(), telefono.strip(), correo.strip().lower()
+        if not all([nombre, apellido, dui, especialidad]):
+            raise ErrorValidacion("Nombre, Apellido, DUI y Especialidad son campos obligatorios")
+        telefono_num = self._validar_persona(self.doctores, "doctor", dui, telefono, correo)
+
+        doctor = {
+            'nombre': nombre,
+            'apellido': apellido,
+            'dui': dui,
+            'especialidad': especialidad,
+            'telefono': telefono_num,
+            'correo': correo,
+            'citas': [],
+            'horario': [],
+            'fecha_registro': datetime.now().strftime('%d/%m/%Y - %H:%M:%S')
+        }
+        self.doctores.agregar(doctor)
+        return doctor
+
+    def obtener_doctor(self, dui: str) -> dict:
+        doctor = self.doctores.obtener(dui)
+        if doctor is None:
+            raise ErrorValidacion(f"No se encontró ningún doctor con el DUI: {dui}")
+        return doctor
+
+    def actualizar_doctor(self, dui: str, nombre: str, apellido: str, especialidad: str,
+                          telefono: str, correo: str) -> dict:
+        """Modifica los datos de un doctor (el DUI no cambia)"""
+        try:
+            return self.doctores.actualizar(dui, {
+                'nombre': nombre.strip().title(),
+                'apellido': apellido.strip().title(),
+                'especialidad': especialidad.strip().title(),
+                'telefono': int(telefono.strip()) if telefono.strip().isdigit() else 0,
+                'correo': correo.strip().lower()
+            })
+        except ClaveDuplicadaError as e:
+            raise ErrorValidacion(f"Ya existe un doctor registrado con el {e.campo}: {e.valor}")
+        except KeyError:
+            raise ErrorValidacion("El doctor que se estaba editando ya no está registrado.")
+
+    def eliminar_doctor(self, dui: str) -> dict:
+        """Borra al doctor y libera sus horarios (en el índice los horarios van por DUI)"""
+        doctor = self.doctores.eliminar(dui)
+        if doctor is None:
+            raise ErrorValidacion(f"No se encontró ningún doctor con el DUI: {dui}")
+        self.horarios.eliminar_doctor(dui)
+        return doctor
+
+    # ----------------------- Citas -----------------------
+
+    def _cita_existente(self, id_cita: str) -> Cita:
+        cita = self.citas.obtener(id_cita)
+        if cita is None:
+            raise ErrorValidacion("No se encontró la cita.")
+        return cita
+
+    @staticmethod
+    def _validar_cita(id_cita: str, costo, hora_inicio: datetime, hora_fin: datetime) -> float:
+        if not id_cita or costo in (None, ""):
+            raise ErrorValidacion("Todos los campos son obligatorios.")
+        try:
+            costo = float(costo)
+        except (TypeError, ValueError):
+            raise ErrorValidacion("El costo debe ser un número válido.")
+        if hora_fin <= hora_inicio:
+            raise ErrorValidacion("La hora de fin debe ser posterior a la hora de inicio.")
+        return costo
+
+    def crear_cita(self, id_cita: str, paciente, doctor, hora_inicio: datetime, hora_fin: datetime,
+                   costo, estado: str = "Pendiente", tratamiento=None) -> Cita:
+        """Registra una cita si el ID es nuevo y el doctor está libre en ese horario"""
+        id_cita = id_cita.strip()
+        costo = self._validar_cita(id_cita, costo, hora_inicio, hora_fin)
+        if id_cita in self.citas:
+            raise ErrorValidacion("Ya existe una cita con ese ID.")
+        cita = Cita(id_cita, paciente, doctor, hora_inicio, hora_fin, costo)
+        cita.tratamiento = tratamiento
+        cita.estado = estado
+        if not self.citas.agregar(cita):
+            raise ErrorValidacion("El doctor no está disponible en ese horario.")
+        return cita
+
+    def modificar_cita(self, cita: Cita, id_cita: str, paciente, doctor, hora_inicio: datetime,
+                       hora_fin: datetime, costo, estado: str, tratamiento=None) -> Cita:
+        """Reprograma una cita existente; el horario nuevo no puede chocar con otra cita del doctor"""
+        id_cita = id_cita.strip()
+        costo = self._validar_cita(id_cita, costo, hora_inicio, hora_fin)
+        if id_cita != cita.id_cita and id_cita in self.citas:
+            raise ErrorValidacion("Ya existe una cita con ese ID.")
+        if not self.citas.modificar(cita, id_cita=id_cita, paciente=paciente, doctor=doctor,
+                                    hora_inicio=hora_inicio, hora_fin=hora_fin, costo_cita=costo,
+                                    tratamiento=tratamiento, estado=estado):
+            raise ErrorValidacion("El doctor no está disponible en ese horario.")
+        return cita
+
+    def obtener_cita(self, id_cita: str) -> Cita:
+        return self._cita_existente(id_cita.strip())
+
+    def cancelar_cita(self, id_cita: str) -> Cita:
+        cita = self.citas.cancelar(id_cita.strip())
+        if cita is None:
+            raise ErrorValidacion("No se encontró la cita.")
+        return cita
+
+    def confirmar_asistencia(self, id_cita: str) -> Cita:
+        cita = self._cita_existente(id_cita.strip())
+        cita.estado = ESTADO_ASISTIDA
+        return cita
+
+    def monto_cita(self, id_cita: str) -> Tuple[float, float, float]:
+        """(costo de la consulta, costo del tratamiento, total) de una cita"""
+        cita = self._cita_existente(id_cita.strip())
+        tratamiento = getattr(cita, 'tratamiento', None) or {}
+        costo_tratamiento = tratamiento.get('costo', 0)
+        return cita.costo_cita, costo_tratamiento, cita.costo_cita + costo_tratamiento
+
+    # ----------------------- Horarios -----------------------
+
+    def agregar_horario(self, id_horario: str, dia: str, hora_inicio: str, hora_fin: str, doctor) -> Horario:
+        """Registra un horario de atención si no se traslapa con otro del mismo doctor ese día"""
+        if not all([id_horario, dia, hora_inicio, hora_fin, doctor]):
+            raise ErrorValidacion("Todos los campos son obligatorios", "Error")
+        try:
+            # Las horas se validan y convierten a minutos una sola vez al crear el horario
+            horario = Horario(id_horario, dia, hora_inicio, hora_fin, doctor)
+        except ValueError as e:
+            raise ErrorValidacion(f"formato de hora invalido: {e}", "Error")
+        if horario.fin_min <= horario.inicio_min:
+            raise ErrorValidacion("La hora de fin debe ser posterior a la hora de inicio", "Error")
+        if id_horario in self.horarios:
+            raise ErrorValidacion("El ID de horario ya existe", "Error")
+        if not self.horarios.agregar(horario):
+            raise ErrorValidacion("El horario ya está ocupado", "Error")
+        return horario
+
+    def nuevo_id_horario(self, prefijo: str) -> str:
+        """
+        Siguiente ID libre con la forma '<prefijo>-H<n>'. El contador no retrocede al eliminar
+        horarios, así que no se repite un ID aunque se borren bloques intermedios.
+        """
+        numero = self._secuencias_horario.get(prefijo, 0)
+        while True:
+            numero += 1
+            id_horario = f"{prefijo}-H{numero}"
+            if id_horario not in self.horarios:
+                self._secuencias_horario[prefijo] = numero
+                return id_horario
+
+    def eliminar_horario(self, id_horario: str) -> Optional[Horario]:
+        return self.horarios.eliminar(id_horario)
+
+    # ----------------------- Facturas -----------------------
+
+    @staticmethod
+    def _leer_servicios(servicios_texto: str, montos_texto: str) -> Tuple[List[str], List[Decimal]]:
+        """Convierte 'Limpieza, Resina' y '20, 35.5' en listas paralelas de servicios y montos (Decimal)"""
+        servicios = [s.strip() for s in servicios_texto.split(',') if s.strip()]
+        try:
+            if montos_texto.strip():
+                montos = [a_decimal(a_centavos(m)) for m in montos_texto.split(',') if m.strip()]
+            else:
+                montos = [Decimal(0)] * len(servicios)
+        except ValueError:
+            raise ErrorValidacion("Los montos deben ser números válidos separados por comas", "⚠️ Error")
+        if len(servicios) != len(montos):
+            raise ErrorValidacion(f"Número de servicios ({len(servicios)}) no coincide con número de montos "
+                                  f"({len(montos)})", "⚠️ Error")
+        if any(m <= 0 for m in montos):
+            raise ErrorValidacion("Todos los montos deben ser mayores a 0", "⚠️ Error")
+        return servicios, montos
+
+    def crear_factura(self, id_factura: str, paciente, fecha_texto: str, servicios_texto: str,
+                      montos_texto: str, estado_pago: str) -> Factura:
+        """Valida los datos escritos en FacturaWindow y registra la factura"""
+        id_factura = id_factura.strip()
+        if not id_factura:
+            raise ErrorValidacion("El ID de factura es obligatorio", "⚠️ Error")
+        if paciente is None:
+            raise ErrorValidacion("Debe seleccionar un paciente", "⚠️ Error")
+        if not servicios_texto.strip():
+            raise ErrorValidacion("La descripción del servicio es obligatoria", "⚠️ Error")
+        if id_factura in self.facturas:
+            raise ErrorValidacion("Ya existe una factura con este ID", "⚠️ Error")
+        try:
+            fecha = datetime.strptime(fecha_texto.strip(), '%d/%m/%Y')
+        except ValueError:
+            raise ErrorValidacion("Formato de fecha inválido (DD/MM/YYYY)", "⚠️ Error")
+        servicios, montos = self._leer_servicios(servicios_texto, montos_texto)
+
+        factura = Factura(id_factura=id_factura, paciente=paciente, servicios=servicios, montos=montos,
+                          fecha_emision=fecha, estado_pago=estado_pago)
+        self.facturas[id_factura] = factura
+        dui = getattr(paciente, 'dui', None)
+        if dui is not None and estado_pago in ESTADOS_PAGADOS:   # Sus tratamientos y citas ya están en el saldo
+            self.saldos.registrar_pago(dui, factura.monto_total)
+        return factura
+
+    def pagar_factura(self, id_factura: str) -> Factura:
+        factura = self.facturas.get(id_factura)
+        if factura is None:
+            raise ErrorValidacion(f"No existe la factura {id_factura}", "⚠️ Error")
+        if factura.estado_pago not in ESTADOS_POR_COBRAR:
+            raise ErrorValidacion(f"La factura {id_factura} no está pendiente de pago ({factura.estado_pago})",
+                                  "⚠️ Error")
+        factura.estado_pago = ESTADO_PAGADA
+        dui = getattr(factura.paciente, 'dui', None)
+        if dui is not None:
+            self.saldos.registrar_pago(dui, factura.monto_total)
+        return factura
+
+    def lista_facturas(self) -> List[Factura]:
+        return list(self.facturas.values())
+
+    def total_facturado(self, facturas: Optional[Sequence[Factura]] = None) -> Decimal:
+        facturas = self.facturas.values() if facturas is None else facturas
+        return sum((factura.monto_total for factura in facturas), Decimal(0))
+
+    def totales_por_estado(self) -> Dict[str, Decimal]:
+        """Total facturado por estado de pago (Pendiente, Pagada, Vencida)"""
+        totales: Dict[str, Decimal] = {}
+        for factura in self.facturas.values():
+            totales[factura.estado_pago] = totales.get(factura.estado_pago, Decimal(0)) + factura.monto_total
+        return totales
@@ -0,0 +1,240 @@
+import math
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator
+
+from Repositorios import TABLAS
+
+NOMBRES = ("Laura", "Ricardo", "Carla", "Daniela", "Luis", "Rebeca", "Ivonne", "Pedro", "Tatiana", "José",
+           "María", "Carlos", "Ana", "Jorge", "Sofía", "Miguel", "Gabriela", "Fernando", "Patricia", "Óscar")
+APELLIDOS = ("Mendoza", "Vásquez", "López", "Pineda", "Zelaya", "García", "Morales", "Luna", "Ramos", "Hernández",
+             "Martínez", "Rivas", "Flores", "Cruz", "Romero", "Alvarado", "Guevara", "Orellana", "Castro", "Mejía")
+ESPECIALIDADES = ("Odontología General", "Ortodoncia", "Endodoncia", "Periodoncia", "Odontopediatría",
+                  "Cirugía Oral")
+TRATAMIENTOS = (("Limpieza dental general", 20.00), ("Resina dental", 35.50), ("Extracción simple", 45.00),
+                ("Blanqueamiento", 120.00), ("Tratamiento de conducto", 250.00), ("Corona de porcelana", 300.00),
+                ("Colocación de brackets", 450.00))
+ESTADOS_CITA = ("Pendiente", "Confirmada", "Confirmada", "Cancelada")
+ESTADOS_TRATAMIENTO = ("Pendiente", "En_Progreso", "Finalizado", "Finalizado")
+ESTADOS_FACTURA = ("Pendiente", "Pagada", "Pagada", "Vencida")
+COSTOS_CITA = (20.00, 25.00, 45.00, 60.00)
+
+# Bloques de atención de cada doctor por día; cada uno tiene 8 espacios de 30 minutos
+BLOQUES = (("08:00:00", "12:00:00", 8 * 60), ("13:00:00", "17:00:00", 13 * 60))
+ESPACIOS_POR_DIA = 16
+CITAS_POR_DIA = 12      # Se ocupan 12 de los 16 espacios para que quede disponibilidad
+
+
+class GeneradorClinica:
+    """
+    Datos sintéticos repetibles para todas las tablas de GestionClinicaDental.sql.
+    La escala es el número de citas; las demás tablas se dimensionan en proporción
+    (un paciente por cada 4 citas, un doctor por cada 1,000, etc.).
+    Con la misma escala y semilla se generan siempre las mismas filas, en cualquier orden en
+    que se pidan las tablas. Las filas vienen en el orden de columnas de Repositorios.TABLAS y
+    las llaves foráneas suponen IDs auto_increment desde 1 (base vacía).
+    """
+    def __init__(self, escala: int, semilla: int = 16, inicio: date = date(2025, 1, 6)):
+        if escala < 1:
+            raise ValueError("La escala debe ser mayor que cero")
+        self.escala = escala
+        self.semilla = semilla
+        self.inicio = inicio
+        self.num_citas = escala
+        self.num_pacientes = max(10, escala // 4)
+        self.num_doctores = max(3, escala // 1000)
+        self.num_asistentes = max(3, escala // 5000)
+        self.num_tratamientos = max(2, escala // 2)
+        self.num_facturas = self.num_tratamientos // 2     # Cada factura cobra dos tratamientos del paciente
+        self.num_dias = math.ceil(self.num_citas / (self.num_doctores * CITAS_POR_DIA))
+        self.num_horarios = self.num_doctores * self.num_dias * len(BLOQUES)
+
+    def _aleatorio(self, tabla: str) -> random.Random:
+        # Un generador por tabla: el resultado no depende del orden en que se recorren las tablas
+        return random.Random(f"{self.semilla}:{tabla}")
+
+    def _mezclar(self, i: int, n: int) -> int:
+        """Reparto pseudoaleatorio y reproducible de i en 0..n-1, sin guardar estado"""
+        return (i * 2654435761 + self.semilla * 40503) % 4294967291 % n
+
+    def dia(self, numero: int) -> date:
+        return self.inicio + timedelta(days=numero)
+
+    def conteos(self) -> Dict[str, int]:
+        return {
+            'Paciente': self.num_pacientes, 'Historial_Medico': self.num_pacientes,
+            'Doctor': self.num_doctores, 'Horario': self.num_horarios, 'Cita': self.num_citas,
+            'Tratamiento': self.num_tratamientos, 'Factura': self.num_facturas,
+            'Asistente': self.num_asistentes, 'Tratamiento_Factura': self.num_facturas * 2,
+            'Asistente_Paciente': self.num_pacientes, 'Asistente_Cita': self.num_citas // 2,
+            'Asistente_Factura': self.num_facturas,
+        }
+
+    # ----------------------- Personas -----------------------
+
+    def pacientes(self) -> Iterator[tuple]:
+        """(Nombre, Apellido, Fecha_Nacimiento, DUI, Telefono, Correo); los menores de edad no tienen DUI"""
+        aleatorio = self._aleatorio('Paciente')
+        for i in range(1, self.num_pacientes + 1):
+            nacimiento = date(aleatorio.randint(1945, 2020), aleatorio.randint(1, 12), aleatorio.randint(1, 28))
+            dui = f"{i:08d}-{i % 10}" if nacimiento.year <= 2006 else None
+            yield (aleatorio.choice(NOMBRES), aleatorio.choice(APELLIDOS), nacimiento.isoformat(), dui,
+                   f"7{i % 10_000_000:07d}", f"p{i}@correo.com")
+
+    def historiales(self) -> Iterator[tuple]:
+        """(ID_Paciente, Fecha_Creacion, Notas_Generales, Estado)"""
+        aleatorio = self._aleatorio('Historial_Medico')
+        for i in range(1, self.num_pacientes + 1):
+            yield (i, self.dia(-aleatorio.randrange(1, 1000)).isoformat(), "Evaluación inicial.",
+                   "Activo" if aleatorio.random() < 0.9 else "Archivado")
+
+    def doctores(self) -> Iterator[tuple]:
+        """(Nombre, Apellido, Especialidad, Telefono, Correo, Contrasena)"""
+        aleatorio = self._aleatorio('Doctor')
+        for i in range(1, self.num_doctores + 1):
+            yield (aleatorio.choice(NOMBRES), aleatorio.choice(APELLIDOS), ESPECIALIDADES[i % len(ESPECIALIDADES)],
+                   f"6{i:07d}", f"d{i}@doc.com", f"clave{i}")
+
+    def asistentes(self) -> Iterator[tuple]:
+        """(Nombre, Apellido, Telefono, Correo, Contrasena)"""
+        aleatorio = self._aleatorio('Asistente')
+        for i in range(1, self.num_asistentes + 1):
+            yield (aleatorio.choice(NOMBRES), aleatorio.choice(APELLIDOS), f"2{i:07d}",
+                   f"asistente{i}@clinicadental.com", f"asist{i}")
+
+    # ----------------------- Agenda -----------------------
+
+    def horarios(self) -> Iterator[tuple]:
+        """(ID_Doctor, Dia, Hora_Inicio, Hora_Fin, Disponible): dos bloques por doctor y día"""
+        for numero in range(self.num_dias):
+            dia = self.dia(numero).isoformat()
+            for doctor in range(1, self.num_doctores + 1):
+                for hora_inicio, hora_fin, _ in BLOQUES:
+                    yield doctor, dia, hora_inicio, hora_fin, 1
+
+    def citas(self) -> Iterator[tuple]:
+        """
+        (ID_Paciente, ID_Doctor, Fecha, Estado, Costo). Cada cita cae dentro de un horario del doctor
+        y ninguna se traslapa con otra del mismo doctor.
+        """
+        aleatorio = self._aleatorio('Cita')
+        generadas = 0
+        for numero in range(self.num_dias):
+            medianoche = datetime.combine(self.dia(numero), datetime.min.time())
+            for doctor in range(1, self.num_doctores + 1):
+                for espacio in sorted(aleatorio.sample(range(ESPACIOS_POR_DIA), CITAS_POR_DIA)):
+                    if generadas == self.num_citas:
+                        return
+                    _, _, minuto_bloque = BLOQUES[espacio // 8]
+                    fecha = medianoche + timedelta(minutes=minuto_bloque + 30 * (espacio % 8))
+                    yield (aleatorio.randint(1, self.num_pacientes), doctor, fecha.isoformat(' '),
+                           aleatorio.choice(ESTADOS_CITA), aleatorio.choice(COSTOS_CITA))
+                    generadas += 1
+
+    # ----------------------- Facturación -----------------------
+
+    def tratamiento(self, i: int) -> tuple:
+        """Fila del tratamiento i (desde 0); los tratamientos 2k y 2k+1 son del mismo paciente"""
+        descripcion, costo = TRATAMIENTOS[self._mezclar(i, len(TRATAMIENTOS))]
+        fecha = datetime.combine(self.dia(i * self.num_dias // self.num_tratamientos), datetime.min.time())
+        fecha += timedelta(hours=8 + self._mezclar(i + 7, 9))
+        return (self._mezclar(i // 2, self.num_pacientes) + 1, self._mezclar(i + 3, self.num_doctores) + 1,
+                descripcion, costo, fecha.isoformat(' '), ESTADOS_TRATAMIENTO[self._mezclar(i + 11, 4)])
+
+    def tratamientos(self) -> Iterator[tuple]:
+        """(ID_Paciente, ID_Doctor, Descripcion, Costo, Fecha, Estado)"""
+        for i in range(self.num_tratamientos):
+            yield self.tratamiento(i)
+
+    def facturas(self) -> Iterator[tuple]:
+        """(ID_Paciente, Fecha_Emision, Monto_Total, Estado_Pago); el total es la suma de sus dos tratamientos"""
+        for k in range(self.num_facturas):
+            primero, segundo = self.tratamiento(2 * k), self.tratamiento(2 * k + 1)
+            yield (primero[0], segundo[4][:10], round(primero[3] + segundo[3], 2),
+                   ESTADOS_FACTURA[self._mezclar(k + 13, 4)])
+
+    def tratamientos_factura(self) -> Iterator[tuple]:
+        for k in range(self.num_facturas):
+            yield 2 * k + 1, k + 1
+            yield 2 * k + 2, k + 1
+
+    # ----------------------- Asistentes -----------------------
+
+    def asistentes_paciente(self) -> Iterator[tuple]:
+        for i in range(1, self.num_pacientes + 1):
+            yield self._mezclar(i, self.num_asistentes) + 1, i
+
+    def asistentes_cita(self) -> Iterator[tuple]:
+        for i in range(1, self.num_citas // 2 + 1):
+            yield self._mezclar(i + 17, self.num_asistentes) + 1, 2 * i
+
+    def asistentes_factura(self) -> Iterator[tuple]:
+        for i in range(1, self.num_facturas + 1):
+            yield self._mezclar(i + 19, self.num_asistentes) + 1, i
+
+    def tablas(self) -> Dict[str, Iterator[tuple]]:
+        """Generadores de filas de cada tabla, en un orden que respeta las llaves foráneas"""
+        return {
+            'Paciente': self.pacientes(), 'Historial_Medico': self.historiales(), 'Doctor': self.doctores(),
+            'Horario': self.horarios(), 'Cita': self.citas(), 'Tratamiento': self.tratamientos(),
+            'Factura': self.facturas(), 'Asistente': self.asistentes(),
+            'Tratamiento_Factura': self.tratamientos_factura(), 'Asistente_Paciente': self.asistentes_paciente(),
+            'Asistente_Cita': self.asistentes_cita(), 'Asistente_Factura': self.asistentes_factura(),
+        }
+
+    def cargar(self, repositorios: Dict, tamano_lote: int = 5000) -> Dict[str, int]:
+        """Inserta todas las tablas con los repositorios de crear_repositorios(); la base debe estar vacía"""
+        return {tabla: repositorios[tabla].insertar_lote(filas, tamano_lote=tamano_lote)
+                for tabla, filas in self.tablas().items()}
+
+
+def main():
+    # Verificación: mismas filas con la misma semilla, conteos esperados y llaves foráneas válidas en SQLite
+    import os
+    import sqlite3
+    import sys
+    import tempfile
+    import time
+    from Migraciones import migrar
+    from PoolConexiones import PoolConexiones
+    from Repositorios import crear_esquema_sqlite, crear_repositorios
+
+    escala = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    generador = GeneradorClinica(escala)
+    assert list(GeneradorClinica(escala).citas())[:100] == list(generador.citas())[:100]
+    assert set(generador.tablas()) == set(TABLAS)
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_sintetica.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=1)
+
+    inicio = time.perf_counter()
+    insertadas = generador.cargar(crear_repositorios(pool, marcador='?'))
+    duracion = time.perf_counter() - inicio
+    assert insertadas == generador.conteos(), insertadas
+    print(f"Escala {escala:,}: {sum(insertadas.values()):,} filas en {duracion:.1f} s")
+    for tabla, total in insertadas.items():
+        print(f"   {tabla:<20} {total:>10,}")
+
+    with pool.conexion() as conexion:
+        migrar(conexion, marcador='?')      # Con los índices las verificaciones no recorren tablas completas
+        huerfanas = conexion.execute("PRAGMA foreign_key_check").fetchall()
+        dobles = conexion.execute("SELECT COUNT(*) FROM (SELECT 1 FROM Cita GROUP BY ID_Doctor, Fecha "
+                                  "HAVING COUNT(*) > 1)").fetchone()[0]
+        fuera_de_horario = conexion.execute(
+            "SELECT COUNT(*) FROM Cita c WHERE NOT EXISTS (SELECT 1 FROM Horario h WHERE h.ID_Doctor = c.ID_Doctor "
+            "AND h.Dia = substr(c.Fecha, 1, 10) AND h.Hora_Inicio <= substr(c.Fecha, 12) "
+            "AND h.Hora_Fin > substr(c.Fecha, 12))").fetchone()[0]
+        descuadradas = conexion.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM Factura f JOIN Tratamiento_Factura tf ON tf.ID_Factura = f.ID_Factura "
+            "JOIN Tratamiento t ON t.ID_Tratamiento = tf.ID_Tratamiento GROUP BY f.ID_Factura "
+            "HAVING ROUND(MAX(f.Monto_Total), 2) <> ROUND(SUM(t.Costo), 2))").fetchone()[0]
+    print(f"Llaves foráneas inválidas: {len(huerfanas)} | citas dobles: {dobles} | "
+          f"citas fuera de horario: {fuera_de_horario} | facturas descuadradas: {descuadradas}")
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,53 @@
+import threading
+
 import mysql.connector
 from mysql.connector import Error
 
+from PoolConexiones import PoolConexiones, PoolAgotadoError
+
+# Datos de conexión a MariaDB
+CONFIG_DB = {
+    'host': 'localhost',
+    'port': 3307,
+    'user': 'root',
+    'password': '1234',
+    'database': 'clinicadental'
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def crear_conexion():
+    """Abre una conexión nueva a MariaDB (la usa el pool, no llamar directamente)"""
+    return mysql.connector.connect(**CONFIG_DB)
+
+def obtener_pool(min_conexiones: int = 1, max_conexiones: int = 5) -> PoolConexiones:
+    """Devuelve el pool compartido por todas las ventanas; se crea en el primer uso"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            print("📡 Intentando conectar a la base de datos...")
+            _pool = PoolConexiones(crear_conexion, min_conexiones=min_conexiones,
+                                   max_conexiones=max_conexiones)
+            print("✅ Conectado correctamente.")
+        return _pool
+
 def obtener_datos():
     try:
-        print("📡 Intentando conectar a la base de datos...")
-        conexion = mysql.connector.connect(
-            host='localhost',
-            port=3307, 
-            user='root',
-            password='1234',
-            database='clinicadental'
-        )
-        print("✅ Conectado correctamente.")
-
-        cursor = conexion.cursor()
-        print("🔍 Ejecutando consulta SQL...")
-        cursor.execute("select Nombre from Paciente limit 2 ;")
-
-        resultados = cursor.fetchall()
-        columnas = [desc[0] for desc in cursor.description]
-
-        cursor.close()
-        conexion.close()
+        with obtener_pool().conexion() as conexion:
+            cursor = conexion.cursor()
+            print("🔍 Ejecutando consulta SQL...")
+            cursor.execute("select Nombre from Paciente limit 2 ;")
+
+            resultados = cursor.fetchall()
+            columnas = [desc[0] for desc in cursor.description]
+
+            cursor.close()
 
         print("📦 Datos obtenidos correctamente.")
         return columnas, resultados
 
-    except Error as e:
+    except (Error, PoolAgotadoError) as e:
         print("❌ Error al conectar a MariaDB")
         print(e)
         return [], []
@@ -0,0 +1,230 @@
+import calendar
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from SqlReservas import es_conflicto
+from PoolConexiones import PoolConexiones
+
+# Qué se cobra en el cierre de mes
+ESTADO_TRATAMIENTO_COBRABLE = 'Finalizado'
+ESTADO_CITA_COBRABLE = 'Confirmada'
+ESTADO_FACTURA_NUEVA = 'Pendiente'
+CENTAVO = Decimal('0.01')
+
+
+class ResumenFacturacion(NamedTuple):
+    """Resultado de una corrida de facturación"""
+    desde: date
+    hasta: date                 # Exclusivo
+    facturas: int
+    tratamientos: int
+    citas: int
+    monto_total: Decimal
+    segundos: float
+
+    @property
+    def filas(self) -> int:
+        """Filas escritas: una por factura y una por cada tratamiento o cita enlazado"""
+        return self.facturas + self.tratamientos + self.citas
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+
+def periodo_mes(anio: int, mes: int) -> Tuple[date, date]:
+    """(primer día del mes, primer día del mes siguiente)"""
+    ultimo = calendar.monthrange(anio, mes)[1]
+    return date(anio, mes, 1), date(anio, mes, ultimo) + timedelta(days=1)
+
+
+class FacturacionMensual:
+    """
+    Cierre de facturación: junta los tratamientos Finalizados y las citas Confirmadas del periodo que
+    todavía no están en ninguna factura, arma una factura por paciente y escribe Factura,
+    Tratamiento_Factura y Cita_Factura (migración 5).
+    Los pacientes se reparten en tramos de IDs consecutivos; cada tramo se lee y se escribe en una
+    sola transacción con su propia conexión del pool, y varios tramos se procesan en paralelo.
+    Lo ya enlazado no se vuelve a cobrar, así que repetir la corrida de un periodo no duplica facturas.
+    """
+    def __init__(self, pool: PoolConexiones, marcador: str = '%s', pacientes_por_tramo: int = 2000,
+                 hilos: int = 4, max_reintentos: int = 5):
+        self.pool = pool
+        self.pacientes_por_tramo = pacientes_por_tramo
+        self.hilos = hilos
+        self.max_reintentos = max_reintentos
+        self.texto = marcador == '?'    # sqlite3 recibe fechas y montos como texto
+        m = marcador
+        self.sql_rango = "SELECT MIN(ID_Paciente), MAX(ID_Paciente) FROM Paciente"
+        # Los índices (ID_Paciente, Fecha) de Tratamiento y Cita limitan la lectura al tramo y al periodo;
+        # la clave primaria de las tablas puente responde el NOT EXISTS
+        self.sql_tratamientos = (
+            f"SELECT t.ID_Paciente, t.ID_Tratamiento, t.Costo FROM Tratamiento t "
+            f"WHERE t.ID_Paciente >= {m} AND t.ID_Paciente < {m} AND t.Fecha >= {m} AND t.Fecha < {m} "
+            f"AND t.Estado = '{ESTADO_TRATAMIENTO_COBRABLE}' "
+            f"AND NOT EXISTS (SELECT 1 FROM Tratamiento_Factura tf WHERE tf.ID_Tratamiento = t.ID_Tratamiento)")
+        self.sql_citas = (
+            f"SELECT c.ID_Paciente, c.ID_Cita, c.Costo FROM Cita c "
+            f"WHERE c.ID_Paciente >= {m} AND c.ID_Paciente < {m} AND c.Fecha >= {m} AND c.Fecha < {m} "
+            f"AND c.Estado = '{ESTADO_CITA_COBRABLE}' "
+            f"AND NOT EXISTS (SELECT 1 FROM Cita_Factura cf WHERE cf.ID_Cita = c.ID_Cita)")
+        self.sql_factura = (f"INSERT INTO Factura (ID_Paciente, Fecha_Emision, Monto_Total, Estado_Pago) "
+                            f"VALUES ({m}, {m}, {m}, '{ESTADO_FACTURA_NUEVA}')")
+        self.sql_tratamiento_factura = f"INSERT INTO Tratamiento_Factura (ID_Tratamiento, ID_Factura) VALUES ({m}, {m})"
+        self.sql_cita_factura = f"INSERT INTO Cita_Factura (ID_Cita, ID_Factura) VALUES ({m}, {m})"
+
+    def _valor(self, valor):
+        return str(valor) if self.texto else valor
+
+    def _tramos(self, conexion) -> List[Tuple[int, int]]:
+        cursor = conexion.cursor()
+        try:
+            cursor.execute(self.sql_rango)
+            primero, ultimo = cursor.fetchone()
+        finally:
+            cursor.close()
+        if primero is None:
+            return []
+        return [(inicio, min(inicio + self.pacientes_por_tramo, ultimo + 1))
+                for inicio in range(primero, ultimo + 1, self.pacientes_por_tramo)]
+
+    def _facturar_tramo(self, conexion, tramo: Tuple[int, int], desde: date, hasta: date,
+                        emision: date) -> Tuple[int, int, int, Decimal]:
+        """Una transacción: lee lo cobrable del tramo, lo agrupa por paciente y escribe las facturas"""
+        parametros = (tramo[0], tramo[1], self._valor(desde), self._valor(hasta))
+        # ID_Paciente -> [total, tratamientos, citas]
+        por_paciente: Dict[int, list] = {}
+        cursor = conexion.cursor()
+        try:
+            for sql, posicion in ((self.sql_tratamientos, 1), (self.sql_citas, 2)):
+                cursor.execute(sql, parametros)
+                for id_paciente, id_registro, costo in cursor.fetchall():
+                    grupo = por_paciente.get(id_paciente)
+                    if grupo is None:
+                        grupo = por_paciente[id_paciente] = [Decimal(0), [], []]
+                    # El float de SQLite pasa por texto para sumar los centavos exactos
+                    grupo[0] += costo if isinstance(costo, Decimal) else Decimal(str(costo))
+                    grupo[posicion].append(id_registro)
+
+            enlaces_tratamientos, enlaces_citas = [], []
+            monto = Decimal(0)
+            for id_paciente in sorted(por_paciente):
+                total, tratamientos, citas = por_paciente[id_paciente]
+                total = total.quantize(CENTAVO)
+                cursor.execute(self.sql_factura, (id_paciente, self._valor(emision), self._valor(total)))
+                id_factura = cursor.lastrowid
+                enlaces_tratamientos.extend((id_tratamiento, id_factura) for id_tratamiento in tratamientos)
+                enlaces_citas.extend((id_cita, id_factura) for id_cita in citas)
+                monto += total
+            if enlaces_tratamientos:
+                cursor.executemany(self.sql_tratamiento_factura, enlaces_tratamientos)
+            if enlaces_citas:
+                cursor.executemany(self.sql_cita_factura, enlaces_citas)
+            conexion.commit()
+            return len(por_paciente), len(enlaces_tratamientos), len(enlaces_citas), monto
+        except Exception:
+            conexion.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _procesar(self, tramo: Tuple[int, int], desde: date, hasta: date, emision: date):
+        """Reintenta el tramo completo si otra transacción lo bloqueó; la transacción fallida no dejó nada"""
+        for intento in range(self.max_reintentos):
+            try:
+                with self.pool.conexion() as conexion:
+                    return self._facturar_tramo(conexion, tramo, desde, hasta, emision)
+            except Exception as e:
+                if not es_conflicto(e) or intento == self.max_reintentos - 1:
+                    raise
+            time.sleep(random.uniform(0, 0.01 * (2 ** intento)))
+
+    def facturar(self, desde: date, hasta: date, fecha_emision: Optional[date] = None) -> ResumenFacturacion:
+        """
+        Factura lo cobrable con fecha en [desde, hasta). La fecha de emisión es por defecto el último
+        día del periodo.
+        """
+        inicio = time.perf_counter()
+        emision = fecha_emision or hasta - timedelta(days=1)
+        with self.pool.conexion() as conexion:
+            tramos = self._tramos(conexion)
+
+        totales = [0, 0, 0, Decimal(0)]
+        lock = threading.Lock()
+
+        def procesar(tramo):
+            resultado = self._procesar(tramo, desde, hasta, emision)
+            with lock:
+                for i, valor in enumerate(resultado):
+                    totales[i] += valor
+
+        with ThreadPoolExecutor(max_workers=self.hilos) as ejecutor:
+            list(ejecutor.map(procesar, tramos))    # list() propaga la primera excepción
+        return ResumenFacturacion(desde, hasta, totales[0], totales[1], totales[2], totales[3],
+                                  time.perf_counter() - inicio)
+
+    def facturar_mes(self, anio: int, mes: int) -> ResumenFacturacion:
+        return self.facturar(*periodo_mes(anio, mes))
+
+
+def imprimir_resumen(resumen: ResumenFacturacion):
+    print(f"🧾 Facturación del {resumen.desde:%d/%m/%Y} al {resumen.hasta - timedelta(days=1):%d/%m/%Y}")
+    print(f"   Facturas: {resumen.facturas:,} | tratamientos: {resumen.tratamientos:,} | "
+          f"citas: {resumen.citas:,} | total: ${resumen.monto_total:,.2f}")
+    print(f"   {resumen.filas:,} filas en {resumen.segundos:.2f} s ({resumen.filas_por_segundo:,.0f} filas/s)")
+
+
+def main():
+    # Uso: python FacturacionMensual.py [escala] [hilos]
+    #      Carga datos sintéticos en SQLite (escala 1,000,000 = 500,000 tratamientos) y factura todo el rango.
+    import os
+    import sqlite3
+    import sys
+    import tempfile
+    from DatosSinteticos import GeneradorClinica
+    from Migraciones import migrar
+    from Repositorios import crear_esquema_sqlite, crear_repositorios
+
+    escala = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    generador = GeneradorClinica(escala)
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_facturacion.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    inicial.execute("PRAGMA journal_mode=WAL")      # Los lectores no esperan al escritor
+    migrar(inicial, marcador='?')
+    inicial.close()
+    # timeout: en SQLite solo escribe una conexión a la vez; las demás esperan su turno
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, timeout=60, check_same_thread=False),
+                          max_conexiones=hilos)
+
+    # Sin las facturas del generador: todos los tratamientos quedan sin cobrar
+    repositorios = crear_repositorios(pool, marcador='?')
+    inicio = time.perf_counter()
+    for tabla, filas in generador.tablas().items():
+        if tabla in ('Paciente', 'Doctor', 'Cita', 'Tratamiento'):
+            repositorios[tabla].insertar_lote(filas, tamano_lote=20_000)
+    print(f"Datos cargados en {time.perf_counter() - inicio:.1f} s: {generador.num_pacientes:,} pacientes, "
+          f"{generador.num_tratamientos:,} tratamientos, {generador.num_citas:,} citas")
+
+    desde = generador.inicio
+    hasta = generador.dia(generador.num_dias)
+    facturacion = FacturacionMensual(pool, marcador='?', hilos=hilos)
+    resumen = facturacion.facturar(desde, hasta)
+    imprimir_resumen(resumen)
+
+    # Una segunda corrida del mismo periodo solo lee: todo ya quedó enlazado a una factura
+    # (que no duplica nada y que los montos cuadran se prueba en tests/test_facturacion_mensual.py)
+    repetida = facturacion.facturar(desde, hasta)
+    print(f"   Segunda corrida del mismo periodo: {repetida.facturas:,} facturas en {repetida.segundos:.2f} s")
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
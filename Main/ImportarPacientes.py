@@ -0,0 +1,187 @@
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Repositorios import Repositorio
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modelos'))
+from ValidacionPacientes import ValidadorLotes
+
+
+class ResultadoImportacion:
+    """Resumen de una importación: filas leídas, importadas y errores por fila"""
+    def __init__(self, max_errores: int = 1000):
+        self.leidas = 0
+        self.importadas = 0
+        self.total_errores = 0
+        self.max_errores = max_errores
+        self.errores: List[Tuple[int, str, str]] = []   # (numero_fila, campo, mensaje)
+        self.duracion = 0.0
+
+    def agregar_error(self, numero_fila: int, campo: str, mensaje: str):
+        # Se guardan solo los primeros max_errores para que la memoria no crezca con el archivo
+        self.total_errores += 1
+        if len(self.errores) < self.max_errores:
+            self.errores.append((numero_fila, campo, mensaje))
+
+    def __str__(self):
+        return (f"📥 Filas leídas: {self.leidas:,} | ✅ importadas: {self.importadas:,} | "
+                f"❌ con errores: {self.total_errores:,} | ⏱️ {self.duracion:.2f} s")
+
+
+def leer_csv(ruta: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Lee el CSV fila por fila; los encabezados no distinguen mayúsculas (Nombre, DUI, Correo...)"""
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        lector = csv.DictReader(archivo)
+        if lector.fieldnames:
+            lector.fieldnames = [campo.strip().lower() for campo in lector.fieldnames]
+        for numero, fila in enumerate(lector, 2):    # La fila 1 es el encabezado
+            yield numero, fila
+
+
+def leer_json(ruta: str) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Lee pacientes en JSON Lines (un objeto por línea, se procesa sin cargar el archivo completo)
+    o en un arreglo JSON normal, que sí se carga entero en memoria.
+    """
+    with open(ruta, encoding='utf-8-sig') as archivo:
+        primero = archivo.read(1)
+        while primero.isspace():
+            primero = archivo.read(1)
+        archivo.seek(0)
+        if primero == '[':
+            filas = enumerate(json.load(archivo), 1)
+        else:
+            filas = ((numero, json.loads(linea)) for numero, linea in enumerate(archivo, 1) if linea.strip())
+        for numero, fila in filas:
+            yield numero, {str(campo).lower(): valor for campo, valor in fila.items()}
+
+
+def leer_archivo(ruta: str) -> Iterator[Tuple[int, Dict[str, object]]]:
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.csv':
+        return leer_csv(ruta)
+    if extension in ('.json', '.jsonl'):
+        return leer_json(ruta)
+    raise ValueError(f"Formato no soportado: {extension} (use .csv, .json o .jsonl)")
+
+
+def _como_tupla(fila: Dict[str, str]) -> tuple:
+    # Mismo orden que las columnas de Repositorios.TABLAS['Paciente']; DUI y teléfono vacíos van como NULL
+    return (fila['nombre'], fila['apellido'], fila['fecha_nacimiento'],
+            fila['dui'] or None, fila['telefono'] or None, fila['correo'])
+
+
+def importar_pacientes(ruta: str, repositorio: Repositorio, tamano_lote: int = 2000,
+                       validador: Optional[ValidadorLotes] = None,
+                       max_errores: int = 1000) -> ResultadoImportacion:
+    """
+    Importa pacientes desde un archivo CSV/JSON a la tabla Paciente.
+    El archivo se lee por lotes de `tamano_lote` filas: cada lote se valida completo y las filas
+    válidas se guardan en una sola transacción. Si la base rechaza el lote (por ejemplo un DUI
+    que ya estaba en la tabla), ese lote se reintenta fila por fila para reportar cuál falló.
+    """
+    resultado = ResultadoImportacion(max_errores)
+    validador = validador or ValidadorLotes()
+    filas = leer_archivo(ruta)
+    inicio = time.perf_counter()
+
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        resultado.leidas += len(lote)
+        validas, errores = validador.validar(lote)
+        for error in errores:
+            resultado.agregar_error(*error)
+        if not validas:
+            continue
+
+        try:
+            resultado.importadas += repositorio.insertar_lote((_como_tupla(fila) for _, fila in validas),
+                                                              tamano_lote=tamano_lote)
+        except Exception:
+            for numero, fila in validas:
+                try:
+                    repositorio.insertar(_como_tupla(fila))
+                    resultado.importadas += 1
+                except Exception as e:
+                    validador.liberar(fila)
+                    resultado.agregar_error(numero, 'base de datos', str(e))
+
+    resultado.duracion = time.perf_counter() - inicio
+    return resultado
+
+
+def _generar_archivo_prueba(ruta: str, total: int):
+    """CSV de prueba con ~1% de filas inválidas o repetidas"""
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['Nombre', 'Apellido', 'Fecha_Nacimiento', 'DUI', 'Telefono', 'Correo'])
+        for i in range(total):
+            dui = f"{i:08d}-{i % 10}"
+            correo = f"p{i}@correo.com"
+            telefono = f"7{i % 10_000_000:07d}"
+            if i % 250 == 1:
+                dui = "123"                         # Formato inválido
+            elif i % 250 == 2:
+                correo = "sin-arroba.com"
+            elif i % 250 == 3:
+                dui = f"{i - 3:08d}-{(i - 3) % 10}"  # DUI repetido
+            escritor.writerow([f"nombre{i}", f"apellido{i}", "1990-05-17", dui, telefono, correo])
+
+
+def main():
+    # Uso: python ImportarPacientes.py archivo.csv  -> importa a MariaDB
+    #      python ImportarPacientes.py              -> benchmark de 100k filas contra SQLite
+    if len(sys.argv) > 1:
+        from DbClinica import obtener_pool
+        from Repositorios import crear_repositorios
+
+        resultado = importar_pacientes(sys.argv[1], crear_repositorios(obtener_pool())['Paciente'])
+        print(resultado)
+        for numero, campo, mensaje in resultado.errores:
+            print(f"   Fila {numero} ({campo}): {mensaje}")
+        return
+
+    import sqlite3
+    import tempfile
+    import tracemalloc
+    from PoolConexiones import PoolConexiones
+    from Repositorios import crear_esquema_sqlite, crear_repositorios
+
+    carpeta = tempfile.mkdtemp()
+    ruta_csv = os.path.join(carpeta, "pacientes.csv")
+    ruta_db = os.path.join(carpeta, "clinica_importacion.db")
+    total = 100_000
+    _generar_archivo_prueba(ruta_csv, total)
+
+    inicial = sqlite3.connect(ruta_db)
+    crear_esquema_sqlite(inicial)
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta_db, check_same_thread=False), max_conexiones=2)
+    pacientes = crear_repositorios(pool, marcador='?')['Paciente']
+
+    # Tiempo (sin tracemalloc, que vuelve lento todo el proceso)
+    resultado = importar_pacientes(ruta_csv, pacientes)
+    print(resultado)
+    print(f"{resultado.leidas / resultado.duracion:,.0f} filas/s")
+    for numero, campo, mensaje in resultado.errores[:3]:
+        print(f"   Fila {numero} ({campo}): {mensaje}")
+    assert pacientes.contar() == resultado.importadas
+
+    # Memoria pico en una segunda importación (todas las filas chocan con la base y se reintentan)
+    tracemalloc.start()
+    importar_pacientes(ruta_csv, pacientes)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Memoria pico: {pico / 1e6:.1f} MB para {total:,} filas")
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import re
+import sys
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class Migracion(NamedTuple):
+    """Cambio de esquema numerado; 'bajar' deshace exactamente lo que hace 'subir'"""
+    version: int
+    descripcion: str
+    subir: Tuple[str, ...]
+    bajar: Tuple[str, ...]
+
+
+def _indice(nombre: str, tabla: str, columnas: str) -> Tuple[str, str]:
+    return (f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})",
+            f"DROP INDEX IF EXISTS {nombre} ON {tabla}")
+
+
+# Índices compuestos para las consultas que más se repiten. La primera columna es la del filtro
+# por igualdad y la segunda la del rango u orden, así el motor no recorre la tabla completa.
+_CITA_DOCTOR_FECHA = _indice("idx_cita_doctor_fecha", "Cita", "ID_Doctor, Fecha")
+_HORARIO_DOCTOR_DIA = _indice("idx_horario_doctor_dia", "Horario", "ID_Doctor, Dia")
+_FACTURA_PACIENTE_ESTADO = _indice("idx_factura_paciente_estado", "Factura", "ID_Paciente, Estado_Pago")
+_TRATAMIENTO_PACIENTE_FECHA = _indice("idx_tratamiento_paciente_fecha", "Tratamiento", "ID_Paciente, Fecha")
+_CITA_PACIENTE_FECHA = _indice("idx_cita_paciente_fecha", "Cita", "ID_Paciente, Fecha")
+_FACTURA_ESTADO_EMISION = _indice("idx_factura_estado_emision", "Factura", "Estado_Pago, Fecha_Emision")
+# Las claves de las tablas puente empiezan por el tratamiento o la cita; estos índices buscan desde la factura
+_TRATAMIENTO_FACTURA_FACTURA = _indice("idx_tratamiento_factura_factura", "Tratamiento_Factura", "ID_Factura")
+_CITA_FACTURA_FACTURA = _indice("idx_cita_factura_factura", "Cita_Factura", "ID_Factura")
+
+# Tabla puente de las citas cobradas, igual a Tratamiento_Factura (la usa FacturacionMensual.py)
+_CITA_FACTURA = (
+    "CREATE TABLE IF NOT EXISTS Cita_Factura ("
+    "ID_Cita INTEGER NOT NULL, ID_Factura INTEGER NOT NULL, PRIMARY KEY (ID_Cita, ID_Factura), "
+    "FOREIGN KEY (ID_Cita) REFERENCES Cita(ID_Cita) ON DELETE CASCADE, "
+    "FOREIGN KEY (ID_Factura) REFERENCES Factura(ID_Factura) ON DELETE CASCADE)",
+    "DROP TABLE IF EXISTS Cita_Factura")
+
+# Lista en orden; nunca se edita una migración ya aplicada, se agrega una nueva al final
+MIGRACIONES: List[Migracion] = [
+    Migracion(1, "Cita por doctor y fecha (agenda y choque de citas)",
+              (_CITA_DOCTOR_FECHA[0],), (_CITA_DOCTOR_FECHA[1],)),
+    Migracion(2, "Horario por doctor y día (disponibilidad)",
+              (_HORARIO_DOCTOR_DIA[0],), (_HORARIO_DOCTOR_DIA[1],)),
+    Migracion(3, "Factura por paciente y estado de pago (saldo pendiente)",
+              (_FACTURA_PACIENTE_ESTADO[0],), (_FACTURA_PACIENTE_ESTADO[1],)),
+    Migracion(4, "Tratamiento por paciente y fecha (historial)",
+              (_TRATAMIENTO_PACIENTE_FECHA[0],), (_TRATAMIENTO_PACIENTE_FECHA[1],)),
+    Migracion(5, "Tabla Cita_Factura (citas ya cobradas)",
+              (_CITA_FACTURA[0],), (_CITA_FACTURA[1],)),
+    Migracion(6, "Cita por paciente y fecha (facturación por paciente)",
+              (_CITA_PACIENTE_FECHA[0],), (_CITA_PACIENTE_FECHA[1],)),
+    Migracion(7, "Factura por estado de pago y fecha de emisión (facturas vencidas)",
+              (_FACTURA_ESTADO_EMISION[0],), (_FACTURA_ESTADO_EMISION[1],)),
+    Migracion(8, "Tablas puente por factura (antigüedad de saldos por doctor)",
+              (_TRATAMIENTO_FACTURA_FACTURA[0], _CITA_FACTURA_FACTURA[0]),
+              (_CITA_FACTURA_FACTURA[1], _TRATAMIENTO_FACTURA_FACTURA[1])),
+]
+
+# Tabla donde la base recuerda qué migraciones ya tiene aplicadas
+SQL_TABLA_VERSIONES = ("CREATE TABLE IF NOT EXISTS Version_Esquema ("
+                       "Version INTEGER PRIMARY KEY, Descripcion VARCHAR(100) NOT NULL, Aplicada DATETIME NOT NULL)")
+
+
+def _adaptar(sentencia: str, marcador: str) -> str:
+    # SQLite no acepta "DROP INDEX nombre ON tabla": el nombre del índice ya es único en la base
+    if marcador == '?':
+        return re.sub(r"^(DROP INDEX (?:IF EXISTS )?\w+) ON \w+$", r"\1", sentencia)
+    return sentencia
+
+
+def versiones_aplicadas(conexion) -> List[int]:
+    cursor = conexion.cursor()
+    try:
+        cursor.execute(SQL_TABLA_VERSIONES)
+        cursor.execute("SELECT Version FROM Version_Esquema ORDER BY Version")
+        return [fila[0] for fila in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def version_actual(conexion) -> int:
+    aplicadas = versiones_aplicadas(conexion)
+    return aplicadas[-1] if aplicadas else 0
+
+
+def migrar(conexion, marcador: str = '%s', hasta: Optional[int] = None) -> List[Migracion]:
+    """
+    Aplica en orden las migraciones pendientes (hasta la versión indicada o la última) y
+    devuelve las que aplicó. Cada una queda registrada en Version_Esquema al terminar.
+    """
+    aplicadas = set(versiones_aplicadas(conexion))
+    nuevas = []
+    cursor = conexion.cursor()
+    try:
+        for migracion in MIGRACIONES:
+            if migracion.version in aplicadas or (hasta is not None and migracion.version > hasta):
+                continue
+            for sentencia in migracion.subir:
+                cursor.execute(_adaptar(sentencia, marcador))
+            cursor.execute(f"INSERT INTO Version_Esquema (Version, Descripcion, Aplicada) "
+                           f"VALUES ({marcador}, {marcador}, {marcador})",
+                           (migracion.version, migracion.descripcion, datetime.now().isoformat(' ', 'seconds')))
+            conexion.commit()
+            nuevas.append(migracion)
+    finally:
+        cursor.close()
+    return nuevas
+
+
+def revertir(conexion, hasta: int, marcador: str = '%s') -> List[Migracion]:
+    """Deshace, de la más nueva a la más vieja, las migraciones con versión mayor a 'hasta'"""
+    aplicadas = set(versiones_aplicadas(conexion))
+    deshechas = []
+    cursor = conexion.cursor()
+    try:
+        for migracion in reversed(MIGRACIONES):
+            if migracion.version <= hasta or migracion.version not in aplicadas:
+                continue
+            for sentencia in migracion.bajar:
+                cursor.execute(_adaptar(sentencia, marcador))
+            cursor.execute(f"DELETE FROM Version_Esquema WHERE Version = {marcador}", (migracion.version,))
+            conexion.commit()
+            deshechas.append(migracion)
+    finally:
+        cursor.close()
+    return deshechas
+
+
+def main():
+    # Uso: python Migraciones.py           -> aplica las migraciones pendientes en MariaDB
+    #      python Migraciones.py bajar N   -> deja la base en la versión N
+    from DbClinica import obtener_pool
+
+    with obtener_pool().conexion() as conexion:
+        if len(sys.argv) > 2 and sys.argv[1] == "bajar":
+            for migracion in revertir(conexion, int(sys.argv[2])):
+                print(f"↩️ Revertida {migracion.version:03d}: {migracion.descripcion}")
+        else:
+            for migracion in migrar(conexion):
+                print(f"✅ Aplicada {migracion.version:03d}: {migracion.descripcion}")
+        print(f"📌 Versión del esquema: {version_actual(conexion)}")
+
+
+if __name__ == "__main__":
+    main()
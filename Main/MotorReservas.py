@@ -0,0 +1,204 @@
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from PoolConexiones import PoolConexiones
+from SqlReservas import DURACION_CITA, ConflictoReservaError, HorarioNoDisponibleError, es_conflicto, sentencias_reserva
+
+
+class MotorReservas:
+    """
+    Reserva de citas segura entre varias computadoras que comparten la tabla Cita.
+    Control optimista con la columna Horario.Version: se lee el horario y su versión, se revisa que
+    no haya choque, se inserta la cita y se incrementa la versión solo si sigue igual a la leída.
+    Si otra reserva del mismo horario se guardó en medio, el UPDATE no afecta filas, se deshace todo
+    y se vuelve a intentar (con espera aleatoria creciente), esta vez viendo la cita de la otra persona.
+    """
+    def __init__(self, pool: PoolConexiones, marcador: str = '%s', max_reintentos: int = 8,
+                 espera_base: float = 0.002):
+        self.pool = pool
+        self.max_reintentos = max_reintentos
+        self.espera_base = espera_base
+        reserva = sentencias_reserva(marcador)
+        self.sql_horario, self.sql_choque, self.sql_insertar = reserva.horario, reserva.choque, reserva.insertar
+        self.sql_version, self.sql_cancelar = reserva.version, reserva.cancelar
+        self.texto_fechas = marcador == '?'    # sqlite3 recibe las fechas como texto ISO
+        self._lock = threading.Lock()
+        self._contadores = {'reservadas': 0, 'rechazadas': 0, 'conflictos': 0, 'agotadas': 0}
+
+    def _fecha(self, valor: datetime):
+        return valor.isoformat(' ') if self.texto_fechas else valor
+
+    def _contar(self, contador: str):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    def _intentar(self, conexion, id_paciente: int, id_doctor: int, fecha: datetime, costo: float) -> Optional[int]:
+        """Un intento de reserva; devuelve el ID de la cita o None si otra reserva ganó la carrera"""
+        fin = fecha + DURACION_CITA
+        cursor = conexion.cursor()
+        try:
+            dia = fecha.date().isoformat() if self.texto_fechas else fecha.date()
+            cursor.execute(self.sql_horario, (id_doctor, dia, fecha.strftime('%H:%M:%S'), fin.strftime('%H:%M:%S')))
+            horario = cursor.fetchone()
+            if horario is None or fin.date() != fecha.date():
+                raise HorarioNoDisponibleError("El doctor no atiende en ese horario")
+            id_horario, version = horario
+
+            cursor.execute(self.sql_choque, (id_doctor, self._fecha(fecha - DURACION_CITA), self._fecha(fin)))
+            if cursor.fetchone() is not None:
+                raise HorarioNoDisponibleError("El doctor ya tiene una cita en ese horario")
+
+            cursor.execute(self.sql_insertar, (id_paciente, id_doctor, self._fecha(fecha), costo))
+            id_cita = cursor.lastrowid
+            cursor.execute(self.sql_version, (id_horario, version))
+            if cursor.rowcount != 1:
+                conexion.rollback()
+                return None
+            conexion.commit()
+            return id_cita
+        except Exception:
+            conexion.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def reservar(self, id_paciente: int, id_doctor: int, fecha: datetime, costo: float) -> int:
+        """
+        Reserva la cita y devuelve su ID.
+        Lanza HorarioNoDisponibleError si el espacio no existe o ya está tomado, y ConflictoReservaError
+        si después de max_reintentos seguía perdiendo la carrera contra otras reservas.
+        """
+        for intento in range(self.max_reintentos):
+            try:
+                with self.pool.conexion() as conexion:
+                    id_cita = self._intentar(conexion, id_paciente, id_doctor, fecha, costo)
+            except HorarioNoDisponibleError:
+                self._contar('rechazadas')
+                raise
+            except Exception as e:
+                if not es_conflicto(e):
+                    raise
+                id_cita = None
+            if id_cita is not None:
+                self._contar('reservadas')
+                return id_cita
+            self._contar('conflictos')
+            time.sleep(random.uniform(0, self.espera_base * (2 ** intento)))
+        self._contar('agotadas')
+        raise ConflictoReservaError(f"No se pudo reservar después de {self.max_reintentos} intentos")
+
+    def cancelar(self, id_cita: int) -> bool:
+        """Cancela la cita y libera el espacio; False si no existe o ya estaba cancelada"""
+        with self.pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(self.sql_cancelar, (id_cita,))
+                conexion.commit()
+                return cursor.rowcount > 0
+            finally:
+                cursor.close()
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._contadores)
+
+
+def main():
+    # Prueba de estrés: muchas recepcionistas (hilos con su propia conexión) reservando a la vez
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import date, timedelta
+    from Repositorios import crear_esquema_sqlite
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_reservas.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    inicial.execute("PRAGMA journal_mode=WAL")
+    doctores, dias = 10, 5
+    lunes = date(2025, 3, 3)
+    for i in range(doctores):
+        inicial.execute("INSERT INTO Doctor (Nombre, Apellido, Especialidad, Telefono, Correo, Contrasena) "
+                        "VALUES (?, 'A', 'General', '70000000', ?, 'x')", (f"Doc{i}", f"d{i}@c.com"))
+        for d in range(dias):
+            inicial.execute("INSERT INTO Horario (ID_Doctor, Dia, Hora_Inicio, Hora_Fin) VALUES (?, ?, ?, ?)",
+                            (i + 1, (lunes + timedelta(days=d)).isoformat(), "08:00:00", "12:00:00"))
+    inicial.execute("INSERT INTO Paciente (Nombre, Apellido, Fecha_Nacimiento, Correo) "
+                    "VALUES ('Pac', 'B', '1990-01-01', 'p@c.com')")
+    inicial.commit()
+    inicial.close()
+
+    solicitudes, recepcionistas = 4000, 16
+    random.seed(14)
+    # 8 cupos x 5 días x 10 doctores = 400 cupos para 4000 solicitudes: casi todas compiten por lo mismo
+    pedidos = [(random.randint(1, doctores),
+                datetime.combine(lunes + timedelta(days=random.randrange(dias)), datetime.min.time()) +
+                timedelta(hours=8, minutes=30 * random.randrange(8))) for _ in range(solicitudes)]
+
+    def probar(nombre: str, reservar, motor: Optional[MotorReservas] = None):
+        conexion = sqlite3.connect(ruta)
+        conexion.execute("DELETE FROM Cita")
+        conexion.execute("UPDATE Horario SET Version = 0")
+        conexion.commit()
+        errores = {'otros': 0}
+
+        def recepcionista(pedido):
+            try:
+                reservar(1, pedido[0], pedido[1], 25.0)
+            except (HorarioNoDisponibleError, ConflictoReservaError):
+                pass
+            except Exception:
+                errores['otros'] += 1
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=recepcionistas) as hilos:
+            list(hilos.map(recepcionista, pedidos))
+        duracion = time.perf_counter() - inicio
+
+        (guardadas,), = conexion.execute("SELECT COUNT(*) FROM Cita").fetchall()
+        dobles = conexion.execute("SELECT COUNT(*) FROM (SELECT 1 FROM Cita WHERE Estado <> 'Cancelada' "
+                                  "GROUP BY ID_Doctor, Fecha HAVING COUNT(*) > 1)").fetchone()[0]
+        conexion.close()
+        extra = ""
+        if motor is not None:
+            e = motor.estadisticas()
+            extra = f" | conflictos reintentados {e['conflictos']}, reintentos agotados {e['agotadas']}"
+        print(f"{nombre:<22} {solicitudes / duracion:7,.0f} solicitudes/s | citas guardadas {guardadas} | "
+              f"espacios con doble reserva {dobles} | otros errores {errores['otros']}{extra}")
+        return dobles
+
+    def crear_pool():
+        return PoolConexiones(lambda: sqlite3.connect(ruta, timeout=5, check_same_thread=False),
+                              max_conexiones=recepcionistas)
+
+    # Referencia: revisar y luego insertar sin control de versión (como CitaWindow con datos compartidos)
+    pool_ingenuo = crear_pool()
+    motor_ingenuo = MotorReservas(pool_ingenuo, marcador='?')
+
+    def reservar_sin_version(id_paciente, id_doctor, fecha, costo):
+        with pool_ingenuo.conexion() as conexion:
+            fin = fecha + DURACION_CITA
+            choque = conexion.execute(motor_ingenuo.sql_choque, (id_doctor, (fecha - DURACION_CITA).isoformat(' '),
+                                                                 fin.isoformat(' '))).fetchone()
+            if choque is not None:
+                raise HorarioNoDisponibleError()
+            time.sleep(0)    # Cede el GIL, como pasaría con la latencia de red entre consulta e inserción
+            conexion.execute(motor_ingenuo.sql_insertar, (id_paciente, id_doctor, fecha.isoformat(' '), costo))
+            conexion.commit()
+
+    probar("Sin control de versión", reservar_sin_version)
+    pool_ingenuo.cerrar()
+
+    pool = crear_pool()
+    motor = MotorReservas(pool, marcador='?')
+    dobles = probar("MotorReservas", motor.reservar, motor)
+    pool.cerrar()
+    assert dobles == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+
+class PoolAgotadoError(Exception):
+    """Se lanza cuando no se obtiene una conexión libre dentro del tiempo de espera"""
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones reutilizables a la base de datos.
+    Recibe una función que crea conexiones nuevas (MariaDB con mysql.connector o
+    sqlite3 para pruebas), así que no depende de ningún driver en particular.
+    """
+    def __init__(self, crear_conexion: Callable, min_conexiones: int = 1, max_conexiones: int = 5,
+                 tiempo_max_inactiva: float = 300.0, tiempo_espera: float = 10.0,
+                 consulta_salud: str = "SELECT 1"):
+        if min_conexiones < 0 or max_conexiones < 1 or min_conexiones > max_conexiones:
+            raise ValueError("Tamaño de pool inválido: se requiere 0 <= min <= max y max >= 1")
+
+        self.crear_conexion = crear_conexion
+        self.min_conexiones = min_conexiones
+        self.max_conexiones = max_conexiones
+        self.tiempo_max_inactiva = tiempo_max_inactiva    # Segundos antes de cerrar una conexión ociosa
+        self.tiempo_espera = tiempo_espera                # Segundos que se espera por una conexión libre
+        self.consulta_salud = consulta_salud
+
+        self._condicion = threading.Condition()
+        self._libres: List[Tuple[object, float]] = []     # (conexion, ultimo_uso) en orden LIFO
+        self._total = 0                                   # Conexiones abiertas (libres + prestadas)
+        self._cerrado = False
+
+        # Contadores para dimensionar el pool bajo carga
+        self._contadores = {
+            'aciertos': 0,          # Préstamos servidos con una conexión ya abierta
+            'fallos': 0,            # Préstamos que tuvieron que abrir una conexión nueva
+            'esperas': 0,           # Préstamos que esperaron porque el pool estaba lleno
+            'tiempo_espera_total': 0.0,
+            'tiempo_espera_max': 0.0,
+            'creadas': 0,
+            'descartadas': 0,       # Conexiones cerradas por fallar el chequeo o por inactividad
+        }
+
+        for _ in range(min_conexiones):
+            self._libres.append((self._abrir(), time.monotonic()))
+            self._total += 1
+
+    def _abrir(self):
+        """Abre una conexión fuera del lock (puede tardar); solo el contador se actualiza con el lock"""
+        conexion = self.crear_conexion()
+        with self._condicion:
+            self._contadores['creadas'] += 1
+        return conexion
+
+    def _cerrar_conexion(self, conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    def _esta_viva(self, conexion) -> bool:
+        """Chequeo de salud antes de prestar la conexión"""
+        try:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(self.consulta_salud)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _desalojar_inactivas(self, ahora: float) -> list:
+        """Saca del pool las conexiones ociosas que sobran por encima del mínimo (con el lock tomado)"""
+        desalojadas = []
+        # Las más antiguas quedan al inicio de la lista
+        while self._libres and self._total > self.min_conexiones:
+            conexion, ultimo_uso = self._libres[0]
+            if ahora - ultimo_uso < self.tiempo_max_inactiva:
+                break
+            self._libres.pop(0)
+            self._total -= 1
+            self._contadores['descartadas'] += 1
+            desalojadas.append(conexion)
+        return desalojadas
+
+    def obtener(self):
+        """Presta una conexión del pool; hay que devolverla con devolver()"""
+        inicio = time.monotonic()
+        espero = False
+
+        while True:
+            conexion = None
+            crear = False
+            with self._condicion:
+                if self._cerrado:
+                    raise PoolAgotadoError("El pool de conexiones está cerrado")
+
+                desalojadas = self._desalojar_inactivas(time.monotonic())
+
+                while not self._libres and self._total >= self.max_conexiones:
+                    restante = self.tiempo_espera - (time.monotonic() - inicio)
+                    if restante <= 0:
+                        raise PoolAgotadoError(
+                            f"No hay conexiones libres después de {self.tiempo_espera:.1f} s "
+                            f"(máximo {self.max_conexiones})")
+                    espero = True
+                    self._condicion.wait(restante)
+                    if self._cerrado:
+                        raise PoolAgotadoError("El pool de conexiones está cerrado")
+
+                if self._libres:
+                    conexion, _ = self._libres.pop()
+                else:
+                    self._total += 1
+                    crear = True
+
+            for vieja in desalojadas:
+                self._cerrar_conexion(vieja)
+
+            if crear:
+                try:
+                    conexion = self._abrir()
+                except Exception:
+                    with self._condicion:
+                        self._total -= 1
+                        self._condicion.notify()
+                    raise
+            elif not self._esta_viva(conexion):
+                # Conexión rota (p. ej. el servidor la cerró): se descarta y se intenta de nuevo
+                self._cerrar_conexion(conexion)
+                with self._condicion:
+                    self._total -= 1
+                    self._contadores['descartadas'] += 1
+                continue
+
+            esperado = time.monotonic() - inicio
+            with self._condicion:
+                self._contadores['fallos' if crear else 'aciertos'] += 1
+                if espero:
+                    self._contadores['esperas'] += 1
+                self._contadores['tiempo_espera_total'] += esperado
+                self._contadores['tiempo_espera_max'] = max(self._contadores['tiempo_espera_max'], esperado)
+            return conexion
+
+    def devolver(self, conexion, descartar: bool = False):
+        """Regresa una conexión al pool; si quedó en mal estado se cierra"""
+        if not descartar:
+            try:
+                # Deshace cualquier transacción que haya quedado abierta
+                conexion.rollback()
+            except Exception:
+                descartar = True
+
+        with self._condicion:
+            if descartar or self._cerrado:
+                self._total -= 1
+                if descartar:
+                    self._contadores['descartadas'] += 1
+            else:
+                self._libres.append((conexion, time.monotonic()))
+                conexion = None
+            self._condicion.notify()
+
+        if conexion is not None:
+            self._cerrar_conexion(conexion)
+
+    @contextmanager
+    def conexion(self):
+        """
+        Context manager para usar una conexión prestada:
+
+            with pool.conexion() as conexion:
+                cursor = conexion.cursor()
+                ...
+        """
+        conexion = self.obtener()
+        try:
+            yield conexion
+        finally:
+            self.devolver(conexion)
+
+    def estadisticas(self) -> dict:
+        """Devuelve una copia de los contadores del pool"""
+        with self._condicion:
+            datos = dict(self._contadores)
+            datos['libres'] = len(self._libres)
+            datos['en_uso'] = self._total - len(self._libres)
+            datos['total'] = self._total
+            prestamos = datos['aciertos'] + datos['fallos']
+            datos['espera_promedio'] = datos['tiempo_espera_total'] / prestamos if prestamos else 0.0
+        return datos
+
+    def cerrar(self):
+        """Cierra todas las conexiones libres; las prestadas se cierran al devolverse"""
+        with self._condicion:
+            self._cerrado = True
+            libres = [conexion for conexion, _ in self._libres]
+            self._total -= len(libres)
+            self._libres.clear()
+            self._condicion.notify_all()
+        for conexion in libres:
+            self._cerrar_conexion(conexion)
+
+
+def main():
+    # Simulación con SQLite en memoria en lugar de MariaDB
+    import sqlite3
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = PoolConexiones(lambda: sqlite3.connect(":memory:", check_same_thread=False),
+                          min_conexiones=2, max_conexiones=4)
+
+    def consulta(_):
+        with pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+
+    with ThreadPoolExecutor(max_workers=16) as ejecutor:
+        list(ejecutor.map(consulta, range(2000)))
+
+    for clave, valor in pool.estadisticas().items():
+        print(f"{clave}: {valor}")
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
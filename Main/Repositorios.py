@@ -0,0 +1,378 @@
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from PoolConexiones import PoolConexiones
+
+# Tablas de GestionClinicaDental.sql: (clave primaria, columnas que se insertan)
+# En las tablas con auto_increment la clave no se inserta; en las tablas puente la clave son las dos columnas.
+TABLAS = {
+    'Paciente': (('ID_Paciente',),
+                 ('Nombre', 'Apellido', 'Fecha_Nacimiento', 'DUI', 'Telefono', 'Correo')),
+    'Historial_Medico': (('ID_Historial',),
+                         ('ID_Paciente', 'Fecha_Creacion', 'Notas_Generales', 'Estado')),
+    'Doctor': (('ID_Doctor',),
+               ('Nombre', 'Apellido', 'Especialidad', 'Telefono', 'Correo', 'Contrasena')),
+    'Horario': (('ID_Horario',),
+                ('ID_Doctor', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Disponible')),
+    'Cita': (('ID_Cita',),
+             ('ID_Paciente', 'ID_Doctor', 'Fecha', 'Estado', 'Costo')),
+    'Tratamiento': (('ID_Tratamiento',),
+                    ('ID_Paciente', 'ID_Doctor', 'Descripcion', 'Costo', 'Fecha', 'Estado')),
+    'Factura': (('ID_Factura',),
+                ('ID_Paciente', 'Fecha_Emision', 'Monto_Total', 'Estado_Pago')),
+    'Asistente': (('ID_Asistente',),
+                  ('Nombre', 'Apellido', 'Telefono', 'Correo', 'Contrasena')),
+    'Tratamiento_Factura': (('ID_Tratamiento', 'ID_Factura'), ('ID_Tratamiento', 'ID_Factura')),
+    'Asistente_Paciente': (('ID_Asistente', 'ID_Paciente'), ('ID_Asistente', 'ID_Paciente')),
+    'Asistente_Cita': (('ID_Asistente', 'ID_Cita'), ('ID_Asistente', 'ID_Cita')),
+    'Asistente_Factura': (('ID_Asistente', 'ID_Factura'), ('ID_Asistente', 'ID_Factura')),
+}
+
+# Mismo esquema traducido a SQLite, para pruebas y benchmarks sin MariaDB
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS Paciente (
+    ID_Paciente INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nombre TEXT NOT NULL, Apellido TEXT NOT NULL, Fecha_Nacimiento TEXT NOT NULL,
+    DUI TEXT UNIQUE, Telefono TEXT, Correo TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS Historial_Medico (
+    ID_Historial INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Paciente INTEGER NOT NULL REFERENCES Paciente(ID_Paciente) ON DELETE CASCADE,
+    Fecha_Creacion TEXT NOT NULL, Notas_Generales TEXT, Estado TEXT DEFAULT 'Activo');
+CREATE TABLE IF NOT EXISTS Doctor (
+    ID_Doctor INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nombre TEXT NOT NULL, Apellido TEXT NOT NULL, Especialidad TEXT NOT NULL,
+    Telefono TEXT NOT NULL, Correo TEXT NOT NULL, Contrasena TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS Horario (
+    ID_Horario INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Doctor INTEGER NOT NULL REFERENCES Doctor(ID_Doctor) ON DELETE CASCADE,
+    Dia TEXT NOT NULL, Hora_Inicio TEXT NOT NULL, Hora_Fin TEXT NOT NULL, Disponible INTEGER DEFAULT 1,
+    Version INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS Cita (
+    ID_Cita INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Paciente INTEGER NOT NULL REFERENCES Paciente(ID_Paciente) ON DELETE CASCADE,
+    ID_Doctor INTEGER NOT NULL REFERENCES Doctor(ID_Doctor) ON DELETE CASCADE,
+    Fecha TEXT NOT NULL, Estado TEXT DEFAULT 'Pendiente', Costo NUMERIC NOT NULL);
+CREATE TABLE IF NOT EXISTS Tratamiento (
+    ID_Tratamiento INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Paciente INTEGER NOT NULL REFERENCES Paciente(ID_Paciente) ON DELETE CASCADE,
+    ID_Doctor INTEGER NOT NULL REFERENCES Doctor(ID_Doctor) ON DELETE CASCADE,
+    Descripcion TEXT NOT NULL, Costo NUMERIC NOT NULL, Fecha TEXT NOT NULL, Estado TEXT DEFAULT 'Pendiente');
+CREATE TABLE IF NOT EXISTS Factura (
+    ID_Factura INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_Paciente INTEGER NOT NULL REFERENCES Paciente(ID_Paciente) ON DELETE CASCADE,
+    Fecha_Emision TEXT NOT NULL, Monto_Total NUMERIC NOT NULL, Estado_Pago TEXT DEFAULT 'Pendiente');
+CREATE TABLE IF NOT EXISTS Asistente (
+    ID_Asistente INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nombre TEXT NOT NULL, Apellido TEXT NOT NULL, Telefono TEXT NOT NULL,
+    Correo TEXT NOT NULL, Contrasena TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS Tratamiento_Factura (
+    ID_Tratamiento INTEGER NOT NULL REFERENCES Tratamiento(ID_Tratamiento) ON DELETE CASCADE,
+    ID_Factura INTEGER NOT NULL REFERENCES Factura(ID_Factura) ON DELETE CASCADE,
+    PRIMARY KEY (ID_Tratamiento, ID_Factura));
+CREATE TABLE IF NOT EXISTS Asistente_Paciente (
+    ID_Asistente INTEGER NOT NULL REFERENCES Asistente(ID_Asistente) ON DELETE CASCADE,
+    ID_Paciente INTEGER NOT NULL REFERENCES Paciente(ID_Paciente) ON DELETE CASCADE,
+    PRIMARY KEY (ID_Asistente, ID_Paciente));
+CREATE TABLE IF NOT EXISTS Asistente_Cita (
+    ID_Asistente INTEGER NOT NULL REFERENCES Asistente(ID_Asistente) ON DELETE CASCADE,
+    ID_Cita INTEGER NOT NULL REFERENCES Cita(ID_Cita) ON DELETE CASCADE,
+    PRIMARY KEY (ID_Asistente, ID_Cita));
+CREATE TABLE IF NOT EXISTS Asistente_Factura (
+    ID_Asistente INTEGER NOT NULL REFERENCES Asistente(ID_Asistente) ON DELETE CASCADE,
+    ID_Factura INTEGER NOT NULL REFERENCES Factura(ID_Factura) ON DELETE CASCADE,
+    PRIMARY KEY (ID_Asistente, ID_Factura));
+"""
+
+def crear_esquema_sqlite(conexion):
+    """Crea todas las tablas en una conexión sqlite3"""
+    conexion.executescript(ESQUEMA_SQLITE)
+    conexion.commit()
+
+
+class Repositorio:
+    """
+    Acceso a una tabla con consultas parametrizadas.
+    marcador es el estilo de parámetro del driver: '%s' para mysql.connector, '?' para sqlite3.
+    """
+    def __init__(self, pool: PoolConexiones, tabla: str, clave: Sequence[str], columnas: Sequence[str],
+                 marcador: str = '%s', preparado: bool = False):
+        self.pool = pool
+        self.tabla = tabla
+        self.clave = tuple(clave)
+        self.columnas = tuple(columnas)
+        self.columnas_lectura = self.clave + tuple(c for c in self.columnas if c not in self.clave)
+        self._columnas_validas = frozenset(self.columnas_lectura)
+        self.marcador = marcador
+        self.preparado = preparado      # Usar cursores preparados de mysql.connector en las lecturas
+
+        # Las sentencias se arman una sola vez
+        lista_clave = ", ".join(self.clave)
+        self._orden = f" ORDER BY {lista_clave}"
+        self._filtro_clave = " AND ".join(f"{c} = {marcador}" for c in self.clave)
+        if len(self.clave) == 1:
+            self._despues_de = f"{self.clave[0]} > {marcador}"
+        else:
+            self._despues_de = f"({lista_clave}) > ({', '.join(marcador for _ in self.clave)})"
+        self.sql_insertar = (f"INSERT INTO {tabla} ({', '.join(self.columnas)}) "
+                             f"VALUES ({', '.join(marcador for _ in self.columnas)})")
+        self.sql_obtener = f"SELECT * FROM {tabla} WHERE {self._filtro_clave}"
+        self.sql_eliminar = f"DELETE FROM {tabla} WHERE {self._filtro_clave}"
+
+    def _cursor(self, conexion, lectura: bool = False):
+        if lectura and self.preparado:
+            return conexion.cursor(prepared=True)
+        return conexion.cursor()
+
+    def _como_tupla(self, fila) -> tuple:
+        if isinstance(fila, dict):
+            return tuple(fila.get(c) for c in self.columnas)
+        return tuple(fila)
+
+    def _como_clave(self, valor) -> tuple:
+        return tuple(valor) if isinstance(valor, (tuple, list)) else (valor,)
+
+    def _validar_columnas(self, columnas: Iterable[str]):
+        """Los nombres de columna van dentro del SQL; solo se aceptan los de la tabla (ver TABLAS)"""
+        desconocidas = [c for c in columnas if c not in self._columnas_validas]
+        if desconocidas:
+            raise ValueError(f"Columnas desconocidas en {self.tabla}: {', '.join(map(str, desconocidas))}")
+
+    def insertar(self, fila) -> Optional[int]:
+        """Inserta una fila (dict o tupla en el orden de columnas) y devuelve el id generado"""
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion)
+            try:
+                cursor.execute(self.sql_insertar, self._como_tupla(fila))
+                conexion.commit()
+                return cursor.lastrowid
+            finally:
+                cursor.close()
+
+    def insertar_lote(self, filas: Iterable, tamano_lote: int = 1000) -> int:
+        """
+        Inserta muchas filas con executemany en una sola transacción.
+        mysql.connector convierte cada lote en un único INSERT de varias filas (un viaje al servidor por lote).
+        """
+        total = 0
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion)
+            try:
+                lote = []
+                for fila in filas:
+                    lote.append(self._como_tupla(fila))
+                    if len(lote) >= tamano_lote:
+                        cursor.executemany(self.sql_insertar, lote)
+                        total += len(lote)
+                        lote = []
+                if lote:
+                    cursor.executemany(self.sql_insertar, lote)
+                    total += len(lote)
+                conexion.commit()
+            except Exception:
+                conexion.rollback()
+                raise
+            finally:
+                cursor.close()
+        return total
+
+    def obtener(self, id_registro) -> Optional[tuple]:
+        """Busca una fila por su clave primaria"""
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion, lectura=True)
+            try:
+                cursor.execute(self.sql_obtener, self._como_clave(id_registro))
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+
+    def pagina(self, despues_de=None, limite: int = 100,
+               filtros: Optional[Dict[str, object]] = None) -> List[tuple]:
+        """
+        Lectura paginada por keyset: devuelve hasta `limite` filas con clave mayor a `despues_de`.
+        A diferencia de OFFSET, el costo no crece con el número de página.
+        """
+        filtros = filtros or {}
+        self._validar_columnas(filtros)
+        condiciones = []
+        parametros: list = []
+        if despues_de is not None:
+            condiciones.append(self._despues_de)
+            parametros.extend(self._como_clave(despues_de))
+        for columna, valor in filtros.items():
+            condiciones.append(f"{columna} = {self.marcador}")
+            parametros.append(valor)
+
+        sql = f"SELECT * FROM {self.tabla}"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += f"{self._orden} LIMIT {int(limite)}"
+
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion, lectura=True)
+            try:
+                cursor.execute(sql, tuple(parametros))
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def pagina_ordenada(self, orden: Optional[str] = None, descendente: bool = False, despues_de=None,
+                        limite: int = 100, busqueda: str = "",
+                        columnas_busqueda: Sequence[str] = ()) -> List[tuple]:
+        """
+        Página ordenada por cualquier columna, para las tablas de la interfaz.
+        Las filas vienen con las columnas de la clave primero y luego las demás (ver columnas_lectura).
+        El keyset es (valor de la columna, clave) para que el orden sea estable aunque haya valores
+        repetidos; despues_de es ese par tomado de la última fila de la página anterior (ver cursor_de).
+        busqueda filtra con LIKE '%texto%' sobre columnas_busqueda; % y _ en el texto se buscan tal cual.
+        """
+        if orden is None or orden in self.clave:
+            orden = self.clave[0]
+        if len(self.clave) != 1:
+            raise ValueError("pagina_ordenada solo está disponible para tablas con clave simple")
+        self._validar_columnas((orden, *columnas_busqueda))
+        clave = self.clave[0]
+        m = self.marcador
+        direccion, comparacion = ("DESC", "<") if descendente else ("ASC", ">")
+
+        condiciones = []
+        parametros: list = []
+        if busqueda and columnas_busqueda:
+            condiciones.append("(" + " OR ".join(f"{c} LIKE {m} ESCAPE '!'" for c in columnas_busqueda) + ")")
+            texto = busqueda.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+            parametros.extend(f"%{texto}%" for _ in columnas_busqueda)
+        if despues_de is not None:
+            valor, id_registro = despues_de
+            if orden == clave:
+                condiciones.append(f"{clave} {comparacion} {m}")
+                parametros.append(id_registro)
+            else:
+                condiciones.append(f"({orden} {comparacion} {m} OR ({orden} = {m} AND {clave} {comparacion} {m}))")
+                parametros.extend((valor, valor, id_registro))
+
+        sql = f"SELECT {', '.join(self.columnas_lectura)} FROM {self.tabla}"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        if orden == clave:
+            sql += f" ORDER BY {clave} {direccion}"
+        else:
+            sql += f" ORDER BY {orden} {direccion}, {clave} {direccion}"
+        sql += f" LIMIT {int(limite)}"
+
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion, lectura=True)
+            try:
+                cursor.execute(sql, tuple(parametros))
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def cursor_de(self, fila: tuple, orden: Optional[str] = None):
+        """Par (valor de la columna de orden, clave) de una fila de pagina_ordenada"""
+        if orden is None or orden in self.clave:
+            return fila[0], fila[0]
+        return fila[self.columnas_lectura.index(orden)], fila[0]
+
+    def clave_de(self, fila: tuple):
+        """Extrae la clave primaria de una fila leída con SELECT * (las claves son las primeras columnas)"""
+        if len(self.clave) == 1:
+            return fila[0]
+        return tuple(fila[:len(self.clave)])
+
+    def recorrer(self, tamano_pagina: int = 1000,
+                 filtros: Optional[Dict[str, object]] = None) -> Iterator[tuple]:
+        """Recorre toda la tabla página por página sin cargarla completa en memoria"""
+        despues_de = None
+        while True:
+            filas = self.pagina(despues_de, tamano_pagina, filtros)
+            yield from filas
+            if len(filas) < tamano_pagina:
+                return
+            despues_de = self.clave_de(filas[-1])
+
+    def actualizar(self, id_registro, cambios: Dict[str, object]) -> int:
+        """Actualiza las columnas indicadas de una fila; devuelve las filas afectadas"""
+        self._validar_columnas(cambios)
+        asignaciones = ", ".join(f"{columna} = {self.marcador}" for columna in cambios)
+        sql = f"UPDATE {self.tabla} SET {asignaciones} WHERE {self._filtro_clave}"
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion)
+            try:
+                cursor.execute(sql, tuple(cambios.values()) + self._como_clave(id_registro))
+                conexion.commit()
+                return cursor.rowcount
+            finally:
+                cursor.close()
+
+    def eliminar(self, id_registro) -> int:
+        """Elimina una fila por su clave primaria"""
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion)
+            try:
+                cursor.execute(self.sql_eliminar, self._como_clave(id_registro))
+                conexion.commit()
+                return cursor.rowcount
+            finally:
+                cursor.close()
+
+    def contar(self) -> int:
+        with self.pool.conexion() as conexion:
+            cursor = self._cursor(conexion)
+            try:
+                cursor.execute(f"SELECT COUNT(*) FROM {self.tabla}")
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+
+
+def crear_repositorios(pool: PoolConexiones, marcador: str = '%s',
+                       preparado: bool = False) -> Dict[str, Repositorio]:
+    """Crea un repositorio por cada tabla del esquema, indexados por nombre de tabla"""
+    return {
+        tabla: Repositorio(pool, tabla, clave, columnas, marcador, preparado)
+        for tabla, (clave, columnas) in TABLAS.items()
+    }
+
+
+def main():
+    # Benchmark: 100k pacientes contra SQLite como sustituto de MariaDB
+    import os
+    import sqlite3
+    import tempfile
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_benchmark.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    inicial.close()
+
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=2)
+    repos = crear_repositorios(pool, marcador='?')
+    pacientes = repos['Paciente']
+
+    total = 100_000
+    filas = ((f"Nombre{i}", f"Apellido{i}", "1990-01-01", f"{i:08d}-{i % 10}",
+              f"7{i % 10_000_000:07d}", f"paciente{i}@correo.com") for i in range(total))
+
+    inicio = time.perf_counter()
+    insertados = pacientes.insertar_lote(filas, tamano_lote=5000)
+    duracion = time.perf_counter() - inicio
+    print(f"Insertados: {insertados} en {duracion:.2f} s ({insertados / duracion:,.0f} filas/s)")
+
+    latencias = []
+    despues_de = None
+    while True:
+        inicio = time.perf_counter()
+        filas = pacientes.pagina(despues_de, 100)
+        latencias.append(time.perf_counter() - inicio)
+        if len(filas) < 100:
+            break
+        despues_de = pacientes.clave_de(filas[-1])
+
+    latencias.sort()
+    print(f"Páginas leídas: {len(latencias)}")
+    print(f"Latencia por página: mediana {latencias[len(latencias) // 2] * 1000:.3f} ms, "
+          f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:.3f} ms")
+    pool.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sqlite3
+from datetime import timedelta
+from typing import NamedTuple
+
+# Reglas y consultas de reserva que comparten MotorReservas (hilos) y ServicioCitasAsync (portal)
+
+DURACION_CITA = timedelta(minutes=30)
+ESTADO_CANCELADA = "Cancelada"
+
+# Errores de MariaDB que indican que otra transacción ganó la carrera: deadlock y espera de bloqueo agotada
+ERRORES_CONFLICTO_MARIADB = (1205, 1213)
+
+
+class HorarioNoDisponibleError(Exception):
+    """La cita pedida no cae dentro de un horario del doctor o choca con otra cita"""
+
+
+class ConflictoReservaError(Exception):
+    """Se agotaron los reintentos porque otras recepcionistas reservaban el mismo horario al mismo tiempo"""
+
+
+def es_conflicto(error: Exception) -> bool:
+    """True si el error es de concurrencia y la reserva se puede reintentar"""
+    if isinstance(error, sqlite3.OperationalError):
+        mensaje = str(error).lower()
+        return 'locked' in mensaje or 'busy' in mensaje
+    # mysql.connector trae el código en errno; pymysql (aiomysql) en args[0]
+    codigo = getattr(error, 'errno', None) or (error.args[0] if error.args else None)
+    return codigo in ERRORES_CONFLICTO_MARIADB
+
+
+class SentenciasReserva(NamedTuple):
+    """SQL de una reserva con control optimista sobre Horario.Version"""
+    horario: str        # (id_doctor, dia, hora_inicio, hora_fin) -> (ID_Horario, Version)
+    choque: str         # (id_doctor, desde, hasta) -> una cita activa que se traslapa
+    insertar: str       # (id_paciente, id_doctor, fecha, costo)
+    version: str        # (id_horario, version leída); 0 filas si otra reserva ganó
+    cancelar: str       # (id_cita,); 0 filas si no existe o ya estaba cancelada
+
+
+def sentencias_reserva(marcador: str) -> SentenciasReserva:
+    m = marcador
+    return SentenciasReserva(
+        # ORDER BY: si dos bloques cubren el mismo espacio, todas las reservas leen y versionan el mismo.
+        # Los bloques no deberían traslaparse (agregar_horario de ControladorClinica los rechaza).
+        horario=(f"SELECT ID_Horario, Version FROM Horario WHERE ID_Doctor = {m} AND Dia = {m} "
+                 f"AND Hora_Inicio <= {m} AND Hora_Fin >= {m} AND Disponible = 1 "
+                 f"ORDER BY ID_Horario LIMIT 1"),
+        choque=(f"SELECT ID_Cita FROM Cita WHERE ID_Doctor = {m} AND Estado <> '{ESTADO_CANCELADA}' "
+                f"AND Fecha > {m} AND Fecha < {m} LIMIT 1"),
+        insertar=(f"INSERT INTO Cita (ID_Paciente, ID_Doctor, Fecha, Estado, Costo) "
+                  f"VALUES ({m}, {m}, {m}, 'Pendiente', {m})"),
+        version=(f"UPDATE Horario SET Version = Version + 1 "
+                 f"WHERE ID_Horario = {m} AND Version = {m}"),
+        cancelar=(f"UPDATE Cita SET Estado = '{ESTADO_CANCELADA}' "
+                  f"WHERE ID_Cita = {m} AND Estado <> '{ESTADO_CANCELADA}'"),
+    )
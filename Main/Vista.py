@@ -0,0 +1,237 @@
+import os
+import sys
+import time
+
+_ARRANQUE = time.perf_counter()  # Para --tiempos: desde aquí se mide lo que cuesta importar la interfaz
+
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton
+from PyQt6.QtCore import Qt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modelos'))
+from ControladorClinica import ControladorClinica
+from Tema import aplicar_tema
+
+_IMPORTADO = time.perf_counter()
+
+OBJETIVO_ARRANQUE = 1.0  # Segundos hasta ver el menú principal en un arranque en frío
+
+# Catálogo inicial para el combo de CitaWindow; se completa con los tratamientos ya registrados
+CATALOGO_TRATAMIENTOS = [
+    {'descripcion': 'Consulta general', 'costo': 15.0},
+    {'descripcion': 'Limpieza', 'costo': 20.0},
+    {'descripcion': 'Resina', 'costo': 35.0},
+    {'descripcion': 'Extracción', 'costo': 40.0},
+]
+
+# Ventanas del menú: (clave, texto del botón, módulo de modelos/). El módulo se importa al primer clic.
+VENTANAS = [
+    ('pacientes', "🧑 Pacientes", 'Paciente'),
+    ('doctores', "👨‍⚕️ Doctores", 'Doctor'),
+    ('citas', "📅 Citas", 'Cita'),
+    ('facturas', "🧾 Facturas", 'Factura'),
+    ('horarios', "🕒 Horarios", 'Horario'),
+]
+
+
+class MenuPrincipal(QMainWindow):
+    """
+    Ventana principal. Solo importa PyQt6.QtWidgets y el controlador; cada ventana de gestión
+    (y todo lo que su módulo importa) se carga y se construye la primera vez que se abre.
+    Todas comparten el mismo ControladorClinica, así que rehacer una ventana no pierde datos.
+    """
+    def __init__(self, controlador: ControladorClinica = None):
+        super().__init__()
+        self.controlador = controlador or ControladorClinica()
+        self.ventanas = {}          # clave -> (firma de los datos con que se construyó, ventana)
+        self.tiempos_apertura = {}  # clave -> segundos de la primera apertura (importación + construcción)
+        # Objetos que reciben Cita/Horario/Factura por cada DUI; se reutilizan para que las citas y
+        # horarios ya guardados sigan apuntando al mismo doctor o paciente al rehacer la ventana
+        self._adaptados = {}
+
+        self.setWindowTitle("Clínica Dental")
+        self.setGeometry(100, 100, 420, 460)
+        # La hoja de estilo es de toda la aplicación (Tema.py); las ventanas que se abren después la reutilizan
+        aplicar_tema()
+
+        central_widget = QWidget()
+        layout = QVBoxLayout(central_widget)
+        layout.setContentsMargins(30, 30, 30, 30)
+        layout.setSpacing(12)
+
+        titulo = QLabel("🏥 Clínica Dental")
+        titulo.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        titulo.setObjectName("tituloSimple")
+        layout.addWidget(titulo)
+
+        for clave, texto, _ in VENTANAS:
+            boton = QPushButton(texto)
+            boton.clicked.connect(lambda _, clave=clave: self.abrir(clave))
+            layout.addWidget(boton)
+        layout.addStretch()
+        self.setCentralWidget(central_widget)
+
+    # ----------------------- Datos para cada ventana -----------------------
+
+    def _adaptado(self, tipo: str, dui: str, crear):
+        clave = (tipo, dui)
+        if clave not in self._adaptados:
+            self._adaptados[clave] = crear()
+        return self._adaptados[clave]
+
+    def _paciente(self, modulo, paciente: dict):
+        """Citas y facturas usan la misma clase Paciente (Dominio.py), así que comparten el objeto"""
+        return self._adaptado('paciente', paciente['dui'], lambda: modulo.Paciente(
+            paciente['nombre'], paciente['apellido'], dui=paciente['dui']))
+
+    def _firma(self, clave: str) -> tuple:
+        """Qué datos del controlador usa la ventana al construirse; si cambian, se rehace"""
+        if clave in ('citas', 'horarios'):
+            duis = tuple(d['dui'] for d in self.controlador.doctores)
+            if clave == 'citas':
+                duis += tuple(p['dui'] for p in self.controlador.pacientes)
+            return duis
+        if clave == 'facturas':
+            return tuple(p['dui'] for p in self.controlador.pacientes)
+        return ()
+
+    def _tratamientos(self) -> list:
+        vistos = {t['descripcion'] for t in CATALOGO_TRATAMIENTOS}
+        tratamientos = list(CATALOGO_TRATAMIENTOS)
+        for paciente in self.controlador.pacientes:
+            for tratamiento in paciente['historial_medico']:
+                if tratamiento.descripcion not in vistos:
+                    vistos.add(tratamiento.descripcion)
+                    tratamientos.append({'descripcion': tratamiento.descripcion, 'costo': tratamiento.costo})
+        return tratamientos
+
+    def _construir(self, clave: str, modulo):
+        controlador = self.controlador
+        if clave == 'pacientes':
+            return modulo.PacienteWindow(controlador)
+        if clave == 'doctores':
+            return modulo.DoctorWindow(controlador)
+        if clave == 'citas':
+            doctores = [self._adaptado('cita', d['dui'], lambda d=d: modulo.Doctor(
+                d['nombre'], d['apellido'], d['dui'], d['especialidad'], d['telefono'], d['correo']))
+                for d in controlador.doctores]
+            pacientes = [self._paciente(modulo, p) for p in controlador.pacientes]
+            return modulo.CitaWindow(doctores, pacientes, self._tratamientos(), controlador)
+        if clave == 'facturas':
+            pacientes = [self._paciente(modulo, p) for p in controlador.pacientes]
+            return modulo.FacturaWindow(pacientes, controlador)
+        doctores = [self._adaptado('horario', d['dui'], lambda d=d: modulo.Doctor(
+            d['dui'], f"Dr. {d['nombre']} {d['apellido']}", d['especialidad'])) for d in controlador.doctores]
+        return modulo.HorarioWindow(doctores, controlador)
+
+    # ----------------------- Apertura diferida -----------------------
+
+    def abrir(self, clave: str) -> QMainWindow:
+        """Importa el módulo de la ventana si hace falta, la construye (o la reutiliza) y la muestra"""
+        inicio = time.perf_counter()
+        firma = self._firma(clave)
+        firma_anterior, ventana = self.ventanas.get(clave, (None, None))
+        if ventana is None or firma != firma_anterior:
+            if ventana is not None:
+                ventana.close()
+            # __import__ (y no importlib.import_module) para que -X importtime registre la importación
+            modulo = __import__(next(m for c, _, m in VENTANAS if c == clave))
+            ventana = self._construir(clave, modulo)
+            self.ventanas[clave] = (firma, ventana)
+        ventana.show()
+        ventana.raise_()
+        ventana.activateWindow()
+        self.tiempos_apertura.setdefault(clave, time.perf_counter() - inicio)
+        return ventana
+
+
+def _medir_arranque():
+    """
+    Corre en el proceso hijo de --tiempos: muestra el menú, abre cada ventana una vez y
+    escribe los tiempos en stdout (JSON). Las importaciones de cada etapa se separan en stderr.
+    """
+    app = QApplication(sys.argv)
+    aplicacion = time.perf_counter()
+    menu = MenuPrincipal()
+    menu.show()
+    app.processEvents()
+    visible = time.perf_counter()
+
+    print("# ventanas", file=sys.stderr, flush=True)
+    for clave, _, _ in VENTANAS:
+        menu.abrir(clave)
+        app.processEvents()
+        menu.ventanas[clave][1].close()
+    import json
+    print(json.dumps({
+        'importaciones': _IMPORTADO - _ARRANQUE,
+        'qapplication': aplicacion - _IMPORTADO,
+        'menu_visible': visible - aplicacion,
+        'hasta_menu': visible - _ARRANQUE,
+        'ventanas': menu.tiempos_apertura,
+    }))
+
+
+def _leer_importtime(texto: str):
+    """Líneas de -X importtime de primer nivel: [(módulo, ms acumulados)]"""
+    import re
+    modulos = []
+    for linea in texto.splitlines():
+        coincidencia = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S.*)$", linea)
+        if coincidencia:   # Sin sangría: importado directamente por el script, no por otro módulo
+            modulos.append((coincidencia.group(2), int(coincidencia.group(1)) / 1000))
+    return modulos
+
+
+def reporte_arranque():
+    """Arranque en frío en un proceso nuevo con -X importtime y desglose por etapa"""
+    import json
+    import subprocess
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--medir'],
+                             capture_output=True, text=True)
+    total = time.perf_counter() - inicio
+    if proceso.returncode != 0:
+        sys.exit(f"❌ No se pudo medir el arranque:\n{proceso.stderr[-2000:]}")
+    tiempos = json.loads(proceso.stdout.strip().splitlines()[-1])
+    arranque, _, ventanas = proceso.stderr.partition("# ventanas")
+
+    # El proceso completo incluye cerrar las ventanas; el arranque es el intérprete más hasta_menu
+    interprete = total - tiempos['hasta_menu'] - sum(tiempos['ventanas'].values())
+    hasta_menu = max(interprete, 0) + tiempos['hasta_menu']
+    estado = "✅" if hasta_menu < OBJETIVO_ARRANQUE else "⚠️"
+    print(f"Arranque en frío hasta ver el menú: {hasta_menu * 1000:.0f} ms "
+          f"(objetivo < {OBJETIVO_ARRANQUE * 1000:.0f} ms {estado})")
+    print(f"   Intérprete y cierre (aprox.): {max(interprete, 0) * 1000:8.1f} ms")
+    print(f"   Importaciones de Vista.py:    {tiempos['importaciones'] * 1000:8.1f} ms")
+    print(f"   QApplication:                 {tiempos['qapplication'] * 1000:8.1f} ms")
+    print(f"   Menú construido y pintado:    {tiempos['menu_visible'] * 1000:8.1f} ms")
+
+    print("\nImportaciones de primer nivel al arrancar (-X importtime, acumulado):")
+    for modulo, ms in sorted(_leer_importtime(arranque), key=lambda m: -m[1])[:10]:
+        print(f"   {modulo:<28} {ms:8.1f} ms")
+
+    print("\nPrimera apertura de cada ventana (importación diferida + construcción):")
+    importados = dict(_leer_importtime(ventanas))
+    for clave, texto, modulo in VENTANAS:
+        print(f"   {texto:<16} {tiempos['ventanas'][clave] * 1000:8.1f} ms "
+              f"(importar {modulo}.py: {importados.get(modulo, 0.0):.1f} ms)")
+
+
+def main():
+    # Uso: python Vista.py             -> abre el menú principal
+    #      python Vista.py --tiempos    -> reporte de arranque en frío (sin pantalla: QT_QPA_PLATFORM=offscreen)
+    if '--tiempos' in sys.argv:
+        reporte_arranque()
+        return
+    if '--medir' in sys.argv:
+        _medir_arranque()
+        return
+    app = QApplication(sys.argv)
+    menu = MenuPrincipal()
+    menu.show()
+    menu.statusBar().showMessage(f"Listo en {(time.perf_counter() - _ARRANQUE) * 1000:.0f} ms", 5000)
+    app.exec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+from typing import Dict, Hashable, Iterator, List, Optional
+
+from IndiceDisponibilidad import IndiceDisponibilidad
+
+ESTADO_CANCELADA = "Cancelada"
+
+
+class AlmacenCitas:
+    """
+    Almacén de citas indexado.
+    Guarda las citas en un diccionario por id_cita y mantiene índices secundarios por doctor,
+    paciente y fecha, además del índice de disponibilidad de cada doctor.
+    Todas las altas, cancelaciones y modificaciones deben pasar por aquí para que los índices
+    se mantengan consistentes.
+    """
+    def __init__(self):
+        self._por_id: Dict[str, object] = {}
+        self._por_doctor: Dict[Hashable, Dict[str, object]] = {}
+        self._por_paciente: Dict[Hashable, Dict[str, object]] = {}
+        self._por_fecha: Dict[object, Dict[str, object]] = {}
+        self.disponibilidad = IndiceDisponibilidad()
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._por_id.values()))
+
+    def __contains__(self, id_cita) -> bool:
+        return id_cita in self._por_id
+
+    # ----------------------- Índices -----------------------
+
+    @staticmethod
+    def _fecha(cita):
+        return cita.hora_inicio.date() if hasattr(cita.hora_inicio, 'date') else cita.hora_inicio
+
+    def _indexar(self, cita):
+        self._por_id[cita.id_cita] = cita
+        self._por_doctor.setdefault(cita.doctor, {})[cita.id_cita] = cita
+        self._por_paciente.setdefault(cita.paciente, {})[cita.id_cita] = cita
+        self._por_fecha.setdefault(self._fecha(cita), {})[cita.id_cita] = cita
+
+    def _desindexar(self, cita):
+        del self._por_id[cita.id_cita]
+        for indice, clave in ((self._por_doctor, cita.doctor),
+                              (self._por_paciente, cita.paciente),
+                              (self._por_fecha, self._fecha(cita))):
+            grupo = indice[clave]
+            del grupo[cita.id_cita]
+            if not grupo:
+                del indice[clave]
+
+    # ----------------------- Consultas -----------------------
+
+    def obtener(self, id_cita: str):
+        """Devuelve la cita con ese ID o None"""
+        return self._por_id.get(id_cita)
+
+    def por_doctor(self, doctor) -> List:
+        return list(self._por_doctor.get(doctor, {}).values())
+
+    def por_paciente(self, paciente) -> List:
+        return list(self._por_paciente.get(paciente, {}).values())
+
+    def por_fecha(self, fecha) -> List:
+        return list(self._por_fecha.get(fecha, {}).values())
+
+    def esta_libre(self, doctor, hora_inicio, hora_fin) -> bool:
+        return self.disponibilidad.esta_libre(doctor, hora_inicio, hora_fin)
+
+    # ----------------------- Cambios -----------------------
+
+    def agregar(self, cita) -> bool:
+        """
+        Registra una cita nueva. Devuelve False si el doctor no está disponible.
+        Lanza ValueError si ya existe una cita con el mismo ID.
+        """
+        if cita.id_cita in self._por_id:
+            raise ValueError(f"Ya existe una cita con el ID {cita.id_cita}")
+        if cita.estado != ESTADO_CANCELADA:
+            if not self.disponibilidad.agregar(cita.doctor, cita.hora_inicio, cita.hora_fin, cita):
+                return False
+        self._indexar(cita)
+        return True
+
+    def cancelar(self, id_cita: str) -> Optional[object]:
+        """Marca la cita como cancelada y libera el horario del doctor"""
+        cita = self._por_id.get(id_cita)
+        if cita is None:
+            return None
+        if cita.estado != ESTADO_CANCELADA:
+            self.disponibilidad.cancelar(cita.doctor, cita.hora_inicio, cita)
+        cita.estado = ESTADO_CANCELADA
+        return cita
+
+    def modificar(self, cita, **cambios) -> bool:
+        """
+        Aplica cambios a una cita registrada (id_cita, paciente, doctor, hora_inicio, hora_fin,
+        estado u otros atributos) reindexándola. Devuelve False si el nuevo horario está ocupado.
+        """
+        nuevo_id = cambios.get('id_cita', cita.id_cita)
+        if nuevo_id != cita.id_cita and nuevo_id in self._por_id:
+            raise ValueError(f"Ya existe una cita con el ID {nuevo_id}")
+
+        doctor = cambios.get('doctor', cita.doctor)
+        hora_inicio = cambios.get('hora_inicio', cita.hora_inicio)
+        hora_fin = cambios.get('hora_fin', cita.hora_fin)
+        activa_antes = cita.estado != ESTADO_CANCELADA
+        activa_despues = cambios.get('estado', cita.estado) != ESTADO_CANCELADA
+
+        if activa_antes and activa_despues:
+            if not self.disponibilidad.reprogramar(cita.doctor, cita, cita.hora_inicio, cita.hora_fin,
+                                                   hora_inicio, hora_fin, doctor):
+                return False
+        elif activa_antes:
+            self.disponibilidad.cancelar(cita.doctor, cita.hora_inicio, cita)
+        elif activa_despues:
+            if not self.disponibilidad.agregar(doctor, hora_inicio, hora_fin, cita):
+                return False
+
+        self._desindexar(cita)
+        for atributo, valor in cambios.items():
+            setattr(cita, atributo, valor)
+        self._indexar(cita)
+        return True
+
+
+def main():
+    # Benchmark: búsqueda por ID con recorrido lineal vs. almacén indexado
+    import random
+    import time
+    from datetime import datetime, timedelta
+    from types import SimpleNamespace
+
+    random.seed(7)
+    base = datetime(2025, 1, 1, 8, 0)
+    for total in (10_000, 100_000, 1_000_000):
+        almacen = AlmacenCitas()
+        lista = []
+        for i in range(total):
+            # Cada doctor tiene su propia franja de 30 minutos, así que nunca chocan
+            inicio = base + timedelta(minutes=30 * (i // 50))
+            cita = SimpleNamespace(id_cita=f"C{i}", doctor=i % 50, paciente=i % 5000,
+                                   hora_inicio=inicio, hora_fin=inicio + timedelta(minutes=30),
+                                   estado="Pendiente")
+            lista.append(cita)
+            almacen.agregar(cita)
+
+        buscados = [f"C{random.randrange(total)}" for _ in range(200)]
+
+        inicio = time.perf_counter()
+        for id_cita in buscados:
+            next(c for c in lista if c.id_cita == id_cita)
+        lineal = (time.perf_counter() - inicio) / len(buscados)
+
+        inicio = time.perf_counter()
+        for id_cita in buscados:
+            almacen.obtener(id_cita)
+        indexado = (time.perf_counter() - inicio) / len(buscados)
+
+        print(f"{total:>9,} citas | lineal: {lineal * 1e6:10.1f} µs | indexado: {indexado * 1e6:6.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,181 +4,28 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QDateTime
 from PyQt6.QtGui import QFont
-from datetime import datetime
-from Doctor import Doctor  
-
-class Paciente:
-    def __init__(self, nombre, apellido):
-        self.nombre = nombre
-        self.apellido = apellido
-    def __str__(self):
-        return f"{self.nombre} {self.apellido}"
-
-class Cita:
-    """
-    Clase que representa una cita en la clínica dental.
-    Contiene información sobre el paciente, el doctor, el horario y el estado de la cita.
-    """
-    def __init__(self, id_cita: str, paciente, doctor, hora_inicio: datetime, hora_fin: datetime, costo_cita: float):
-        self.id_cita = id_cita                  # Identificador único de la cita
-        self.paciente = paciente                # Paciente asociado a la cita
-        self.doctor = doctor                    # Doctor asociado a la cita
-        self.hora_inicio = hora_inicio          # Fecha y hora de inicio de la cita
-        self.hora_fin = hora_fin                # Fecha y hora de fin de la cita
-        self.costo_cita = costo_cita            # Costo de la cita
-        self.estado = "Pendiente"               # Por defecto, la cita está pendiente
-
-    def __str__(self):
-        return (
-            f"ID Cita: {self.id_cita}\n"
-            f"Paciente: {self.paciente.nombre} {self.paciente.apellido}\n"
-            f"Doctor: {self.doctor.nombre} {self.doctor.apellido}\n"
-            f"Fecha y Hora Inicio: {self.hora_inicio.strftime('%d/%m/%Y %H:%M')}\n"
-            f"Fecha y Hora Fin: {self.hora_fin.strftime('%d/%m/%Y %H:%M')}\n"
-            f"Estado: {self.estado}\n"
-            f"Costo: ${self.costo_cita:.2f}\n"
-        )
+import os
+import sys
+from Tema import aplicar_tema
+from Entidades import Cita, Doctor, Paciente  # Clases sin PyQt6; importar Doctor.py cargaría toda DoctorWindow
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+from ControladorClinica import ControladorClinica, ErrorValidacion
 
 class CitaWindow(QMainWindow):
-    def __init__(self, doctores, pacientes, tratamientos):
+    def __init__(self, doctores, pacientes, tratamientos, controlador=None):
         super().__init__()
         self.setWindowTitle("Gestión de Citas - Clínica Dental")
         self.setGeometry(100, 100, 900, 700)
-        
-        # Color scheme 
-        self.colors = {
-            'primary': '#130760',      # Dark blue-purple 
-            'secondary': '#756f9f',    # Medium purple
-            'accent': '#10b8b9',       # Teal
-            'background': '#2b2b2b',   # Dark gray
-            'surface': '#3c3c3c',      # Slightly lighter gray
-            'text_light': '#ffffff',   # White text
-            'text_dark': '#e0e0e0'     # Light gray text
-        }
-
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background-color: {self.colors['background']};
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                color: {self.colors['text_light']};
-            }}
-            
-            QLabel {{
-                color: {self.colors['text_light']};
-                font-family: 'Segoe UI';
-                font-size: 14px;
-            }}
-            
-            QGroupBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                margin: 10px 0px;
-                padding-top: 15px;
-                background-color: {self.colors['surface']};
-            }}
-            
-            QGroupBox::title {{
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 8px 0 8px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['accent']};
-            }}
-            
-            QLineEdit, QSpinBox, QDoubleSpinBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 6px;
-                padding: 10px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                selection-background-color: {self.colors['accent']};
-            }}
-            
-            QLineEdit:focus, QSpinBox:focus, QDoubleSpinBox:focus {{
-                border-color: {self.colors['accent']};
-                background-color: #404040;
-            }}
-            
-            QPushButton {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: {self.colors['text_light']};
-                background-color: {self.colors['secondary']};
-                border: none;
-                border-radius: 8px;
-                padding: 12px 20px;
-                margin: 4px;
-            }}
-            
-            QPushButton:hover {{
-                background-color: {self.colors['accent']};
-                
-            }}
-            
-            QPushButton:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QTextEdit {{
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 13px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_dark']};
-                padding: 15px;
-                selection-background-color: {self.colors['accent']};
-            }}
-            
-            QTextEdit:focus {{
-                border-color: {self.colors['accent']};
-            }}
-            
-            QComboBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 6px;
-                padding: 10px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                selection-background-color: {self.colors['accent']};
-            }}
-
-            QComboBox:focus {{
-                border-color: {self.colors['accent']};
-                background-color: #404040;
-            }}
-            
-            QDateTimeEdit {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 6px;
-                padding: 10px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                selection-background-color: {self.colors['accent']};
-            }}
-            QDateTimeEdit:focus {{
-                border-color: {self.colors['accent']};
-                background-color: #404040;
-            }}
-        """)
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
 
         self.doctores = doctores
         self.pacientes = pacientes
         self.tratamientos = tratamientos
-        self.citas = []
+        # Las reglas y las citas (AlmacenCitas) las guarda el controlador; la ventana solo lee y muestra
+        self.controlador = controlador or ControladorClinica()
+        self.citas = self.controlador.citas
 
         self.editando_cita = None
 
@@ -196,16 +43,7 @@ class CitaWindow(QMainWindow):
         title = QLabel("🏥 Sistema de Gestión de Citas")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setFont(QFont("Segoe UI", 16, QFont.Weight.Bold))
-        title.setStyleSheet(f"""
-            QLabel {{
-                color: {self.colors['text_light']};
-                background-color: {self.colors['surface']};
-                border: 3px solid {self.colors['accent']};
-                border-radius: 12px;
-                padding: 20px;
-                margin: 10px;
-            }}
-        """)
+        title.setObjectName("titulo")
         main_layout.addWidget(title)
 
         # Información de la cita
@@ -272,7 +110,7 @@ class CitaWindow(QMainWindow):
 
         resultado_label = QLabel("📊 Resultados:")
         resultado_label.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
-        resultado_label.setStyleSheet(f"color: {self.colors['accent']};")
+        resultado_label.setObjectName("etiquetaResultados")
         main_layout.addWidget(resultado_label)
         
         self.resultado_text = QTextEdit()
@@ -284,80 +122,7 @@ class CitaWindow(QMainWindow):
         self.resultado_text.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.resultado_text.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
-        # Estilo mejorado para el área de texto y scroll bars
-        self.resultado_text.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                padding: 15px;
-            }}
-            
-            QScrollBar:vertical {{
-                background-color: #3c3c3c;
-                width: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }}
-            
-            QScrollBar::handle:vertical {{
-                background-color: {self.colors['secondary']};
-                border-radius: 6px;
-                min-height: 20px;
-                margin: 2px;
-            }}
-            
-            QScrollBar::handle:vertical:hover {{
-                background-color: {self.colors['accent']};
-            }}
-            
-            QScrollBar::handle:vertical:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                border: none;
-                background: none;
-                height: 0px;
-            }}
-            
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{
-                background: none;
-            }}
-            
-            QScrollBar:horizontal {{
-                background-color: #3c3c3c;
-                height: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }}
-            
-            QScrollBar::handle:horizontal {{
-                background-color: {self.colors['secondary']};
-                border-radius: 6px;
-                min-width: 20px;
-                margin: 2px;
-            }}
-            
-            QScrollBar::handle:horizontal:hover {{
-                background-color: {self.colors['accent']};
-            }}
-            
-            QScrollBar::handle:horizontal:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
-                border: none;
-                background: none;
-                width: 0px;
-            }}
-            
-            QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {{
-                background: none;
-            }}
-        """)
+        self.resultado_text.setObjectName("resultados")  # Estilo del área y sus scroll bars en Tema.py
         
         # Configurar el comportamiento del scroll
         self.resultado_text.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
@@ -383,26 +148,33 @@ class CitaWindow(QMainWindow):
         costo = self.costo_edit.text().strip()
         estado = self.estado_combo.currentText()
 
-        if not id_cita or paciente_idx == -1 or doctor_idx == -1 or tratamiento_idx == -1 or not costo:
+        if paciente_idx == -1 or doctor_idx == -1 or tratamiento_idx == -1:
             QMessageBox.warning(self, "❌ Error", "Todos los campos son obligatorios.")
             return
 
-        # Verificar disponibilidad del doctor
         doctor = self.doctores[doctor_idx]
-        for cita in self.citas:
-            if cita.doctor == doctor and not (hora_fin <= cita.hora_inicio or hora_inicio >= cita.hora_fin):
-                QMessageBox.warning(self, "❌ Error", "El doctor no está disponible en ese horario.")
-                return
-
         paciente = self.pacientes[paciente_idx]
         tratamiento = self.tratamientos[tratamiento_idx]
-        nueva_cita = Cita(id_cita, paciente, doctor, hora_inicio, hora_fin, float(costo))
-        nueva_cita.tratamiento = tratamiento  
-        nueva_cita.estado = estado
 
-        self.citas.append(nueva_cita)
-        self.resultado_text.append(f"Cita creada:\n{nueva_cita}")
-        QMessageBox.information(self, "✅ Éxito", "Cita creada exitosamente.")
+        try:
+            # Si venimos de "Modificar Cita" se reprograma la cita existente
+            if self.editando_cita is not None:
+                cita = self.controlador.modificar_cita(self.editando_cita, id_cita, paciente, doctor,
+                                                       hora_inicio, hora_fin, costo, estado, tratamiento)
+            else:
+                cita = self.controlador.crear_cita(id_cita, paciente, doctor, hora_inicio, hora_fin,
+                                                   costo, estado, tratamiento)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
+            return
+
+        if self.editando_cita is not None:
+            self.editando_cita = None
+            self.resultado_text.append(f"Cita modificada:\n{cita}")
+            QMessageBox.information(self, "✅ Éxito", "Cita modificada exitosamente.")
+        else:
+            self.resultado_text.append(f"Cita creada:\n{cita}")
+            QMessageBox.information(self, "✅ Éxito", "Cita creada exitosamente.")
         self.limpiar_campos()
 
     def cancelar_cita(self):
@@ -411,13 +183,13 @@ class CitaWindow(QMainWindow):
         id_cita, ok = QInputDialog.getText(self, "Cancelar Cita", "Ingrese el ID de la cita a cancelar:")
         if not ok or not id_cita.strip():
             return
-        for cita in self.citas:
-            if cita.id_cita == id_cita.strip():
-                cita.estado = "Cancelada"
-                self.resultado_text.append(f"Cita cancelada:\n{cita}")
-                QMessageBox.information(self, "✅ Éxito", "Cita cancelada exitosamente.")
-                return
-        QMessageBox.warning(self, "❌ Error", "No se encontró la cita.")
+        try:
+            cita = self.controlador.cancelar_cita(id_cita)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
+            return
+        self.resultado_text.append(f"Cita cancelada:\n{cita}")
+        QMessageBox.information(self, "✅ Éxito", "Cita cancelada exitosamente.")
 
     def modificar_cita(self):
         """Permite modificar fecha y hora de una cita"""
@@ -425,17 +197,24 @@ class CitaWindow(QMainWindow):
         id_cita, ok = QInputDialog.getText(self, "Modificar Cita", "Ingrese el ID de la cita a modificar:")
         if not ok or not id_cita.strip():
             return
-        for cita in self.citas:
-            if cita.id_cita == id_cita.strip():
-                # Cargar datos actuales
-                self.id_edit.setText(cita.id_cita)
-                self.fecha_inicio_edit.setDateTime(QDateTime(cita.hora_inicio))
-                self.fecha_fin_edit.setDateTime(QDateTime(cita.hora_fin))
-                # El usuario puede modificar y luego presionar "Crear Cita" para guardar cambios
-                self.editando_cita = cita
-                QMessageBox.information(self, "Modificar Cita", "Modifique los campos y presione 'Crear Cita' para guardar cambios.")
-                return
-        QMessageBox.warning(self, "❌ Error", "No se encontró la cita.")
+        try:
+            cita = self.controlador.obtener_cita(id_cita)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
+            return
+        # Cargar datos actuales
+        self.id_edit.setText(cita.id_cita)
+        self.fecha_inicio_edit.setDateTime(QDateTime(cita.hora_inicio))
+        self.fecha_fin_edit.setDateTime(QDateTime(cita.hora_fin))
+        self.costo_edit.setText(f"{cita.costo_cita:.2f}")
+        self.estado_combo.setCurrentText(cita.estado)
+        if cita.doctor in self.doctores:
+            self.doctor_combo.setCurrentIndex(self.doctores.index(cita.doctor))
+        if cita.paciente in self.pacientes:
+            self.paciente_combo.setCurrentIndex(self.pacientes.index(cita.paciente))
+        # El usuario puede modificar y luego presionar "Crear Cita" para guardar cambios
+        self.editando_cita = cita
+        QMessageBox.information(self, "Modificar Cita", "Modifique los campos y presione 'Crear Cita' para guardar cambios.")
 
     def confirmar_asistencia(self):
         """Confirma si se asistió a la cita"""
@@ -443,13 +222,13 @@ class CitaWindow(QMainWindow):
         id_cita, ok = QInputDialog.getText(self, "Confirmar Asistencia", "Ingrese el ID de la cita:")
         if not ok or not id_cita.strip():
             return
-        for cita in self.citas:
-            if cita.id_cita == id_cita.strip():
-                cita.estado = "Asistida"
-                self.resultado_text.append(f"Asistencia confirmada:\n{cita}")
-                QMessageBox.information(self, "✅ Éxito", "Asistencia confirmada.")
-                return
-        QMessageBox.warning(self, "❌ Error", "No se encontró la cita.")
+        try:
+            cita = self.controlador.confirmar_asistencia(id_cita)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
+            return
+        self.resultado_text.append(f"Asistencia confirmada:\n{cita}")
+        QMessageBox.information(self, "✅ Éxito", "Asistencia confirmada.")
 
     def calcular_monto(self):
         """Calcula el monto a pagar según el tipo de consulta y tratamiento"""
@@ -457,20 +236,18 @@ class CitaWindow(QMainWindow):
         id_cita, ok = QInputDialog.getText(self, "Calcular Monto", "Ingrese el ID de la cita:")
         if not ok or not id_cita.strip():
             return
-        for cita in self.citas:
-            if cita.id_cita == id_cita.strip():
-                costo_cita = cita.costo_cita
-                costo_tratamiento = getattr(cita, 'tratamiento', {}).get('costo', 0)
-                total = costo_cita + costo_tratamiento
-                self.resultado_text.append(
-                    f"Monto a pagar para la cita {cita.id_cita}:\n"
-                    f"Consulta: ${costo_cita:.2f}\n"
-                    f"Tratamiento: ${costo_tratamiento:.2f}\n"
-                    f"Total: ${total:.2f}\n"
-                )
-                QMessageBox.information(self, "Monto a Pagar", f"Total a pagar: ${total:.2f}")
-                return
-        QMessageBox.warning(self, "❌ Error", "No se encontró la cita.")
+        try:
+            costo_cita, costo_tratamiento, total = self.controlador.monto_cita(id_cita)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
+            return
+        self.resultado_text.append(
+            f"Monto a pagar para la cita {id_cita.strip()}:\n"
+            f"Consulta: ${costo_cita:.2f}\n"
+            f"Tratamiento: ${costo_tratamiento:.2f}\n"
+            f"Total: ${total:.2f}\n"
+        )
+        QMessageBox.information(self, "Monto a Pagar", f"Total a pagar: ${total:.2f}")
 
     def limpiar_campos(self):
         self.id_edit.clear()
@@ -5,23 +5,19 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout,      QHBoxL
                              QScrollArea, QScrollBar, QInputDialog)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from datetime import datetime
+import os
+import sys
 from typing import List
-import re
+import Entidades as entidades
+from Entidades import Horario
+from Horario import Doctor as DoctorHorario  # Identifica al doctor por DUI en el índice de horarios
+from ValidacionPacientes import validar_correo, validar_dui, validar_telefono
+from TablaVirtual import TablaVirtual, FuenteLista, Columna
+from Tareas import obtener_ejecutor
+from Tema import aplicar_tema
 
-# Clase temporal para representar el horario de atención del doctor
-class Horario:
-    """
-    Clase que representa un horario de atención del doctor.
-    Contiene información sobre el día de la semana y el rango de horas.
-    """
-    def __init__(self, dia: str, hora_inicio: datetime, hora_fin: datetime):
-        self.dia = dia
-        self.hora_inicio = hora_inicio
-        self.hora_fin = hora_fin
-
-    def __str__(self):
-        return f"Horario{{dia='{self.dia}', hora_inicio={self.hora_inicio}, hora_fin={self.hora_fin}}}"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+from ControladorClinica import ControladorClinica, ErrorValidacion
 
 class AgregarHorarioDialog(QDialog):
     """
@@ -33,52 +29,8 @@ class AgregarHorarioDialog(QDialog):
         self.setWindowTitle("⌚ Agregar Horario")        
         self.setModal(True)
         self.resize(450, 350)
-               
-        self.setStyleSheet(f"""
-            QDialog {{
-                background-color: #2b2b2b;
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                color: #ffffff;
-            }}
-            
-            QLabel {{
-                color: #ffffff;
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-            }}
-            
-            QLineEdit, QTextEdit, QDoubleSpinBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid #756f9f;
-                border-radius: 6px;
-                padding: 8px;
-                background-color: #3c3c3c;
-                color: #ffffff;
-            }}
-            
-            QLineEdit:focus, QTextEdit:focus, QDoubleSpinBox:focus {{
-                border-color: #10b8b9;
-                background-color: #404040;
-            }}
-            
-            QPushButton {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #756f9f;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 15px;
-            }}
-            
-            QPushButton:hover {{
-                background-color: #10b8b9;
-            }}
-        """)
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
 
         self.dia_edit = QLineEdit(self)
         self.dia_edit.setPlaceholderText("Día de la semana (ej. Lunes)")
@@ -112,133 +64,42 @@ class AgregarHorarioDialog(QDialog):
         
         return dia, hora_inicio, hora_fin
 
-class Doctor:
-    def __init__(self, nombre, apellido, dui, especialidad, telefono, correo):
-        self.nombre = nombre
-        self.apellido = apellido
-        self.dui = dui
-        self.especialidad = especialidad
-        self.telefono = telefono
-        self.correo = correo
-        self.citas: List["Cita"] = [] 
-        self.horario = []
-
-    def __str__(self):
-        return f"{self.nombre} {self.apellido} ({self.especialidad})"
-
-    def mostrar_citas(self, resultado_text):
-        """Muestra todas las citas asociadas a este doctor en el QTextEdit resultado_text."""
+class Doctor(entidades.Doctor):
+    """El modelo (sin PyQt6) está en Entidades.py; aquí solo se agrega cómo se muestra en la ventana"""
+    def mostrar_citas(self, tabla: TablaVirtual) -> bool:
+        """Muestra todas las citas asociadas a este doctor en la tabla; devuelve False si no tiene citas."""
         if not self.citas:
-            resultado_text.append(f"No hay citas registradas para el Dr. {self.nombre} {self.apellido}.")
-            return
-        resultado_text.append(f"Citas del Dr. {self.nombre} {self.apellido}:")
-        for cita in self.citas:
-            resultado_text.append(str(cita))
-        resultado_text.append("")
+            tabla.hide()
+            return False
+        tabla.mostrar(FuenteLista(self.citas, COLUMNAS_CITAS))
+        tabla.show()
+        return True
+
+# Columnas de los listados de doctores (diccionarios de DoctorWindow) y de citas
+COLUMNAS_DOCTORES = [
+    Columna("DUI", lambda d: d['dui']),
+    Columna("Nombre", lambda d: f"Dr. {d['nombre']} {d['apellido']}"),
+    Columna("Especialidad", lambda d: d['especialidad']),
+    Columna("Teléfono", lambda d: d['telefono']),
+    Columna("Correo", lambda d: d['correo']),
+]
+
+COLUMNAS_CITAS = [
+    Columna("ID", lambda c: c.id_cita),
+    Columna("Paciente", lambda c: c.paciente),
+    Columna("Inicio", lambda c: c.hora_inicio),
+    Columna("Fin", lambda c: c.hora_fin),
+    Columna("Costo ($)", lambda c: c.costo_cita),
+    Columna("Estado", lambda c: c.estado),
+]
 
 class DoctorWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, controlador=None):
         super().__init__()
         self.setWindowTitle("Gestión de Doctores - Clínica Dental")
         self.setGeometry(100, 100, 800, 600)
 
-        # Color scheme 
-        self.colors = {
-            'primary': '#130760',      # Dark blue-purple 
-            'secondary': '#756f9f',    # Medium purple
-            'accent': '#10b8b9',       # Teal
-            'background': '#2b2b2b',   # Dark gray
-            'surface': '#3c3c3c',      # Slightly lighter gray
-            'text_light': '#ffffff',   # White text
-            'text_dark': '#e0e0e0'     # Light gray text
-        }
-
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background-color: {self.colors['background']};
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                color: {self.colors['text_light']};
-            }}
-            
-            QLabel {{
-                color: {self.colors['text_light']};
-                font-family: 'Segoe UI';
-                font-size: 14px;
-            }}
-            
-            QGroupBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                margin: 10px 0px;
-                padding-top: 15px;
-                background-color: {self.colors['surface']};
-            }}
-            
-            QGroupBox::title {{
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 8px 0 8px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['accent']};
-            }}
-            
-            QLineEdit, QSpinBox, QDoubleSpinBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 6px;
-                padding: 10px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                selection-background-color: {self.colors['accent']};
-            }}
-            
-            QLineEdit:focus, QSpinBox:focus, QDoubleSpinBox:focus {{
-                border-color: {self.colors['accent']};
-                background-color: #404040;
-            }}
-            
-            QPushButton {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: {self.colors['text_light']};
-                background-color: {self.colors['secondary']};
-                border: none;
-                border-radius: 8px;
-                padding: 12px 20px;
-                margin: 4px;
-            }}
-            
-            QPushButton:hover {{
-                background-color: {self.colors['accent']};
-                
-            }}
-            
-            QPushButton:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QTextEdit {{
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 13px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_dark']};
-                padding: 15px;
-                selection-background-color: {self.colors['accent']};
-            }}
-            
-            QTextEdit:focus {{
-                border-color: {self.colors['accent']};
-            }}
-        """)
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
 
         self.dui = 0
         self.nombre = ""
@@ -249,8 +110,10 @@ class DoctorWindow(QMainWindow):
         self.citas: List["Cita"] = []  # Lista de citas asociadas al doctor
         self.horario: List[Horario] = [] # Lista de horarios del doctor
 
-        # Almacenamos los dotores en una lista
-        self.doctores = []
+        # Los doctores (indexados por DUI y correo) y sus reglas los guarda el controlador
+        self.controlador = controlador or ControladorClinica()
+        self.doctores = self.controlador.doctores
+        self.tareas = obtener_ejecutor()  # Listados en segundo plano
         
         self.editando_doctor = None  # Variable que ocuparemos para actulizar campos de la informacion del doctor
 
@@ -275,16 +138,7 @@ class DoctorWindow(QMainWindow):
         title = QLabel("🏥 Sistema de Gestión de Doctor")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setFont(QFont("Segoe UI", 16, QFont.Weight.Bold))
-        title.setStyleSheet(f"""
-            QLabel {{
-                color: {self.colors['text_light']};
-                background-color: {self.colors['surface']};
-                border: 3px solid {self.colors['accent']};
-                border-radius: 12px;
-                padding: 20px;
-                margin: 10px;
-            }}
-        """)
+        title.setObjectName("titulo")
         main_layout.addWidget(title)
         
         # Información del paciente
@@ -319,15 +173,7 @@ class DoctorWindow(QMainWindow):
         
         self.crear_btn = QPushButton("👤 Crear Doctor")
         self.crear_btn.clicked.connect(self.crear_doctor)
-        self.crear_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {self.colors['accent']};
-                min-height: 45px;
-            }}
-            QPushButton:hover {{
-                background-color: {self.colors['secondary']};
-            }}
-        """)
+        self.crear_btn.setObjectName("botonPrincipal")
         
         self.agregar_horario_btn = QPushButton("🩺 Agregar Horario")
         self.agregar_horario_btn.clicked.connect(self.agregar_horario)
@@ -377,7 +223,7 @@ class DoctorWindow(QMainWindow):
         # Área de resultados con estilo mejorado y scroll bar
         resultado_label = QLabel("📊 Resultados:")
         resultado_label.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
-        resultado_label.setStyleSheet(f"color: {self.colors['accent']};")
+        resultado_label.setObjectName("etiquetaResultados")
         main_layout.addWidget(resultado_label)
         
         self.resultado_text = QTextEdit()
@@ -389,100 +235,31 @@ class DoctorWindow(QMainWindow):
         self.resultado_text.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.resultado_text.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
-        # Estilo mejorado para el área de texto y scroll bars
-        self.resultado_text.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                padding: 15px;
-            }}
-            
-            QScrollBar:vertical {{
-                background-color: #3c3c3c;
-                width: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }}
-            
-            QScrollBar::handle:vertical {{
-                background-color: {self.colors['secondary']};
-                border-radius: 6px;
-                min-height: 20px;
-                margin: 2px;
-            }}
-            
-            QScrollBar::handle:vertical:hover {{
-                background-color: {self.colors['accent']};
-            }}
-            
-            QScrollBar::handle:vertical:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                border: none;
-                background: none;
-                height: 0px;
-            }}
-            
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{
-                background: none;
-            }}
-            
-            QScrollBar:horizontal {{
-                background-color: #3c3c3c;
-                height: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }}
-            
-            QScrollBar::handle:horizontal {{
-                background-color: {self.colors['secondary']};
-                border-radius: 6px;
-                min-width: 20px;
-                margin: 2px;
-            }}
-            
-            QScrollBar::handle:horizontal:hover {{
-                background-color: {self.colors['accent']};
-            }}
-            
-            QScrollBar::handle:horizontal:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
-                border: none;
-                background: none;
-                width: 0px;
-            }}
-            
-            QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {{
-                background: none;
-            }}
-        """)
+        self.resultado_text.setObjectName("resultados")  # Estilo del área y sus scroll bars en Tema.py
         
         # Configurar el comportamiento del scroll
         self.resultado_text.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
         self.resultado_text.setMinimumHeight(200)
         
         main_layout.addWidget(self.resultado_text)
+        
+        # Tabla para los listados (doctores y citas); solo arma las filas visibles
+        self.tabla_resultados = TablaVirtual()
+        self.tabla_resultados.setMinimumHeight(250)
+        self.tabla_resultados.hide()
+        main_layout.addWidget(self.tabla_resultados)
     
     def validar_email(self, email: str) -> bool:
         """Valida el formato del email"""
-        patron = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(patron, email) is not None
+        return validar_correo(email)
     
     def validar_dui(self, dui: str) -> bool:
         """Valida el formato del DUI (########-#)"""
-        patron = r'^\d{8}-\d{1}$'
-        return re.match(patron, dui) is not None
+        return validar_dui(dui)
     
     def validar_telefono(self, telefono: str) -> bool:
         """Valida que el teléfono tenga al menos 8 dígitos"""
-        return telefono.isdigit() and len(telefono) >= 8
+        return validar_telefono(telefono)
     
     def limpiar_campos(self):
         """Limpia todos los campos de entrada para agregar un nuevo paciente"""
@@ -500,60 +277,18 @@ class DoctorWindow(QMainWindow):
         """Crea un nuevo paciente con los datos ingresados"""
         try:
             self.resultado_text.clear()  # Limpia el área de resultados antes de mostrar nuevos datos
+            self.tabla_resultados.hide()
 
-            nombre = self.nombre_edit.text().strip().title()
-            apellido = self.apellido_edit.text().strip().title()
-            especialidad = self.especialidad_edit.text().strip().title()
-            dui = self.dui_edit.text().strip()
-            telefono_str = self.telefono_edit.text().strip()
-            correo = self.correo_edit.text().strip().lower()
-            
-            # Validaciones básicas
-            if not all([nombre, apellido, dui, especialidad]):
-                QMessageBox.warning(self, "❌ Error", "Nombre, Apellido, DUI y Especialidad son campos obligatorios")
-                return
-            
-            # Validación DUI
-            if not self.validar_dui(dui):
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El DUI debe tener el formato: 12345678-9")
-                return
-            
-            # Verificar si ya existe un paciente con el mismo DUI
-            for doctor in self.doctores:
-                if doctor['dui'] == dui:
-                    QMessageBox.warning(self, "❌ Error", 
-                                      f"Ya existe un doctor registrado con el DUI: {dui}")
-                    return
-            
-            # Validación teléfono
-            if telefono_str and not self.validar_telefono(telefono_str):
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El teléfono debe contener al menos 8 dígitos")
-                return
-            
-            telefono = int(telefono_str) if telefono_str else 0
-            
-            # Validación email
-            if correo and not self.validar_email(correo):
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El email no tiene un formato válido")
+            try:
+                nuevo_doctor = self.controlador.crear_doctor(
+                    self.nombre_edit.text(), self.apellido_edit.text(), self.dui_edit.text(),
+                    self.especialidad_edit.text(), self.telefono_edit.text(), self.correo_edit.text())
+            except ErrorValidacion as e:
+                QMessageBox.warning(self, e.titulo, str(e))
                 return
-               
-            # Crear datos del nuevo paciente
-            nuevo_doctor = {
-                'nombre': nombre,
-                'apellido': apellido,
-                'dui': dui,
-                'especialidad': especialidad,
-                'telefono': telefono,
-                'correo': correo,
-                'citas': [],
-                'fecha_registro': datetime.now().strftime('%d/%m/%Y - %H:%M:%S')
-            }
-            
-            # Agregar a la lista de pacientes registrados
-            self.doctores.append(nuevo_doctor)
+            nombre, apellido = nuevo_doctor['nombre'], nuevo_doctor['apellido']
+            especialidad, dui = nuevo_doctor['especialidad'], nuevo_doctor['dui']
+            telefono, correo = nuevo_doctor['telefono'], nuevo_doctor['correo']
             
             # Establecer como paciente actual
             self.nombre = nombre
@@ -589,53 +324,41 @@ class DoctorWindow(QMainWindow):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             dia, hora_inicio, hora_fin = dialog.get_horario()
             
-            # Validar que se ingresaron todos los campos
-            if not all([dia, hora_inicio, hora_fin]):
-                QMessageBox.warning(self, "❌ Error", "Todos los campos son obligatorios")
-                return
-            
-            # Validar formato de horas
+            # El controlador valida los campos, convierte las horas a minutos una sola vez y rechaza
+            # traslapes con el índice de horarios (el mismo camino que HorarioWindow)
+            doctor = DoctorHorario(self.dui, f"Dr. {self.nombre} {self.apellido}", self.especialidad)
             try:
-                hora_inicio_dt = datetime.strptime(hora_inicio, "%H:%M")
-                hora_fin_dt = datetime.strptime(hora_fin, "%H:%M")
-            except ValueError:
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El formato de hora debe ser HH:MM (24 horas)")
+                nuevo_horario = self.controlador.agregar_horario(
+                    self.controlador.nuevo_id_horario(self.dui), dia, hora_inicio, hora_fin, doctor)
+            except ErrorValidacion as e:
+                QMessageBox.warning(self, e.titulo, str(e))
                 return
-            
-            # Verificar que la hora de inicio sea antes de la hora de fin
-            if hora_inicio_dt >= hora_fin_dt:
-                QMessageBox.warning(self, "❌ Error", 
-                                  "La hora de inicio debe ser anterior a la hora de fin")
-                return
-            
-            # Crear el horario y agregarlo a la lista
-            nuevo_horario = Horario(dia, hora_inicio_dt, hora_fin_dt)
             self.horario.append(nuevo_horario)
             
             # Actualizar también en la lista de doctores registrados
-            for doctor in self.doctores:
-                if doctor['dui'] == self.dui:
-                    doctor['horario'].append(nuevo_horario)
-                    break
+            doctor = self.doctores.obtener(self.dui)
+            if doctor is not None:
+                doctor['horario'].append(nuevo_horario)
             
             QMessageBox.information(self, "✅ Éxito", 
                                   f"Horario agregado exitosamente para {self.nombre} {self.apellido}")
 
     def mostrar_info_doctor(self):
-        """ Muestra un diálogo con la información de todos los doctores registrados """
+        """ Muestra el listado de todos los doctores registrados """
         self.resultado_text.clear()  # Limpia el área de resultados antes de mostrar nuevos datos
 
         if not self.doctores:
+            self.tabla_resultados.hide()
             QMessageBox.information(self, "ℹ️ Información", "No hay doctores registrados")
             return
     
-        for doctor in self.doctores:
-            self.resultado_text.append(f"""- DUI: {doctor['dui']}
-Dr. {doctor['nombre']} {doctor['apellido']}
-Especialidad: {doctor['especialidad']}
-Teléfono: {doctor['telefono']}
-Correo: {doctor['correo']}\n""")
+        # El texto de búsqueda de la tabla se arma en segundo plano
+        self.resultado_text.setPlainText("⏳ Preparando listado de doctores...")
+        titulo = f"Doctores registrados: {len(self.doctores)}"
+        self.tareas.enviar(lambda doctores: FuenteLista(doctores, COLUMNAS_DOCTORES).preparar_busqueda(),
+                           list(self.doctores), nombre="listado_doctores",
+                           al_terminar=lambda fuente: self._mostrar_listado(titulo, fuente),
+                           al_fallar=self._error_listado)
             
     def suprimir_doctor(self):
         """
@@ -643,6 +366,7 @@ Correo: {doctor['correo']}\n""")
         Si no se encuentra el doctor, muestra un mensaje de error.
         """
         self.resultado_text.clear()
+        self.tabla_resultados.hide()
 
         if not self.doctores:
             QMessageBox.information(self, "ℹ️ Información", "No hay doctores registrados")
@@ -653,14 +377,14 @@ Correo: {doctor['correo']}\n""")
             return
 
         dui_a_eliminar = dui_a_eliminar.strip()
-        for doctor in self.doctores:
-            if doctor['dui'] == dui_a_eliminar:
-                self.doctores.remove(doctor)
-                QMessageBox.information(self, "✅ Éxito", f"Doctor con DUI {dui_a_eliminar} eliminado correctamente.")
-                self.resultado_text.append(f"Doctor eliminado: {doctor['nombre']} {doctor['apellido']} (DUI: {dui_a_eliminar})\n")
-                return
+        try:
+            doctor = self.controlador.eliminar_doctor(dui_a_eliminar)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
+            return
 
-        QMessageBox.warning(self, "❌ Error", f"No se encontró ningún doctor con el DUI: {dui_a_eliminar}")
+        QMessageBox.information(self, "✅ Éxito", f"Doctor con DUI {dui_a_eliminar} eliminado correctamente.")
+        self.resultado_text.append(f"Doctor eliminado: {doctor['nombre']} {doctor['apellido']} (DUI: {dui_a_eliminar})\n")
             
 
     def actualizar_info_doctor(self):
@@ -669,6 +393,7 @@ Correo: {doctor['correo']}\n""")
         Si ya estamos editando, guarda los cambios realizados.
         """
         self.resultado_text.clear()
+        self.tabla_resultados.hide()
 
         if not self.doctores:
             QMessageBox.information(self, "ℹ️ Información", "No hay doctores registrados")
@@ -676,12 +401,17 @@ Correo: {doctor['correo']}\n""")
 
         # Si ya estamos editando, guardar los cambios
         if self.editando_doctor is not None:
-            doctor = self.editando_doctor
-            doctor['nombre'] = self.nombre_edit.text().strip().title()
-            doctor['apellido'] = self.apellido_edit.text().strip().title()
-            doctor['especialidad'] = self.especialidad_edit.text().strip().title()
-            doctor['telefono'] = int(self.telefono_edit.text().strip()) if self.telefono_edit.text().strip().isdigit() else 0
-            doctor['correo'] = self.correo_edit.text().strip().lower()
+            try:
+                doctor = self.controlador.actualizar_doctor(
+                    self.editando_doctor['dui'], self.nombre_edit.text(), self.apellido_edit.text(),
+                    self.especialidad_edit.text(), self.telefono_edit.text(), self.correo_edit.text())
+            except ErrorValidacion as e:
+                QMessageBox.warning(self, e.titulo, str(e))
+                if self.editando_doctor['dui'] not in self.doctores:
+                    # El doctor ya no está registrado: se sale del modo edición
+                    self.dui_edit.setReadOnly(False)
+                    self.editando_doctor = None
+                return
 
             QMessageBox.information(self, "✅ Éxito", "Información del doctor actualizada correctamente.")
             self.resultado_text.append(
@@ -704,46 +434,62 @@ Correo: {doctor['correo']}\n""")
             return
 
         dui_a_buscar = dui_a_buscar.strip()
-        for doctor in self.doctores:
-            if doctor['dui'] == dui_a_buscar:
-                # Llenar los campos con los datos encontrados
-                self.dui_edit.setText(doctor['dui'])
-                self.nombre_edit.setText(doctor['nombre'])
-                self.apellido_edit.setText(doctor['apellido'])
-                self.especialidad_edit.setText(doctor['especialidad'])
-                self.telefono_edit.setText(str(doctor['telefono']))
-                self.correo_edit.setText(doctor['correo'])
-                self.dui_edit.setReadOnly(True)  # No permitir editar el DUI
-
-                self.editando_doctor = doctor  # Guardamos referencia para editar después
-
-                QMessageBox.information(self, "Editar Doctor", 
-                    "Modifique los campos que desee y presione nuevamente 'Actualizar Info Doctor' para guardar los cambios.")
-                return
+        doctor = self.doctores.obtener(dui_a_buscar)
+        if doctor is None:
+            QMessageBox.warning(self, "❌ Error", f"No se encontró ningún doctor con el DUI: {dui_a_buscar}")
+            return
+
+        # Llenar los campos con los datos encontrados
+        self.dui_edit.setText(doctor['dui'])
+        self.nombre_edit.setText(doctor['nombre'])
+        self.apellido_edit.setText(doctor['apellido'])
+        self.especialidad_edit.setText(doctor['especialidad'])
+        self.telefono_edit.setText(str(doctor['telefono']))
+        self.correo_edit.setText(doctor['correo'])
+        self.dui_edit.setReadOnly(True)  # No permitir editar el DUI
+
+        self.editando_doctor = doctor  # Guardamos referencia para editar después
 
-        QMessageBox.warning(self, "❌ Error", f"No se encontró ningún doctor con el DUI: {dui_a_buscar}")
+        QMessageBox.information(self, "Editar Doctor", 
+            "Modifique los campos que desee y presione nuevamente 'Actualizar Info Doctor' para guardar los cambios.")
 
     # Por el momento, no encontrara ninguna cita para el doctor, una vez se haya hecho la conexion con la base de datos será más fácil
     def ver_citas(self):
         self.resultado_text.clear()
+        self.tabla_resultados.hide()
         # Pide el DUI del doctor a consultar
         dui, ok = QInputDialog.getText(self, "Ver Citas", "Ingrese el DUI del doctor:")
         if not ok or not dui.strip():
             return
-        for doctor in self.doctores:
-            if doctor['dui'] == dui.strip():
-                if not doctor.get('citas'):
-                    self.resultado_text.append("No hay citas registradas para este doctor.")
-                    return
-                self.resultado_text.append(f"Citas del Dr. {doctor['nombre']} {doctor['apellido']}:")
-                for cita in doctor['citas']:
-                    self.resultado_text.append(str(cita))
-                return
-        QMessageBox.warning(self, "❌ Error", "No se encontró el doctor con ese DUI.")
+        doctor = self.doctores.obtener(dui.strip())
+        if doctor is None:
+            QMessageBox.warning(self, "❌ Error", "No se encontró el doctor con ese DUI.")
+            return
+        if not doctor.get('citas'):
+            self.resultado_text.append("No hay citas registradas para este doctor.")
+            return
+        titulo = f"Citas del Dr. {doctor['nombre']} {doctor['apellido']}: {len(doctor['citas'])}"
+        self.resultado_text.append("⏳ Preparando listado de citas...")
+        self.tareas.enviar(lambda citas: FuenteLista(citas, COLUMNAS_CITAS).preparar_busqueda(),
+                           list(doctor['citas']), nombre="citas_doctor",
+                           al_terminar=lambda fuente: self._mostrar_listado(titulo, fuente),
+                           al_fallar=self._error_listado)
+
+    def _mostrar_listado(self, titulo: str, fuente: FuenteLista):
+        """Recibe la fuente preparada en segundo plano y la muestra en la tabla de resultados"""
+        self.resultado_text.setPlainText(titulo)
+        self.tabla_resultados.mostrar(fuente)
+        self.tabla_resultados.show()
+        self.statusBar().showMessage(self.tareas.resumen(), 10000)
+
+    def _error_listado(self, error: Exception):
+        self.resultado_text.setPlainText(f"❌ No se pudo preparar el listado: {error}")
 
     # Este metodo sera para que el doctor pueda registrar un diagnostico a un paciente, sin embargo se implementara mas adelante.
     # Especialmente, cuando se haga la conexion con la base de datos
-    # def registrar_diagnostico(self):
+    def registrar_diagnostico(self):
+        QMessageBox.information(self, "ℹ️ Información",
+                                "El registro de diagnósticos estará disponible al conectar la base de datos.")
 
 
 def main():
@@ -0,0 +1,396 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional
+
+from IndiceHorarios import hora_a_minutos, minutos_a_hora
+
+# Modelo de dominio de GestionClinicaDental.sql: una clase por tabla, con __slots__ (sin __dict__
+# por objeto), IDs enteros y las llaves foráneas guardadas como referencias al objeto relacionado.
+# El ID vale 0 mientras el registro no se ha guardado en la base.
+# Las ventanas y ControladorClinica solo usan Paciente y Doctor de aquí; sus citas, horarios, tratamientos
+# y facturas siguen siendo las clases de Entidades.py, Paciente.py y Tratamiento.py (IDs de texto y horas
+# como se escriben en pantalla). Las demás clases las usa ModeloClinica para cargar las tablas completas.
+# eq=False: los objetos se comparan y se usan como claves de diccionario por identidad, igual que antes.
+
+CENTAVO = Decimal('0.01')
+
+ESTADOS_HISTORIAL = ('Activo', 'Archivado')
+ESTADOS_CITA = ('Pendiente', 'Confirmada', 'Cancelada')
+ESTADOS_TRATAMIENTO = ('Pendiente', 'En_Progreso', 'Finalizado')
+ESTADOS_FACTURA = ('Pendiente', 'Pagada', 'Vencida')
+ESTADO_PAGADA = 'Pagada'
+ESTADOS_POR_COBRAR = ('Pendiente', 'Vencida')   # Facturas emitidas que el paciente todavía debe
+
+
+@dataclass(slots=True, eq=False)
+class Paciente:
+    nombre: str
+    apellido: str
+    fecha_nacimiento: Optional[date] = None
+    dui: Optional[str] = None               # Puede faltar: los menores de edad no tienen DUI
+    telefono: Optional[str] = None
+    correo: str = ""
+    id_paciente: int = 0
+
+    def __str__(self):
+        return f"{self.nombre} {self.apellido}"
+
+
+@dataclass(slots=True, eq=False)
+class HistorialMedico:
+    paciente: Paciente
+    fecha_creacion: date
+    notas_generales: Optional[str] = None
+    estado: str = 'Activo'
+    id_historial: int = 0
+
+    @property
+    def id_paciente(self) -> int:
+        return self.paciente.id_paciente
+
+
+@dataclass(slots=True, eq=False)
+class Doctor:
+    nombre: str
+    apellido: str
+    dui: Optional[str] = None               # Lo usa la aplicación para identificarlo; la tabla no lo tiene
+    especialidad: str = ""
+    telefono: str = ""
+    correo: str = ""
+    contrasena: str = field(default="", repr=False)
+    id_doctor: int = 0
+    # Las llenan las ventanas; al cargar desde la base la relación va de la cita o el horario al doctor
+    citas: list = field(default_factory=list, repr=False)
+    horario: list = field(default_factory=list, repr=False)
+
+    def __str__(self):
+        return f"{self.nombre} {self.apellido} ({self.especialidad})"
+
+
+@dataclass(slots=True, eq=False)
+class Horario:
+    """Las horas se guardan como minutos enteros desde la medianoche, como en Entidades.Horario"""
+    doctor: Doctor
+    dia: date
+    inicio_min: int
+    fin_min: int
+    disponible: bool = True
+    version: int = 0                        # Control de concurrencia de MotorReservas
+    id_horario: int = 0
+
+    @property
+    def id_doctor(self) -> int:
+        return self.doctor.id_doctor
+
+    @property
+    def hora_inicio(self) -> str:
+        return minutos_a_hora(self.inicio_min)
+
+    @property
+    def hora_fin(self) -> str:
+        return minutos_a_hora(self.fin_min)
+
+
+@dataclass(slots=True, eq=False)
+class Cita:
+    paciente: Paciente
+    doctor: Doctor
+    fecha: datetime
+    costo: Decimal
+    estado: str = 'Pendiente'
+    id_cita: int = 0
+
+    @property
+    def id_paciente(self) -> int:
+        return self.paciente.id_paciente
+
+    @property
+    def id_doctor(self) -> int:
+        return self.doctor.id_doctor
+
+
+@dataclass(slots=True, eq=False)
+class Tratamiento:
+    paciente: Paciente
+    doctor: Doctor
+    descripcion: str
+    costo: Decimal
+    fecha: datetime
+    estado: str = 'Pendiente'
+    id_tratamiento: int = 0
+
+    @property
+    def id_paciente(self) -> int:
+        return self.paciente.id_paciente
+
+    @property
+    def id_doctor(self) -> int:
+        return self.doctor.id_doctor
+
+
+@dataclass(slots=True, eq=False)
+class Factura:
+    paciente: Paciente
+    fecha_emision: date
+    monto_total: Decimal
+    estado_pago: str = 'Pendiente'
+    id_factura: int = 0
+
+    @property
+    def id_paciente(self) -> int:
+        return self.paciente.id_paciente
+
+
+@dataclass(slots=True, eq=False)
+class Asistente:
+    nombre: str
+    apellido: str
+    telefono: str
+    correo: str
+    contrasena: str = field(default="", repr=False)
+    id_asistente: int = 0
+
+
+# Tablas puente: solo las dos referencias
+
+@dataclass(slots=True, eq=False)
+class TratamientoFactura:
+    tratamiento: Tratamiento
+    factura: Factura
+
+
+@dataclass(slots=True, eq=False)
+class AsistentePaciente:
+    asistente: Asistente
+    paciente: Paciente
+
+
+@dataclass(slots=True, eq=False)
+class AsistenteCita:
+    asistente: Asistente
+    cita: Cita
+
+
+@dataclass(slots=True, eq=False)
+class AsistenteFactura:
+    asistente: Asistente
+    factura: Factura
+
+
+# ----------------------- Conversión de valores de la base -----------------------
+# mysql.connector devuelve date/datetime/timedelta/Decimal; sqlite3 devuelve texto y float.
+
+def a_fecha(valor) -> Optional[date]:
+    if valor is None or type(valor) is date:
+        return valor
+    if isinstance(valor, datetime):
+        return valor.date()
+    return date.fromisoformat(str(valor)[:10])
+
+
+def a_fecha_hora(valor) -> datetime:
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime.combine(valor, time())
+    return datetime.fromisoformat(str(valor))
+
+
+def a_minutos(valor) -> int:
+    """TIME de la base a minutos: timedelta (MariaDB), time o texto 'HH:MM[:SS]'"""
+    if isinstance(valor, timedelta):
+        return int(valor.total_seconds()) // 60
+    if isinstance(valor, time):
+        return valor.hour * 60 + valor.minute
+    return hora_a_minutos(str(valor)[:5])
+
+
+def a_monto(valor) -> Decimal:
+    """DECIMAL(10,2): el float de SQLite pasa por texto para no arrastrar el error binario"""
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor)).quantize(CENTAVO)
+
+
+class Compartidos:
+    """
+    Guarda una sola copia de cada valor repetido (fechas, montos, estados, descripciones).
+    Un millón de citas caen en unos pocos miles de fechas y un puñado de costos; sin esto cada
+    fila tendría su propio datetime y su propio Decimal.
+    """
+    __slots__ = ('_valores',)
+
+    def __init__(self):
+        # La clave lleva el tipo porque Decimal('20'), 20 y 20.0 son iguales para un diccionario
+        self._valores: Dict[tuple, object] = {}
+
+    def __call__(self, valor):
+        if valor is None:
+            return None
+        return self._valores.setdefault((valor.__class__, valor), valor)
+
+    def __len__(self):
+        return len(self._valores)
+
+
+class ModeloClinica:
+    """
+    Mapa de identidad de las tablas: un objeto por ID y las llaves foráneas resueltas a referencias.
+    cargar() recibe filas de SELECT * (ID primero y luego las columnas del esquema), por ejemplo
+    las de Repositorio.recorrer(); las tablas se cargan en el orden de las llaves foráneas.
+    """
+    def __init__(self):
+        self.compartir = Compartidos()
+        self.pacientes: Dict[int, Paciente] = {}
+        self.historiales: Dict[int, HistorialMedico] = {}
+        self.doctores: Dict[int, Doctor] = {}
+        self.horarios: Dict[int, Horario] = {}
+        self.citas: Dict[int, Cita] = {}
+        self.tratamientos: Dict[int, Tratamiento] = {}
+        self.facturas: Dict[int, Factura] = {}
+        self.asistentes: Dict[int, Asistente] = {}
+        self.tratamientos_factura: List[TratamientoFactura] = []
+        self.asistentes_paciente: List[AsistentePaciente] = []
+        self.asistentes_cita: List[AsistenteCita] = []
+        self.asistentes_factura: List[AsistenteFactura] = []
+
+        # Tabla -> (constructor desde una fila, destino)
+        self._tablas: Dict[str, tuple] = {
+            'Paciente': (self._paciente, self.pacientes),
+            'Historial_Medico': (self._historial, self.historiales),
+            'Doctor': (self._doctor, self.doctores),
+            'Horario': (self._horario, self.horarios),
+            'Cita': (self._cita, self.citas),
+            'Tratamiento': (self._tratamiento, self.tratamientos),
+            'Factura': (self._factura, self.facturas),
+            'Asistente': (self._asistente, self.asistentes),
+            'Tratamiento_Factura': (lambda f: TratamientoFactura(self.tratamientos[f[0]], self.facturas[f[1]]),
+                                    self.tratamientos_factura),
+            'Asistente_Paciente': (lambda f: AsistentePaciente(self.asistentes[f[0]], self.pacientes[f[1]]),
+                                   self.asistentes_paciente),
+            'Asistente_Cita': (lambda f: AsistenteCita(self.asistentes[f[0]], self.citas[f[1]]),
+                               self.asistentes_cita),
+            'Asistente_Factura': (lambda f: AsistenteFactura(self.asistentes[f[0]], self.facturas[f[1]]),
+                                  self.asistentes_factura),
+        }
+
+    # Una fila por tabla; los textos que se repiten mucho (nombres, estados, descripciones) se comparten
+
+    def _paciente(self, f) -> Paciente:
+        c = self.compartir
+        return Paciente(c(f[1]), c(f[2]), c(a_fecha(f[3])), f[4], f[5], f[6], f[0])
+
+    def _historial(self, f) -> HistorialMedico:
+        c = self.compartir
+        return HistorialMedico(self.pacientes[f[1]], c(a_fecha(f[2])), c(f[3]), c(f[4] or 'Activo'), f[0])
+
+    def _doctor(self, f) -> Doctor:
+        c = self.compartir
+        return Doctor(c(f[1]), c(f[2]), None, c(f[3]), f[4], f[5], f[6], f[0])
+
+    def _horario(self, f) -> Horario:
+        c = self.compartir
+        version = f[7] if len(f) > 7 else 0
+        return Horario(self.doctores[f[1]], c(a_fecha(f[2])), a_minutos(f[3]), a_minutos(f[4]),
+                       bool(f[5]), version, f[0])
+
+    def _cita(self, f) -> Cita:
+        c = self.compartir
+        return Cita(self.pacientes[f[1]], self.doctores[f[2]], c(a_fecha_hora(f[3])), c(a_monto(f[5])),
+                    c(f[4] or 'Pendiente'), f[0])
+
+    def _tratamiento(self, f) -> Tratamiento:
+        c = self.compartir
+        return Tratamiento(self.pacientes[f[1]], self.doctores[f[2]], c(f[3]), c(a_monto(f[4])),
+                           c(a_fecha_hora(f[5])), c(f[6] or 'Pendiente'), f[0])
+
+    def _factura(self, f) -> Factura:
+        c = self.compartir
+        return Factura(self.pacientes[f[1]], c(a_fecha(f[2])), c(a_monto(f[3])), c(f[4] or 'Pendiente'), f[0])
+
+    def _asistente(self, f) -> Asistente:
+        c = self.compartir
+        return Asistente(c(f[1]), c(f[2]), f[3], f[4], f[5], f[0])
+
+    def cargar(self, tabla: str, filas: Iterable) -> int:
+        """Convierte las filas de una tabla; lanza KeyError si una llave foránea no está cargada"""
+        crear, destino = self._tablas[tabla]
+        antes = len(destino)
+        if isinstance(destino, dict):
+            for fila in filas:
+                entidad = crear(fila)
+                destino[fila[0]] = entidad
+        else:
+            destino.extend(map(crear, filas))
+        return len(destino) - antes
+
+    def cargar_repositorios(self, repositorios: Dict, tamano_pagina: int = 5000) -> Dict[str, int]:
+        """Carga todas las tablas desde los repositorios de crear_repositorios(), página por página"""
+        return {tabla: self.cargar(tabla, repositorios[tabla].recorrer(tamano_pagina)) for tabla in self._tablas}
+
+
+# ----------------------- Benchmark de memoria -----------------------
+
+def _cita_como_diccionario(fila, c: Compartidos) -> dict:
+    """Una cita como diccionario, con los valores compartidos igual que en ModeloClinica._cita"""
+    return {'id_cita': fila[0], 'id_paciente': fila[1], 'id_doctor': fila[2],
+            'fecha': c(a_fecha_hora(fila[3])), 'estado': c(fila[4] or 'Pendiente'), 'costo': c(a_monto(fila[5]))}
+
+
+def _citas_como_diccionarios(filas) -> list:
+    """Línea base del benchmark: su propio Compartidos, que se mide junto con los diccionarios"""
+    compartir = Compartidos()
+    return [_cita_como_diccionario(f, compartir) for f in filas]
+
+
+def medir_memoria(construir: Callable[[], object]) -> tuple:
+    """(bytes que quedan reservados por lo que devuelve construir(), segundos, objeto construido)"""
+    import gc
+    import time
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = construir()
+    segundos = time.perf_counter() - inicio
+    usados = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return usados, segundos, resultado
+
+
+def main():
+    # Uso: python Dominio.py [número de citas]   (por defecto 1,000,000)
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+    from DatosSinteticos import GeneradorClinica
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    generador = GeneradorClinica(total)
+
+    # Pacientes y doctores primero: las citas del modelo los referencian y no entran en la medición
+    modelo = ModeloClinica()
+    modelo.cargar('Paciente', ((i, *fila) for i, fila in enumerate(generador.pacientes(), 1)))
+    modelo.cargar('Doctor', ((i, *fila) for i, fila in enumerate(generador.doctores(), 1)))
+    filas = [(i, *fila) for i, fila in enumerate(generador.citas(), 1)]
+
+    # Que el modelo arme bien las entidades se prueba en tests/test_dominio.py
+    print(f"{len(filas):,} citas en memoria ({len(modelo.pacientes):,} pacientes, {len(modelo.doctores):,} doctores)")
+    # Las dos versiones comparten fechas, montos y estados de la misma forma: la diferencia que se mide es
+    # la del diccionario por fila contra __slots__
+    en_dict, t_dict, registros = medir_memoria(lambda: _citas_como_diccionarios(filas))
+    del registros
+    modelo.citas.clear()
+    en_slots, t_slots, _ = medir_memoria(lambda: modelo.cargar('Cita', filas))
+
+    print(f"{'Modelo':<34} {'memoria':>10} {'por cita':>10} {'tiempo':>9}")
+    for nombre, usados, segundos in (("Diccionarios (valores compartidos)", en_dict, t_dict),
+                                     ("Dominio con __slots__", en_slots, t_slots)):
+        print(f"{nombre:<34} {usados / 2**20:7.1f} MB {usados / len(filas):7.0f} B {segundos:7.2f} s")
+    print(f"El modelo con __slots__ ocupa {en_slots / en_dict:.0%} de la memoria de los diccionarios "
+          f"({len(modelo.compartir):,} valores compartidos)")
+
+
+if __name__ == "__main__":
+    main()
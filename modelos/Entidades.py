@@ -0,0 +1,99 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+from Dominio import Doctor, Paciente  # Personas del modelo de dominio; se reexportan aquí
+from IndiceHorarios import hora_a_minutos, minutos_a_hora
+from LineasFactura import a_centavos, a_decimal
+
+# Clases de datos sin nada de PyQt6: las usan las ventanas y también ControladorClinica,
+# los procesos por lotes y los benchmarks, que corren sin pantalla.
+
+
+class Cita:
+    """
+    Clase que representa una cita en la clínica dental.
+    Contiene información sobre el paciente, el doctor, el horario y el estado de la cita.
+    """
+    def __init__(self, id_cita: str, paciente, doctor, hora_inicio: datetime, hora_fin: datetime, costo_cita: float):
+        self.id_cita = id_cita                  # Identificador único de la cita
+        self.paciente = paciente                # Paciente asociado a la cita
+        self.doctor = doctor                    # Doctor asociado a la cita
+        self.hora_inicio = hora_inicio          # Fecha y hora de inicio de la cita
+        self.hora_fin = hora_fin                # Fecha y hora de fin de la cita
+        self.costo_cita = costo_cita            # Costo de la cita
+        self.estado = "Pendiente"               # Por defecto, la cita está pendiente
+
+    def __str__(self):
+        return (
+            f"ID Cita: {self.id_cita}\n"
+            f"Paciente: {self.paciente.nombre} {self.paciente.apellido}\n"
+            f"Doctor: {self.doctor.nombre} {self.doctor.apellido}\n"
+            f"Fecha y Hora Inicio: {self.hora_inicio.strftime('%d/%m/%Y %H:%M')}\n"
+            f"Fecha y Hora Fin: {self.hora_fin.strftime('%d/%m/%Y %H:%M')}\n"
+            f"Estado: {self.estado}\n"
+            f"Costo: ${self.costo_cita:.2f}\n"
+        )
+
+
+class Horario:
+    """
+    Horario de atención de un doctor.
+    Las horas se convierten una sola vez a minutos enteros al crear el objeto;
+    hora_inicio y hora_fin se siguen pudiendo leer como texto 'HH:MM'.
+    """
+    __slots__ = ('id_horario', 'dia', 'inicio_min', 'fin_min', 'doctor', 'disponible')
+
+    def __init__(self, id_horario: str, dia: str, hora_inicio: str, hora_fin: str, doctor):
+        self.id_horario = id_horario
+        self.dia = dia
+        self.inicio_min = hora_a_minutos(hora_inicio)   # Lanza ValueError si no es HH:MM
+        self.fin_min = hora_a_minutos(hora_fin)
+        self.doctor = doctor
+        self.disponible = True
+
+    @property
+    def hora_inicio(self) -> str:
+        return minutos_a_hora(self.inicio_min)
+
+    @property
+    def hora_fin(self) -> str:
+        return minutos_a_hora(self.fin_min)
+
+    def __str__(self):
+        status = "✅ Disponible" if self.disponible else "❌ Ocupado"
+        return (f"🆔 ID Horario: {self.id_horario}\n"
+                f"📅 Día: {self.dia} | ⏰ {self.hora_inicio} - {self.hora_fin}\n"
+                f"👨‍⚕️ Médico: {self.doctor}\n"
+                f" {status}\n"
+                )
+
+    def horario_ocupado(self, otro_horario):
+        if self.doctor.id_doctor != otro_horario.doctor.id_doctor or self.dia != otro_horario.dia:
+            return False
+        return self.inicio_min < otro_horario.fin_min and otro_horario.inicio_min < self.fin_min
+
+
+class Factura:
+    def __init__(self, id_factura: str, paciente,
+                 servicios: List[str], montos: List[Decimal], fecha_emision: datetime,
+                 estado_pago: str):
+        self.id_factura = id_factura
+        self.paciente = paciente
+        self.servicios = servicios
+        self.montos = montos
+        self.monto_total = a_decimal(sum(map(a_centavos, montos)))   # Suma en centavos: exacta, como DECIMAL(10,2)
+        self.fecha_emision = fecha_emision
+        self.estado_pago = estado_pago
+
+    def __str__(self):
+        servicios_str = "\n".join(f"   - {servicio}: ${monto:.2f}"
+                                 for servicio, monto in zip(self.servicios, self.montos))
+        return (f"🧾 Factura ID: {self.id_factura}\n"
+                f"📅 Fecha: {self.fecha_emision.strftime('%d/%m/%Y')}\n"
+                f"👤 Paciente: {self.paciente.nombre} {self.paciente.apellido}\n"
+                f"📋 DUI: {self.paciente.dui}\n"
+                f"🩺 Servicios:\n{servicios_str}\n"
+                f"💰 Estado: {self.estado_pago}\n"
+                f"💵 Total: ${self.monto_total:.2f}\n"
+                f"{'='*30}")
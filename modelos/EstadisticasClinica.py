@@ -0,0 +1,126 @@
+from typing import Iterable
+
+
+def totales_paciente(paciente: dict):
+    """Devuelve (total_tratamientos, total_citas) de un paciente en una sola pasada por sus listas"""
+    return (sum(t.costo for t in paciente['historial_medico']),
+            sum(c.costo_cita for c in paciente['citas']))
+
+
+class EstadisticasClinica:
+    """
+    Totales generales de la clínica (los del final del historial de todos los pacientes).
+    ControladorClinica los mantiene al día llamando registrar_* con cada paciente, tratamiento
+    o cita, así que el historial solo copia los totales. desde_pacientes() los recalcula
+    en una sola pasada cuando no hay totales mantenidos.
+    """
+    def __init__(self):
+        self.total_pacientes = 0
+        self.total_tratamientos = 0
+        self.total_citas = 0
+        self.dinero_tratamientos = 0.0
+        self.dinero_citas = 0.0
+        self.saldos_pendientes = 0.0
+
+    @classmethod
+    def desde_pacientes(cls, pacientes: Iterable[dict]) -> "EstadisticasClinica":
+        """Calcula todos los totales recorriendo los pacientes una sola vez"""
+        # Acumuladores locales: llamar a registrar_paciente por cada paciente costaba más que los recorridos separados
+        total_pacientes = total_tratamientos = total_citas = 0
+        dinero_tratamientos = dinero_citas = saldos_pendientes = 0.0
+        for paciente in pacientes:
+            tratamientos, citas = paciente['historial_medico'], paciente['citas']
+            total_pacientes += 1
+            total_tratamientos += len(tratamientos)
+            total_citas += len(citas)
+            for tratamiento in tratamientos:
+                dinero_tratamientos += tratamiento.costo
+            for cita in citas:
+                dinero_citas += cita.costo_cita
+            saldos_pendientes += paciente['saldo_pendiente']
+
+        estadisticas = cls()
+        estadisticas.total_pacientes = total_pacientes
+        estadisticas.total_tratamientos = total_tratamientos
+        estadisticas.total_citas = total_citas
+        estadisticas.dinero_tratamientos = dinero_tratamientos
+        estadisticas.dinero_citas = dinero_citas
+        estadisticas.saldos_pendientes = saldos_pendientes
+        return estadisticas
+
+    def registrar_paciente(self, paciente: dict, totales=None):
+        """Suma un paciente con sus tratamientos y citas; totales puede traer lo ya calculado"""
+        dinero_tratamientos, dinero_citas = totales if totales is not None else totales_paciente(paciente)
+        self.total_pacientes += 1
+        self.total_tratamientos += len(paciente['historial_medico'])
+        self.total_citas += len(paciente['citas'])
+        self.dinero_tratamientos += dinero_tratamientos
+        self.dinero_citas += dinero_citas
+        self.saldos_pendientes += paciente['saldo_pendiente']
+
+    def registrar_tratamiento(self, costo: float):
+        self.total_tratamientos += 1
+        self.dinero_tratamientos += costo
+
+    def registrar_cita(self, costo: float):
+        self.total_citas += 1
+        self.dinero_citas += costo
+
+    @property
+    def ingresos_totales(self) -> float:
+        return self.dinero_tratamientos + self.dinero_citas
+
+    @property
+    def balance_general(self) -> float:
+        return self.ingresos_totales + self.saldos_pendientes
+
+    def copia(self) -> "EstadisticasClinica":
+        nueva = EstadisticasClinica()
+        nueva.__dict__.update(self.__dict__)
+        return nueva
+
+
+def main():
+    # Benchmark: cinco recorridos separados vs. una sola pasada vs. los totales que mantiene el controlador
+    import random
+    import time
+    from types import SimpleNamespace
+
+    random.seed(3)
+    pacientes = [{
+        'dui': f"{i:08d}-0",
+        'saldo_pendiente': random.uniform(0, 100),
+        'historial_medico': [SimpleNamespace(costo=random.uniform(10, 500)) for _ in range(random.randrange(4))],
+        'citas': [SimpleNamespace(costo_cita=random.uniform(10, 60)) for _ in range(random.randrange(4))],
+    } for i in range(200_000)]
+
+    inicio = time.perf_counter()
+    sum(len(p['historial_medico']) for p in pacientes)
+    sum(len(p['citas']) for p in pacientes)
+    sum(sum(t.costo for t in p['historial_medico']) for p in pacientes)
+    sum(sum(c.costo_cita for c in p['citas']) for p in pacientes)
+    sum(p['saldo_pendiente'] for p in pacientes)
+    separados = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    EstadisticasClinica.desde_pacientes(pacientes)
+    duracion_pasada = time.perf_counter() - inicio
+
+    # Lo que usa el historial: los totales ya mantenidos con cada alta, solo se copian
+    mantenidas = EstadisticasClinica()
+    inicio = time.perf_counter()
+    for p in pacientes:
+        mantenidas.registrar_paciente(p)
+    por_alta = (time.perf_counter() - inicio) / len(pacientes)
+    inicio = time.perf_counter()
+    mantenidas.copia()
+    duracion_copia = time.perf_counter() - inicio
+
+    print(f"{len(pacientes):,} pacientes")
+    print(f"Recorridos separados: {separados * 1000:.1f} ms")
+    print(f"Una sola pasada:      {duracion_pasada * 1000:.1f} ms")
+    print(f"Totales mantenidos:   {duracion_copia * 1e6:.1f} µs al leer, {por_alta * 1e6:.2f} µs por alta")
+
+
+if __name__ == "__main__":
+    main()
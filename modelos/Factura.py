@@ -4,120 +4,54 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                              QScrollArea, QComboBox)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from datetime import datetime
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
 from typing import List
+from Entidades import Factura, Paciente  # Las clases viven en Entidades.py (sin PyQt6); se reexportan aquí
+from TablaVirtual import TablaVirtual, FuenteLista, Columna
+from Tareas import obtener_ejecutor
+from Tema import aplicar_tema
 
-class Paciente:
-    def __init__(self, nombre: str, apellido: str, dui: str, edad: int = 0):
-        self.nombre = nombre
-        self.apellido = apellido
-        self.dui = dui
-        self.edad = edad
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+from ControladorClinica import ControladorClinica, ErrorValidacion
+from AntiguedadSaldos import NOMBRES_TRAMOS, tramo
+from Dominio import ESTADOS_POR_COBRAR
 
-class Factura:
-    def __init__(self, id_factura: str, paciente: Paciente, 
-                 servicios: List[str], montos: List[float], fecha_emision: datetime, 
-                 estado_pago: str):
-        self.id_factura = id_factura
-        self.paciente = paciente
-        self.servicios = servicios
-        self.montos = montos
-        self.monto_total = sum(montos)
-        self.fecha_emision = fecha_emision
-        self.estado_pago = estado_pago
+# columnas del listado de facturas
+COLUMNAS_FACTURAS = [
+    Columna("ID", lambda f: f.id_factura, 'ID_Factura'),
+    Columna("Paciente", lambda f: f"{f.paciente.nombre} {f.paciente.apellido}"),
+    Columna("DUI", lambda f: f.paciente.dui),
+    Columna("Fecha", lambda f: f.fecha_emision, 'Fecha_Emision', lambda fecha: fecha.strftime('%d/%m/%Y')),
+    Columna("Servicios", lambda f: ", ".join(f.servicios)),
+    Columna("Estado", lambda f: f.estado_pago, 'Estado_Pago'),
+    Columna("Total ($)", lambda f: f.monto_total, 'Monto_Total'),
+]
 
-    def __str__(self):
-        servicios_str = "\n".join(f"   - {servicio}: ${monto:.2f}" 
-                                 for servicio, monto in zip(self.servicios, self.montos))
-        return (f"🧾 Factura ID: {self.id_factura}\n"
-                f"📅 Fecha: {self.fecha_emision.strftime('%d/%m/%Y')}\n"
-                f"👤 Paciente: {self.paciente.nombre} {self.paciente.apellido}\n"
-                f"📋 DUI: {self.paciente.dui}\n"
-                f"🩺 Servicios:\n{servicios_str}\n"
-                f"💰 Estado: {self.estado_pago}\n"
-                f"💵 Total: ${self.monto_total:.2f}\n"
-                f"{'='*30}")
+def _preparar_listado(facturas: List[Factura]):
+    """Corre en un hilo de trabajo: total general, saldo por tramo de antigüedad y fuente de la tabla lista para filtrar"""
+    total_general = sum(factura.monto_total for factura in facturas)
+    hoy = date.today()
+    por_tramo = [Decimal(0)] * len(NOMBRES_TRAMOS)
+    for factura in facturas:
+        if factura.estado_pago in ESTADOS_POR_COBRAR:
+            por_tramo[tramo((hoy - factura.fecha_emision.date()).days)] += factura.monto_total
+    return FuenteLista(facturas, COLUMNAS_FACTURAS).preparar_busqueda(), total_general, por_tramo
 
 class FacturaWindow(QMainWindow):
-    def __init__(self, pacientes: List[Paciente]):
+    def __init__(self, pacientes: List[Paciente], controlador=None):
         super().__init__()
         self.setWindowTitle("Gestión de facturas")
         self.setGeometry(100, 100, 900, 700)
-        self.colors = {
-            'primary': '#130760',      
-            'secondary': '#756f9f',   
-            'accent': '#10b8b9',       
-            'background': '#2b2b2b',   
-            'surface': '#3c3c3c',      
-            'text_light': '#ffffff',   
-            'text_dark': '#e0e0e0'     
-        }
 
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background-color: {self.colors['background']};
-                color: {self.colors['text_light']};
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }}
-            QLabel {{
-                color: {self.colors['accent']};
-                font-weight: bold;
-                font-size: 12px;
-            }}
-            QLineEdit, QComboBox {{
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 5px;
-                padding: 8px;
-                font-size: 11px;
-            }}
-            QLineEdit:focus, QComboBox:focus {{
-                border-color: {self.colors['accent']};
-            }}
-            QPushButton {{
-                background-color: {self.colors['secondary']};
-                color: white;
-                padding: 10px 15px;
-                border-radius: 6px;
-                font-weight: bold;
-                font-size: 11px;
-                border: none;
-            }}
-            QPushButton:hover {{
-                background-color: {self.colors['accent']};
-                transform: translateY(-2px);
-            }}
-            QPushButton:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            QGroupBox {{
-                color: {self.colors['text_light']};
-                font-weight: bold;
-                font-size: 13px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }}
-            QGroupBox::title {{
-                color: {self.colors['accent']};
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 10px;
-            }}
-            QTextEdit {{
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 5px;
-                padding: 10px;
-                font-family: 'Courier New', monospace;
-                font-size: 10px;
-            }}
-        """)
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
 
-        self.facturas: List[Factura] = []  # lista de facturas
+        # Las reglas y las facturas (por ID) las guarda el controlador; la ventana solo lee y muestra
+        self.controlador = controlador or ControladorClinica()
+        self.facturas = self.controlador.facturas
+        self.tareas = obtener_ejecutor()  # listados y reportes en segundo plano
         self.pacientes = pacientes  # lista de pacientes existentes
         self.init_ui()
     
@@ -130,7 +64,7 @@ class FacturaWindow(QMainWindow):
         title = QLabel("🧾 Sistema de facturación dental")
         title.setFont(QFont("Segoe UI", 18, QFont.Weight.Bold))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet(f"color: {self.colors['accent']}; padding: 20px;")
+        title.setObjectName("tituloSimple")
         main_layout.addWidget(title)
         
         # form
@@ -202,7 +136,13 @@ class FacturaWindow(QMainWindow):
         self.resultado_text.setReadOnly(True)
         self.resultado_text.setPlaceholderText("Aquí aparecerán las facturas creadas...")
         
+        # listado de facturas: tabla que solo arma las filas visibles
+        self.tabla_facturas = TablaVirtual()
+        self.tabla_facturas.setMinimumHeight(250)
+        self.tabla_facturas.hide()
+        
         resultado_layout.addWidget(self.resultado_text)
+        resultado_layout.addWidget(self.tabla_facturas)
         resultado_group.setLayout(resultado_layout)
         main_layout.addWidget(resultado_group)
         
@@ -211,72 +151,21 @@ class FacturaWindow(QMainWindow):
     def crear_factura(self):
         id_factura = self.id_factura_edit.text().strip()
         paciente = self.paciente_combo.currentData()
-        fecha_str = self.fecha_edit.text().strip()
-        servicios_str = self.servicio_edit.text().strip()
-        montos_str = self.monto_edit.text().strip()
+        fecha_str = self.fecha_edit.text()
+        servicios_str = self.servicio_edit.text()
+        montos_str = self.monto_edit.text()
         estado_pago = self.estado_pago_combo.currentText()
         
-        # validaciones
-        if not id_factura:
-            QMessageBox.warning(self, "⚠️ Error", "El ID de factura es obligatorio")
-            return
-            
-        if paciente is None:
-            QMessageBox.warning(self, "⚠️ Error", "Debe seleccionar un paciente")
-            return
-            
-        if not servicios_str:
-            QMessageBox.warning(self, "⚠️ Error", "La descripción del servicio es obligatoria")
-            return
-            
-        # ver si ya hay una con el mismo ID
-        if any(f.id_factura == id_factura for f in self.facturas):
-            QMessageBox.warning(self, "⚠️ Error", "Ya existe una factura con este ID")
-            return
-            
-        try:
-            fecha = datetime.strptime(fecha_str, '%d/%m/%Y')
-        except ValueError:
-            QMessageBox.warning(self, "⚠️ Error", "Formato de fecha inválido (DD/MM/YYYY)")
-            return
-        
-        #  servicios y $
         try:
-            servicios = [s.strip() for s in servicios_str.split(',') if s.strip()]
-            
-            if montos_str:
-                montos = [float(m.strip()) for m in montos_str.split(',') if m.strip()]
-            else:
-                montos = [0.0] * len(servicios)
-            
-            # ver que haya la misma cantidad 
-            if len(servicios) != len(montos):
-                QMessageBox.warning(self, "⚠️ Error", 
-                                   f"Número de servicios ({len(servicios)}) no coincide con número de montos ({len(montos)})")
-                return
-            
-            # que sean numeros positivos
-            if any(m <= 0 for m in montos):
-                QMessageBox.warning(self, "⚠️ Error", "Todos los montos deben ser mayores a 0")
-                return
-                
-        except ValueError:
-            QMessageBox.warning(self, "⚠️ Error", "Los montos deben ser números válidos separados por comas")
+            nueva_factura = self.controlador.crear_factura(id_factura, paciente, fecha_str, servicios_str,
+                                                           montos_str, estado_pago)
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, e.titulo, str(e))
             return
         
-        nueva_factura = Factura(
-            id_factura=id_factura,
-            paciente=paciente,
-            servicios=servicios,
-            montos=montos,
-            fecha_emision=fecha,
-            estado_pago=estado_pago
-        )
-        
-        self.facturas.append(nueva_factura)
         QMessageBox.information(self, "✅ Éxito", 
                                f"Factura '{id_factura}' creada correctamente\n"
-                               f"Servicios: {len(servicios)}\n"
+                               f"Servicios: {len(nueva_factura.servicios)}\n"
                                f"Total: ${nueva_factura.monto_total:.2f}")
         
         #aqui  mostramos la factura
@@ -288,20 +177,29 @@ class FacturaWindow(QMainWindow):
         if not self.facturas:
             QMessageBox.information(self, "ℹ️ Información", "No hay facturas registradas")
             self.resultado_text.append("📋 No hay facturas registradas en el sistema.")
+            self.tabla_facturas.hide()
             return
             
-        self.resultado_text.append(f"📊 RESUMEN DE FACTURAS ({len(self.facturas)} total)\n")
-        self.resultado_text.append("="*60 + "\n")
-        
-        total_general = 0
-        for i, factura in enumerate(self.facturas, 1):
-            self.resultado_text.append(f"FACTURA #{i}")
-            self.resultado_text.append(str(factura))
-            self.resultado_text.append("\n")
-            total_general += factura.monto_total
-            
-        self.resultado_text.append("="*60)
-        self.resultado_text.append(f"TOTAL GENERAL: ${total_general:.2f}")
+        # el total y el texto de búsqueda de la tabla se calculan en segundo plano
+        self.resultado_text.setPlainText("⏳ Preparando listado de facturas...")
+        self.mostrar_btn.setEnabled(False)
+        self.tareas.enviar(_preparar_listado, self.controlador.lista_facturas(), nombre="listado_facturas",
+                           al_terminar=self._mostrar_listado, al_fallar=self._error_listado)
+
+    def _mostrar_listado(self, resultado):
+        fuente, total_general, por_tramo = resultado
+        self.mostrar_btn.setEnabled(True)
+        antiguedad = " | ".join(f"{nombre} días: ${monto:.2f}" for nombre, monto in zip(NOMBRES_TRAMOS, por_tramo))
+        self.resultado_text.setPlainText(f"📊 RESUMEN DE FACTURAS ({len(fuente.registros)} total)\n"
+                                         f"TOTAL GENERAL: ${total_general:.2f}\n"
+                                         f"POR COBRAR ({antiguedad})")
+        self.tabla_facturas.mostrar(fuente)
+        self.tabla_facturas.show()
+        self.statusBar().showMessage(self.tareas.resumen(), 10000)
+
+    def _error_listado(self, error: Exception):
+        self.mostrar_btn.setEnabled(True)
+        QMessageBox.warning(self, "⚠️ Error", f"No se pudo preparar el listado: {error}")
 
     def limpiar_campos(self):
         self.id_factura_edit.clear()
@@ -310,16 +208,17 @@ class FacturaWindow(QMainWindow):
         self.monto_edit.clear()
         self.estado_pago_combo.setCurrentIndex(0)
         self.resultado_text.clear()
+        self.tabla_facturas.hide()
 
 def main():
     app = QApplication([])
     
     # igual aqui creamos pacientes hipoteticos y luego al sql
     pacientes = [
-        Paciente(nombre="Laura", apellido="Pérez", dui="12345678-9", edad=27),
-        Paciente(nombre="Juan", apellido="Gómez", dui="87654321-0", edad=30),
-        Paciente(nombre="María", apellido="González", dui="11111111-1", edad=35),
-        Paciente(nombre="Carlos", apellido="Rodríguez", dui="22222222-2", edad=42)
+        Paciente(nombre="Laura", apellido="Pérez", dui="12345678-9"),
+        Paciente(nombre="Juan", apellido="Gómez", dui="87654321-0"),
+        Paciente(nombre="María", apellido="González", dui="11111111-1"),
+        Paciente(nombre="Carlos", apellido="Rodríguez", dui="22222222-2")
     ]
     
     window = FacturaWindow(pacientes)
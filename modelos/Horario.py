@@ -3,9 +3,16 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                             QTextEdit, QGroupBox, QFormLayout, QMessageBox,
                             QDialog, QDialogButtonBox, QInputDialog, QComboBox)
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
-from datetime import datetime
+import os
+import sys
 from typing import List
+from Entidades import Horario  # La clase vive en Entidades.py (sin PyQt6); se reexporta aquí
+from IndiceHorarios import minutos_a_hora
+from TablaVirtual import TablaVirtual, FuenteLista, Columna
+from Tema import aplicar_tema
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+from ControladorClinica import ControladorClinica, ErrorValidacion
 
 class Doctor:
     def __init__(self, id_doctor: str, nombre: str, especialidad: str):
@@ -16,36 +23,6 @@ class Doctor:
     def __str__(self):
         return f"{self.nombre} ({self.especialidad})"
 
-class Horario:
-    def __init__(self, id_horario: str, dia: str, hora_inicio: str, hora_fin: str, doctor: Doctor):
-        self.id_horario = id_horario
-        self.dia = dia
-        self.hora_inicio = hora_inicio
-        self.hora_fin = hora_fin
-        self.doctor = doctor
-        self.disponible = True
-
-    def __str__(self):
-        status = "✅ Disponible" if self.disponible else "❌ Ocupado"
-        return (f"🆔 ID Horario: {self.id_horario}\n"
-                f"📅 Día: {self.dia} | ⏰ {self.hora_inicio} - {self.hora_fin}\n"
-                f"👨‍⚕️ Médico: {self.doctor}\n"
-                f" {status}\n"
-                )
-    def horario_ocupado(self, otro_horario):
-        if self.doctor.id_doctor != otro_horario.doctor.id_doctor or self.dia != otro_horario.dia:
-            return False
-        def hora_a_minutos(hora):
-            h, m = map(int, hora.split(':'))
-            return h * 60 + m
-    
-        inicio1 = hora_a_minutos(self.hora_inicio)
-        fin1 = hora_a_minutos(self.hora_fin)
-        inicio2 = hora_a_minutos(otro_horario.hora_inicio)
-        fin2 = hora_a_minutos(otro_horario.hora_fin)
-
-        return max (inicio1, inicio2) < min (fin1, fin2)
-
 class AgregarHorarioDialog(QDialog):
     def __init__(self, doctores: List[Doctor], parent=None):
         super().__init__(parent)
@@ -53,20 +30,8 @@ class AgregarHorarioDialog(QDialog):
         self.setWindowTitle("➕ Agregar Horario")
         self.setModal(True)
         self.resize(500, 400)
-        
-        self.setStyleSheet("""
-            QDialog { background: #2b2b2b; color: white; font-family: 'Segoe UI'; }
-            QLabel { color: #10b8b9; font-weight: bold; }
-            QLineEdit, QComboBox {
-                background: #3c3c3c; color: white; border: 2px solid #756f9f;
-                border-radius: 6px; padding: 8px;
-            }
-            QPushButton {
-                background: #756f9f; color: white; padding: 10px 15px;
-                border-radius: 8px; min-width: 120px;
-            }
-            QPushButton:hover { background: #10b8b9; }
-        """)
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
 
         layout = QFormLayout()
         
@@ -106,13 +71,26 @@ class AgregarHorarioDialog(QDialog):
             'doctor': self.doctor_combo.currentData()
         }
 
+# columnas de la lista de horarios
+COLUMNAS_HORARIOS = [
+    Columna("ID", lambda h: h.id_horario),
+    Columna("Día", lambda h: h.dia),
+    Columna("Inicio", lambda h: h.inicio_min, formato=minutos_a_hora),
+    Columna("Fin", lambda h: h.fin_min, formato=minutos_a_hora),
+    Columna("Médico", lambda h: str(h.doctor)),
+    Columna("Estado", lambda h: "✅ Disponible" if h.disponible else "❌ Ocupado"),
+]
+
 class HorarioWindow(QMainWindow):
-    def __init__(self, doctores: List[Doctor]):
+    def __init__(self, doctores: List[Doctor], controlador=None):
         super().__init__()
         self.doctores = doctores
-        self.horarios: List[Horario] = []
+        # Las reglas y el IndiceHorarios los guarda el controlador; la ventana solo lee y muestra
+        self.controlador = controlador or ControladorClinica()
+        self.horarios = self.controlador.horarios
         
         self.setWindowTitle("🕒 Gestión de horarios")
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
         self.setGeometry(100, 100, 900, 700)
         
         self.configurar_ui()
@@ -127,7 +105,7 @@ class HorarioWindow(QMainWindow):
         layout.setSpacing(15)
 
         titulo = QLabel("🕒 Gestión de horarios médicos")
-        titulo.setStyleSheet("font-size: 24px; font-weight: bold; color: #10b8b9;")
+        titulo.setObjectName("tituloSimple")
         titulo.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(titulo)
         
@@ -136,61 +114,35 @@ class HorarioWindow(QMainWindow):
         
         self.btn_agregar = QPushButton("➕ Agregar")
         self.btn_agregar.clicked.connect(self.agregar_horario)
-        self.btn_agregar.setStyleSheet("background: #2ecc71;")
+        self.btn_agregar.setObjectName("botonExito")
         
         self.btn_eliminar = QPushButton("🗑️ Eliminar")
         self.btn_eliminar.clicked.connect(self.eliminar_horario)
-        self.btn_eliminar.setStyleSheet("background: #e74c3c; color: white;")
+        self.btn_eliminar.setObjectName("botonPeligro")
         
         btn_container.addWidget(self.btn_agregar)
         btn_container.addWidget(self.btn_eliminar)
         layout.addLayout(btn_container)
         
-        # lista de horarios
-        self.resultados = QTextEdit()
-        self.resultados.setReadOnly(True)
-        self.resultados.setStyleSheet("""
-            QTextEdit {
-                background: #1e1e1e;
-                color: #f0f0f0;
-                border: 2px solid #756f9f;
-                border-radius: 8px;
-                font-family: 'Consolas';
-                font-size: 13px;
-            }
-        """)
+        # lista de horarios: tabla que solo arma las filas visibles
+        self.resultados = TablaVirtual()
         layout.addWidget(QLabel("📋 Horarios Registrados:"))
         layout.addWidget(self.resultados)
+        self.actualizar_lista()
          
     def agregar_horario(self):
         dialog = AgregarHorarioDialog(self.doctores, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             try:
-                datos = dialog.get_data()
-
-    #validaciones
-                if not all(datos.values()):
-                    QMessageBox.warning(self, "Error", "Todos los campos son obligatorios")
-                    return   
-                datetime.strptime(datos['hora_inicio'], "%H:%M")
-                datetime.strptime(datos['hora_fin'], "%H:%M")
-        
-                if any(h.id_horario == datos['id_horario'] for h in self.horarios):
-                    QMessageBox.warning(self, "Error", "El ID de horario ya existe")
-                    return
-        
-                nuevo_horario = Horario(**datos)
-                for horario_existente in self.horarios:
-                    if nuevo_horario.horario_ocupado(horario_existente):
-                        QMessageBox.warning(self, "Error", "El horario ya está ocupado")
-                        return
-                self.horarios.append(nuevo_horario)
-                self.actualizar_lista()
-                QMessageBox.information(self, "Éxito", "Horario agregado correctamente")
-            except ValueError as e:
-                QMessageBox.warning(self, "Error", f"formato de hora invalido: {str(e)}")
+                nuevo_horario = self.controlador.agregar_horario(**dialog.get_data())
+            except ErrorValidacion as e:
+                QMessageBox.warning(self, e.titulo, str(e))
+                return
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Error al agregar horario: {str(e)}")
+                return
+            self.resultados.modelo.insertar_registro(self.horarios.posicion(nuevo_horario), nuevo_horario)
+            QMessageBox.information(self, "Éxito", "Horario agregado correctamente")
     
     def eliminar_horario(self):
         """Elimina un horario existente"""
@@ -216,27 +168,19 @@ class HorarioWindow(QMainWindow):
             )
             
             if confirm == QMessageBox.StandardButton.Yes:
-                self.horarios = [h for h in self.horarios if h.id_horario != id_horario]
-                self.actualizar_lista()
+                eliminado = self.controlador.eliminar_horario(id_horario)
+                if eliminado is not None:
+                    self.resultados.modelo.quitar_registro(self.horarios.posicion(eliminado))
                 QMessageBox.information(self, "Éxito", "Horario eliminado")
     
     def actualizar_lista(self):
-        self.resultados.clear()
-        if not self.horarios:
-            self.resultados.setPlainText("No hay horarios registrados")
-            return
-        # agrupar horarios por dia para q se vea ordenado
-        horarios_por_dia = {}
-        for horario in sorted(self.horarios, key=lambda h: h.dia):
-            if horario.dia not in horarios_por_dia:
-                horarios_por_dia[horario.dia] = []
-            horarios_por_dia[horario.dia].append(horario)
+        """
+        Muestra los horarios agrupados por día y ordenados por hora de inicio (el índice ya los
+        mantiene ordenados); con clic en el encabezado se pueden ordenar por otra columna.
+        Al agregar o eliminar solo se inserta o quita la fila de ese horario en su día.
+        """
+        self.resultados.mostrar(FuenteLista(self.horarios, COLUMNAS_HORARIOS))
 
-        for dia, horarios in horarios_por_dia.items():
-            self.resultados.append(f"\n📅 {dia.upper()}")
-            self.resultados.append("━━━━━━━━━━━━━━━━━━━━━━━")
-            for horario in sorted(horarios, key=lambda h: h.hora_inicio):
-                self.resultados.append(str(horario))
 #evidentemente son ejemplos de doctores vea, luego vemos los del sql 
 def cargar_doctores():
     """Función de ejemplo para cargar doctores"""
@@ -0,0 +1,19 @@
+from typing import Optional
+
+# Módulos opcionales y pesados que se importan la primera vez que se usan, no al abrir la aplicación.
+# NumPy solo hace falta en las verificaciones y totales masivos, y tarda más en importarse que el
+# resto de la aplicación junta.
+
+_numpy = False      # False: todavía no se ha intentado importar; None: no está instalado
+
+
+def cargar_numpy() -> Optional[object]:
+    """Devuelve el módulo numpy (importándolo la primera vez) o None si no está instalado"""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Hashable, List
+
+
+class AgendaDoctor:
+    """
+    Intervalos ocupados de un doctor, ordenados por hora de inicio.
+    Como los intervalos nunca se traslapan, ordenar por inicio también los deja ordenados por fin,
+    así que para saber si un rango está libre basta revisar el vecino anterior y el siguiente (bisect).
+    """
+    def __init__(self):
+        self._inicios: List = []
+        self._fines: List = []
+        self._claves: List[Hashable] = []
+
+    def __len__(self):
+        return len(self._inicios)
+
+    def claves(self) -> List[Hashable]:
+        """Claves de los intervalos ocupados, por hora de inicio"""
+        return list(self._claves)
+
+    def esta_libre(self, inicio, fin) -> bool:
+        """True si [inicio, fin) no se traslapa con ningún intervalo ocupado"""
+        i = bisect_right(self._inicios, inicio)
+        if i > 0 and self._fines[i - 1] > inicio:
+            return False
+        if i < len(self._inicios) and self._inicios[i] < fin:
+            return False
+        return True
+
+    def agregar(self, inicio, fin, clave: Hashable) -> bool:
+        """Ocupa [inicio, fin); devuelve False si choca con otro intervalo"""
+        if not fin > inicio:
+            raise ValueError("La hora de fin debe ser posterior a la hora de inicio")
+        if not self.esta_libre(inicio, fin):
+            return False
+        i = bisect_right(self._inicios, inicio)
+        self._inicios.insert(i, inicio)
+        self._fines.insert(i, fin)
+        self._claves.insert(i, clave)
+        return True
+
+    def quitar(self, inicio, clave: Hashable) -> bool:
+        """Libera el intervalo que empieza en `inicio` y pertenece a `clave`"""
+        i = bisect_left(self._inicios, inicio)
+        while i < len(self._inicios) and self._inicios[i] == inicio:
+            if self._claves[i] == clave:
+                del self._inicios[i]
+                del self._fines[i]
+                del self._claves[i]
+                return True
+            i += 1
+        return False
+
+
+class IndiceDisponibilidad:
+    """Índice de disponibilidad por doctor para validar citas en tiempo logarítmico"""
+    def __init__(self):
+        self._agendas: Dict[Hashable, AgendaDoctor] = {}
+
+    def _agenda(self, doctor) -> AgendaDoctor:
+        agenda = self._agendas.get(doctor)
+        if agenda is None:
+            agenda = self._agendas[doctor] = AgendaDoctor()
+        return agenda
+
+    def esta_libre(self, doctor, inicio, fin) -> bool:
+        """¿Está libre el doctor entre inicio y fin?"""
+        agenda = self._agendas.get(doctor)
+        return agenda is None or agenda.esta_libre(inicio, fin)
+
+    def agregar(self, doctor, inicio, fin, clave: Hashable) -> bool:
+        """Reserva el rango para el doctor; devuelve False si ya estaba ocupado"""
+        return self._agenda(doctor).agregar(inicio, fin, clave)
+
+    def cancelar(self, doctor, inicio, clave: Hashable) -> bool:
+        """Libera el rango reservado con `clave`"""
+        agenda = self._agendas.get(doctor)
+        return agenda is not None and agenda.quitar(inicio, clave)
+
+    def reprogramar(self, doctor, clave: Hashable, inicio_anterior, fin_anterior,
+                    nuevo_inicio, nuevo_fin, nuevo_doctor=None) -> bool:
+        """
+        Mueve una reserva a un nuevo rango (y opcionalmente a otro doctor).
+        Si el nuevo rango está ocupado se deja la reserva original y se devuelve False; si no es
+        válido (fin <= inicio) se lanza ValueError sin tocar la reserva original.
+        """
+        if not nuevo_fin > nuevo_inicio:
+            raise ValueError("La hora de fin debe ser posterior a la hora de inicio")
+        destino = doctor if nuevo_doctor is None else nuevo_doctor
+        self.cancelar(doctor, inicio_anterior, clave)
+        if self._agenda(destino).agregar(nuevo_inicio, nuevo_fin, clave):
+            return True
+        self._agenda(doctor).agregar(inicio_anterior, fin_anterior, clave)
+        return False
+
+
+def main():
+    # Microbenchmark: 1M intentos de reserva repartidos entre 50 doctores
+    import random
+    import time
+
+    random.seed(42)
+    indice = IndiceDisponibilidad()
+    doctores = 50
+    intentos = 1_000_000
+    # Horas en minutos desde el inicio del año; citas de 15 a 60 minutos en jornada de 8:00 a 17:00
+    solicitudes = []
+    for i in range(intentos):
+        dia = random.randrange(365)
+        inicio = dia * 1440 + 8 * 60 + random.randrange(0, 9 * 60, 15)
+        solicitudes.append((random.randrange(doctores), inicio, inicio + random.choice((15, 30, 45, 60)), i))
+
+    inicio_reloj = time.perf_counter()
+    reservadas = 0
+    for doctor, inicio, fin, clave in solicitudes:
+        if indice.agregar(doctor, inicio, fin, clave):
+            reservadas += 1
+    duracion = time.perf_counter() - inicio_reloj
+
+    print(f"Intentos: {intentos:,} | Reservadas: {reservadas:,} | Rechazadas: {intentos - reservadas:,}")
+    print(f"Tiempo: {duracion:.2f} s ({intentos / duracion:,.0f} reservas/s)")
+
+
+if __name__ == "__main__":
+    main()
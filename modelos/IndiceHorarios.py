@@ -0,0 +1,272 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from IndiceDisponibilidad import AgendaDoctor
+from ImportacionDiferida import cargar_numpy  # NumPy es opcional; sin él la verificación masiva se hace ordenando en Python
+
+
+def hora_a_minutos(hora: str) -> int:
+    """Convierte 'HH:MM' a minutos desde la medianoche; lanza ValueError si el formato no es válido"""
+    h, separador, m = hora.strip().partition(':')
+    if not separador or len(m) != 2:
+        raise ValueError(f"Hora inválida: {hora!r}")
+    h, m = int(h), int(m)
+    if not (0 <= h <= 23 and 0 <= m <= 59):
+        raise ValueError(f"Hora inválida: {hora!r}")
+    return h * 60 + m
+
+
+def minutos_a_hora(minutos: int) -> str:
+    """Convierte minutos desde la medianoche a 'HH:MM'"""
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def horarios_en_conflicto(horarios: Iterable) -> Set[str]:
+    """
+    Verificación masiva: devuelve los IDs de los horarios que se traslapan con algún otro
+    del mismo doctor el mismo día. Ordena una sola vez por (doctor, día, inicio) en lugar de
+    comparar todos contra todos; con NumPy el barrido se hace de forma vectorizada.
+    """
+    horarios = list(horarios)
+    if len(horarios) < 2:
+        return set()
+
+    np = cargar_numpy()
+    if np is None:
+        ordenados = sorted(horarios, key=lambda h: (h.doctor.id_doctor, h.dia, h.inicio_min))
+        conflictos = set()
+        grupo_anterior = None
+        for horario in ordenados:
+            grupo = (horario.doctor.id_doctor, horario.dia)
+            if grupo != grupo_anterior:
+                grupo_anterior, fin_maximo, dueno = grupo, horario.fin_min, horario
+                continue
+            if horario.inicio_min < fin_maximo:
+                conflictos.add(horario.id_horario)
+                conflictos.add(dueno.id_horario)
+            if horario.fin_min > fin_maximo:
+                fin_maximo, dueno = horario.fin_min, horario
+        return conflictos
+
+    grupos: Dict[Tuple[object, str], int] = {}
+    grupo = np.fromiter((grupos.setdefault((h.doctor.id_doctor, h.dia), len(grupos)) for h in horarios),
+                        dtype=np.int64, count=len(horarios))
+    inicios = np.fromiter((h.inicio_min for h in horarios), dtype=np.int64, count=len(horarios))
+    fines = np.fromiter((h.fin_min for h in horarios), dtype=np.int64, count=len(horarios))
+
+    orden = np.lexsort((inicios, grupo))
+    grupo, inicios, fines = grupo[orden], inicios[orden], fines[orden]
+    # Un día tiene 1440 minutos: desplazando cada grupo se puede usar un solo máximo acumulado
+    desplazamiento = grupo * 1440
+    fin_acumulado = np.maximum.accumulate(fines + desplazamiento) - desplazamiento
+    mismo_grupo = grupo[1:] == grupo[:-1]
+    choca = mismo_grupo & (inicios[1:] < fin_acumulado[:-1])
+    if not choca.any():
+        return set()
+
+    # Cada horario que choca se reporta junto con el horario anterior que lo cubre
+    conflictos = set()
+    for posicion in np.flatnonzero(choca) + 1:
+        conflictos.add(horarios[orden[posicion]].id_horario)
+        previo = posicion - 1
+        while inicios[posicion] >= fines[previo]:
+            previo -= 1
+        conflictos.add(horarios[orden[previo]].id_horario)
+    return conflictos
+
+
+class IndiceHorarios:
+    """
+    Horarios de atención indexados.
+    - Por (doctor, día): una AgendaDoctor en minutos para detectar traslapes con bisect.
+    - Por día: los horarios ordenados por hora de inicio, listos para mostrarse.
+    - Por ID de horario, para validar IDs repetidos y eliminar sin recorrer la lista.
+    """
+    def __init__(self):
+        self._por_id: Dict[str, object] = {}
+        self._agendas: Dict[Tuple[object, str], AgendaDoctor] = {}
+        self._por_dia: Dict[str, List[Tuple[int, str, object]]] = {}
+        self._dias: List[str] = []    # Días con horarios, en orden
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def __contains__(self, id_horario) -> bool:
+        return id_horario in self._por_id
+
+    def __iter__(self) -> Iterator:
+        """Recorre los horarios agrupados por día y ordenados por hora de inicio"""
+        for dia in list(self._dias):
+            yield from self.horarios_del_dia(dia)
+
+    def dias(self) -> List[str]:
+        return list(self._dias)
+
+    def horarios_del_dia(self, dia: str) -> List:
+        return [horario for _, _, horario in self._por_dia.get(dia, [])]
+
+    def obtener(self, id_horario: str):
+        return self._por_id.get(id_horario)
+
+    def posicion(self, horario) -> int:
+        """
+        Posición del horario en el recorrido por día (la fila que ocupa en la lista).
+        Sirve también para un horario recién eliminado: da la fila que ocupaba.
+        """
+        inicio, _ = self._rango(horario)
+        antes = sum(len(self._por_dia[dia]) for dia in self._dias[:bisect_left(self._dias, horario.dia)])
+        return antes + bisect_left(self._por_dia.get(horario.dia, []), (inicio, horario.id_horario))
+
+    @staticmethod
+    def _rango(horario) -> Tuple[int, int]:
+        return horario.inicio_min, horario.fin_min
+
+    def esta_ocupado(self, horario) -> bool:
+        """True si el horario se traslapa con otro del mismo doctor el mismo día"""
+        agenda = self._agendas.get((horario.doctor.id_doctor, horario.dia))
+        if agenda is None:
+            return False
+        inicio, fin = self._rango(horario)
+        return not agenda.esta_libre(inicio, fin)
+
+    def agregar(self, horario) -> bool:
+        """
+        Registra el horario; devuelve False si choca con otro del mismo doctor.
+        Lanza ValueError si el ID ya existe o si la hora de fin no es posterior a la de inicio.
+        """
+        if horario.id_horario in self._por_id:
+            raise ValueError(f"El ID de horario {horario.id_horario} ya existe")
+        inicio, fin = self._rango(horario)
+        clave = (horario.doctor.id_doctor, horario.dia)
+        agenda = self._agendas.get(clave)
+        if agenda is None:
+            agenda = self._agendas[clave] = AgendaDoctor()
+        if not agenda.agregar(inicio, fin, horario.id_horario):
+            return False
+
+        self._por_id[horario.id_horario] = horario
+        if horario.dia not in self._por_dia:
+            self._por_dia[horario.dia] = []
+            insort(self._dias, horario.dia)
+        insort(self._por_dia[horario.dia], (inicio, horario.id_horario, horario))
+        return True
+
+    def eliminar(self, id_horario: str) -> Optional[object]:
+        """Quita un horario por su ID y lo devuelve"""
+        horario = self._por_id.pop(id_horario, None)
+        if horario is None:
+            return None
+        inicio, _ = self._rango(horario)
+        clave = (horario.doctor.id_doctor, horario.dia)
+        agenda = self._agendas[clave]
+        agenda.quitar(inicio, id_horario)
+        if not len(agenda):
+            del self._agendas[clave]
+
+        del_dia = self._por_dia[horario.dia]
+        del del_dia[bisect_left(del_dia, (inicio, id_horario))]
+        if not del_dia:
+            del self._por_dia[horario.dia]
+            del self._dias[bisect_left(self._dias, horario.dia)]
+        return horario
+
+    def eliminar_doctor(self, id_doctor) -> List:
+        """Quita todos los horarios de un doctor (solo recorre sus agendas) y los devuelve"""
+        ids = [id_horario for (doctor, _), agenda in list(self._agendas.items()) if doctor == id_doctor
+               for id_horario in agenda.claves()]
+        return [self.eliminar(id_horario) for id_horario in ids]
+
+
+def main():
+    # Benchmark: 200 doctores x 365 días con cuatro bloques de atención por día
+    import random
+    import time
+    from types import SimpleNamespace
+    from Entidades import Horario
+
+    random.seed(11)
+    doctores = [SimpleNamespace(id_doctor=f"D{i:03d}") for i in range(200)]
+    bloques = ("08:00", "10:00", "13:00", "15:00")
+
+    def bloque(id_horario, dia, hora_inicio, hora_fin, doctor):
+        return SimpleNamespace(id_horario=id_horario, dia=dia, inicio_min=hora_a_minutos(hora_inicio),
+                               fin_min=hora_a_minutos(hora_fin), doctor=doctor)
+
+    horarios = []
+    for doctor in doctores:
+        for dia in range(365):
+            for j, inicio in enumerate(bloques):
+                h, m = map(int, inicio.split(':'))
+                horarios.append(bloque(f"{doctor.id_doctor}-{dia}-{j}", f"2025-{dia:03d}",
+                                       inicio, f"{h + 2:02d}:{m:02d}", doctor))
+    random.shuffle(horarios)
+
+    indice = IndiceHorarios()
+    inicio = time.perf_counter()
+    for horario in horarios:
+        indice.agregar(horario)
+    duracion = time.perf_counter() - inicio
+    print(f"Horarios cargados: {len(indice):,} en {duracion:.2f} s ({len(indice) / duracion:,.0f} altas/s)")
+
+    # Verificación de traslapes: índice vs. comparar contra todos los horarios existentes
+    candidatos = [bloque(f"N{i}", f"2025-{random.randrange(365):03d}", "09:00", "09:30", random.choice(doctores))
+                  for i in range(1000)]
+    inicio = time.perf_counter()
+    for candidato in candidatos:
+        indice.esta_ocupado(candidato)
+    por_indice = (time.perf_counter() - inicio) / len(candidatos)
+
+    def traslapa(a, b):
+        if a.doctor.id_doctor != b.doctor.id_doctor or a.dia != b.dia:
+            return False
+        return max(a.inicio_min, b.inicio_min) < min(a.fin_min, b.fin_min)
+
+    muestra = candidatos[:20]
+    inicio = time.perf_counter()
+    for candidato in muestra:
+        any(traslapa(candidato, h) for h in horarios)
+    lineal = (time.perf_counter() - inicio) / len(muestra)
+    print(f"Verificación de traslape: índice {por_indice * 1e6:.1f} µs | lineal {lineal * 1000:.1f} ms")
+
+    # Comparaciones por segundo: horas en texto (parseadas en cada comparación) vs. minutos enteros
+    def traslapa_texto(a, b):
+        # Comparación como estaba antes en Horario.horario_ocupado
+        def a_minutos(hora):
+            h, m = map(int, hora.split(':'))
+            return h * 60 + m
+        if a.doctor.id_doctor != b.doctor.id_doctor or a.dia != b.dia:
+            return False
+        return max(a_minutos(a.hora_inicio), a_minutos(b.hora_inicio)) < \
+            min(a_minutos(a.hora_fin), a_minutos(b.hora_fin))
+
+    doctor = SimpleNamespace(id_doctor="D000")
+    pares = []
+    for i in range(100_000):
+        inicio_a, inicio_b = random.randrange(8 * 60, 17 * 60), random.randrange(8 * 60, 17 * 60)
+        pares.append((Horario(f"A{i}", "Lunes", minutos_a_hora(inicio_a), minutos_a_hora(inicio_a + 60), doctor),
+                      Horario(f"B{i}", "Lunes", minutos_a_hora(inicio_b), minutos_a_hora(inicio_b + 45), doctor)))
+
+    inicio = time.perf_counter()
+    antes = sum(traslapa_texto(a, b) for a, b in pares)
+    con_texto = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    despues = sum(a.horario_ocupado(b) for a, b in pares)
+    con_enteros = time.perf_counter() - inicio
+    print(f"Comparaciones/s: texto {len(pares) / con_texto:,.0f} | enteros {len(pares) / con_enteros:,.0f}")
+
+    # Verificación masiva de una semana cargada de golpe
+    semana = [h for h in horarios if h.dia < "2025-007"] + candidatos
+    cargar_numpy()  # La importación de NumPy no forma parte de lo que se mide
+    inicio = time.perf_counter()
+    conflictos = horarios_en_conflicto(semana)
+    masivo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    por_pares = sum(1 for i, a in enumerate(semana[:500]) for b in semana[i + 1:] if traslapa(a, b))
+    pares_parcial = time.perf_counter() - inicio
+    print(f"Verificación masiva de {len(semana):,} horarios: {len(conflictos)} en conflicto en "
+          f"{masivo * 1000:.1f} ms ({'NumPy' if cargar_numpy() is not None else 'Python'}) | "
+          f"todos contra todos (solo 500 primeros): {pares_parcial * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import time
+from array import array
+from decimal import Decimal
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from ImportacionDiferida import cargar_numpy  # NumPy es opcional; sin él se compara fila por fila
+from LineasFactura import a_centavos, a_decimal
+
+# Columnas del libro, en el orden en que conciliar() recibe los valores esperados
+COMPONENTES = ('anterior', 'tratamientos', 'citas', 'pagos')
+
+
+def saldo_de(anterior: int, tratamientos: int, citas: int, pagos: int) -> int:
+    return anterior + tratamientos + citas - pagos
+
+
+class ResumenConciliacion(NamedTuple):
+    """Resultado de comparar el libro con los saldos recalculados desde cero"""
+    revisados: int
+    # (paciente, (anterior, tratamientos, citas, pagos, saldo) en el libro, los mismos valores esperados)
+    diferencias: List[Tuple[Hashable, Tuple[int, ...], Tuple[int, ...]]]
+    corregidos: bool
+    segundos: float
+
+    @property
+    def cuadra(self) -> bool:
+        return not self.diferencias
+
+
+class ConciliacionPreparada(NamedTuple):
+    """Valores esperados ya alineados con las filas del libro; se arma sin modificar el libro"""
+    movimientos: int                    # Movimientos del libro cuando se empezó a preparar
+    esperado: List[array]               # Una columna por componente
+    nuevos: Dict[Hashable, Tuple[int, int, int, int]]  # Pacientes que el libro todavía no tiene
+    inicio: float
+
+
+class LibroSaldos:
+    """
+    Saldo por paciente mantenido con cada movimiento, para mostrarlo sin recorrer sus listas.
+    Cada componente vive en centavos enteros en un array contiguo y el saldo
+    se actualiza en el mismo movimiento:
+        saldo = saldo anterior + tratamientos + citas - pagos
+    Una factura cobra tratamientos y citas que ya están en el saldo, así que emitirla no lo cambia;
+    pagarla sí lo baja. conciliar() compara cada columna con lo recalculado desde los datos
+    originales y corrige lo que no cuadre.
+    """
+    def __init__(self):
+        self._filas: Dict[Hashable, int] = {}      # Paciente (DUI o ID_Paciente) -> posición en las columnas
+        self.anterior = array('q')
+        self.tratamientos = array('q')
+        self.citas = array('q')
+        self.pagos = array('q')
+        self.saldos = array('q')
+        self.movimientos = 0                        # Cambia con cada escritura; invalida una conciliación en curso
+
+    def __len__(self):
+        return len(self._filas)
+
+    def __contains__(self, paciente) -> bool:
+        return paciente in self._filas
+
+    def _columnas(self) -> List[array]:
+        return [getattr(self, nombre) for nombre in COMPONENTES]
+
+    def abrir(self, paciente, saldo_anterior=0) -> int:
+        """Agrega un paciente con el saldo que traía (el que se escribe al registrarlo)"""
+        if paciente in self._filas:
+            raise ValueError(f"El paciente {paciente} ya está en el libro de saldos")
+        centavos = a_centavos(saldo_anterior)
+        fila = self._filas[paciente] = len(self._filas)
+        self.anterior.append(centavos)
+        for columna in (self.tratamientos, self.citas, self.pagos):
+            columna.append(0)
+        self.saldos.append(centavos)
+        self.movimientos += 1
+        return fila
+
+    def _fila(self, paciente) -> int:
+        fila = self._filas.get(paciente)
+        return self.abrir(paciente) if fila is None else fila
+
+    def _mover(self, columna: array, paciente, centavos: int, signo: int = 1):
+        fila = self._fila(paciente)
+        columna[fila] += centavos
+        self.saldos[fila] += signo * centavos
+        self.movimientos += 1
+
+    # ----------------------- Movimientos -----------------------
+
+    def registrar_tratamiento(self, paciente, costo):
+        self._mover(self.tratamientos, paciente, a_centavos(costo))
+
+    def registrar_cita(self, paciente, costo):
+        self._mover(self.citas, paciente, a_centavos(costo))
+
+    def registrar_pago(self, paciente, monto):
+        """Pago de una factura: baja el saldo que dejaron sus tratamientos y citas"""
+        self._mover(self.pagos, paciente, a_centavos(monto), signo=-1)
+
+    # ----------------------- Consultas O(1) -----------------------
+
+    def saldo_centavos(self, paciente) -> int:
+        fila = self._filas.get(paciente)
+        return 0 if fila is None else self.saldos[fila]
+
+    def saldo(self, paciente) -> Decimal:
+        return a_decimal(self.saldo_centavos(paciente))
+
+    def _componente(self, columna: array, paciente) -> Decimal:
+        fila = self._filas.get(paciente)
+        return a_decimal(0 if fila is None else columna[fila])
+
+    def saldo_anterior(self, paciente) -> Decimal:
+        return self._componente(self.anterior, paciente)
+
+    def total_tratamientos(self, paciente) -> Decimal:
+        return self._componente(self.tratamientos, paciente)
+
+    def total_citas(self, paciente) -> Decimal:
+        return self._componente(self.citas, paciente)
+
+    def total_pagos(self, paciente) -> Decimal:
+        return self._componente(self.pagos, paciente)
+
+    # ----------------------- Conciliación -----------------------
+
+    def preparar_conciliacion(self, esperados: Iterable[Tuple[Hashable, Tuple[int, int, int, int]]],
+                              movimientos: Optional[int] = None) -> ConciliacionPreparada:
+        """
+        esperados: (paciente, (anterior, tratamientos, citas, pagos) en centavos) recalculado desde cero;
+        los pacientes del libro que no aparecen deben tener todo en 0. Solo lee el libro, así que puede
+        correr en un hilo de trabajo mientras la ventana sigue registrando movimientos. movimientos: los
+        del libro cuando se copiaron los datos de `esperados` (por defecto, los actuales).
+        """
+        inicio = time.perf_counter()
+        if movimientos is None:
+            movimientos = self.movimientos
+        filas = len(self.saldos)
+        esperado = [array('q', bytes(8 * filas)) for _ in COMPONENTES]
+        nuevos: Dict[Hashable, Tuple[int, int, int, int]] = {}
+        for paciente, componentes in esperados:
+            fila = self._filas.get(paciente)
+            if fila is None or fila >= filas:
+                nuevos[paciente] = tuple(componentes)
+                continue
+            for columna, valor in zip(esperado, componentes):
+                columna[fila] = valor
+        return ConciliacionPreparada(movimientos, esperado, nuevos, inicio)
+
+    def aplicar_conciliacion(self, preparada: ConciliacionPreparada,
+                             corregir: bool = True) -> Optional[ResumenConciliacion]:
+        """
+        Compara y corrige cada columna del libro con lo preparado. Corre en el hilo que registra los
+        movimientos. Devuelve None si el libro cambió mientras se preparaba: hay que volver a preparar.
+        """
+        if preparada.movimientos != self.movimientos:
+            return None
+        esperado = preparada.esperado
+        for paciente, componentes in preparada.nuevos.items():
+            self.abrir(paciente)
+            for columna, valor in zip(esperado, componentes):
+                columna.append(valor)
+        libro = self._columnas()
+        np = cargar_numpy()
+        if np is not None and len(self.saldos):
+            # np.frombuffer no copia los datos de los arrays
+            vista = lambda columna: np.frombuffer(columna, dtype=np.int64)
+            distinto = vista(self.saldos) != saldo_de(*(vista(columna) for columna in esperado))
+            for columna_libro, columna_esperada in zip(libro, esperado):
+                distinto |= vista(columna_libro) != vista(columna_esperada)
+            filas = np.flatnonzero(distinto).tolist()
+            del vista, distinto
+        else:
+            filas = [fila for fila in range(len(self.saldos))
+                     if self.saldos[fila] != saldo_de(*(columna[fila] for columna in esperado))
+                     or any(columna_libro[fila] != columna_esperada[fila]
+                            for columna_libro, columna_esperada in zip(libro, esperado))]
+        pacientes = list(self._filas) if filas else []
+        diferencias = []
+        for fila in filas:
+            real = tuple(columna[fila] for columna in esperado)
+            diferencias.append((pacientes[fila], tuple(columna[fila] for columna in libro) + (self.saldos[fila],),
+                                real + (saldo_de(*real),)))
+            if corregir:
+                for columna, valor in zip(libro, real):
+                    columna[fila] = valor
+                self.saldos[fila] = saldo_de(*real)
+        return ResumenConciliacion(len(self.saldos), diferencias, corregir, time.perf_counter() - preparada.inicio)
+
+    def conciliar(self, esperados: Iterable[Tuple[Hashable, Tuple[int, int, int, int]]],
+                  corregir: bool = True) -> ResumenConciliacion:
+        """Prepara y aplica en el mismo hilo"""
+        return self.aplicar_conciliacion(self.preparar_conciliacion(esperados), corregir)
+
+
+def imprimir_conciliacion(resumen: ResumenConciliacion, cantidad: int = 5):
+    print(f"🧮 Conciliación de saldos: {resumen.revisados:,} pacientes en {resumen.segundos * 1000:.1f} ms")
+    if resumen.cuadra:
+        print("   Todos los saldos cuadran")
+        return
+    accion = "corregidos" if resumen.corregidos else "sin corregir"
+    print(f"   {len(resumen.diferencias):,} pacientes no cuadraban ({accion}):")
+    for paciente, libro, esperado in resumen.diferencias[:cantidad]:
+        columnas = [nombre for nombre, a, b in zip(COMPONENTES + ('saldo',), libro, esperado) if a != b]
+        print(f"   ▪ {paciente}: libro ${a_decimal(libro[-1]):,.2f} | real ${a_decimal(esperado[-1]):,.2f} "
+              f"({', '.join(columnas)})")
+
+
+def main():
+    # Benchmark: saldo recalculado en cada consulta vs. libro de saldos, y conciliación de 100,000 pacientes
+    import os
+    import random
+    import sys
+    from types import SimpleNamespace
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+    from ControladorClinica import ControladorClinica
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    aleatorio = random.Random(25)
+    doctora = SimpleNamespace(nombre="Daniela", apellido="Pineda")
+    clinica = ControladorClinica()
+    inicio = time.perf_counter()
+    duis = []
+    for i in range(total):
+        dui = f"{i:08d}-{i % 10}"
+        clinica.crear_paciente(f"nombre{i}", f"apellido{i}", 30, dui, "", "", aleatorio.choice((0.0, 0.0, 15.5, 40.0)))
+        for _ in range(aleatorio.randint(0, 8)):
+            clinica.agregar_tratamiento_paciente(dui, SimpleNamespace(
+                descripcion="Limpieza", costo=aleatorio.choice((20.0, 35.5, 120.0, 0.1)), fecha_realizacion="",
+                estado="Completado", doctor=doctora))
+        for _ in range(aleatorio.randint(0, 4)):
+            clinica.agregar_cita_paciente(dui, SimpleNamespace(
+                id_cita="", hora_inicio="", hora_fin="", costo_cita=aleatorio.choice((25.0, 45.0, 0.2)),
+                estado="Pendiente", doctor=doctora))
+        duis.append(dui)
+    titulares = [SimpleNamespace(nombre="", apellido="", dui=dui) for dui in duis[:total // 10]]
+    for k, titular in enumerate(titulares):
+        clinica.crear_factura(f"F{k}", titular, "01/07/2025", "Radiografía", "30.10", "Pendiente")
+    for k in range(0, len(titulares), 2):
+        clinica.pagar_factura(f"F{k}")
+    movimientos = sum(len(p['historial_medico']) + len(p['citas']) for p in clinica.pacientes) + len(titulares) * 3 // 2
+    print(f"{total:,} pacientes y {movimientos:,} movimientos registrados en {time.perf_counter() - inicio:.1f} s")
+
+    # Mostrar el saldo de cada paciente: antes se sumaban sus listas en cada consulta
+    consultas = [aleatorio.choice(duis) for _ in range(200_000)]
+    inicio = time.perf_counter()
+    for dui in consultas:
+        paciente = clinica.obtener_paciente(dui)
+        (sum(t.costo for t in paciente['historial_medico']) + sum(c.costo_cita for c in paciente['citas'])
+         + paciente['saldo_pendiente'])
+    recalculado = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for dui in consultas:
+        clinica.saldos.saldo(dui)
+    libro = time.perf_counter() - inicio
+    print(f"{len(consultas):,} consultas de saldo: recalculando {recalculado / len(consultas) * 1e6:.2f} µs c/u, "
+          f"con el libro {libro / len(consultas) * 1e6:.2f} µs c/u ({recalculado / libro:.1f}x)")
+
+    # El costo del libro no crece con el historial del paciente
+    grande = duis[0]
+    for _ in range(2_000):
+        clinica.agregar_tratamiento_paciente(grande, SimpleNamespace(costo=10.0))
+    paciente = clinica.obtener_paciente(grande)
+    inicio = time.perf_counter()
+    for _ in range(1_000):
+        (sum(t.costo for t in paciente['historial_medico']) + sum(c.costo_cita for c in paciente['citas'])
+         + paciente['saldo_pendiente'])
+    recalculado = (time.perf_counter() - inicio) / 1_000
+    inicio = time.perf_counter()
+    for _ in range(10_000):
+        clinica.saldos.saldo(grande)
+    constante = (time.perf_counter() - inicio) / 10_000
+    print(f"Paciente con {len(paciente['historial_medico']):,} tratamientos: recalculando "
+          f"{recalculado * 1e6:.1f} µs, con el libro {constante * 1e6:.2f} µs por consulta")
+
+    # Conciliación completa, luego con algunos pacientes alterados a propósito
+    # (que detecte y corrija cada columna se prueba en tests/test_libro_saldos.py)
+    imprimir_conciliacion(clinica.conciliar_saldos())
+    libro = clinica.saldos
+    for dui, centavos in {duis[7]: 1, duis[total // 2]: -3550, duis[-1]: 99}.items():
+        libro.saldos[libro._filas[dui]] += centavos
+    imprimir_conciliacion(clinica.conciliar_saldos())
+    print(f"Columnas comparadas con {'NumPy' if cargar_numpy() is not None else 'Python'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+from array import array
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Tuple
+
+from ImportacionDiferida import cargar_numpy  # NumPy es opcional; sin él se recorre el módulo array
+
+# Los montos viven como centavos enteros; Decimal solo aparece al entrar (texto del usuario, DECIMAL(10,2)
+# de la base) y al salir (Monto_Total, pantalla). Así ninguna suma arrastra el error del float binario.
+
+CENTAVO = Decimal('0.01')
+PUNTOS_BASE = 10_000         # Tasas de impuesto y descuento en centésimas de punto porcentual: 13% = 1300
+
+
+def a_centavos(monto) -> int:
+    """
+    Decimal, texto, int o float a centavos enteros. Más de dos decimales se redondean a la mitad hacia
+    arriba, como al guardar en DECIMAL(10,2). El float pasa por su texto más corto (0.1 -> '0.1').
+    """
+    try:
+        valor = monto if isinstance(monto, Decimal) else Decimal(str(monto).strip())
+        return int(valor.quantize(CENTAVO, rounding=ROUND_HALF_UP).scaleb(2))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Monto inválido: {monto!r}") from None
+
+
+def a_decimal(centavos: int) -> Decimal:
+    """Centavos a Decimal con dos decimales exactos, listo para Monto_Total"""
+    return Decimal(int(centavos)).scaleb(-2)
+
+
+def a_puntos_base(tasa) -> int:
+    """Tasa como fracción (Decimal('0.13'), '0.13') a puntos base enteros; no admite más precisión"""
+    puntos = Decimal(str(tasa)) * PUNTOS_BASE
+    if puntos != puntos.to_integral_value() or not 0 <= puntos <= PUNTOS_BASE:
+        raise ValueError(f"Tasa inválida: {tasa!r} (de 0 a 1, hasta centésimas de punto porcentual)")
+    return int(puntos)
+
+
+def _porcion(centavos: int, puntos: int) -> int:
+    """centavos * puntos / 10,000 redondeado a la mitad hacia arriba, en enteros (centavos >= 0)"""
+    return (centavos * puntos + PUNTOS_BASE // 2) // PUNTOS_BASE
+
+
+class LineasFactura:
+    """
+    Líneas de factura en columnas: ID de la factura, servicio (posición en un catálogo de textos) y
+    monto en centavos, cada una en un array contiguo. Los totales por factura, con descuento e
+    impuesto aplicados línea por línea, se calculan de forma vectorizada con NumPy cuando está
+    instalado y con el mismo redondeo entero cuando no, así que ambos caminos dan el mismo centavo.
+    """
+    def __init__(self):
+        self.factura = array('q')
+        self.servicio = array('l')
+        self.centavos = array('q')
+        self.servicios: List[str] = []          # Catálogo: cada descripción se guarda una sola vez
+        self._posiciones: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.centavos)
+
+    def _servicio(self, descripcion: str) -> int:
+        posicion = self._posiciones.get(descripcion)
+        if posicion is None:
+            posicion = self._posiciones[descripcion] = len(self.servicios)
+            self.servicios.append(descripcion)
+        return posicion
+
+    def agregar(self, id_factura: int, servicio: str, monto) -> int:
+        """Agrega una línea (monto Decimal, texto o número); devuelve su posición"""
+        centavos = a_centavos(monto)
+        if centavos < 0:
+            raise ValueError(f"El monto no puede ser negativo: {monto!r}")
+        self.factura.append(id_factura)
+        self.servicio.append(self._servicio(servicio))
+        self.centavos.append(centavos)
+        return len(self.centavos) - 1
+
+    def agregar_lote(self, lineas: Iterable[Tuple[int, str, object]]) -> int:
+        """Carga masiva de (id_factura, servicio, monto); devuelve cuántas líneas agregó"""
+        antes = len(self)
+        for id_factura, servicio, monto in lineas:
+            self.agregar(id_factura, servicio, monto)
+        return len(self) - antes
+
+    def agregar_columnas(self, facturas, servicios, centavos, catalogo: List[str]):
+        """
+        Carga ya en columnas (arrays o vectores de NumPy de enteros): las posiciones de servicios
+        apuntan a catalogo. Para importar millones de líneas sin pasar por objetos de Python.
+        """
+        if not len(facturas) == len(servicios) == len(centavos):
+            raise ValueError("Las columnas deben tener el mismo largo")
+        traduccion = [self._servicio(descripcion) for descripcion in catalogo]
+        np = cargar_numpy()
+        if np is not None:
+            centavos = np.asarray(centavos, dtype=np.int64)
+            if len(centavos) and centavos.min() < 0:
+                raise ValueError("Los montos no pueden ser negativos")
+            servicios = np.asarray(traduccion, dtype=np.int64)[np.asarray(servicios, dtype=np.int64)]
+            self.factura.frombytes(np.asarray(facturas, dtype=np.int64).astype(self.factura.typecode).tobytes())
+            self.servicio.frombytes(servicios.astype(self.servicio.typecode).tobytes())
+            self.centavos.frombytes(centavos.tobytes())
+        else:
+            if any(c < 0 for c in centavos):
+                raise ValueError("Los montos no pueden ser negativos")
+            self.factura.extend(facturas)
+            self.servicio.extend(traduccion[s] for s in servicios)
+            self.centavos.extend(centavos)
+
+    def linea(self, posicion: int) -> Tuple[int, str, Decimal]:
+        return (self.factura[posicion], self.servicios[self.servicio[posicion]],
+                a_decimal(self.centavos[posicion]))
+
+    # ----------------------- Totales -----------------------
+
+    def total_centavos(self) -> int:
+        np = cargar_numpy()
+        if np is not None and len(self.centavos):
+            return int(np.frombuffer(self.centavos, dtype=np.int64).sum())
+        return sum(self.centavos)
+
+    def total(self) -> Decimal:
+        """Suma de todas las líneas, exacta"""
+        return a_decimal(self.total_centavos())
+
+    def totales_por_factura_centavos(self, impuesto=0, descuento=0) -> Dict[int, int]:
+        """
+        ID de factura -> total en centavos. Por línea se resta el descuento y al neto se le suma el
+        impuesto; cada porción se redondea a centavos antes de sumar, como en una factura impresa.
+        """
+        puntos_impuesto, puntos_descuento = a_puntos_base(impuesto), a_puntos_base(descuento)
+        if not len(self.centavos):
+            return {}
+        np = cargar_numpy()
+        if np is None:
+            totales: Dict[int, int] = {}
+            for id_factura, centavos in zip(self.factura, self.centavos):
+                neto = centavos - _porcion(centavos, puntos_descuento)
+                totales[id_factura] = totales.get(id_factura, 0) + neto + _porcion(neto, puntos_impuesto)
+            return totales
+
+        ids = np.frombuffer(self.factura, dtype=np.int64)
+        neto = np.frombuffer(self.centavos, dtype=np.int64)
+        mitad = PUNTOS_BASE // 2
+        if puntos_descuento:
+            neto = neto - (neto * puntos_descuento + mitad) // PUNTOS_BASE
+        if puntos_impuesto:
+            neto = neto + (neto * puntos_impuesto + mitad) // PUNTOS_BASE
+        # Las líneas suelen venir agrupadas por factura; solo se ordena si no lo están.
+        # reduceat suma en int64 (bincount sumaría en float64)
+        if len(ids) > 1 and not (ids[1:] >= ids[:-1]).all():
+            orden = np.argsort(ids, kind='stable')
+            ids, neto = ids[orden], neto[orden]
+        inicios = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        sumas = np.add.reduceat(neto, inicios)
+        return dict(zip(ids[inicios].tolist(), sumas.tolist()))
+
+    def totales_por_factura(self, impuesto=0, descuento=0) -> Dict[int, Decimal]:
+        """ID de factura -> Monto_Total (Decimal con dos decimales)"""
+        return {id_factura: a_decimal(centavos)
+                for id_factura, centavos in self.totales_por_factura_centavos(impuesto, descuento).items()}
+
+
+def main():
+    # Uso: python LineasFactura.py [líneas]   (por defecto 10,000,000)
+    import random
+    import sys
+    import time
+
+    total_lineas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    catalogo = ["Limpieza dental general", "Resina dental", "Extracción simple", "Radiografía", "Consulta"]
+    impuesto, descuento = Decimal('0.13'), Decimal('0.05')
+
+    # Benchmark de sumas sobre muchas líneas (que los totales no se desvíen un centavo de Decimal
+    # se prueba en tests/test_lineas_factura.py)
+    aleatorio = random.Random(22)
+    np = cargar_numpy()
+    grandes = LineasFactura()
+    inicio = time.perf_counter()
+    if np is not None:
+        generador = np.random.default_rng(22)
+        grandes.agregar_columnas(np.sort(generador.integers(0, total_lineas // 4, total_lineas)),
+                                 generador.integers(0, len(catalogo), total_lineas),
+                                 generador.integers(1, 5_000_00, total_lineas), catalogo)
+    else:
+        grandes.agregar_columnas(array('q', (i // 4 for i in range(total_lineas))),
+                                 array('l', (aleatorio.randrange(len(catalogo)) for _ in range(total_lineas))),
+                                 array('q', (aleatorio.randrange(1, 5_000_00) for _ in range(total_lineas))),
+                                 catalogo)
+    print(f"{len(grandes):,} líneas cargadas en columnas en {time.perf_counter() - inicio:.1f} s "
+          f"({(grandes.factura.itemsize + grandes.servicio.itemsize + grandes.centavos.itemsize) * len(grandes) / 2**20:.0f} MB)")
+
+    inicio = time.perf_counter()
+    exacto = grandes.total()
+    t_columnas = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    por_factura = grandes.totales_por_factura_centavos(impuesto, descuento)
+    t_por_factura = time.perf_counter() - inicio
+
+    montos_float = [c / 100 for c in grandes.centavos]      # Como Factura.montos antes: lista de float
+    inicio = time.perf_counter()
+    suma_float = sum(montos_float)
+    t_float = time.perf_counter() - inicio
+    del montos_float
+    inicio = time.perf_counter()
+    suma_decimal = sum(map(a_decimal, grandes.centavos))
+    t_decimal = time.perf_counter() - inicio
+    assert suma_decimal == exacto
+
+    print(f"{'Suma de todas las líneas':<42} {'tiempo':>9}  resultado")
+    print(f"{'Lista de float (sum)':<42} {t_float * 1000:7.0f} ms  {suma_float:,.6f} "
+          f"(se desvía {abs(Decimal(suma_float) - exacto):.6f})")
+    print(f"{'Decimal línea por línea':<42} {t_decimal * 1000:7.0f} ms  {suma_decimal:,}")
+    print(f"{'Centavos en columnas':<42} {t_columnas * 1000:7.1f} ms  {exacto:,}")
+    print(f"{'Totales por factura con desc. e impuesto':<42} {t_por_factura * 1000:7.0f} ms  "
+          f"{len(por_factura):,} facturas")
+
+
+if __name__ == "__main__":
+    main()
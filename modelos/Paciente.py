@@ -4,19 +4,28 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                              QTextEdit, QGroupBox, QFormLayout, QMessageBox,
                              QListWidget, QDialog, QDialogButtonBox, QDoubleSpinBox,
                              QScrollArea, QScrollBar)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont, QTextCursor
 from datetime import datetime
+from decimal import Decimal
+import os
+import sys
 from typing import List
-import re
+from ValidacionPacientes import validar_correo, validar_dui, validar_telefono
+from ReporteHistorial import secciones_historial, formatear_telefono, icono_estado
+from Tareas import obtener_ejecutor
+from Tema import aplicar_tema
+from Dominio import Doctor  # Doctor de Dominio.py; Tratamiento y Cita de abajo son propios de esta ventana
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+from ControladorClinica import ControladorClinica, ErrorValidacion
+
+PACIENTES_POR_BLOQUE = 50  # Pacientes que se escriben en cada pasada del reporte completo
+CONCILIACION_MS = 5 * 60 * 1000  # Cada cuánto se revisa el libro de saldos contra las listas de los pacientes
+CONCILIACION_REINTENTO_MS = 5 * 1000  # Si el libro cambió mientras se revisaba
 
 ## COMETARIO 2
 # Clases auxiliares (Lo puse para que no se pierda el contexto)
-class Doctor:
-    def __init__(self, nombre: str, apellido: str):
-        self.nombre = nombre
-        self.apellido = apellido
-
 class Tratamiento:
     def __init__(self, id_tratamiento: str, descripcion: str, costo: float, 
                  fecha_realizacion: str, estado: str, doctor: Doctor):
@@ -43,54 +52,9 @@ class AgregarTratamientoDialog(QDialog):
         self.setWindowTitle("🩺 Agregar Tratamiento")
         self.setModal(True)
         self.resize(450, 350)
-        
-       
-        self.setStyleSheet(f"""
-            QDialog {{
-                background-color: #2b2b2b;
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                color: #ffffff;
-            }}
-            
-            QLabel {{
-                color: #ffffff;
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-            }}
-            
-            QLineEdit, QTextEdit, QDoubleSpinBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid #756f9f;
-                border-radius: 6px;
-                padding: 8px;
-                background-color: #3c3c3c;
-                color: #ffffff;
-            }}
-            
-            QLineEdit:focus, QTextEdit:focus, QDoubleSpinBox:focus {{
-                border-color: #10b8b9;
-                background-color: #404040;
-            }}
-            
-            QPushButton {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #756f9f;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 15px;
-            }}
-            
-            QPushButton:hover {{
-                background-color: #10b8b9;
-            }}
-        """)
-        
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
+
         layout = QFormLayout()
         
         self.id_edit = QLineEdit()
@@ -140,54 +104,9 @@ class AgregarCitaDialog(QDialog):
         self.setWindowTitle("📅 Agregar Cita")
         self.setModal(True)
         self.resize(450, 300)
-        
-      
-        self.setStyleSheet(f"""
-            QDialog {{
-                background-color: #2b2b2b;
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                color: #ffffff;
-            }}
-            
-            QLabel {{
-                color: #ffffff;
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-            }}
-            
-            QLineEdit, QDoubleSpinBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid #756f9f;
-                border-radius: 6px;
-                padding: 8px;
-                background-color: #3c3c3c;
-                color: #ffffff;
-            }}
-            
-            QLineEdit:focus, QDoubleSpinBox:focus {{
-                border-color: #10b8b9;
-                background-color: #404040;
-            }}
-            
-            QPushButton {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: #ffffff;
-                background-color: #756f9f;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 15px;
-            }}
-            
-            QPushButton:hover {{
-                background-color: #10b8b9;
-            }}
-        """)
-        
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
+
         layout = QFormLayout()
         
         self.id_edit = QLineEdit()
@@ -231,122 +150,110 @@ class AgregarCitaDialog(QDialog):
             doctor
         )
 
-# CLASE PACIENTE
-class Paciente:
-    def __init__(self, nombre, apellido, fecha_nacimiento, dui, telefono, correo):
-        self.nombre = nombre
-        self.apellido = apellido
-        self.fecha_nacimiento = fecha_nacimiento  # Cambiado a fecha de nacimiento
-        self.dui = dui
-        self.telefono = telefono
-        self.correo = correo
+def _generar_historiales(control, pacientes, estadisticas) -> int:
+    """Arma el reporte de todos los pacientes en el hilo de trabajo y lo entrega por bloques"""
+    total = len(pacientes) + 2    # Encabezado, un bloque por paciente y resumen
+    bloque = []
+    for escritas, seccion in enumerate(secciones_historial(pacientes, estadisticas), 1):
+        bloque.append(seccion)
+        if len(bloque) >= PACIENTES_POR_BLOQUE or escritas == total:
+            control.verificar()
+            control.reportar(100 * escritas // total, "".join(bloque))
+            bloque = []
+    return total
+
+
+def _generar_historial_detallado(nombre: str, apellido: str, historial_medico: list, citas: list,
+                                 resumen: tuple) -> str:
+    """
+    Genera el historial médico detallado con formato mejorado. Corre en el hilo de trabajo, así que
+    recibe copias de las listas y el resumen financiero ya leído del libro de saldos.
+    """
+    separador_principal = "=" * 60
+    separador_seccion = "-" * 40
+    
+    historial = f"""
+{separador_principal}
+📋 HISTORIAL MÉDICO COMPLETO
+{separador_principal}
+
+👤 Paciente: {nombre} {apellido}
+📅 Fecha de Consulta: {datetime.now().strftime('%d/%m/%Y - %H:%M:%S')}
+
+{separador_seccion}
+🩺 TRATAMIENTOS REALIZADOS ({len(historial_medico)})
+{separador_seccion}
+"""
+    
+    if not historial_medico:
+        historial += "\n   📝 No hay tratamientos registrados en el historial.\n"
+    else:
+        for i, tratamiento in enumerate(historial_medico, 1):
+            estado_icon = icono_estado(tratamiento.estado)
+            historial += f"""
+   ┌─ Tratamiento #{i:02d}
+   │ 🆔 ID: {tratamiento.id_tratamiento}
+   │ 📄 Descripción: {tratamiento.descripcion}
+   │ 💵 Costo: ${tratamiento.costo:,.2f}
+   │ 📅 Fecha: {tratamiento.fecha_realizacion}
+   │ {estado_icon} Estado: {tratamiento.estado}
+   │ 👨‍⚕️ Doctor: Dr. {tratamiento.doctor.nombre} {tratamiento.doctor.apellido}
+   └─────────────────────────────────────────────────
+"""
+    
+    historial += f"""
+{separador_seccion}
+📅 CITAS PROGRAMADAS ({len(citas)})
+{separador_seccion}
+"""
+    
+    if not citas:
+        historial += "\n   📝 No hay citas programadas.\n"
+    else:
+        for i, cita in enumerate(citas, 1):
+            estado_icon = icono_estado(cita.estado)
+            historial += f"""
+   ┌─ Cita #{i:02d}
+   │ 🆔 ID: {cita.id_cita}
+   │ ⏰ Inicio: {cita.hora_inicio}
+   │ ⏰ Fin: {cita.hora_fin}
+   │ 💵 Costo: ${cita.costo_cita:,.2f}
+   │ {estado_icon} Estado: {cita.estado}
+   │ 👨‍⚕️ Doctor: Dr. {cita.doctor.nombre} {cita.doctor.apellido}
+   └─────────────────────────────────────────────────
+"""
+    
+    # Resumen financiero
+    total_tratamientos, total_citas, saldo_anterior, pagos, balance = resumen
+    total_general = total_tratamientos + total_citas
+    
+    historial += f"""
+{separador_seccion}
+💰 RESUMEN FINANCIERO
+{separador_seccion}
+
+   📊 Estadísticas:
+   ▪ Total de Tratamientos: {len(historial_medico)} - ${total_tratamientos:,.2f}
+   ▪ Total de Citas: {len(citas)} - ${total_citas:,.2f}
+   ▪ Subtotal General: ${total_general:,.2f}
+   ▪ Saldo Anterior: ${saldo_anterior:,.2f}
+   ▪ Pagos de Facturas: -${pagos:,.2f}
+   
+   💳 Balance Final: ${balance:,.2f}
+
+{separador_principal}
+"""
+    return historial
+
 
 class PacienteWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, controlador=None):
         super().__init__()
         self.setWindowTitle("Gestión de Pacientes - Clínica Dental")
         self.setGeometry(100, 100, 900, 700)
-        
-        # Color scheme 
-        self.colors = {
-            'primary': '#130760',      # Dark blue-purple 
-            'secondary': '#756f9f',    # Medium purple
-            'accent': '#10b8b9',       # Teal
-            'background': '#2b2b2b',   # Dark gray
-            'surface': '#3c3c3c',      # Slightly lighter gray
-            'text_light': '#ffffff',   # White text
-            'text_dark': '#e0e0e0'     # Light gray text
-        }
-        
-        
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background-color: {self.colors['background']};
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                color: {self.colors['text_light']};
-            }}
-            
-            QLabel {{
-                color: {self.colors['text_light']};
-                font-family: 'Segoe UI';
-                font-size: 14px;
-            }}
-            
-            QGroupBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                margin: 10px 0px;
-                padding-top: 15px;
-                background-color: {self.colors['surface']};
-            }}
-            
-            QGroupBox::title {{
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 8px 0 8px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['accent']};
-            }}
-            
-            QLineEdit, QSpinBox, QDoubleSpinBox {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 6px;
-                padding: 10px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_light']};
-                selection-background-color: {self.colors['accent']};
-            }}
-            
-            QLineEdit:focus, QSpinBox:focus, QDoubleSpinBox:focus {{
-                border-color: {self.colors['accent']};
-                background-color: #404040;
-            }}
-            
-            QPushButton {{
-                font-family: 'Segoe UI';
-                font-size: 14px;
-                font-weight: bold;
-                color: {self.colors['text_light']};
-                background-color: {self.colors['secondary']};
-                border: none;
-                border-radius: 8px;
-                padding: 12px 20px;
-                margin: 4px;
-            }}
-            
-            QPushButton:hover {{
-                background-color: {self.colors['accent']};
-                
-            }}
-            
-            QPushButton:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QTextEdit {{
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 13px;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                background-color: {self.colors['surface']};
-                color: {self.colors['text_dark']};
-                padding: 15px;
-                selection-background-color: {self.colors['accent']};
-            }}
-            
-            QTextEdit:focus {{
-                border-color: {self.colors['accent']};
-            }}
-        """)
-        
-        
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
+
         # Atributos del paciente actual
         # CREAR LA CLASE PACIENTE
         self.nombre = ""
@@ -359,10 +266,24 @@ class PacienteWindow(QMainWindow):
         self.citas: List[Cita] = [] # QUERY
         self.saldo_pendiente = 0.0 # POR MEDIO DEL JOIN DE TRATAMIENTO SE HACE LA CONSULTA PARA CALCULAR EL SALDO PENDIENTE
         
-        # Nueva lista para almacenar todos los pacientes registrados
-        self.pacientes_registrados = [] # INSERT INTO pacientes (nombre, apellido, edad, dui, telefono, correo, saldo_pendiente, fecha_registro)
+        # Los pacientes registrados y los totales los guarda el controlador, que también aplica las reglas
+        self.controlador = controlador or ControladorClinica()
+        self.pacientes_registrados = self.controlador.pacientes # INSERT INTO pacientes (nombre, apellido, edad, dui, telefono, correo, saldo_pendiente, fecha_registro)
+        self.estadisticas = self.controlador.estadisticas  # Totales de la clínica, se actualizan con cada alta
+        self.saldos = self.controlador.saldos  # Saldo de cada paciente, se actualiza con cada tratamiento, cita o pago
+        
+        # Trabajo pesado (reportes) en segundo plano; la tarea del reporte completo se guarda para detenerla
+        self.tareas = obtener_ejecutor()
+        self._tarea_reporte = None
+        self._tarea_historial = None
         
         self.init_ui()
+
+        # Revisión completa del libro de saldos cada cierto tiempo: se recalcula en un hilo de trabajo y
+        # se corrige en este, el mismo que registra los movimientos
+        self._timer_conciliacion = QTimer(self)
+        self._timer_conciliacion.timeout.connect(self.conciliar_saldos)
+        self._timer_conciliacion.start(CONCILIACION_MS)
     
     def init_ui(self):
         # Creamos el widget central real
@@ -382,16 +303,7 @@ class PacienteWindow(QMainWindow):
         title = QLabel("🏥 Sistema de Gestión de Pacientes")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setFont(QFont("Segoe UI", 16, QFont.Weight.Bold))
-        title.setStyleSheet(f"""
-            QLabel {{
-                color: {self.colors['text_light']};
-                background-color: {self.colors['surface']};
-                border: 3px solid {self.colors['accent']};
-                border-radius: 12px;
-                padding: 20px;
-                margin: 10px;
-            }}
-        """)
+        title.setObjectName("titulo")
         main_layout.addWidget(title)
         
         # Información del paciente
@@ -430,15 +342,7 @@ class PacienteWindow(QMainWindow):
         
         self.crear_btn = QPushButton("👤 Crear Paciente")
         self.crear_btn.clicked.connect(self.crear_paciente)
-        self.crear_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {self.colors['accent']};
-                min-height: 45px;
-            }}
-            QPushButton:hover {{
-                background-color: {self.colors['secondary']};
-            }}
-        """)
+        self.crear_btn.setObjectName("botonPrincipal")
         
         self.agregar_tratamiento_btn = QPushButton("🩺 Agregar Tratamiento")
         self.agregar_tratamiento_btn.clicked.connect(self.agregar_tratamiento)
@@ -463,15 +367,7 @@ class PacienteWindow(QMainWindow):
         # Botón para mostrar todos los historiales
         self.mostrar_todos_btn = QPushButton("📚 Todos los Historiales")
         self.mostrar_todos_btn.clicked.connect(self.mostrar_todos_historiales)
-        self.mostrar_todos_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: #9b59b6;
-                min-height: 45px;
-            }}
-            QPushButton:hover {{
-                background-color: #8e44ad;
-            }}
-        """)
+        self.mostrar_todos_btn.setObjectName("botonDestacado")
         
         buttons_row2.addWidget(self.consultar_historial_btn)
         buttons_row2.addWidget(self.mostrar_info_btn)
@@ -487,7 +383,7 @@ class PacienteWindow(QMainWindow):
         # Área de resultados con estilo mejorado y scroll bar
         resultado_label = QLabel("📊 Resultados:")
         resultado_label.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
-        resultado_label.setStyleSheet(f"color: {self.colors['accent']};")
+        resultado_label.setObjectName("etiquetaResultados")
         main_layout.addWidget(resultado_label)
         
         self.resultado_text = QTextEdit()
@@ -499,80 +395,7 @@ class PacienteWindow(QMainWindow):
         self.resultado_text.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.resultado_text.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
-        # Estilo mejorado para el área de texto y scroll bars
-        self.resultado_text.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 2px solid {self.colors['secondary']};
-                border-radius: 8px;
-                padding: 15px;
-            }}
-            
-            QScrollBar:vertical {{
-                background-color: #3c3c3c;
-                width: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }}
-            
-            QScrollBar::handle:vertical {{
-                background-color: {self.colors['secondary']};
-                border-radius: 6px;
-                min-height: 20px;
-                margin: 2px;
-            }}
-            
-            QScrollBar::handle:vertical:hover {{
-                background-color: {self.colors['accent']};
-            }}
-            
-            QScrollBar::handle:vertical:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                border: none;
-                background: none;
-                height: 0px;
-            }}
-            
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{
-                background: none;
-            }}
-            
-            QScrollBar:horizontal {{
-                background-color: #3c3c3c;
-                height: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }}
-            
-            QScrollBar::handle:horizontal {{
-                background-color: {self.colors['secondary']};
-                border-radius: 6px;
-                min-width: 20px;
-                margin: 2px;
-            }}
-            
-            QScrollBar::handle:horizontal:hover {{
-                background-color: {self.colors['accent']};
-            }}
-            
-            QScrollBar::handle:horizontal:pressed {{
-                background-color: {self.colors['primary']};
-            }}
-            
-            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
-                border: none;
-                background: none;
-                width: 0px;
-            }}
-            
-            QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {{
-                background: none;
-            }}
-        """)
+        self.resultado_text.setObjectName("resultados")  # Estilo del área y sus scroll bars en Tema.py
         
         # Configurar el comportamiento del scroll
         self.resultado_text.setLineWrapMode(QTextEdit.LineWrapMode.WidgetWidth)
@@ -582,17 +405,15 @@ class PacienteWindow(QMainWindow):
     
     def validar_email(self, email: str) -> bool:
         """Valida el formato del email"""
-        patron = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(patron, email) is not None
+        return validar_correo(email)
     
     def validar_dui(self, dui: str) -> bool:
         """Valida el formato del DUI (########-#)"""
-        patron = r'^\d{8}-\d{1}$'
-        return re.match(patron, dui) is not None
+        return validar_dui(dui)
     
     def validar_telefono(self, telefono: str) -> bool:
         """Valida que el teléfono tenga al menos 8 dígitos"""
-        return telefono.isdigit() and len(telefono) >= 8
+        return validar_telefono(telefono)
     
     def limpiar_campos(self):
         """Limpia todos los campos de entrada para agregar un nuevo paciente"""
@@ -610,82 +431,29 @@ class PacienteWindow(QMainWindow):
     def crear_paciente(self):
         """Crea un nuevo paciente con los datos ingresados"""
         try:
-            nombre = self.nombre_edit.text().strip().title()
-            apellido = self.apellido_edit.text().strip().title()
-            edad = self.edad_edit.value()
-            dui = self.dui_edit.text().strip()
-            telefono_str = self.telefono_edit.text().strip()
-            correo = self.correo_edit.text().strip().lower()
-            saldo_pendiente = self.saldo_edit.value()
-            
-            # Validaciones básicas
-            if not all([nombre, apellido, dui]):
-                QMessageBox.warning(self, "❌ Error", "Nombre, Apellido y DUI son campos obligatorios")
+            try:
+                nuevo_paciente = self.controlador.crear_paciente(
+                    self.nombre_edit.text(), self.apellido_edit.text(), self.edad_edit.value(),
+                    self.dui_edit.text(), self.telefono_edit.text(), self.correo_edit.text(),
+                    self.saldo_edit.value())
+            except ErrorValidacion as e:
+                QMessageBox.warning(self, e.titulo, str(e))
                 return
             
-            # Validación DUI
-            if not self.validar_dui(dui):
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El DUI debe tener el formato: 12345678-9")
-                return
-            
-            # Verificar si ya existe un paciente con el mismo DUI
-            for paciente in self.pacientes_registrados:
-                if paciente['dui'] == dui:
-                    QMessageBox.warning(self, "❌ Error", 
-                                      f"Ya existe un paciente registrado con el DUI: {dui}")
-                    return
-            
-            # Validación teléfono
-            if telefono_str and not self.validar_telefono(telefono_str):
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El teléfono debe contener al menos 8 dígitos")
-                return
-            
-            telefono = int(telefono_str) if telefono_str else 0
-            
-            # Validación email
-            if correo and not self.validar_email(correo):
-                QMessageBox.warning(self, "❌ Error de Formato", 
-                                  "El email no tiene un formato válido")
-                return
-            
-            # Validación edad
-            if edad <= 0:
-                QMessageBox.warning(self, "❌ Error", "La edad debe ser mayor a 0")
-                return
-            
-            # Crear datos del nuevo paciente
-            nuevo_paciente = {
-                'nombre': nombre,
-                'apellido': apellido,
-                'edad': edad,
-                'dui': dui,
-                'telefono': telefono,
-                'correo': correo,
-                'saldo_pendiente': saldo_pendiente,
-                'historial_medico': [],
-                'citas': [],
-                'fecha_registro': datetime.now().strftime('%d/%m/%Y - %H:%M:%S')
-            }
-            
-            # Agregar a la lista de pacientes registrados
-            self.pacientes_registrados.append(nuevo_paciente)
-            
             # Establecer como paciente actual
-            self.nombre = nombre
-            self.apellido = apellido
-            self.edad = edad
-            self.dui = dui
-            self.telefono = telefono
-            self.correo = correo
-            self.saldo_pendiente = saldo_pendiente
+            self.nombre = nuevo_paciente['nombre']
+            self.apellido = nuevo_paciente['apellido']
+            self.edad = nuevo_paciente['edad']
+            self.dui = nuevo_paciente['dui']
+            self.telefono = nuevo_paciente['telefono']
+            self.correo = nuevo_paciente['correo']
+            self.saldo_pendiente = nuevo_paciente['saldo_pendiente']
             self.historial_medico = []
             self.citas = []
             
             # Mostrar mensaje de éxito
             QMessageBox.information(self, "✅ Éxito", 
-                                  f"Paciente {nombre} {apellido} creado exitosamente.\n\n"
+                                  f"Paciente {self.nombre} {self.apellido} creado exitosamente.\n\n"
                                   f"Total de pacientes registrados: {len(self.pacientes_registrados)}")
             
             # Mostrar información del paciente creado
@@ -698,130 +466,62 @@ class PacienteWindow(QMainWindow):
             QMessageBox.warning(self, "❌ Error", f"Error en el formato de los datos: {str(e)}")
     
     def mostrar_todos_historiales(self):
-        """Muestra todos los historiales de los pacientes registrados"""
+        """
+        Muestra todos los historiales de los pacientes registrados.
+        El reporte se arma en segundo plano y se escribe por bloques de pacientes a medida que llega;
+        si se presiona el botón mientras se genera, se detiene.
+        """
+        if self._tarea_reporte is not None:
+            self.cancelar_historiales()
+            return
+
         if not self.pacientes_registrados:
             QMessageBox.information(self, "ℹ️ Información", 
                                   "No hay pacientes registrados en el sistema.")
             return
         
-        historial_completo = self._generar_historial_todos_pacientes()
-        self.resultado_text.setText(historial_completo)
-    
-    def _generar_historial_todos_pacientes(self) -> str:
-        """Genera el historial de todos los pacientes registrados"""
-        separador_principal = "=" * 80
-        separador_paciente = "-" * 60
-        
-        historial = f"""
-{separador_principal}
-🏥 HISTORIALES MÉDICOS COMPLETOS - CLÍNICA DENTAL
-{separador_principal}
-
-📊 RESUMEN GENERAL:
-   ▪ Total de Pacientes Registrados: {len(self.pacientes_registrados)}
-   ▪ Fecha de Consulta: {datetime.now().strftime('%d/%m/%Y - %H:%M:%S')}
-
-{separador_principal}
-"""
-        
-        # Mostrar cada paciente
-        for i, paciente in enumerate(self.pacientes_registrados, 1):
-            total_tratamientos = sum(t.costo for t in paciente['historial_medico'])
-            total_citas = sum(c.costo_cita for c in paciente['citas'])
-            
-            historial += f"""
-{separador_paciente}
-👤 PACIENTE #{i:02d}: {paciente['nombre']} {paciente['apellido']}
-{separador_paciente}
-
-📋 INFORMACIÓN PERSONAL:
-   ▪ Nombre Completo: {paciente['nombre']} {paciente['apellido']}
-   ▪ Edad: {paciente['edad']} años
-   ▪ DUI: {paciente['dui']}
-   ▪ Teléfono: {self._formatear_telefono_static(paciente['telefono'])}
-   ▪ Correo: {paciente['correo'] if paciente['correo'] else 'No especificado'}
-   ▪ Fecha de Registro: {paciente['fecha_registro']}
+        self.resultado_text.clear()
+        # Se envía una copia de la lista y de los totales para no leerlos mientras la ventana los cambia
+        # Cada callback lleva su tarea: las señales que llegan tarde de un reporte detenido se ignoran.
+        # Corren en este hilo después de que enviar() devuelve, así que `tarea` ya tiene valor.
+        tarea = self._tarea_reporte = self.tareas.enviar(
+            _generar_historiales, list(self.pacientes_registrados), self.estadisticas.copia(),
+            con_control=True, nombre="historiales",
+            al_progresar=lambda porcentaje, bloque: self._renderizar_bloque_historial(tarea, porcentaje, bloque),
+            al_terminar=lambda _: self._terminar_historiales(tarea),
+            al_cancelar=lambda: self._terminar_historiales(tarea),
+            al_fallar=lambda error: self._error_historiales(tarea, error))
+        self.mostrar_todos_btn.setText("⏹️ Detener Historiales")
 
-💰 INFORMACIÓN FINANCIERA:
-   ▪ Saldo Pendiente: ${paciente['saldo_pendiente']:,.2f}
-   ▪ Total Tratamientos: ${total_tratamientos:,.2f}
-   ▪ Total Citas: ${total_citas:,.2f}
-   ▪ Balance Total: ${(total_tratamientos + total_citas + paciente['saldo_pendiente']):,.2f}
+    def _renderizar_bloque_historial(self, tarea, porcentaje: int, bloque: str):
+        """Escribe el siguiente bloque de pacientes del reporte en el área de resultados"""
+        if tarea is not self._tarea_reporte:
+            return
+        cursor = QTextCursor(self.resultado_text.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(bloque)
+        self.mostrar_todos_btn.setText(f"⏹️ Detener Historiales ({porcentaje}%)")
 
-🩺 TRATAMIENTOS ({len(paciente['historial_medico'])}):
-"""
-            
-            if not paciente['historial_medico']:
-                historial += "   📝 No hay tratamientos registrados.\n"
-            else:
-                for j, tratamiento in enumerate(paciente['historial_medico'], 1):
-                    estado_icon = self._get_estado_icon(tratamiento.estado)
-                    historial += f"""   {j}. {tratamiento.descripcion}
-      💵 ${tratamiento.costo:,.2f} | 📅 {tratamiento.fecha_realizacion}
-      {estado_icon} {tratamiento.estado} | 👨‍⚕️ Dr. {tratamiento.doctor.nombre} {tratamiento.doctor.apellido}
-"""
-            
-            historial += f"""
-📅 CITAS ({len(paciente['citas'])}):
-"""
-            
-            if not paciente['citas']:
-                historial += "   📝 No hay citas programadas.\n"
-            else:
-                for j, cita in enumerate(paciente['citas'], 1):
-                    estado_icon = self._get_estado_icon(cita.estado)
-                    historial += f"""   {j}. ID: {cita.id_cita}
-      ⏰ {cita.hora_inicio} - {cita.hora_fin}
-      💵 ${cita.costo_cita:,.2f} | {estado_icon} {cita.estado}
-      👨‍⚕️ Dr. {cita.doctor.nombre} {cita.doctor.apellido}
-"""
-            
-            historial += "\n"
-        
-        # Resumen general
-        total_pacientes = len(self.pacientes_registrados)
-        total_tratamientos_general = sum(len(p['historial_medico']) for p in self.pacientes_registrados)
-        total_citas_general = sum(len(p['citas']) for p in self.pacientes_registrados)
-        total_dinero_tratamientos = sum(sum(t.costo for t in p['historial_medico']) for p in self.pacientes_registrados)
-        total_dinero_citas = sum(sum(c.costo_cita for c in p['citas']) for p in self.pacientes_registrados)
-        total_saldos_pendientes = sum(p['saldo_pendiente'] for p in self.pacientes_registrados)
-        
-        historial += f"""
-{separador_principal}
-📈 ESTADÍSTICAS GENERALES DE LA CLÍNICA
-{separador_principal}
+    def cancelar_historiales(self):
+        """Detiene la generación del reporte de todos los pacientes"""
+        if self._tarea_reporte is None:
+            return
+        self._tarea_reporte.cancelar()
+        self._terminar_historiales(self._tarea_reporte)
+        self.resultado_text.append("\n⏹️ Reporte detenido por el usuario.")
 
-👥 PACIENTES:
-   ▪ Total de Pacientes: {total_pacientes}
-   
-🩺 TRATAMIENTOS:
-   ▪ Total de Tratamientos: {total_tratamientos_general}
-   ▪ Ingresos por Tratamientos: ${total_dinero_tratamientos:,.2f}
-   
-📅 CITAS:
-   ▪ Total de Citas: {total_citas_general}
-   ▪ Ingresos por Citas: ${total_dinero_citas:,.2f}
-   
-💰 FINANCIERO:
-   ▪ Saldos Pendientes: ${total_saldos_pendientes:,.2f}
-   ▪ Ingresos Totales: ${(total_dinero_tratamientos + total_dinero_citas):,.2f}
-   ▪ Balance General: ${(total_dinero_tratamientos + total_dinero_citas + total_saldos_pendientes):,.2f}
+    def _error_historiales(self, tarea, error: Exception):
+        if tarea is not self._tarea_reporte:
+            return
+        self._terminar_historiales(tarea)
+        QMessageBox.warning(self, "❌ Error", f"No se pudo generar el reporte: {error}")
 
-{separador_principal}
-"""
-        return historial
-    
-    def _formatear_telefono_static(self, telefono: int) -> str:
-        """Formatea el número de teléfono para mejor presentación (versión estática)"""
-        if telefono == 0:
-            return "No especificado"
-        
-        telefono_str = str(telefono)
-        if len(telefono_str) == 8:
-            return f"{telefono_str[:4]}-{telefono_str[4:]}"
-        elif len(telefono_str) >= 8:
-            return f"+503 {telefono_str[-8:-4]}-{telefono_str[-4:]}"
-        return telefono_str
+    def _terminar_historiales(self, tarea):
+        if tarea is not self._tarea_reporte:
+            return
+        self._tarea_reporte = None
+        self.mostrar_todos_btn.setText("📚 Todos los Historiales")
+        self.statusBar().showMessage(self.tareas.resumen(), 10000)
     
     def agregar_tratamiento(self):
         """Abre un diálogo para agregar un tratamiento"""
@@ -835,10 +535,8 @@ class PacienteWindow(QMainWindow):
             self.historial_medico.append(tratamiento)
             
             # Actualizar también en la lista de pacientes registrados
-            for paciente in self.pacientes_registrados:
-                if paciente['dui'] == self.dui:
-                    paciente['historial_medico'].append(tratamiento)
-                    break
+            if self.dui in self.pacientes_registrados:
+                self.controlador.agregar_tratamiento_paciente(self.dui, tratamiento)
             
             QMessageBox.information(self, "✅ Éxito", "Tratamiento agregado exitosamente")
     
@@ -854,22 +552,52 @@ class PacienteWindow(QMainWindow):
             self.citas.append(cita)
             
             # Actualizar también en la lista de pacientes registrados
-            for paciente in self.pacientes_registrados:
-                if paciente['dui'] == self.dui:
-                    paciente['citas'].append(cita)
-                    break
+            if self.dui in self.pacientes_registrados:
+                self.controlador.agregar_cita_paciente(self.dui, cita)
             
             QMessageBox.information(self, "✅ Éxito", "Cita agregada exitosamente")
     
     def consultar_historial(self):
-        """Consulta y muestra el historial médico del paciente"""
+        """Consulta y muestra el historial médico del paciente (se arma en segundo plano)"""
         if not self.nombre:
             QMessageBox.warning(self, "❌ Error", "Debe crear un paciente primero")
             return
         
-        historial = self._generar_historial_detallado()
-        self.resultado_text.setText(historial)
+        self.resultado_text.setText("⏳ Generando historial...")
+        # El hilo de trabajo recibe copias: la ventana sigue agregando tratamientos y citas mientras tanto
+        # Los callbacks corren en este hilo después de que enviar() devuelve, así que `tarea` ya tiene valor
+        tarea = self._tarea_historial = self.tareas.enviar(
+            _generar_historial_detallado, self.nombre, self.apellido, list(self.historial_medico),
+            list(self.citas), self._resumen_financiero(), nombre="historial_paciente",
+            al_terminar=lambda texto: self._mostrar_historial(tarea, texto),
+            al_fallar=lambda error: self._error_historial(tarea, error))
+    
+    def _mostrar_historial(self, tarea, texto: str):
+        if tarea is self._tarea_historial:      # Una consulta anterior que terminó tarde no pisa la última
+            self._tarea_historial = None
+            self.resultado_text.setText(texto)
     
+    def _error_historial(self, tarea, error: Exception):
+        if tarea is self._tarea_historial:
+            self._tarea_historial = None
+            self.resultado_text.setText(f"❌ Error al generar el historial: {error}")
+    
+    def conciliar_saldos(self):
+        """Recalcula los saldos desde una copia de las listas en segundo plano; _aplicar_conciliacion corrige"""
+        self.tareas.enviar(self.controlador.preparar_conciliacion, *self.controlador.instantanea_saldos(),
+                           nombre="conciliacion_saldos", al_terminar=self._aplicar_conciliacion,
+                           al_fallar=lambda e: self.statusBar().showMessage(f"❌ Error al conciliar saldos: {e}", 10000))
+
+    def _aplicar_conciliacion(self, preparada):
+        """Compara el libro de saldos con lo recalculado y corrige lo que no cuadre"""
+        resumen = self.saldos.aplicar_conciliacion(preparada)
+        if resumen is None:
+            # Hubo movimientos mientras se recalculaba: se vuelve a intentar con una copia nueva
+            QTimer.singleShot(CONCILIACION_REINTENTO_MS, self.conciliar_saldos)
+            return
+        if not resumen.cuadra:
+            self.statusBar().showMessage(f"🧮 Se corrigieron {len(resumen.diferencias)} saldos que no cuadraban", 10000)
+
     def mostrar_info_paciente(self):
         """Muestra la información básica del paciente"""
         if not self.nombre:
@@ -881,6 +609,7 @@ class PacienteWindow(QMainWindow):
     def _generar_info_completa(self) -> str:
         """Genera la información completa del paciente con formato mejorado"""
         separador = "=" * 60
+        saldo = self.saldos.saldo(self.dui)
         info = f"""
 {separador}
 🏥 INFORMACIÓN DEL PACIENTE - CLÍNICA DENTAL
@@ -894,8 +623,8 @@ class PacienteWindow(QMainWindow):
    ▪ Correo Electrónico: {self.correo if self.correo else 'No especificado'}
 
 💰 INFORMACIÓN FINANCIERA:
-   ▪ Saldo Pendiente: ${self.saldo_pendiente:,.2f}
-   ▪ Estado: {'🔴 Pendiente de pago' if self.saldo_pendiente > 0 else '🟢 Al día'}
+   ▪ Saldo Pendiente: ${saldo:,.2f}
+   ▪ Estado: {'🔴 Pendiente de pago' if saldo > 0 else '🟢 Al día'}
 
 📊 RESUMEN MÉDICO:
    ▪ Tratamientos Realizados: {len(self.historial_medico)}
@@ -908,117 +637,26 @@ class PacienteWindow(QMainWindow):
 """
         return info
     
-    def _generar_historial_detallado(self) -> str:
-        """Genera el historial médico detallado con formato mejorado"""
-        separador_principal = "=" * 60
-        separador_seccion = "-" * 40
-        
-        historial = f"""
-{separador_principal}
-📋 HISTORIAL MÉDICO COMPLETO
-{separador_principal}
-
-👤 Paciente: {self.nombre} {self.apellido}
-📅 Fecha de Consulta: {datetime.now().strftime('%d/%m/%Y - %H:%M:%S')}
-
-{separador_seccion}
-🩺 TRATAMIENTOS REALIZADOS ({len(self.historial_medico)})
-{separador_seccion}
-"""
-        
-        if not self.historial_medico:
-            historial += "\n   📝 No hay tratamientos registrados en el historial.\n"
-        else:
-            for i, tratamiento in enumerate(self.historial_medico, 1):
-                estado_icon = self._get_estado_icon(tratamiento.estado)
-                historial += f"""
-   ┌─ Tratamiento #{i:02d}
-   │ 🆔 ID: {tratamiento.id_tratamiento}
-   │ 📄 Descripción: {tratamiento.descripcion}
-   │ 💵 Costo: ${tratamiento.costo:,.2f}
-   │ 📅 Fecha: {tratamiento.fecha_realizacion}
-   │ {estado_icon} Estado: {tratamiento.estado}
-   │ 👨‍⚕️ Doctor: Dr. {tratamiento.doctor.nombre} {tratamiento.doctor.apellido}
-   └─────────────────────────────────────────────────
-"""
-        
-        historial += f"""
-{separador_seccion}
-📅 CITAS PROGRAMADAS ({len(self.citas)})
-{separador_seccion}
-"""
-        
-        if not self.citas:
-            historial += "\n   📝 No hay citas programadas.\n"
-        else:
-            for i, cita in enumerate(self.citas, 1):
-                estado_icon = self._get_estado_icon(cita.estado)
-                historial += f"""
-   ┌─ Cita #{i:02d}
-   │ 🆔 ID: {cita.id_cita}
-   │ ⏰ Inicio: {cita.hora_inicio}
-   │ ⏰ Fin: {cita.hora_fin}
-   │ 💵 Costo: ${cita.costo_cita:,.2f}
-   │ {estado_icon} Estado: {cita.estado}
-   │ 👨‍⚕️ Doctor: Dr. {cita.doctor.nombre} {cita.doctor.apellido}
-   └─────────────────────────────────────────────────
-"""
-        
-        # Resumen financiero
-        total_tratamientos = self._calcular_total_tratamientos()
-        total_citas = self._calcular_total_citas()
-        total_general = total_tratamientos + total_citas
-        
-        historial += f"""
-{separador_seccion}
-💰 RESUMEN FINANCIERO
-{separador_seccion}
-
-   📊 Estadísticas:
-   ▪ Total de Tratamientos: {len(self.historial_medico)} - ${total_tratamientos:,.2f}
-   ▪ Total de Citas: {len(self.citas)} - ${total_citas:,.2f}
-   ▪ Subtotal General: ${total_general:,.2f}
-   ▪ Saldo Pendiente: ${self.saldo_pendiente:,.2f}
-   
-   💳 Balance Final: ${(total_general + self.saldo_pendiente):,.2f}
-
-{separador_principal}
-"""
-        return historial
+    def _resumen_financiero(self) -> tuple:
+        """(tratamientos, citas, saldo anterior, pagos, balance) del paciente según el libro de saldos"""
+        return (self._calcular_total_tratamientos(), self._calcular_total_citas(),
+                self.saldos.saldo_anterior(self.dui), self.saldos.total_pagos(self.dui), self.saldos.saldo(self.dui))
     
     def _formatear_telefono(self) -> str:
         """Formatea el número de teléfono para mejor presentación"""
-        if self.telefono == 0:
-            return "No especificado"
-        
-        telefono_str = str(self.telefono)
-        if len(telefono_str) == 8:
-            return f"{telefono_str[:4]}-{telefono_str[4:]}"
-        elif len(telefono_str) >= 8:
-            return f"+503 {telefono_str[-8:-4]}-{telefono_str[-4:]}"
-        return telefono_str
+        return formatear_telefono(self.telefono)
     
     def _get_estado_icon(self, estado: str) -> str:
         """Devuelve un icono basado en el estado"""
-        estado_lower = estado.lower()
-        if 'completado' in estado_lower or 'finalizado' in estado_lower:
-            return "✅"
-        elif 'pendiente' in estado_lower or 'programado' in estado_lower:
-            return "⏳"
-        elif 'cancelado' in estado_lower:
-            return "❌"
-        elif 'en proceso' in estado_lower or 'activo' in estado_lower:
-            return "🔄"
-        else:
-            return "📋"
+        return icono_estado(estado)
     
-    def _calcular_total_tratamientos(self) -> float:
-        """Calcula el costo total de todos los tratamientos"""
-        return sum(tratamiento.costo for tratamiento in self.historial_medico)
+    def _calcular_total_tratamientos(self) -> Decimal:
+        """Costo total de los tratamientos, ya sumado en el libro de saldos"""
+        return self.saldos.total_tratamientos(self.dui)
     
-    def _calcular_total_citas(self) -> float:
-        """Calcula el costo total de todas las citas"""
-        return sum(cita.costo_cita for cita in self.citas)
+    def _calcular_total_citas(self) -> Decimal:
+        """Costo total de las citas, ya sumado en el libro de saldos"""
+        return self.saldos.total_citas(self.dui)
     
     def __str__(self):
         """Representación en cadena del paciente con formato mejorado"""
@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class ClaveDuplicadaError(ValueError):
+    """Se lanza cuando un registro repite un valor que debe ser único (DUI, correo...)"""
+    def __init__(self, campo: str, valor):
+        super().__init__(f"Ya existe un registro con {campo}: {valor}")
+        self.campo = campo
+        self.valor = valor
+
+
+class RegistroUnico:
+    """
+    Registro de personas (pacientes o doctores guardados como diccionarios) con índices únicos.
+    El primer campo es la clave principal (el DUI); los demás se validan como únicos solo si
+    traen valor, porque el correo es opcional.
+    """
+    def __init__(self, campos_unicos: Sequence[str] = ('dui', 'correo')):
+        self.campo_clave = campos_unicos[0]
+        self.campos_unicos = tuple(campos_unicos)
+        self._indices: Dict[str, Dict[object, dict]] = {campo: {} for campo in self.campos_unicos}
+
+    def __len__(self):
+        return len(self._indices[self.campo_clave])
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(list(self._indices[self.campo_clave].values()))
+
+    def __contains__(self, clave) -> bool:
+        return clave in self._indices[self.campo_clave]
+
+    def obtener(self, clave) -> Optional[dict]:
+        """Busca un registro por su clave principal (DUI)"""
+        return self._indices[self.campo_clave].get(clave)
+
+    def buscar(self, campo: str, valor) -> Optional[dict]:
+        """Busca un registro por cualquiera de los campos únicos"""
+        return self._indices[campo].get(valor)
+
+    def conflicto(self, registro: dict, ignorar: Optional[dict] = None) -> Optional[Tuple[str, object]]:
+        """Devuelve (campo, valor) del primer campo único que ya está ocupado por otro registro"""
+        for campo in self.campos_unicos:
+            valor = registro.get(campo)
+            if campo != self.campo_clave and not valor:
+                continue
+            existente = self._indices[campo].get(valor)
+            if existente is not None and existente is not ignorar:
+                return campo, valor
+        return None
+
+    def _indexar(self, registro: dict):
+        for campo in self.campos_unicos:
+            valor = registro.get(campo)
+            if campo == self.campo_clave or valor:
+                self._indices[campo][valor] = registro
+
+    def _desindexar(self, registro: dict):
+        for campo in self.campos_unicos:
+            valor = registro.get(campo)
+            if self._indices[campo].get(valor) is registro:
+                del self._indices[campo][valor]
+
+    def agregar(self, registro: dict):
+        """Agrega un registro; lanza ClaveDuplicadaError si repite un campo único"""
+        if not registro.get(self.campo_clave):
+            raise ValueError(f"El campo {self.campo_clave} es obligatorio")
+        choque = self.conflicto(registro)
+        if choque:
+            raise ClaveDuplicadaError(*choque)
+        self._indexar(registro)
+
+    def agregar_lote(self, registros: Iterable[dict]) -> Tuple[int, List[Tuple[dict, ClaveDuplicadaError]]]:
+        """
+        Carga masiva: agrega todos los registros válidos y devuelve (agregados, rechazados).
+        Los duplicados dentro del mismo lote también se rechazan.
+        """
+        agregados = 0
+        rechazados = []
+        for registro in registros:
+            try:
+                self.agregar(registro)
+                agregados += 1
+            except ClaveDuplicadaError as e:
+                rechazados.append((registro, e))
+        return agregados, rechazados
+
+    def actualizar(self, clave, cambios: dict) -> dict:
+        """Modifica un registro existente manteniendo los índices; lanza ClaveDuplicadaError si hay choque"""
+        registro = self._indices[self.campo_clave].get(clave)
+        if registro is None:
+            raise KeyError(clave)
+        nuevo = {**registro, **cambios}
+        choque = self.conflicto(nuevo, ignorar=registro)
+        if choque:
+            raise ClaveDuplicadaError(*choque)
+        self._desindexar(registro)
+        registro.update(cambios)
+        self._indexar(registro)
+        return registro
+
+    def eliminar(self, clave) -> Optional[dict]:
+        """Quita un registro por su clave principal y lo devuelve"""
+        registro = self._indices[self.campo_clave].get(clave)
+        if registro is not None:
+            self._desindexar(registro)
+        return registro
+
+
+def main():
+    # Tiempo de alta con 50,000 pacientes (la consistencia de los índices se prueba en tests/test_registro_unico.py)
+    import time
+
+    registro = RegistroUnico()
+    inicio = time.perf_counter()
+    agregados, rechazados = registro.agregar_lote(
+        {'dui': f"{i:08d}-{i % 10}", 'correo': f"paciente{i}@correo.com"} for i in range(50_000))
+    print(f"Carga masiva: {agregados} agregados, {len(rechazados)} rechazados "
+          f"en {time.perf_counter() - inicio:.3f} s")
+
+    inicio = time.perf_counter()
+    registro.agregar({'dui': "99999999-9", 'correo': "nuevo@correo.com"})
+    print(f"Alta del paciente {len(registro):,}: {(time.perf_counter() - inicio) * 1e6:.1f} µs")
+
+    # Duplicados por DUI y por correo
+    for duplicado in ({'dui': "00000001-1", 'correo': ""}, {'dui': "12121212-1", 'correo': "paciente2@correo.com"}):
+        try:
+            registro.agregar(duplicado)
+            raise AssertionError("Se aceptó un duplicado")
+        except ClaveDuplicadaError as e:
+            print(f"Rechazado: {e}")
+
+
+if __name__ == "__main__":
+    main()
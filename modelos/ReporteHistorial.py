@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from EstadisticasClinica import EstadisticasClinica, totales_paciente
+
+SEPARADOR_PRINCIPAL = "=" * 80
+SEPARADOR_PACIENTE = "-" * 60
+
+
+def formatear_telefono(telefono: int) -> str:
+    """Formatea el número de teléfono para mejor presentación"""
+    if telefono == 0:
+        return "No especificado"
+
+    telefono_str = str(telefono)
+    if len(telefono_str) == 8:
+        return f"{telefono_str[:4]}-{telefono_str[4:]}"
+    elif len(telefono_str) >= 8:
+        return f"+503 {telefono_str[-8:-4]}-{telefono_str[-4:]}"
+    return telefono_str
+
+
+def icono_estado(estado: str) -> str:
+    """Devuelve un icono basado en el estado"""
+    estado_lower = estado.lower()
+    if 'completado' in estado_lower or 'finalizado' in estado_lower:
+        return "✅"
+    elif 'pendiente' in estado_lower or 'programado' in estado_lower:
+        return "⏳"
+    elif 'cancelado' in estado_lower:
+        return "❌"
+    elif 'en proceso' in estado_lower or 'activo' in estado_lower:
+        return "🔄"
+    else:
+        return "📋"
+
+
+def encabezado_historial(total_pacientes: int) -> str:
+    return f"""
+{SEPARADOR_PRINCIPAL}
+🏥 HISTORIALES MÉDICOS COMPLETOS - CLÍNICA DENTAL
+{SEPARADOR_PRINCIPAL}
+
+📊 RESUMEN GENERAL:
+   ▪ Total de Pacientes Registrados: {total_pacientes}
+   ▪ Fecha de Consulta: {datetime.now().strftime('%d/%m/%Y - %H:%M:%S')}
+
+{SEPARADOR_PRINCIPAL}
+"""
+
+
+def seccion_paciente(i: int, paciente: dict, totales=None) -> str:
+    """Arma la sección del reporte de un paciente (dict de PacienteWindow)"""
+    total_tratamientos, total_citas = totales if totales is not None else totales_paciente(paciente)
+
+    partes = [f"""
+{SEPARADOR_PACIENTE}
+👤 PACIENTE #{i:02d}: {paciente['nombre']} {paciente['apellido']}
+{SEPARADOR_PACIENTE}
+
+📋 INFORMACIÓN PERSONAL:
+   ▪ Nombre Completo: {paciente['nombre']} {paciente['apellido']}
+   ▪ Edad: {paciente['edad']} años
+   ▪ DUI: {paciente['dui']}
+   ▪ Teléfono: {formatear_telefono(paciente['telefono'])}
+   ▪ Correo: {paciente['correo'] if paciente['correo'] else 'No especificado'}
+   ▪ Fecha de Registro: {paciente['fecha_registro']}
+
+💰 INFORMACIÓN FINANCIERA:
+   ▪ Saldo Pendiente: ${paciente['saldo_pendiente']:,.2f}
+   ▪ Total Tratamientos: ${total_tratamientos:,.2f}
+   ▪ Total Citas: ${total_citas:,.2f}
+   ▪ Balance Total: ${(total_tratamientos + total_citas + paciente['saldo_pendiente']):,.2f}
+
+🩺 TRATAMIENTOS ({len(paciente['historial_medico'])}):
+"""]
+
+    if not paciente['historial_medico']:
+        partes.append("   📝 No hay tratamientos registrados.\n")
+    else:
+        for j, tratamiento in enumerate(paciente['historial_medico'], 1):
+            estado_icon = icono_estado(tratamiento.estado)
+            partes.append(f"""   {j}. {tratamiento.descripcion}
+      💵 ${tratamiento.costo:,.2f} | 📅 {tratamiento.fecha_realizacion}
+      {estado_icon} {tratamiento.estado} | 👨‍⚕️ Dr. {tratamiento.doctor.nombre} {tratamiento.doctor.apellido}
+""")
+
+    partes.append(f"""
+📅 CITAS ({len(paciente['citas'])}):
+""")
+
+    if not paciente['citas']:
+        partes.append("   📝 No hay citas programadas.\n")
+    else:
+        for j, cita in enumerate(paciente['citas'], 1):
+            estado_icon = icono_estado(cita.estado)
+            partes.append(f"""   {j}. ID: {cita.id_cita}
+      ⏰ {cita.hora_inicio} - {cita.hora_fin}
+      💵 ${cita.costo_cita:,.2f} | {estado_icon} {cita.estado}
+      👨‍⚕️ Dr. {cita.doctor.nombre} {cita.doctor.apellido}
+""")
+
+    partes.append("\n")
+    return "".join(partes)
+
+
+def resumen_historial(estadisticas: EstadisticasClinica) -> str:
+    """Estadísticas generales al final del reporte"""
+    total_pacientes = estadisticas.total_pacientes
+    total_tratamientos_general = estadisticas.total_tratamientos
+    total_citas_general = estadisticas.total_citas
+    total_dinero_tratamientos = estadisticas.dinero_tratamientos
+    total_dinero_citas = estadisticas.dinero_citas
+    total_saldos_pendientes = estadisticas.saldos_pendientes
+
+    return f"""
+{SEPARADOR_PRINCIPAL}
+📈 ESTADÍSTICAS GENERALES DE LA CLÍNICA
+{SEPARADOR_PRINCIPAL}
+
+👥 PACIENTES:
+   ▪ Total de Pacientes: {total_pacientes}
+
+🩺 TRATAMIENTOS:
+   ▪ Total de Tratamientos: {total_tratamientos_general}
+   ▪ Ingresos por Tratamientos: ${total_dinero_tratamientos:,.2f}
+
+📅 CITAS:
+   ▪ Total de Citas: {total_citas_general}
+   ▪ Ingresos por Citas: ${total_dinero_citas:,.2f}
+
+💰 FINANCIERO:
+   ▪ Saldos Pendientes: ${total_saldos_pendientes:,.2f}
+   ▪ Ingresos Totales: ${(total_dinero_tratamientos + total_dinero_citas):,.2f}
+   ▪ Balance General: ${(total_dinero_tratamientos + total_dinero_citas + total_saldos_pendientes):,.2f}
+
+{SEPARADOR_PRINCIPAL}
+"""
+
+
+def secciones_historial(pacientes: Iterable[dict],
+                        estadisticas: Optional[EstadisticasClinica] = None) -> Iterator[str]:
+    """
+    Genera el historial de todos los pacientes sección por sección
+    (encabezado, un bloque por paciente y el resumen), sin armar el texto completo en memoria.
+    Si no se pasan estadisticas ya mantenidas, se acumulan en la misma pasada que arma las secciones.
+    """
+    pacientes = list(pacientes)
+    acumuladas = EstadisticasClinica() if estadisticas is None else None
+    yield encabezado_historial(len(pacientes))
+    for i, paciente in enumerate(pacientes, 1):
+        totales = totales_paciente(paciente)
+        if acumuladas is not None:
+            acumuladas.registrar_paciente(paciente, totales)
+        yield seccion_paciente(i, paciente, totales)
+    yield resumen_historial(estadisticas if estadisticas is not None else acumuladas)
+
+
+def main():
+    # Benchmark: tiempo al primer paciente y memoria pico con 10,000 pacientes
+    import time
+    import tracemalloc
+    from types import SimpleNamespace
+
+    doctor = SimpleNamespace(nombre="Ana", apellido="Rivas")
+    pacientes = []
+    for i in range(10_000):
+        pacientes.append({
+            'nombre': f"Nombre{i}", 'apellido': f"Apellido{i}", 'edad': 30, 'dui': f"{i:08d}-0",
+            'telefono': 70000000 + i, 'correo': f"p{i}@correo.com", 'saldo_pendiente': 10.0,
+            'fecha_registro': "01/01/2025 - 08:00:00",
+            'historial_medico': [SimpleNamespace(descripcion="Limpieza", costo=20.0, fecha_realizacion="01/01/2025",
+                                                 estado="Finalizado", doctor=doctor) for _ in range(3)],
+            'citas': [SimpleNamespace(id_cita=f"C{i}-{j}", hora_inicio="08:00", hora_fin="09:00", costo_cita=15.0,
+                                      estado="Pendiente", doctor=doctor) for j in range(2)],
+        })
+
+    # Tiempos (sin tracemalloc, que vuelve lento todo el proceso)
+    inicio = time.perf_counter()
+    "".join(secciones_historial(pacientes))
+    completo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    generador = secciones_historial(pacientes)
+    next(generador)     # Encabezado
+    next(generador)     # Primer paciente
+    primer_paciente = time.perf_counter() - inicio
+    for _ in generador:
+        pass
+    por_secciones = time.perf_counter() - inicio
+
+    # Memoria pico: texto completo vs. consumir y descartar cada sección
+    tracemalloc.start()
+    texto = "".join(secciones_historial(pacientes))
+    _, pico_completo = tracemalloc.get_traced_memory()
+    del texto
+    tracemalloc.reset_peak()
+    for _ in secciones_historial(pacientes):
+        pass
+    _, pico_secciones = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Texto completo: {completo * 1000:.1f} ms, memoria pico {pico_completo / 1e6:.1f} MB")
+    print(f"Por secciones: primer paciente en {primer_paciente * 1000:.2f} ms, "
+          f"total {por_secciones * 1000:.1f} ms, memoria pico {pico_secciones / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
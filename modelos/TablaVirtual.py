@@ -0,0 +1,363 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QTableView, QHeaderView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+
+class Columna(NamedTuple):
+    """
+    Columna de una tabla virtual.
+    obtener saca el valor de un registro (con él se ordena); campo es la columna SQL equivalente
+    (para ordenar en la base) y formato convierte el valor al texto de la celda.
+    """
+    titulo: str
+    obtener: Callable[[object], object]
+    campo: Optional[str] = None
+    formato: Optional[Callable[[object], str]] = None
+
+    def texto(self, registro) -> str:
+        valor = self.obtener(registro)
+        if self.formato is not None:
+            return self.formato(valor)
+        return f"{valor:,.2f}" if isinstance(valor, float) else str(valor)
+
+
+class FuenteLista:
+    """
+    Registros que ya están en memoria (las listas y registros de las ventanas).
+    El filtro y el orden se aplican una vez sobre toda la lista; el modelo luego pide páginas.
+    """
+    def __init__(self, registros, columnas: Sequence[Columna]):
+        self.registros = list(registros)
+        self.columnas = list(columnas)
+        self._textos: Optional[List[str]] = None   # Texto de búsqueda por registro, se arma al primer filtro
+        self._vista = self.registros
+        self._posicion = 0
+
+    def preparar_busqueda(self) -> "FuenteLista":
+        """Arma el texto de búsqueda de todos los registros (se puede llamar desde un hilo de trabajo)"""
+        if self._textos is None:
+            self._textos = [" ".join(c.texto(r) for c in self.columnas).lower() for r in self.registros]
+        return self
+
+    def reiniciar(self, columna: Optional[int] = None, descendente: bool = False, busqueda: str = ""):
+        vista = self.registros
+        if busqueda:
+            self.preparar_busqueda()
+            busqueda = busqueda.lower()
+            vista = [r for r, texto in zip(self.registros, self._textos) if busqueda in texto]
+        if columna is not None:
+            obtener = self.columnas[columna].obtener
+            vista = sorted(vista, key=obtener, reverse=descendente)
+        self._vista = vista
+        self._posicion = 0
+
+    def hay_mas(self) -> bool:
+        return self._posicion < len(self._vista)
+
+    def siguiente_pagina(self, limite: int) -> list:
+        pagina = self._vista[self._posicion:self._posicion + limite]
+        self._posicion += len(pagina)
+        return pagina
+
+    def insertar(self, posicion: int, registro) -> bool:
+        """
+        Inserta un registro en el orden original; devuelve True si cae dentro de lo ya entregado
+        en páginas (el modelo debe agregar la fila), False si saldrá en una página posterior.
+        """
+        self.registros.insert(posicion, registro)
+        if self._textos is not None:
+            self._textos.insert(posicion, " ".join(c.texto(registro) for c in self.columnas).lower())
+        if posicion < self._posicion:
+            self._posicion += 1
+            return True
+        return False
+
+    def quitar(self, posicion: int) -> bool:
+        """Quita el registro de esa posición del orden original; devuelve True si ya se había entregado"""
+        del self.registros[posicion]
+        if self._textos is not None:
+            del self._textos[posicion]
+        if posicion < self._posicion:
+            self._posicion -= 1
+            return True
+        return False
+
+
+class FuenteRepositorio:
+    """
+    Registros leídos de la base por páginas con Repositorio.pagina_ordenada (keyset, sin OFFSET).
+    Los registros son las tuplas tal como vienen de la base, en el orden de repositorio.columnas_lectura.
+    """
+    def __init__(self, repositorio, columnas: Sequence[Columna], columnas_busqueda: Sequence[str] = ()):
+        self.repositorio = repositorio
+        self.columnas = list(columnas)
+        self.columnas_busqueda = tuple(columnas_busqueda)
+        self._orden = None
+        self._descendente = False
+        self._busqueda = ""
+        self._cursor = None
+        self._terminado = False
+
+    def reiniciar(self, columna: Optional[int] = None, descendente: bool = False, busqueda: str = ""):
+        self._orden = self.columnas[columna].campo if columna is not None else None
+        self._descendente = descendente
+        self._busqueda = busqueda
+        self._cursor = None
+        self._terminado = False
+
+    def hay_mas(self) -> bool:
+        return not self._terminado
+
+    def siguiente_pagina(self, limite: int) -> list:
+        filas = self.repositorio.pagina_ordenada(self._orden, self._descendente, self._cursor, limite,
+                                                 self._busqueda, self.columnas_busqueda)
+        if len(filas) < limite:
+            self._terminado = True
+        if filas:
+            self._cursor = self.repositorio.cursor_de(filas[-1], self._orden)
+        return filas
+
+
+class ModeloTablaVirtual(QAbstractTableModel):
+    """
+    Modelo de tabla que carga los registros por páginas a medida que la vista hace scroll
+    (canFetchMore/fetchMore). Solo se arma el texto de las celdas que la vista pide,
+    es decir, de las filas visibles.
+    """
+    def __init__(self, fuente, tamano_pagina: int = 200, parent=None):
+        super().__init__(parent)
+        self.fuente = fuente
+        self.columnas = fuente.columnas
+        self.tamano_pagina = tamano_pagina
+        self._filas: list = []
+        self._orden: Optional[int] = None
+        self._descendente = False
+        self._busqueda = ""
+        self.fuente.reiniciar()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columnas)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.columnas[index.column()].texto(self._filas[index.row()])
+        if role == Qt.ItemDataRole.UserRole:
+            return self._filas[index.row()]
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientacion == Qt.Orientation.Horizontal:
+            return self.columnas[seccion].titulo
+        return super().headerData(seccion, orientacion, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.fuente.hay_mas()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        pagina = self.fuente.siguiente_pagina(self.tamano_pagina)
+        if not pagina:
+            return
+        inicio = len(self._filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina) - 1)
+        self._filas.extend(pagina)
+        self.endInsertRows()
+
+    def registro(self, fila: int):
+        return self._filas[fila]
+
+    def _en_orden_original(self) -> bool:
+        # Solo la vista sin orden ni filtro corresponde fila a fila con fuente.registros
+        return self._orden is None and not self._busqueda
+
+    def insertar_registro(self, posicion: int, registro):
+        """Agrega un registro en esa posición del orden original sin recargar las demás filas (FuenteLista)"""
+        en_vista = self._en_orden_original()
+        if self.fuente.insertar(posicion, registro) and en_vista:
+            self.beginInsertRows(QModelIndex(), posicion, posicion)
+            self._filas.insert(posicion, registro)
+            self.endInsertRows()
+        elif not en_vista:
+            self._recargar()
+
+    def quitar_registro(self, posicion: int):
+        """Quita el registro de esa posición del orden original sin recargar las demás filas (FuenteLista)"""
+        en_vista = self._en_orden_original()
+        if self.fuente.quitar(posicion) and en_vista:
+            self.beginRemoveRows(QModelIndex(), posicion, posicion)
+            del self._filas[posicion]
+            self.endRemoveRows()
+        elif not en_vista:
+            self._recargar()
+
+    def _recargar(self):
+        self.beginResetModel()
+        self._filas = []
+        self.fuente.reiniciar(self._orden, self._descendente, self._busqueda)
+        self.endResetModel()
+        # La vista pedirá las páginas que necesite con fetchMore; la primera se carga de una vez
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def sort(self, columna, orden=Qt.SortOrder.AscendingOrder):
+        self._orden = columna if columna >= 0 else None
+        self._descendente = orden == Qt.SortOrder.DescendingOrder
+        self._recargar()
+
+    def filtrar(self, texto: str):
+        texto = texto.strip()
+        if texto != self._busqueda:
+            self._busqueda = texto
+            self._recargar()
+
+
+class TablaVirtual(QWidget):
+    """Caja de búsqueda más una QTableView sobre un ModeloTablaVirtual; se ordena con clic en el encabezado"""
+    def __init__(self, parent=None, espera_filtro_ms: int = 200):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.filtro_edit = QLineEdit()
+        self.filtro_edit.setPlaceholderText("🔍 Filtrar...")
+        self.vista = QTableView()
+        self.vista.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.vista.setAlternatingRowColors(True)
+        self.vista.verticalHeader().setVisible(False)
+        # Alto de fila fijo: la vista no tiene que medir cada fila
+        self.vista.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.vista.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.vista.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.filtro_edit)
+        layout.addWidget(self.vista)
+
+        # Filtrar mientras se escribe, esperando a que el usuario haga una pausa
+        self._timer_filtro = QTimer(self)
+        self._timer_filtro.setSingleShot(True)
+        self._timer_filtro.setInterval(espera_filtro_ms)
+        self._timer_filtro.timeout.connect(self._aplicar_filtro)
+        self.filtro_edit.textChanged.connect(self._timer_filtro.start)
+        self.modelo: Optional[ModeloTablaVirtual] = None
+
+    def mostrar(self, fuente, tamano_pagina: int = 200) -> ModeloTablaVirtual:
+        """Muestra los registros de una fuente (FuenteLista o FuenteRepositorio)"""
+        self.modelo = ModeloTablaVirtual(fuente, tamano_pagina, self)
+        self.vista.setSortingEnabled(False)
+        self.vista.setModel(self.modelo)
+        self.vista.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.vista.setSortingEnabled(True)
+        if self.filtro_edit.text().strip():
+            self.modelo.filtrar(self.filtro_edit.text())
+        elif self.modelo.canFetchMore():
+            self.modelo.fetchMore()
+        return self.modelo
+
+    def _aplicar_filtro(self):
+        if self.modelo is not None:
+            self.modelo.filtrar(self.filtro_edit.text())
+
+
+def main():
+    # Benchmark: primer pintado y scroll con 100k facturas, en memoria y desde SQLite
+    import os
+    import sqlite3
+    import sys
+    import tempfile
+    import time
+    from datetime import datetime, timedelta
+    from PyQt6.QtWidgets import QApplication, QTextEdit
+    from Factura import Factura, Paciente
+
+    app = QApplication(sys.argv)
+    total = 100_000
+    pacientes = [Paciente(f"Nombre{i}", f"Apellido{i}", dui=f"{i:08d}-{i % 10}") for i in range(1000)]
+    base = datetime(2025, 1, 1)
+    facturas = [Factura(f"FAC-{i:06d}", pacientes[i % 1000], ["Limpieza", "Radiografía"],
+                        [20.0 + i % 50, 15.0], base + timedelta(days=i % 365),
+                        ("Pendiente", "Pagado", "Cancelado")[i % 3]) for i in range(total)]
+    columnas = [
+        Columna("ID", lambda f: f.id_factura, 'ID_Factura'),
+        Columna("Paciente", lambda f: f"{f.paciente.nombre} {f.paciente.apellido}"),
+        Columna("Fecha", lambda f: f.fecha_emision, 'Fecha_Emision', lambda d: d.strftime('%d/%m/%Y')),
+        Columna("Estado", lambda f: f.estado_pago, 'Estado_Pago'),
+        Columna("Total", lambda f: f.monto_total, 'Monto_Total'),
+    ]
+
+    def medir(nombre, fuente):
+        tabla = TablaVirtual()
+        tabla.resize(900, 600)
+        inicio = time.perf_counter()
+        tabla.mostrar(fuente)
+        tabla.show()
+        app.processEvents()
+        primer_pintado = time.perf_counter() - inicio
+
+        barra = tabla.vista.verticalScrollBar()
+        inicio = time.perf_counter()
+        for _ in range(50):    # 50 saltos al final: cada uno dispara un fetchMore
+            barra.setValue(barra.maximum())
+            app.processEvents()
+        scroll = (time.perf_counter() - inicio) / 50
+        cargadas = tabla.modelo.rowCount()
+
+        inicio = time.perf_counter()
+        tabla.modelo.sort(4, Qt.SortOrder.DescendingOrder)
+        app.processEvents()
+        ordenar = time.perf_counter() - inicio
+
+        filtros = []
+        for texto in ("Pendiente", "Pagado"):
+            inicio = time.perf_counter()
+            tabla.modelo.filtrar(texto)
+            app.processEvents()
+            filtros.append(f"{(time.perf_counter() - inicio) * 1000:.1f}")
+        print(f"{nombre:<8} primer pintado {primer_pintado * 1000:5.1f} ms | scroll {scroll * 1000:4.1f} ms/salto "
+              f"({cargadas:,} filas cargadas de {total:,}) | ordenar {ordenar * 1000:5.1f} ms | "
+              f"filtrar {' / '.join(filtros)} ms")
+        tabla.close()
+
+    medir("Memoria", FuenteLista(facturas, columnas))
+
+    # Desde la base (SQLite como sustituto de MariaDB)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main'))
+    from PoolConexiones import PoolConexiones
+    from Repositorios import crear_esquema_sqlite, crear_repositorios
+
+    ruta = os.path.join(tempfile.mkdtemp(), "clinica_tabla.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=2)
+    repos = crear_repositorios(pool, marcador='?')
+    repos['Paciente'].insertar_lote((p.nombre, p.apellido, "1990-01-01", p.dui, None, f"{p.dui}@correo.com")
+                                    for p in pacientes)
+    repos['Factura'].insertar_lote((1 + i % 1000, f.fecha_emision.strftime('%Y-%m-%d'), str(f.monto_total),
+                                    f.estado_pago) for i, f in enumerate(facturas))
+    columnas_db = [
+        Columna("ID", lambda f: f[0], 'ID_Factura'),
+        Columna("Paciente", lambda f: f[1], 'ID_Paciente'),
+        Columna("Fecha", lambda f: f[2], 'Fecha_Emision'),
+        Columna("Estado", lambda f: f[4], 'Estado_Pago'),
+        Columna("Total", lambda f: f[3], 'Monto_Total'),
+    ]
+    medir("SQLite", FuenteRepositorio(repos['Factura'], columnas_db, ('Estado_Pago',)))
+    pool.cerrar()
+
+    # Referencia: QTextEdit.append por factura (solo 5,000 para no esperar minutos)
+    texto = QTextEdit()
+    texto.show()
+    inicio = time.perf_counter()
+    for factura in facturas[:5000]:
+        texto.append(str(factura))
+    app.processEvents()
+    print(f"QTextEdit.append con 5,000 facturas: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
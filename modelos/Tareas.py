@@ -0,0 +1,275 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TareaCancelada(Exception):
+    """La lanza ControlTarea.verificar() dentro de la tarea cuando se pidió cancelarla"""
+
+
+class SenalesTarea(QObject):
+    """
+    Señales de una tarea. El objeto se crea en el hilo de la ventana, así que los slots
+    conectados se ejecutan en ese hilo aunque la señal se emita desde el hilo de trabajo.
+    """
+    terminada = pyqtSignal(object)        # Resultado de la función
+    fallo = pyqtSignal(object)            # Excepción lanzada
+    progreso = pyqtSignal(int, object)    # Porcentaje y dato parcial opcional
+    cancelada = pyqtSignal()
+    finalizada = pyqtSignal()             # Siempre al final, después de las anteriores
+
+
+class ControlTarea:
+    """Lo recibe la función de la tarea (con con_control=True) para reportar avance y revisar cancelación"""
+    def __init__(self, senales: SenalesTarea):
+        self._senales = senales
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def verificar(self):
+        """Lanza TareaCancelada si se pidió cancelar; llamarlo entre pasos largos"""
+        if self._cancelada.is_set():
+            raise TareaCancelada()
+
+    def reportar(self, porcentaje: int, dato=None):
+        if not self._cancelada.is_set():
+            self._senales.progreso.emit(int(porcentaje), dato)
+
+
+class Tarea(QRunnable):
+    """Trabajo que corre en el QThreadPool y entrega su resultado por señales"""
+    def __init__(self, ejecutor: "EjecutorTareas", funcion: Callable, args: tuple, kwargs: dict,
+                 con_control: bool, nombre: str):
+        super().__init__()
+        self.setAutoDelete(False)     # La ventana conserva la tarea para poder cancelarla
+        self.ejecutor = ejecutor
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.nombre = nombre
+        self.senales = SenalesTarea()
+        self.control = ControlTarea(self.senales)
+        self._con_control = con_control
+        self.enviada_en = time.perf_counter()
+        self.iniciada = False
+        self.terminada = False
+
+    def cancelar(self):
+        """
+        Si la tarea sigue en cola se saca del pool; si ya está corriendo se marca como cancelada
+        (la función lo nota con control.verificar()) y su resultado ya no se entrega.
+        """
+        self.control._cancelada.set()
+        if not self.iniciada and self.ejecutor.pool.tryTake(self):
+            self.ejecutor._registrar_fin(self, 'cancelada', time.perf_counter())
+            self.senales.cancelada.emit()
+            self.senales.finalizada.emit()
+
+    def run(self):
+        self.iniciada = True
+        inicio = time.perf_counter()
+        self.ejecutor._registrar_inicio(self, inicio)
+        estado = 'completada'
+        try:
+            if self.control.cancelada:
+                raise TareaCancelada()
+            if self._con_control:
+                resultado = self.funcion(self.control, *self.args, **self.kwargs)
+            else:
+                resultado = self.funcion(*self.args, **self.kwargs)
+            if self.control.cancelada:
+                raise TareaCancelada()
+        except TareaCancelada:
+            estado = 'cancelada'
+            self.senales.cancelada.emit()
+        except Exception as e:
+            estado = 'fallida'
+            self.senales.fallo.emit(e)
+        else:
+            self.senales.terminada.emit(resultado)
+        finally:
+            self.terminada = True
+            self.ejecutor._registrar_fin(self, estado, inicio)
+            self.senales.finalizada.emit()
+
+
+class EjecutorTareas(QObject):
+    """
+    Ejecuta funciones en un QThreadPool para que las ventanas no se congelen.
+    Lleva métricas: tareas en cola (profundidad), en ejecución, y latencia de espera y de ejecución.
+    """
+    def __init__(self, max_hilos: Optional[int] = None, muestras: int = 1000,
+                 umbral_lenta_ms: float = 500.0, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        if max_hilos is not None:
+            self.pool.setMaxThreadCount(max_hilos)
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self._lock = threading.Lock()
+        self._en_cola = 0
+        self._en_ejecucion = 0
+        self._cola_maxima = 0
+        self._contadores = {'enviadas': 0, 'completadas': 0, 'fallidas': 0, 'canceladas': 0, 'lentas': 0}
+        self._esperas = deque(maxlen=muestras)      # Segundos entre enviar y empezar
+        self._duraciones = deque(maxlen=muestras)   # Segundos de ejecución
+        # Referencias a las tareas vivas: si Python las libera mientras están en el pool, Qt se cae.
+        # Se sueltan desde el hilo de la ventana cuando llega la señal finalizada.
+        self._activas = set()
+
+    def enviar(self, funcion: Callable, *args, al_terminar: Optional[Callable] = None,
+               al_fallar: Optional[Callable] = None, al_progresar: Optional[Callable] = None,
+               al_cancelar: Optional[Callable] = None, con_control: bool = False,
+               nombre: str = "", **kwargs) -> Tarea:
+        """
+        Pone funcion(*args, **kwargs) en cola. Con con_control=True la función recibe primero un
+        ControlTarea. Los callbacks se ejecutan en el hilo de la ventana.
+        """
+        tarea = Tarea(self, funcion, args, kwargs, con_control, nombre or getattr(funcion, '__name__', 'tarea'))
+        if al_terminar is not None:
+            tarea.senales.terminada.connect(al_terminar)
+        if al_fallar is not None:
+            tarea.senales.fallo.connect(al_fallar)
+        if al_progresar is not None:
+            tarea.senales.progreso.connect(al_progresar)
+        if al_cancelar is not None:
+            tarea.senales.cancelada.connect(al_cancelar)
+        self._activas.add(tarea)
+        tarea.senales.finalizada.connect(lambda: self._activas.discard(tarea))
+        with self._lock:
+            self._contadores['enviadas'] += 1
+            self._en_cola += 1
+            self._cola_maxima = max(self._cola_maxima, self._en_cola)
+        self.pool.start(tarea)
+        return tarea
+
+    def _registrar_inicio(self, tarea: Tarea, inicio: float):
+        with self._lock:
+            self._en_cola -= 1
+            self._en_ejecucion += 1
+            self._esperas.append(inicio - tarea.enviada_en)
+
+    def _registrar_fin(self, tarea: Tarea, estado: str, inicio: float):
+        duracion = time.perf_counter() - inicio
+        with self._lock:
+            if tarea.iniciada:
+                self._en_ejecucion -= 1
+                self._duraciones.append(duracion)
+                if duracion * 1000 > self.umbral_lenta_ms:
+                    self._contadores['lentas'] += 1
+            else:
+                self._en_cola -= 1     # Cancelada antes de empezar
+            self._contadores[{'completada': 'completadas', 'fallida': 'fallidas',
+                              'cancelada': 'canceladas'}[estado]] += 1
+
+    @staticmethod
+    def _percentil(valores, p: float) -> float:
+        if not valores:
+            return 0.0
+        ordenados = sorted(valores)
+        return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Profundidad de la cola, contadores y latencias (ms) de las últimas tareas"""
+        with self._lock:
+            esperas = list(self._esperas)
+            duraciones = list(self._duraciones)
+            datos = dict(self._contadores)
+            datos.update(en_cola=self._en_cola, en_ejecucion=self._en_ejecucion, cola_maxima=self._cola_maxima,
+                         hilos=self.pool.maxThreadCount())
+        datos.update(
+            espera_p50_ms=self._percentil(esperas, 0.50) * 1000,
+            espera_p95_ms=self._percentil(esperas, 0.95) * 1000,
+            ejecucion_p50_ms=self._percentil(duraciones, 0.50) * 1000,
+            ejecucion_p95_ms=self._percentil(duraciones, 0.95) * 1000,
+            ejecucion_max_ms=max(duraciones, default=0.0) * 1000,
+        )
+        return datos
+
+    def resumen(self) -> str:
+        e = self.estadisticas()
+        return (f"⚙️ Tareas: {e['en_cola']} en cola (máx. {e['cola_maxima']}), {e['en_ejecucion']} en ejecución | "
+                f"espera p50 {e['espera_p50_ms']:.1f} ms, p95 {e['espera_p95_ms']:.1f} ms | "
+                f"ejecución p50 {e['ejecucion_p50_ms']:.1f} ms, p95 {e['ejecucion_p95_ms']:.1f} ms")
+
+    def esperar(self, milisegundos: int = -1) -> bool:
+        return self.pool.waitForDone(milisegundos)
+
+
+_ejecutor: Optional[EjecutorTareas] = None
+
+
+def obtener_ejecutor() -> EjecutorTareas:
+    """Ejecutor compartido por todas las ventanas; se crea en el primer uso"""
+    global _ejecutor
+    if _ejecutor is None:
+        _ejecutor = EjecutorTareas()
+    return _ejecutor
+
+
+def main():
+    # Benchmark: demora máxima del event loop con trabajo en el hilo de la ventana vs. en el pool
+    import sys
+    from PyQt6.QtCore import QCoreApplication, QTimer
+
+    app = QCoreApplication(sys.argv)
+
+    def trabajo(control=None, pasos=20):
+        # Simula una consulta lenta a la base (~200 ms esperando al servidor, sin ocupar el GIL)
+        for paso in range(pasos):
+            if control is not None:
+                control.verificar()
+                control.reportar(100 * (paso + 1) // pasos)
+            time.sleep(0.01)
+        return pasos
+
+    def medir_event_loop(lanzar, duracion_ms=1500):
+        # Un QTimer de 10 ms mide cuánto se atrasa el event loop mientras corre el trabajo
+        demoras = []
+        ultimo = [time.perf_counter()]
+
+        def tic():
+            ahora = time.perf_counter()
+            demoras.append((ahora - ultimo[0]) * 1000 - 10)
+            ultimo[0] = ahora
+
+        timer = QTimer()
+        timer.timeout.connect(tic)
+        timer.start(10)
+        QTimer.singleShot(50, lanzar)
+        QTimer.singleShot(duracion_ms, app.quit)
+        app.exec()
+        timer.stop()
+        return max(demoras)
+
+    def en_hilo_ventana():
+        for _ in range(5):
+            trabajo()
+
+    print(f"Trabajo en el hilo de la ventana: event loop detenido hasta {medir_event_loop(en_hilo_ventana):.0f} ms")
+
+    ejecutor = EjecutorTareas(max_hilos=4)
+    progresos = []
+
+    def en_pool():
+        for i in range(40):
+            tarea = ejecutor.enviar(trabajo, con_control=True, al_progresar=lambda p, _: progresos.append(p))
+            if i % 10 == 9:
+                tarea.cancelar()
+
+    print(f"Trabajo en el pool:               event loop detenido hasta {medir_event_loop(en_pool, 3500):.0f} ms")
+    ejecutor.esperar()
+    app.processEvents()
+    print(ejecutor.resumen())
+    e = ejecutor.estadisticas()
+    print(f"Enviadas {e['enviadas']}, completadas {e['completadas']}, canceladas {e['canceladas']}, "
+          f"avisos de progreso recibidos: {len(progresos)}")
+
+
+if __name__ == "__main__":
+    main()
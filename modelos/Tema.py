@@ -0,0 +1,460 @@
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List
+
+from PyQt6 import sip
+from PyQt6.QtWidgets import QApplication
+
+# Paletas de la aplicación. 'oscuro' es la que repetía cada ventana en su self.colors;
+# 'claro' es la que usaba el diálogo de Tratamiento.py, que la conserva con cualquier tema.
+TEMAS: Dict[str, Dict[str, str]] = {
+    'oscuro': {
+        'primary': '#130760',          # Dark blue-purple
+        'secondary': '#756f9f',        # Medium purple
+        'accent': '#10b8b9',           # Teal
+        'background': '#2b2b2b',       # Dark gray
+        'surface': '#3c3c3c',          # Slightly lighter gray
+        'focus': '#404040',            # Campo con el foco
+        'text_light': '#ffffff',       # White text
+        'text_dark': '#e0e0e0',        # Light gray text
+        'results': '#1e1e1e',          # Fondo del área de resultados y las tablas
+        'results_text': '#d4d4d4',
+        'highlight': '#9b59b6',        # Botón "Todos los Historiales"
+        'highlight_hover': '#8e44ad',
+        'success': '#2ecc71',
+        'danger': '#e74c3c',
+    },
+    'claro': {
+        'primary': '#130760',
+        'secondary': '#756f9f',
+        'accent': '#10b8b9',
+        'background': '#f7f8fa',
+        'surface': '#ffffff',
+        'focus': '#fdfcf8',
+        'text_light': '#2c2c2c',
+        'text_dark': '#3c3c3c',
+        'results': '#ffffff',
+        'results_text': '#2c2c2c',
+        'highlight': '#9b59b6',
+        'highlight_hover': '#8e44ad',
+        'success': '#2ecc71',
+        'danger': '#e74c3c',
+    },
+}
+TEMA_PREDETERMINADO = 'oscuro'
+DIALOGO_CLARO = 'dialogoClaro'     # objectName de los diálogos que usan siempre la paleta 'claro'
+
+
+def colores(tema: str = TEMA_PREDETERMINADO) -> Dict[str, str]:
+    return TEMAS[tema]
+
+
+@lru_cache(maxsize=None)
+def hoja_de_estilo(tema: str = TEMA_PREDETERMINADO) -> str:
+    """
+    Hoja de estilo completa de un tema. Se arma una sola vez por tema; los widgets con un estilo
+    propio se marcan con setObjectName (titulo, tituloSimple, etiquetaResultados, resultados,
+    botonPrincipal, botonDestacado, botonExito, botonPeligro, etiquetaPaciente, dialogoClaro).
+    """
+    c = TEMAS[tema]
+    return f"""
+        QMainWindow, QDialog {{
+            background-color: {c['background']};
+            font-family: 'Segoe UI';
+            font-size: 14px;
+            color: {c['text_light']};
+        }}
+
+        QLabel {{
+            color: {c['text_light']};
+            font-family: 'Segoe UI';
+            font-size: 14px;
+        }}
+
+        QDialog QLabel {{
+            font-weight: bold;
+        }}
+
+        QLabel#titulo {{
+            font-size: 16px;
+            font-weight: bold;
+            background-color: {c['surface']};
+            border: 3px solid {c['accent']};
+            border-radius: 12px;
+            padding: 20px;
+            margin: 10px;
+        }}
+
+        QLabel#tituloSimple {{
+            font-size: 24px;
+            font-weight: bold;
+            color: {c['accent']};
+            padding: 20px;
+        }}
+
+        QLabel#etiquetaResultados, QLabel#etiquetaPaciente {{
+            color: {c['accent']};
+            font-weight: bold;
+        }}
+
+        QLabel#etiquetaPaciente {{
+            font-size: 16px;
+        }}
+
+        QGroupBox {{
+            font-family: 'Segoe UI';
+            font-size: 14px;
+            font-weight: bold;
+            color: {c['text_light']};
+            border: 2px solid {c['secondary']};
+            border-radius: 8px;
+            margin: 10px 0px;
+            padding-top: 15px;
+            background-color: {c['surface']};
+        }}
+
+        QGroupBox::title {{
+            subcontrol-origin: margin;
+            left: 10px;
+            padding: 0 8px 0 8px;
+            background-color: {c['surface']};
+            color: {c['accent']};
+        }}
+
+        QLineEdit, QSpinBox, QDoubleSpinBox, QComboBox, QDateTimeEdit {{
+            font-family: 'Segoe UI';
+            font-size: 14px;
+            border: 2px solid {c['secondary']};
+            border-radius: 6px;
+            padding: 10px;
+            background-color: {c['surface']};
+            color: {c['text_light']};
+            selection-background-color: {c['accent']};
+        }}
+
+        QDialog QLineEdit, QDialog QDoubleSpinBox, QDialog QComboBox, QDialog QTextEdit {{
+            padding: 8px;
+        }}
+
+        QLineEdit:focus, QSpinBox:focus, QDoubleSpinBox:focus, QComboBox:focus, QDateTimeEdit:focus {{
+            border-color: {c['accent']};
+            background-color: {c['focus']};
+        }}
+
+        QPushButton {{
+            font-family: 'Segoe UI';
+            font-size: 14px;
+            font-weight: bold;
+            color: #ffffff;
+            background-color: {c['secondary']};
+            border: none;
+            border-radius: 8px;
+            padding: 12px 20px;
+            margin: 4px;
+        }}
+
+        QDialog QPushButton {{
+            padding: 10px 15px;
+            margin: 0px;
+        }}
+
+        QPushButton:hover {{
+            background-color: {c['accent']};
+        }}
+
+        QPushButton:pressed {{
+            background-color: {c['primary']};
+        }}
+
+        QPushButton#botonPrincipal {{
+            background-color: {c['accent']};
+            min-height: 45px;
+        }}
+
+        QPushButton#botonPrincipal:hover {{
+            background-color: {c['secondary']};
+        }}
+
+        QPushButton#botonDestacado {{
+            background-color: {c['highlight']};
+            min-height: 45px;
+        }}
+
+        QPushButton#botonDestacado:hover {{
+            background-color: {c['highlight_hover']};
+        }}
+
+        QPushButton#botonExito {{
+            background-color: {c['success']};
+        }}
+
+        QPushButton#botonPeligro {{
+            background-color: {c['danger']};
+        }}
+
+        QTextEdit {{
+            font-family: 'Consolas', 'Courier New', monospace;
+            font-size: 13px;
+            border: 2px solid {c['secondary']};
+            border-radius: 8px;
+            background-color: {c['surface']};
+            color: {c['text_dark']};
+            padding: 15px;
+            selection-background-color: {c['accent']};
+        }}
+
+        QTextEdit:focus {{
+            border-color: {c['accent']};
+        }}
+
+        QTextEdit#resultados, QTableView {{
+            background-color: {c['results']};
+            color: {c['results_text']};
+            border: 2px solid {c['secondary']};
+            border-radius: 8px;
+        }}
+
+        QTableView {{
+            font-family: 'Consolas';
+            font-size: 13px;
+        }}
+
+        QTextEdit#resultados QScrollBar:vertical {{
+            background-color: {c['surface']};
+            width: 12px;
+            border-radius: 6px;
+            margin: 0px;
+        }}
+
+        QTextEdit#resultados QScrollBar:horizontal {{
+            background-color: {c['surface']};
+            height: 12px;
+            border-radius: 6px;
+            margin: 0px;
+        }}
+
+        QTextEdit#resultados QScrollBar::handle:vertical, QTextEdit#resultados QScrollBar::handle:horizontal {{
+            background-color: {c['secondary']};
+            border-radius: 6px;
+            margin: 2px;
+        }}
+
+        QTextEdit#resultados QScrollBar::handle:vertical {{
+            min-height: 20px;
+        }}
+
+        QTextEdit#resultados QScrollBar::handle:horizontal {{
+            min-width: 20px;
+        }}
+
+        QTextEdit#resultados QScrollBar::handle:vertical:hover, QTextEdit#resultados QScrollBar::handle:horizontal:hover {{
+            background-color: {c['accent']};
+        }}
+
+        QTextEdit#resultados QScrollBar::handle:vertical:pressed, QTextEdit#resultados QScrollBar::handle:horizontal:pressed {{
+            background-color: {c['primary']};
+        }}
+
+        QTextEdit#resultados QScrollBar::add-line:vertical, QTextEdit#resultados QScrollBar::sub-line:vertical {{
+            border: none;
+            background: none;
+            height: 0px;
+        }}
+
+        QTextEdit#resultados QScrollBar::add-line:horizontal, QTextEdit#resultados QScrollBar::sub-line:horizontal {{
+            border: none;
+            background: none;
+            width: 0px;
+        }}
+
+        QTextEdit#resultados QScrollBar::add-page:vertical, QTextEdit#resultados QScrollBar::sub-page:vertical,
+        QTextEdit#resultados QScrollBar::add-page:horizontal, QTextEdit#resultados QScrollBar::sub-page:horizontal {{
+            background: none;
+        }}
+    """ + _seccion_clara()
+
+
+def _seccion_clara() -> str:
+    """
+    Reglas de la paleta 'claro' limitadas a QDialog#dialogoClaro y sus hijos. El selector con #
+    pesa más que las reglas generales del tema, así que se imponen sin importar el tema activo.
+    """
+    c = TEMAS['claro']
+    d = f"QDialog#{DIALOGO_CLARO}"
+    return f"""
+        {d} {{
+            background-color: {c['background']};
+            color: {c['text_light']};
+        }}
+
+        {d} QLabel {{
+            color: {c['text_light']};
+        }}
+
+        {d} QLabel#etiquetaPaciente {{
+            color: {c['accent']};
+        }}
+
+        {d} QLineEdit, {d} QTextEdit, {d} QDoubleSpinBox {{
+            font-family: 'Segoe UI';
+            font-size: 14px;
+            border: 2px solid {c['secondary']};
+            border-radius: 6px;
+            padding: 8px;
+            background-color: {c['surface']};
+            color: {c['text_light']};
+        }}
+
+        {d} QLineEdit:focus, {d} QTextEdit:focus, {d} QDoubleSpinBox:focus {{
+            border-color: {c['accent']};
+            background-color: {c['focus']};
+        }}
+    """
+
+
+def aplicar_tema(tema: str = TEMA_PREDETERMINADO, app: QApplication = None) -> bool:
+    """
+    Aplica la hoja de estilo del tema a toda la aplicación. Qt la analiza una sola vez y la
+    comparten todas las ventanas y diálogos; llamarla de nuevo con el mismo tema no hace nada.
+    Devuelve True si hubo que aplicarla.
+    """
+    app = app or QApplication.instance()
+    if app is None or app.property('tema') == tema:
+        return False
+    app.setStyleSheet(hoja_de_estilo(tema))
+    app.setProperty('tema', tema)
+    return True
+
+
+# Hojas que cada diálogo se ponía a sí mismo antes de Tema.py, para medir contra el esquema anterior
+_CAMPOS_OSCUROS = """
+    QDialog {{ background-color: #2b2b2b; font-family: 'Segoe UI'; font-size: 14px; color: #ffffff; }}
+    QLabel {{ color: #ffffff; font-family: 'Segoe UI'; font-size: 14px; font-weight: bold; }}
+    {campos} {{
+        font-family: 'Segoe UI'; font-size: 14px; border: 2px solid #756f9f; border-radius: 6px;
+        padding: 8px; background-color: #3c3c3c; color: #ffffff;
+    }}
+    {foco} {{ border-color: #10b8b9; background-color: #404040; }}
+    QPushButton {{
+        font-family: 'Segoe UI'; font-size: 14px; font-weight: bold; color: #ffffff;
+        background-color: #756f9f; border: none; border-radius: 8px; padding: 10px 15px;
+    }}
+    QPushButton:hover {{ background-color: #10b8b9; }}
+"""
+
+
+def _hoja_oscura_anterior(*campos: str) -> str:
+    return _CAMPOS_OSCUROS.format(campos=", ".join(campos), foco=", ".join(f"{c}:focus" for c in campos))
+
+
+_HORARIO_ANTERIOR = """
+    QDialog { background: #2b2b2b; color: white; font-family: 'Segoe UI'; }
+    QLabel { color: #10b8b9; font-weight: bold; }
+    QLineEdit, QComboBox {
+        background: #3c3c3c; color: white; border: 2px solid #756f9f; border-radius: 6px; padding: 8px;
+    }
+    QPushButton {
+        background: #756f9f; color: white; padding: 10px 15px; border-radius: 8px; min-width: 120px;
+    }
+    QPushButton:hover { background: #10b8b9; }
+"""
+
+# La etiqueta del paciente tenía además su propio setStyleSheet; aquí va como una regla más
+_TRATAMIENTO_ANTERIOR = """
+    QDialog { background-color: #f7f8fa; color: #2c2c2c; font: 14px 'Segoe UI'; }
+    QLabel { font-weight: bold; color: #2c2c2c; }
+    QLabel#etiquetaPaciente { color: #10b8b9; font-weight: bold; font-size: 16px; }
+    QLineEdit, QTextEdit, QDoubleSpinBox {
+        background: white; color: #2c2c2c; border: 2px solid #756f9f; border-radius: 6px; padding: 8px;
+    }
+    QLineEdit:focus, QTextEdit:focus, QDoubleSpinBox:focus { border-color: #10b8b9; background-color: #fdfcf8; }
+    QPushButton {
+        background: #756f9f; color: white; padding: 10px 15px; border-radius: 8px; font-weight: bold; border: none;
+    }
+    QPushButton:hover { background: #10b8b9; }
+"""
+
+
+def _dialogos() -> List:
+    """Constructores de todos los diálogos de la aplicación, con la hoja que cada uno usaba antes"""
+    from types import SimpleNamespace
+    import Doctor
+    import Horario
+    import Paciente
+    import Tratamiento
+
+    paciente = SimpleNamespace(nombre="Laura", apellido="Mendoza")
+    campos = ("QLineEdit", "QTextEdit", "QDoubleSpinBox")
+    return [
+        ("Paciente.AgregarTratamientoDialog", Paciente.AgregarTratamientoDialog, _hoja_oscura_anterior(*campos)),
+        ("Paciente.AgregarCitaDialog", Paciente.AgregarCitaDialog,
+         _hoja_oscura_anterior("QLineEdit", "QDoubleSpinBox")),
+        ("Doctor.AgregarHorarioDialog", Doctor.AgregarHorarioDialog, _hoja_oscura_anterior(*campos)),
+        ("Horario.AgregarHorarioDialog", lambda: Horario.AgregarHorarioDialog(Horario.cargar_doctores()),
+         _HORARIO_ANTERIOR),
+        ("Tratamiento.AgregarTratamientoDialog", lambda: Tratamiento.AgregarTratamientoDialog(paciente),
+         _TRATAMIENTO_ANTERIOR),
+    ]
+
+
+def _abrir(app: QApplication, crear, hoja: str = None) -> float:
+    inicio = time.perf_counter()
+    dialogo = crear()
+    if hoja is not None:
+        dialogo.setStyleSheet(hoja)
+    dialogo.show()
+    app.processEvents()
+    dialogo.close()
+    segundos = time.perf_counter() - inicio
+    sip.delete(dialogo)  # deleteLater no se procesa fuera del ciclo de eventos
+    return segundos
+
+
+def medir_apertura(app: QApplication, repeticiones: int = 40) -> Dict[str, tuple]:
+    """
+    Por diálogo: (mediana en ms con la hoja anterior del diálogo, mediana en ms con la hoja de la
+    aplicación). Abrir es construir, mostrar, procesar eventos y cerrar. En el caso anterior la
+    aplicación no tiene hoja y cada diálogo se pone la suya, como antes de Tema.py. Los dos casos se
+    alternan en cada repetición para que el ruido de la máquina afecte a ambos por igual.
+    """
+    resultados = {}
+    for nombre, crear, hoja_anterior in _dialogos():
+        anterior, por_app = [], []
+        for _ in range(repeticiones):
+            # Sin hoja en la aplicación, pero marcada como aplicada para que el constructor no la instale
+            app.setStyleSheet("")
+            app.setProperty('tema', TEMA_PREDETERMINADO)
+            anterior.append(_abrir(app, crear, hoja_anterior))
+            app.setProperty('tema', None)
+            aplicar_tema(app=app)
+            por_app.append(_abrir(app, crear))
+        mediana = lambda tiempos: sorted(tiempos)[len(tiempos) // 2] * 1000
+        resultados[nombre] = (mediana(anterior), mediana(por_app))
+    return resultados
+
+
+def main():
+    # Uso: python Tema.py -> latencia de apertura de los diálogos (sin pantalla: QT_QPA_PLATFORM=offscreen)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    app = QApplication(sys.argv)
+
+    inicio = time.perf_counter()
+    hoja_de_estilo.cache_clear()
+    hoja_de_estilo('oscuro')
+    primera = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    hoja_de_estilo('oscuro')
+    cacheada = time.perf_counter() - inicio
+    print(f"Hoja de estilo: armada en {primera * 1e6:.0f} µs, desde caché en {cacheada * 1e6:.1f} µs "
+          f"({len(hoja_de_estilo()):,} caracteres)")
+
+    medir_apertura(app, repeticiones=3)   # Calentamiento: importaciones y fuentes
+    print(f"\n{'Diálogo':<38} {'hoja anterior':>17} {'hoja de la app':>15}")
+    for nombre, (antes, despues) in medir_apertura(app).items():
+        print(f"{nombre:<38} {antes:14.2f} ms {despues:12.2f} ms ({antes / max(despues, 1e-9):.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
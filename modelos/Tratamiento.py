@@ -3,31 +3,11 @@ from PyQt6.QtWidgets import (
     QDialog, QFormLayout, QVBoxLayout, QLabel, QLineEdit, QTextEdit, QDoubleSpinBox, 
     QSpinBox, QPushButton, QDialogButtonBox, QApplication
 )
+from Tema import DIALOGO_CLARO, aplicar_tema
+from Dominio import Doctor, Paciente  # Personas de Dominio.py; Tratamiento de abajo es propio de este diálogo
 
 # ----------------------- Clases base -----------------------
 
-class Paciente:
-    def __init__(self, id_paciente, nombre, apellido, edad, genero, telefono, correo, direccion):
-        self.id_paciente = id_paciente
-        self.nombre = nombre
-        self.apellido = apellido
-        self.edad = edad
-        self.genero = genero
-        self.telefono = telefono
-        self.correo = correo
-        self.direccion = direccion
-
-    def __str__(self):
-        return f"{self.nombre} {self.apellido}, {self.edad} años"
-
-class Doctor:
-    def __init__(self, nombre, apellido):
-        self.nombre = nombre
-        self.apellido = apellido
-
-    def __str__(self):
-        return f"Dr. {self.nombre} {self.apellido}"
-
 class Tratamiento:
     def __init__(self, id_tratamiento, descripcion, costo, fecha, estado, doctor, paciente):
         self.id_tratamiento = id_tratamiento
@@ -44,7 +24,7 @@ class Tratamiento:
                 f"Costo: ${self.costo:,.2f} \n " 
                 f"Fecha de realización: {self.fecha} \n " 
                 f"Estado: '{self.estado}' \n "
-                f"Doctor: {self.doctor} \n " 
+                f"Doctor: Dr. {self.doctor.nombre} {self.doctor.apellido} \n " 
                 f"Paciente: {self.paciente.nombre} {self.paciente.apellido})")
 
 # ----------------------- Ventana de Tratamiento -----------------------
@@ -56,47 +36,15 @@ class AgregarTratamientoDialog(QDialog):
 
         self.setWindowTitle("🩺 Agregar Tratamiento")
         self.resize(450, 370)
-        
-        # Updated styling to match the main application
-        self.setStyleSheet("""
-            QDialog { 
-                background-color: #f7f8fa; 
-                color: #2c2c2c; 
-                font: 14px 'Segoe UI'; 
-            }
-            QLabel { 
-                font-weight: bold; 
-                color: #2c2c2c;
-            }
-            QLineEdit, QTextEdit, QDoubleSpinBox {
-                background: white; 
-                color: #2c2c2c; 
-                border: 2px solid #756f9f;
-                border-radius: 6px; 
-                padding: 8px;
-            }
-            QLineEdit:focus, QTextEdit:focus, QDoubleSpinBox:focus {
-                border-color: #10b8b9;
-                background-color: #fdfcf8;
-            }
-            QPushButton {
-                background: #756f9f; 
-                color: white; 
-                padding: 10px 15px;
-                border-radius: 8px; 
-                font-weight: bold;
-                border: none;
-            }
-            QPushButton:hover { 
-                background: #10b8b9; 
-            }
-        """)
+        self.setObjectName(DIALOGO_CLARO)  # Conserva la paleta 'claro' dentro de la hoja de la aplicación
+
+        aplicar_tema()  # La hoja de estilo es de toda la aplicación (Tema.py)
 
         form = QFormLayout()
         
         # Patient info label
         patient_label = QLabel(f"Paciente: {paciente.nombre} {paciente.apellido}")
-        patient_label.setStyleSheet("color: #10b8b9; font-weight: bold; font-size: 16px;")
+        patient_label.setObjectName("etiquetaPaciente")
         form.addRow(patient_label)
 
         self.id_edit = QLineEdit()
@@ -153,11 +101,8 @@ if __name__ == "__main__":
         id_paciente=1,
         nombre="Laura",
         apellido="Pérez",
-        edad=27,
-        genero="Femenino",
-        telefono="7012-3456",
-        correo="laura.perez@example.com",
-        direccion="Santa Tecla"
+        telefono="70123456",
+        correo="laura.perez@example.com"
     )
 
     dialog = AgregarTratamientoDialog(paciente_demo)
@@ -0,0 +1,122 @@
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from RegistroUnico import RegistroUnico
+
+# Patrones compilados una sola vez; los usan las ventanas de pacientes y doctores y la importación masiva
+PATRON_CORREO = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PATRON_DUI = re.compile(r'^\d{8}-\d{1}$')
+PATRON_TELEFONO = re.compile(r'^\d{8,}$')
+
+COLUMNAS_PACIENTE = ('nombre', 'apellido', 'fecha_nacimiento', 'dui', 'telefono', 'correo')
+
+# Largo máximo de las columnas de la tabla Paciente (GestionClinicaDental.sql)
+LARGO_COLUMNAS = {'nombre': 50, 'apellido': 50, 'dui': 10, 'telefono': 8, 'correo': 25}
+
+
+def validar_correo(correo: str) -> bool:
+    """Valida el formato del email"""
+    return PATRON_CORREO.match(correo) is not None
+
+
+def validar_dui(dui: str) -> bool:
+    """Valida el formato del DUI (########-#)"""
+    return PATRON_DUI.match(dui) is not None
+
+
+def validar_telefono(telefono: str) -> bool:
+    """Valida que el teléfono tenga al menos 8 dígitos"""
+    return PATRON_TELEFONO.match(telefono) is not None
+
+
+def _fecha_valida(texto: str) -> bool:
+    try:
+        return date.fromisoformat(texto) <= date.today()
+    except ValueError:
+        return False
+
+
+class ValidadorLotes:
+    """
+    Valida filas de pacientes por lotes (cada fila es un dict con nombre, apellido,
+    fecha_nacimiento, dui, telefono y correo).
+    Cada regla se aplica a la columna completa del lote con map() sobre el patrón compilado,
+    en lugar de validar campo por campo con re.match. Los DUI y correos repetidos los rechaza
+    un RegistroUnico con las filas ya aceptadas; por defecto su clave es el correo, porque en
+    la importación el DUI es opcional.
+    """
+    def __init__(self, registro: Optional[RegistroUnico] = None):
+        self.registro = registro if registro is not None else RegistroUnico(('correo', 'dui'))
+
+    @staticmethod
+    def normalizar(fila: Dict[str, object]) -> Dict[str, str]:
+        """Limpia los campos igual que PacienteWindow.crear_paciente"""
+        nombre, apellido, fecha, dui, telefono, correo = (
+            str(fila.get(campo) or '').strip() for campo in COLUMNAS_PACIENTE)
+        return {'nombre': nombre.title(), 'apellido': apellido.title(), 'fecha_nacimiento': fecha,
+                'dui': dui, 'telefono': telefono, 'correo': correo.lower()}
+
+    def validar(self, lote: List[Tuple[int, Dict[str, object]]]
+                ) -> Tuple[List[Tuple[int, Dict[str, str]]], List[Tuple[int, str, str]]]:
+        """
+        Recibe [(numero_fila, fila), ...] y devuelve (validas, errores).
+        validas: [(numero_fila, fila_normalizada)]; errores: [(numero_fila, campo, mensaje)],
+        un solo error por fila (el primero que se encuentre).
+        """
+        numeros = [numero for numero, _ in lote]
+        filas = [self.normalizar(fila) for _, fila in lote]
+        columna = lambda campo: [fila[campo] for fila in filas]
+        duis, telefonos, correos = columna('dui'), columna('telefono'), columna('correo')
+
+        # Cada regla devuelve una lista de booleanos alineada con el lote
+        reglas = [
+            ('nombre', "El nombre es obligatorio", list(map(bool, columna('nombre')))),
+            ('apellido', "El apellido es obligatorio", list(map(bool, columna('apellido')))),
+            ('fecha_nacimiento', "La fecha de nacimiento debe tener el formato AAAA-MM-DD",
+             list(map(_fecha_valida, columna('fecha_nacimiento')))),
+            ('dui', "El DUI debe tener el formato: 12345678-9",
+             [not d or m is not None for d, m in zip(duis, map(PATRON_DUI.match, duis))]),
+            ('telefono', "El teléfono debe contener al menos 8 dígitos",
+             [not t or m is not None for t, m in zip(telefonos, map(PATRON_TELEFONO.match, telefonos))]),
+            ('correo', "El email no tiene un formato válido",
+             [m is not None for m in map(PATRON_CORREO.match, correos)]),
+        ]
+        for campo, largo in LARGO_COLUMNAS.items():
+            reglas.append((campo, f"El campo {campo} admite como máximo {largo} caracteres",
+                           [len(valor) <= largo for valor in columna(campo)]))
+
+        # Solo las filas que fallan alguna regla se revisan regla por regla para armar el mensaje
+        todas_ok = list(map(all, zip(*(resultados for _, _, resultados in reglas))))
+        clave = self.registro.campo_clave
+        candidatas = []
+        errores = []
+        for i, fila in enumerate(filas):
+            if not todas_ok[i]:
+                errores.append((numeros[i], *next((campo, mensaje) for campo, mensaje, resultados in reglas
+                                                  if not resultados[i])))
+            elif not fila[clave]:
+                errores.append((numeros[i], clave, f"El campo {clave} es obligatorio"))
+            else:
+                candidatas.append((numeros[i], fila))
+
+        # Duplicados contra las filas ya aceptadas (de este lote o de los anteriores)
+        _, rechazadas = self.registro.agregar_lote(fila for _, fila in candidatas)
+        rechazadas = {id(fila): error for fila, error in rechazadas}
+        validas = []
+        for numero, fila in candidatas:
+            error = rechazadas.get(id(fila))
+            if error is None:
+                validas.append((numero, fila))
+            else:
+                etiqueta = 'DUI' if error.campo == 'dui' else error.campo
+                errores.append((numero, error.campo,
+                                f"Ya existe un paciente registrado con el {etiqueta}: {error.valor}"))
+        errores.sort(key=lambda error: error[0])
+        return validas, errores
+
+    def liberar(self, fila: Dict[str, str]):
+        """Olvida el DUI y correo de una fila aceptada que al final no se pudo guardar"""
+        clave = fila[self.registro.campo_clave]
+        if self.registro.obtener(clave) is fila:
+            self.registro.eliminar(clave)
@@ -0,0 +1,27 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Los módulos se importan por nombre, igual que entre Main/ y modelos/
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for carpeta in ('Main', 'modelos'):
+    sys.path.insert(0, os.path.join(RAIZ, carpeta))
+
+from Migraciones import migrar
+from PoolConexiones import PoolConexiones
+from Repositorios import crear_esquema_sqlite
+
+
+@pytest.fixture
+def pool_sqlite(tmp_path):
+    """Base SQLite nueva con el esquema y todas las migraciones; el pool se cierra al terminar la prueba"""
+    ruta = str(tmp_path / "clinica.db")
+    inicial = sqlite3.connect(ruta)
+    crear_esquema_sqlite(inicial)
+    migrar(inicial, marcador='?')
+    inicial.close()
+    pool = PoolConexiones(lambda: sqlite3.connect(ruta, check_same_thread=False), max_conexiones=2)
+    yield pool
+    pool.cerrar()
@@ -0,0 +1,124 @@
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from AccesoAsync import ConflictoReservaError, DriverSqlite, HorarioNoDisponibleError, ServicioCitasAsync
+from Repositorios import ESQUEMA_SQLITE
+
+LUNES = date(2025, 3, 3)
+CUPOS_POR_DIA = 8       # Horario de 08:00 a 12:00 con citas de 30 minutos
+
+
+def cupo(dia: int, numero: int) -> datetime:
+    return datetime.combine(LUNES + timedelta(days=dia), datetime.min.time()) + timedelta(hours=8, minutes=30 * numero)
+
+
+async def preparar(driver: DriverSqlite, doctores: int, dias: int, pacientes: int = 50) -> ServicioCitasAsync:
+    async with driver.transaccion() as tx:
+        for i in range(doctores):
+            await tx.ejecutar("INSERT INTO Doctor (Nombre, Apellido, Especialidad, Telefono, Correo, Contrasena) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", (f"Doc{i}", "A", "General", "70000000", f"d{i}@c.com", "x"))
+        for i in range(pacientes):
+            await tx.ejecutar("INSERT INTO Paciente (Nombre, Apellido, Fecha_Nacimiento, Correo) "
+                              "VALUES (?, ?, ?, ?)", (f"Pac{i}", "B", "1990-01-01", f"p{i}@c.com"))
+    servicio = ServicioCitasAsync(driver)
+    for id_doctor in range(1, doctores + 1):
+        for d in range(dias):
+            await servicio.crear_horario(id_doctor, LUNES + timedelta(days=d), "08:00:00", "12:00:00")
+    return servicio
+
+
+async def contar_citas(driver: DriverSqlite):
+    async with driver.transaccion() as tx:
+        dobles = await tx.consultar("SELECT ID_Doctor, Fecha, COUNT(*) FROM Cita WHERE Estado <> 'Cancelada' "
+                                    "GROUP BY ID_Doctor, Fecha HAVING COUNT(*) > 1")
+        (guardadas,), = await tx.consultar("SELECT COUNT(*) FROM Cita")
+    return dobles, guardadas
+
+
+def test_reservas_simultaneas_sin_dobles_reservas():
+    async def escenario():
+        aleatorio = random.Random(13)
+        driver = DriverSqlite(":memory:")
+        await driver.ejecutar_script(ESQUEMA_SQLITE)
+        servicio = await preparar(driver, doctores=5, dias=2)
+        resultados = {'reservadas': 0, 'rechazadas': 0}
+
+        async def reservar():
+            fecha = cupo(aleatorio.randrange(2), aleatorio.randrange(CUPOS_POR_DIA))
+            try:
+                await servicio.crear_cita(aleatorio.randint(1, 50), aleatorio.randint(1, 5), fecha, 25.0)
+                resultados['reservadas'] += 1
+            except HorarioNoDisponibleError:
+                resultados['rechazadas'] += 1
+
+        # 80 cupos y 1,000 solicitudes: la mayoría choca
+        await asyncio.gather(*(reservar() for _ in range(1_000)))
+        dobles, guardadas = await contar_citas(driver)
+        await driver.cerrar()
+        return resultados, dobles, guardadas
+
+    resultados, dobles, guardadas = asyncio.run(escenario())
+    assert not dobles
+    assert guardadas == resultados['reservadas'] <= 5 * 2 * CUPOS_POR_DIA
+    assert resultados['reservadas'] + resultados['rechazadas'] == 1_000
+
+
+def test_cancelar_libera_el_cupo_y_fuera_de_horario_se_rechaza():
+    async def escenario():
+        driver = DriverSqlite(":memory:")
+        await driver.ejecutar_script(ESQUEMA_SQLITE)
+        servicio = await preparar(driver, doctores=1, dias=1)
+        id_cita = await servicio.crear_cita(1, 1, cupo(0, 2), 25.0)
+        with pytest.raises(HorarioNoDisponibleError, match="ya tiene una cita"):
+            await servicio.crear_cita(2, 1, cupo(0, 2) + timedelta(minutes=15), 25.0)
+        with pytest.raises(HorarioNoDisponibleError, match="no atiende"):
+            await servicio.crear_cita(2, 1, cupo(0, 8), 25.0)      # 12:00, fuera del horario
+        libres = await servicio.cupos_libres(1, LUNES)
+
+        assert await servicio.cancelar_cita(id_cita) and not await servicio.cancelar_cita(id_cita)
+        assert len(await servicio.cupos_libres(1, LUNES)) == len(libres) + 1
+        nueva = await servicio.obtener_cita(await servicio.crear_cita(2, 1, cupo(0, 2), 25.0))
+        await driver.cerrar()
+        return libres, nueva
+
+    libres, nueva = asyncio.run(escenario())
+    assert len(libres) == CUPOS_POR_DIA - 1
+    assert nueva[4] == "Pendiente"
+
+
+def test_servidores_distintos_no_reservan_el_mismo_cupo(tmp_path):
+    """
+    Cada servicio tiene su propia conexión y sus propios asyncio.Lock, así que solo Horario.Version
+    impide que dos servidores del portal tomen el mismo espacio
+    """
+    async def escenario():
+        aleatorio = random.Random(31)
+        drivers = [DriverSqlite(str(tmp_path / "clinica_portal.db")) for _ in range(4)]
+        await drivers[0].ejecutar_script(ESQUEMA_SQLITE + "PRAGMA journal_mode=WAL;")
+        await preparar(drivers[0], doctores=1, dias=1)
+        servicios = [ServicioCitasAsync(driver) for driver in drivers]
+        resultados = {'reservadas': 0, 'rechazadas': 0, 'agotadas': 0}
+
+        async def reservar(servicio):
+            try:
+                await servicio.crear_cita(1, 1, cupo(0, aleatorio.randrange(CUPOS_POR_DIA)), 25.0)
+                resultados['reservadas'] += 1
+            except HorarioNoDisponibleError:
+                resultados['rechazadas'] += 1
+            except ConflictoReservaError:
+                resultados['agotadas'] += 1
+
+        await asyncio.gather(*(reservar(servicios[i % len(servicios)]) for i in range(400)))
+        dobles, guardadas = await contar_citas(drivers[0])
+        async with drivers[0].transaccion() as tx:
+            (version,), = await tx.consultar("SELECT Version FROM Horario")
+        for driver in drivers:
+            await driver.cerrar()
+        return resultados, dobles, guardadas, version
+
+    resultados, dobles, guardadas, version = asyncio.run(escenario())
+    assert not dobles
+    assert guardadas == resultados['reservadas'] == version == CUPOS_POR_DIA, (resultados, guardadas, version)
@@ -0,0 +1,109 @@
+import random
+from array import array
+from typing import Dict, List
+
+import pytest
+
+import AntiguedadSaldos as modulo
+from AntiguedadSaldos import NOMBRES_TRAMOS, AntiguedadSaldos, agrupar, repartir, tramo
+from DatosSinteticos import GeneradorClinica
+from Dominio import ESTADOS_POR_COBRAR
+from Repositorios import crear_repositorios
+
+
+@pytest.fixture(params=["numpy", "python"])
+def camino(request, monkeypatch):
+    """repartir y agrupar corren con NumPy (si está instalado) y con el dict en Python"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(modulo, "cargar_numpy", lambda: None)
+    return request.param
+
+
+def como_listas(claves, tramos):
+    return [int(c) for c in claves], [[int(c) for c in fila] for fila in tramos]
+
+
+def test_repartir_en_proporcion_al_costo(camino):
+    partes = repartir(array('q', [1, 1, 2, 2]), array('q', [1000, 1000, 7, 7]), array('q', [100, 200, 0, 0]))
+    assert partes.tolist() == [334, 666, 4, 3]
+    assert repartir(array('q'), array('q'), array('q')).tolist() == []
+
+
+def test_repartir_suma_el_monto_de_cada_factura(camino):
+    aleatorio = random.Random(24)
+    facturas, montos, costos = array('q'), array('q'), array('q')
+    for factura in aleatorio.sample(range(1, 10_000), 2_000):
+        monto = aleatorio.randrange(1, 50_000)
+        for _ in range(aleatorio.randint(1, 4)):
+            facturas.append(factura)
+            montos.append(monto)
+            costos.append(aleatorio.choice((0, 1, 999, 2_500)))
+    partes = repartir(facturas, montos, costos)
+    por_factura: Dict[int, int] = {}
+    for factura, parte in zip(facturas, partes):
+        por_factura[factura] = por_factura.get(factura, 0) + parte
+    assert all(por_factura[f] == m for f, m in zip(facturas, montos))
+
+
+def test_numpy_y_python_reparten_y_agrupan_igual(monkeypatch):
+    pytest.importorskip("numpy")
+    aleatorio = random.Random(7)
+    n = 5_000
+    facturas = array('q', sorted(aleatorio.randrange(1, 1_500) for _ in range(n)))
+    montos_factura = {f: aleatorio.randrange(1, 80_000) for f in set(facturas)}
+    montos = array('q', (montos_factura[f] for f in facturas))
+    costos = array('q', (aleatorio.randrange(0, 3_000) for _ in range(n)))
+    claves = array('q', (aleatorio.randrange(1, 300) for _ in range(n)))
+    dias = array('q', (aleatorio.randrange(-5, 200) for _ in range(n)))
+
+    con_numpy = repartir(facturas, montos, costos), como_listas(*agrupar(claves, dias, montos))
+    monkeypatch.setattr(modulo, "cargar_numpy", lambda: None)
+    assert (repartir(facturas, montos, costos), como_listas(*agrupar(claves, dias, montos))) == con_numpy
+
+
+def test_agrupar_suma_por_clave_y_tramo(camino):
+    aleatorio = random.Random(3)
+    claves = array('q', (aleatorio.randrange(1, 50) for _ in range(3_000)))
+    dias = array('q', (aleatorio.choice((-3, 0, 30, 31, 60, 61, 90, 91, 400)) for _ in range(3_000)))
+    centavos = array('q', (aleatorio.randrange(1, 100_000) for _ in range(3_000)))
+    esperado: Dict[int, List[int]] = {}
+    for clave, antiguedad, monto in zip(claves, dias, centavos):
+        esperado.setdefault(clave, [0] * len(NOMBRES_TRAMOS))[tramo(antiguedad)] += monto
+
+    ids, tramos = como_listas(*agrupar(claves, dias, centavos))
+    assert ids == sorted(esperado)
+    assert tramos == [esperado[clave] for clave in ids]
+    assert agrupar(array('q'), array('q'), array('q')) == ([], [])
+
+
+def test_reportes_cuadran_con_sql(pool_sqlite, camino):
+    generador = GeneradorClinica(4_000)
+    repositorios = crear_repositorios(pool_sqlite, marcador='?')
+    for tabla, filas in generador.tablas().items():
+        if tabla in ('Paciente', 'Doctor', 'Tratamiento', 'Factura', 'Tratamiento_Factura'):
+            repositorios[tabla].insertar_lote(filas)
+    with pool_sqlite.conexion() as conexion:
+        # Algunas facturas con recargo: su monto ya no es la suma de sus tratamientos
+        conexion.execute("UPDATE Factura SET Monto_Total = Monto_Total + 0.07 WHERE ID_Factura % 7 = 0")
+        conexion.commit()
+
+    hoy = generador.dia(generador.num_dias + 10)
+    antiguedad = AntiguedadSaldos(pool_sqlite, marcador='?')
+    por_paciente, por_doctor = antiguedad.por_paciente(hoy), antiguedad.por_doctor(hoy)
+
+    with pool_sqlite.conexion() as conexion:
+        esperado = [0] * len(NOMBRES_TRAMOS)
+        for dias_factura, centavos_factura in conexion.execute(
+                "SELECT CAST(julianday(?) - julianday(Fecha_Emision) AS INTEGER), "
+                "SUM(CAST(ROUND(Monto_Total * 100) AS INTEGER)) FROM Factura WHERE Estado_Pago IN (?, ?) "
+                "GROUP BY 1", (hoy.isoformat(), *ESTADOS_POR_COBRAR)):
+            esperado[tramo(dias_factura)] += centavos_factura
+        abiertas = conexion.execute("SELECT COUNT(*) FROM Factura WHERE Estado_Pago IN (?, ?)",
+                                    ESTADOS_POR_COBRAR).fetchone()[0]
+    assert abiertas and sum(esperado)
+    assert por_paciente.registros == abiertas
+    assert por_paciente.totales_centavos() == esperado
+    # Por doctor se reparte el mismo total, tramo por tramo
+    assert por_doctor.totales_centavos() == esperado
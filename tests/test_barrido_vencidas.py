@@ -0,0 +1,90 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from BarridoVencidas import ESTADO_PENDIENTE, ESTADO_VENCIDA, BarridoVencidas, fecha_corte
+from DatosSinteticos import GeneradorClinica
+from Repositorios import crear_repositorios
+
+HOY = date(2025, 7, 1)
+
+
+@pytest.fixture
+def pool(pool_sqlite):
+    """3,000 facturas pendientes emitidas a lo largo de un año, más 600 ya pagadas que el barrido no toca"""
+    repositorios = crear_repositorios(pool_sqlite, marcador='?')
+    generador = GeneradorClinica(400)
+    repositorios['Paciente'].insertar_lote(generador.pacientes())
+    aleatorio = random.Random(23)
+    repositorios['Factura'].insertar_lote(
+        (aleatorio.randint(1, generador.num_pacientes), (HOY - timedelta(days=aleatorio.randrange(365))).isoformat(),
+         aleatorio.choice((20.0, 35.5, 45.0, 120.0, 250.0)), ESTADO_PENDIENTE if i < 3_000 else 'Pagada')
+        for i in range(3_600))
+    with pool_sqlite.conexion() as conexion:
+        conexion.execute("ANALYZE")
+    return pool_sqlite
+
+
+def contar(pool, condicion: str, *parametros):
+    with pool.conexion() as conexion:
+        return conexion.execute(f"SELECT COUNT(*), SUM(Monto_Total) FROM Factura WHERE {condicion}",
+                                parametros).fetchone()
+
+
+def test_vencen_solo_las_facturas_fuera_de_plazo(pool):
+    corte = fecha_corte(HOY).isoformat()
+    esperadas, monto = contar(pool, "Estado_Pago = ? AND Fecha_Emision < ?", ESTADO_PENDIENTE, corte)
+    barrido = BarridoVencidas(pool, marcador='?', tamano_lote=500)
+    resumen = barrido.barrer(HOY)
+
+    assert esperadas and resumen.vencidas == esperadas
+    assert resumen.lotes == -(-esperadas // 500)
+    assert resumen.monto_vencido == Decimal(str(round(monto, 2))).quantize(Decimal('0.01'))
+    assert contar(pool, "Estado_Pago = ? AND Fecha_Emision < ?", ESTADO_PENDIENTE, corte)[0] == 0
+    assert contar(pool, "Estado_Pago = ? AND Fecha_Emision >= ?", ESTADO_VENCIDA, corte)[0] == 0
+    assert contar(pool, "Estado_Pago = 'Pagada'")[0] == 600
+    assert barrido.barrer(HOY).vencidas == 0, "Una segunda pasada no debe encontrar nada"
+
+
+def test_cada_lote_usa_el_indice_de_estado_y_emision(pool):
+    barrido = BarridoVencidas(pool, marcador='?')
+    with pool.conexion() as conexion:
+        plan = " | ".join(fila[-1] for fila in conexion.execute(
+            "EXPLAIN QUERY PLAN " + barrido.sql_lote, (fecha_corte(HOY).isoformat(),)))
+    assert "USING INDEX idx_factura_estado_emision" in plan
+
+
+class BarridoConCompetencia(BarridoVencidas):
+    """Entre la lectura y el UPDATE del primer lote, otra conexión paga las facturas `pagadas`"""
+    def __init__(self, *args, pagadas=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pendientes_de_pagar = list(pagadas)
+
+    def _sql_actualizar(self, cantidad: int) -> str:
+        if self.pendientes_de_pagar:
+            with self.pool.conexion() as otra:
+                otra.executemany("UPDATE Factura SET Estado_Pago = 'Pagada' WHERE ID_Factura = ?",
+                                 [(id_factura,) for id_factura in self.pendientes_de_pagar])
+                otra.commit()
+            self.pendientes_de_pagar = []
+        return super()._sql_actualizar(cantidad)
+
+
+@pytest.mark.parametrize("cuantas", [3, 200])
+def test_monto_cuenta_solo_las_facturas_que_vencieron(pool, cuantas):
+    corte = fecha_corte(HOY).isoformat()
+    with pool.conexion() as conexion:
+        primeras = conexion.execute(
+            "SELECT ID_Factura, Monto_Total FROM Factura WHERE Estado_Pago = ? AND Fecha_Emision < ? "
+            "ORDER BY Fecha_Emision LIMIT ?", (ESTADO_PENDIENTE, corte, cuantas)).fetchall()
+    esperadas, monto = contar(pool, "Estado_Pago = ? AND Fecha_Emision < ?", ESTADO_PENDIENTE, corte)
+
+    # Con un lote de 200 y 200 pagadas, el primer lote no vence ninguna y el barrido debe seguir
+    barrido = BarridoConCompetencia(pool, marcador='?', tamano_lote=200, pagadas=[f for f, _ in primeras])
+    resumen = barrido.barrer(HOY)
+    assert resumen.vencidas == esperadas - cuantas
+    pagado = sum(Decimal(str(m)) for _, m in primeras)
+    assert resumen.monto_vencido == Decimal(str(round(monto, 2))).quantize(Decimal('0.01')) - pagado
+    assert contar(pool, "Estado_Pago = ? AND Fecha_Emision < ?", ESTADO_PENDIENTE, corte)[0] == 0
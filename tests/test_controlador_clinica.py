@@ -0,0 +1,229 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from ControladorClinica import ESTADO_ASISTIDA, ControladorClinica, ErrorValidacion
+from AlmacenCitas import ESTADO_CANCELADA
+
+DUI = "12345678-9"
+
+
+class Persona:
+    """Como Doctor/Paciente de Cita.py: se usa de clave en la agenda, debe ser hashable"""
+    def __init__(self, nombre, apellido):
+        self.nombre, self.apellido = nombre, apellido
+
+
+@pytest.fixture
+def clinica():
+    clinica = ControladorClinica()
+    clinica.crear_paciente(" laura ", "mendoza", 33, DUI, "70112233", "Laura@Correo.com", 15.0)
+    doctora = SimpleNamespace(nombre="Daniela", apellido="Pineda")
+    clinica.agregar_tratamiento_paciente(DUI, SimpleNamespace(
+        descripcion="Limpieza", costo=20.0, fecha_realizacion="01/07/2025", estado="Completado", doctor=doctora))
+    clinica.agregar_cita_paciente(DUI, SimpleNamespace(
+        id_cita="C0", hora_inicio="09:00", hora_fin="09:30", costo_cita=45.0, estado="Pendiente", doctor=doctora))
+    return clinica
+
+
+@pytest.fixture
+def titular():
+    return SimpleNamespace(nombre="Laura", apellido="Mendoza", dui=DUI)
+
+
+def test_no_importa_pyqt6():
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Main')
+    codigo = ("import sys; import ControladorClinica; "
+              "sys.exit(any(m.startswith('PyQt6') for m in sys.modules))")
+    assert subprocess.run([sys.executable, "-c", codigo], cwd=carpeta).returncode == 0
+
+
+# ----------------------- Pacientes -----------------------
+
+def test_crear_paciente_normaliza_nombre_y_correo(clinica):
+    paciente = clinica.obtener_paciente(DUI)
+    assert paciente['nombre'] == "Laura" and paciente['correo'] == "laura@correo.com"
+
+
+@pytest.mark.parametrize("args, mensaje", [
+    (("Ana", "Ruiz", 20, "1234"), "formato"),
+    (("Ana", "Ruiz", 20, DUI), "DUI"),
+    (("Ana", "Ruiz", 20, "23456789-0", "", "laura@correo.com"), "correo"),
+    (("Ana", "Ruiz", 20, "23456789-0", "123"), "8 dígitos"),
+    (("Ana", "Ruiz", 0, "23456789-0"), "edad"),
+])
+def test_crear_paciente_rechaza(clinica, args, mensaje):
+    with pytest.raises(ErrorValidacion, match=mensaje):
+        clinica.crear_paciente(*args)
+    assert len(clinica.pacientes) == 1
+
+
+def test_totales_y_balance_del_paciente(clinica):
+    assert clinica.totales_paciente(DUI) == (20.0, 45.0)
+    assert clinica.balance_paciente(DUI) == 80.0
+    assert clinica.saldo_paciente(DUI) == Decimal("80.00")
+    assert clinica.estadisticas.balance_general == 80.0
+    assert "".join(clinica.secciones_historial()).count("PACIENTE #01") == 1
+
+
+# ----------------------- Doctores -----------------------
+
+def test_doctores_actualizar_y_eliminar(clinica):
+    clinica.crear_doctor("luis", "zelaya", "98765432-1", "ortodoncia", "72223344", "luis@doc.com")
+    clinica.crear_doctor("rebeca", "garcía", "11111111-1", "endodoncia", "", "rebeca@doc.com")
+    with pytest.raises(ErrorValidacion, match="correo"):
+        clinica.actualizar_doctor("11111111-1", "Rebeca", "García", "Endodoncia", "", "luis@doc.com")
+    doctor = clinica.actualizar_doctor("11111111-1", "Rebeca", "García", "Cirugía", "73334455", "")
+    assert doctor['telefono'] == 73334455
+    clinica.eliminar_doctor("11111111-1")
+    with pytest.raises(ErrorValidacion, match="DUI"):
+        clinica.eliminar_doctor("11111111-1")
+
+
+def test_eliminar_doctor_libera_sus_horarios(clinica):
+    dui = "11111111-1"
+    clinica.crear_doctor("rebeca", "garcía", dui, "endodoncia", "", "")
+    rebeca, luis = SimpleNamespace(id_doctor=dui), SimpleNamespace(id_doctor="98765432-1")
+    clinica.agregar_horario(f"{dui}-H1", "Lunes", "08:00", "12:00", rebeca)
+    clinica.agregar_horario(f"{dui}-H2", "Martes", "08:00", "12:00", rebeca)
+    clinica.agregar_horario("L1", "Lunes", "08:00", "12:00", luis)
+    clinica.eliminar_doctor(dui)
+    assert [h.id_horario for h in clinica.horarios] == ["L1"]
+
+    # Al registrar otra vez el mismo DUI su agenda empieza vacía
+    clinica.crear_doctor("rebeca", "garcía", dui, "endodoncia", "", "")
+    clinica.agregar_horario(f"{dui}-H1", "Lunes", "09:00", "10:00", rebeca)
+
+
+# ----------------------- Citas -----------------------
+
+def test_citas_choques_reprogramacion_y_cancelacion(clinica):
+    persona, medico = Persona("Laura", "Mendoza"), Persona("Luis", "Zelaya")
+    nueve, diez, once = (datetime(2025, 7, 1, h, 0) for h in (9, 10, 11))
+    cita = clinica.crear_cita("C1", persona, medico, nueve, diez, "20")
+    with pytest.raises(ErrorValidacion, match="disponible"):
+        clinica.crear_cita("C2", persona, medico, datetime(2025, 7, 1, 9, 30), datetime(2025, 7, 1, 10, 30), 20)
+    with pytest.raises(ErrorValidacion, match="ID"):
+        clinica.crear_cita("C1", persona, medico, diez, once, 20)
+    with pytest.raises(ErrorValidacion, match="número"):
+        clinica.crear_cita("C3", persona, medico, diez, once, "x")
+    with pytest.raises(ErrorValidacion, match="posterior"):
+        clinica.crear_cita("C3", persona, medico, diez, nueve, 20)
+
+    # Al reprogramar C1 a las diez queda libre el espacio de las nueve
+    clinica.modificar_cita(cita, "C1", persona, medico, diez, once, 25, "Confirmada",
+                           {'descripcion': 'Limpieza', 'costo': 20.0})
+    clinica.crear_cita("C2", persona, medico, nueve, diez, 20)
+    assert clinica.monto_cita("C1") == (25.0, 20.0, 45.0)
+    clinica.cancelar_cita("C2")
+    assert clinica.obtener_cita("C2").estado == ESTADO_CANCELADA
+    clinica.crear_cita("C3", persona, medico, nueve, diez, 20)
+    assert clinica.confirmar_asistencia("C3").estado == ESTADO_ASISTIDA
+
+
+# ----------------------- Horarios -----------------------
+
+def test_horarios_traslapes_formato_e_ids(clinica):
+    consultorio = SimpleNamespace(id_doctor="D001", nombre="Dra. Pérez")
+    clinica.agregar_horario("H1", "Lunes", "08:00", "12:00", consultorio)
+    with pytest.raises(ErrorValidacion, match="ocupado"):
+        clinica.agregar_horario("H2", "Lunes", "11:00", "13:00", consultorio)
+    with pytest.raises(ErrorValidacion, match="formato"):
+        clinica.agregar_horario("H2", "Lunes", "8am", "13:00", consultorio)
+    with pytest.raises(ErrorValidacion, match="ya existe"):
+        clinica.agregar_horario("H1", "Martes", "08:00", "12:00", consultorio)
+    with pytest.raises(ErrorValidacion, match="posterior"):
+        clinica.agregar_horario("H2", "Lunes", "14:00", "13:00", consultorio)
+    clinica.agregar_horario("H2", "Lunes", "12:00", "16:00", consultorio)
+    assert clinica.eliminar_horario("H1").id_horario == "H1"
+    clinica.agregar_horario("H3", "Lunes", "09:00", "11:00", consultorio)
+
+
+def test_nuevo_id_horario_no_repite_ids(clinica):
+    consultorio = SimpleNamespace(id_doctor="D001")
+    primero = clinica.agregar_horario(clinica.nuevo_id_horario("D001"), "Lunes", "08:00", "09:00", consultorio)
+    segundo = clinica.agregar_horario(clinica.nuevo_id_horario("D001"), "Lunes", "09:00", "10:00", consultorio)
+    assert (primero.id_horario, segundo.id_horario) == ("D001-H1", "D001-H2")
+    # Con len(horarios) + 1 el tercero volvía a ser H2 después de borrar el primero
+    clinica.eliminar_horario("D001-H1")
+    assert clinica.nuevo_id_horario("D001") == "D001-H3"
+    # Un ID escrito a mano con la misma forma también se salta
+    clinica.agregar_horario("D001-H4", "Martes", "08:00", "09:00", consultorio)
+    assert clinica.nuevo_id_horario("D001") == "D001-H5"
+
+
+# ----------------------- Facturas -----------------------
+
+@pytest.mark.parametrize("id_factura, fecha, servicios, montos, mensaje", [
+    ("F3", "02/07/2025", "A, B", "10", "no coincide"),
+    ("F3", "02/07/2025", "A", "0", "mayores a 0"),
+    ("F3", "2025-07-02", "A", "10", "fecha"),
+    ("F1", "02/07/2025", "A", "10", "Ya existe"),
+    ("F5", "02/07/2025", "A", "diez", "números válidos"),
+])
+def test_crear_factura_rechaza(clinica, titular, id_factura, fecha, servicios, montos, mensaje):
+    clinica.crear_factura("F1", titular, "01/07/2025", "Limpieza, Resina", "20, 35.50", "Pendiente")
+    with pytest.raises(ErrorValidacion, match=mensaje):
+        clinica.crear_factura(id_factura, titular, fecha, servicios, montos, "Pendiente")
+    assert list(clinica.facturas) == ["F1"]
+
+
+def test_totales_de_facturas(clinica, titular):
+    clinica.crear_factura("F1", titular, "01/07/2025", "Limpieza, Resina", "20, 35.50", "Pendiente")
+    clinica.crear_factura("F2", titular, "02/07/2025", "Conducto", "250", "Pagada")
+    clinica.crear_factura("F4", titular, "03/07/2025", "A, B, C", "0.1, 0.2, 0.3", "Pendiente")
+    assert clinica.facturas["F4"].monto_total == Decimal("0.60")     # En float: 0.6000000000000001
+    assert clinica.total_facturado() == Decimal("306.10")
+    assert clinica.totales_por_estado() == {"Pendiente": Decimal("56.10"), "Pagada": Decimal("250.00")}
+
+
+# ----------------------- Libro de saldos -----------------------
+
+def test_emitir_no_cambia_el_saldo_y_pagar_lo_baja(clinica, titular):
+    clinica.crear_factura("F1", titular, "01/07/2025", "Limpieza, Resina", "20, 35.50", "Pendiente")
+    assert clinica.saldo_paciente(DUI) == Decimal("80.00")
+    clinica.pagar_factura("F1")
+    assert clinica.saldo_paciente(DUI) == Decimal("24.50")
+    with pytest.raises(ErrorValidacion, match="no está pendiente"):
+        clinica.pagar_factura("F1")
+    with pytest.raises(ErrorValidacion, match="No existe"):
+        clinica.pagar_factura("F9")
+    # Una factura emitida ya pagada (con el texto del combo de FacturaWindow) también cuenta como pago
+    clinica.crear_factura("F2", titular, "02/07/2025", "Conducto", "20", "Pagado")
+    assert clinica.saldo_paciente(DUI) == Decimal("4.50")
+    assert clinica.conciliar_saldos().cuadra
+
+
+def test_conciliar_corrige_cada_columna(clinica, titular):
+    clinica.crear_factura("F1", titular, "01/07/2025", "Limpieza", "20", "Pagada")
+    clinica.saldos.saldos[0] += 5
+    clinica.saldos.citas[0] -= 5
+    resumen = clinica.conciliar_saldos()
+    assert [d[0] for d in resumen.diferencias] == [DUI]
+    assert clinica.saldo_paciente(DUI) == Decimal("60.00")
+    assert clinica.saldos.total_citas(DUI) == Decimal("45.00")
+    assert clinica.conciliar_saldos().cuadra
+
+
+def test_conciliacion_preparada_se_descarta_si_el_libro_cambio(clinica, titular):
+    clinica.crear_factura("F1", titular, "01/07/2025", "Limpieza", "20", "Pendiente")
+    instantanea = clinica.instantanea_saldos()
+    clinica.pagar_factura("F1")
+    assert clinica.saldos.aplicar_conciliacion(clinica.preparar_conciliacion(*instantanea)) is None
+    resumen = clinica.saldos.aplicar_conciliacion(clinica.preparar_conciliacion(*clinica.instantanea_saldos()))
+    assert resumen.cuadra and resumen.revisados == 1
+
+
+def test_conciliar_agrega_pacientes_que_el_libro_no_conocia(clinica, titular):
+    # Facturas de pacientes que no se registraron en PacienteWindow
+    otro = SimpleNamespace(nombre="Ana", apellido="Ruiz", dui="23456789-0")
+    clinica.crear_factura("F1", otro, "01/07/2025", "Limpieza", "20", "Pendiente")
+    clinica.facturas["F1"].estado_pago = "Pagada"       # Cambiada sin pasar por pagar_factura
+    resumen = clinica.conciliar_saldos()
+    assert [d[0] for d in resumen.diferencias] == ["23456789-0"]
+    assert clinica.saldos.saldo("23456789-0") == Decimal("-20.00")
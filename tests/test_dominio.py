@@ -0,0 +1,52 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytest
+
+from DatosSinteticos import GeneradorClinica
+from Dominio import Compartidos, ModeloClinica, a_fecha, a_fecha_hora, a_minutos, a_monto
+
+
+@pytest.fixture
+def modelo_y_citas():
+    generador = GeneradorClinica(2_000)
+    modelo = ModeloClinica()
+    modelo.cargar('Paciente', ((i, *fila) for i, fila in enumerate(generador.pacientes(), 1)))
+    modelo.cargar('Doctor', ((i, *fila) for i, fila in enumerate(generador.doctores(), 1)))
+    return modelo, [(i, *fila) for i, fila in enumerate(generador.citas(), 1)]
+
+
+def test_citas_referencian_paciente_y_doctor(modelo_y_citas):
+    modelo, filas = modelo_y_citas
+    assert modelo.cargar('Cita', filas) == len(filas) == len(modelo.citas)
+    cita = modelo.citas[filas[0][0]]
+    assert cita.paciente is modelo.pacientes[filas[0][1]] and cita.id_doctor == filas[0][2]
+    assert isinstance(cita.costo, Decimal) and cita.costo == a_monto(filas[0][5])
+    assert not hasattr(cita, '__dict__'), "Las entidades no deben tener __dict__"
+
+
+def test_citas_comparten_valores_repetidos(modelo_y_citas):
+    modelo, filas = modelo_y_citas
+    modelo.cargar('Cita', filas)
+    citas = modelo.citas.values()
+    assert len({id(cita.costo) for cita in citas}) == len({cita.costo for cita in citas})
+    assert len({id(cita.fecha) for cita in citas}) == len({cita.fecha for cita in citas})
+
+
+def test_llave_foranea_sin_cargar():
+    with pytest.raises(KeyError):
+        ModeloClinica().cargar('Cita', [(1, 99, 1, "2025-03-03 08:00:00", "Pendiente", 25.0)])
+
+
+def test_conversiones_de_valores_de_la_base():
+    assert a_minutos(timedelta(hours=8, minutes=30)) == a_minutos("08:30:00") == a_minutos(time(8, 30)) == 510
+    assert a_monto(20.1) == Decimal("20.10") and a_monto(Decimal("3.5")) == Decimal("3.5")
+    assert a_fecha("2025-03-03 10:00:00") == a_fecha(datetime(2025, 3, 3, 10)) == date(2025, 3, 3)
+    assert a_fecha(None) is None
+    assert a_fecha_hora(date(2025, 3, 3)) == a_fecha_hora("2025-03-03 00:00:00") == datetime(2025, 3, 3)
+
+
+def test_compartidos_distingue_tipos():
+    compartidos = Compartidos()
+    assert type(compartidos(Decimal('20'))) is Decimal and type(compartidos(20)) is int
+    assert compartidos(None) is None and len(compartidos) == 2
@@ -0,0 +1,27 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from EstadisticasClinica import EstadisticasClinica
+
+
+def test_una_pasada_coincide_con_los_totales_mantenidos():
+    random.seed(3)
+    pacientes = [{
+        'saldo_pendiente': random.uniform(0, 100),
+        'historial_medico': [SimpleNamespace(costo=random.uniform(10, 500)) for _ in range(random.randrange(4))],
+        'citas': [SimpleNamespace(costo_cita=random.uniform(10, 60)) for _ in range(random.randrange(4))],
+    } for _ in range(2_000)]
+
+    mantenidas = EstadisticasClinica()
+    for paciente in pacientes:
+        mantenidas.registrar_paciente(paciente)
+    una_pasada = EstadisticasClinica.desde_pacientes(pacientes)
+
+    for campo in ('total_pacientes', 'total_tratamientos', 'total_citas'):
+        assert getattr(una_pasada, campo) == getattr(mantenidas, campo)
+    assert una_pasada.balance_general == pytest.approx(mantenidas.balance_general)
+    assert una_pasada.ingresos_totales == pytest.approx(
+        sum(t.costo for p in pacientes for t in p['historial_medico'])
+        + sum(c.costo_cita for p in pacientes for c in p['citas']))
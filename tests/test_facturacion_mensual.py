@@ -0,0 +1,49 @@
+import pytest
+
+from DatosSinteticos import GeneradorClinica
+from FacturacionMensual import ESTADO_CITA_COBRABLE, ESTADO_TRATAMIENTO_COBRABLE, FacturacionMensual
+from Repositorios import crear_repositorios
+
+
+@pytest.fixture
+def generador(pool_sqlite):
+    """Datos sintéticos sin las facturas del generador: todos los tratamientos quedan sin cobrar"""
+    generador = GeneradorClinica(4_000)
+    repositorios = crear_repositorios(pool_sqlite, marcador='?')
+    for tabla, filas in generador.tablas().items():
+        if tabla in ('Paciente', 'Doctor', 'Cita', 'Tratamiento'):
+            repositorios[tabla].insertar_lote(filas)
+    return generador
+
+
+def test_todo_lo_cobrable_queda_en_una_sola_factura_por_paciente(pool_sqlite, generador):
+    # Tramos chicos y dos hilos: varios tramos se escriben en paralelo
+    facturacion = FacturacionMensual(pool_sqlite, marcador='?', pacientes_por_tramo=100, hilos=2)
+    resumen = facturacion.facturar(generador.inicio, generador.dia(generador.num_dias))
+
+    with pool_sqlite.conexion() as conexion:
+        cobrables = conexion.execute(
+            "SELECT (SELECT COUNT(*) FROM Tratamiento WHERE Estado = ?), (SELECT COUNT(*) FROM Cita WHERE Estado = ?)",
+            (ESTADO_TRATAMIENTO_COBRABLE, ESTADO_CITA_COBRABLE)).fetchone()
+        descuadradas = conexion.execute(
+            "SELECT COUNT(*) FROM Factura f "
+            "LEFT JOIN (SELECT tf.ID_Factura, SUM(t.Costo) AS Suma FROM Tratamiento_Factura tf JOIN Tratamiento t "
+            "ON t.ID_Tratamiento = tf.ID_Tratamiento GROUP BY tf.ID_Factura) st ON st.ID_Factura = f.ID_Factura "
+            "LEFT JOIN (SELECT cf.ID_Factura, SUM(c.Costo) AS Suma FROM Cita_Factura cf JOIN Cita c "
+            "ON c.ID_Cita = cf.ID_Cita GROUP BY cf.ID_Factura) sc ON sc.ID_Factura = f.ID_Factura "
+            "WHERE ROUND(f.Monto_Total, 2) <> ROUND(COALESCE(st.Suma, 0) + COALESCE(sc.Suma, 0), 2)").fetchone()[0]
+        repetidas = conexion.execute("SELECT COUNT(*) - COUNT(DISTINCT ID_Paciente) FROM Factura").fetchone()[0]
+        facturas = conexion.execute("SELECT COUNT(*) FROM Factura").fetchone()[0]
+
+    assert all(cobrables) and (resumen.tratamientos, resumen.citas) == cobrables
+    assert resumen.facturas == facturas
+    assert descuadradas == 0, "Cada Monto_Total debe ser la suma de lo que cobra"
+    assert repetidas == 0, "Un paciente no puede tener dos facturas del mismo periodo"
+
+
+def test_repetir_el_periodo_no_factura_nada(pool_sqlite, generador):
+    facturacion = FacturacionMensual(pool_sqlite, marcador='?', pacientes_por_tramo=100, hilos=2)
+    desde, hasta = generador.inicio, generador.dia(generador.num_dias)
+    primera = facturacion.facturar(desde, hasta)
+    repetida = facturacion.facturar(desde, hasta)
+    assert primera.facturas and (repetida.facturas, repetida.tratamientos, repetida.citas) == (0, 0, 0)
@@ -0,0 +1,37 @@
+import pytest
+
+from IndiceDisponibilidad import IndiceDisponibilidad
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceDisponibilidad()
+    assert indice.agregar("D1", 480, 510, "C1")      # 08:00-08:30
+    assert indice.agregar("D1", 540, 600, "C2")      # 09:00-10:00
+    return indice
+
+
+def test_choques_y_bordes(indice):
+    assert not indice.agregar("D1", 500, 520, "C3")
+    assert not indice.agregar("D1", 450, 700, "C3")
+    assert indice.esta_libre("D1", 510, 540)           # Justo entre las dos citas
+    assert indice.esta_libre("D2", 480, 510)           # Otro doctor
+    with pytest.raises(ValueError):
+        indice.agregar("D1", 700, 700, "C3")
+
+
+def test_reprogramar_a_un_rango_invalido_conserva_la_reserva(indice):
+    with pytest.raises(ValueError):
+        indice.reprogramar("D1", "C1", 480, 510, 510, 480)
+    assert not indice.esta_libre("D1", 480, 510)
+    assert indice.cancelar("D1", 480, "C1"), "La reserva original se perdió"
+
+
+def test_reprogramar_a_un_rango_ocupado_conserva_la_reserva(indice):
+    assert not indice.reprogramar("D1", "C1", 480, 510, 570, 600)
+    assert indice.cancelar("D1", 480, "C1")
+
+
+def test_reprogramar_a_otro_doctor_libera_el_rango(indice):
+    assert indice.reprogramar("D1", "C2", 540, 600, 540, 600, nuevo_doctor="D2")
+    assert indice.esta_libre("D1", 540, 600) and not indice.esta_libre("D2", 550, 560)
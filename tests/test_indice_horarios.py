@@ -0,0 +1,45 @@
+import random
+from types import SimpleNamespace
+
+from Entidades import Horario
+from IndiceHorarios import IndiceHorarios, minutos_a_hora
+
+
+def test_posicion_es_la_fila_en_el_recorrido_por_dia():
+    random.seed(7)
+    doctores = [SimpleNamespace(id_doctor=f"D{i}") for i in range(4)]
+    indice = IndiceHorarios()
+    for i in range(300):
+        hora = random.randrange(6, 20)
+        horario = Horario(f"H{i}", random.choice(["Lunes", "Martes", "Jueves"]),
+                          f"{hora:02d}:00", f"{hora + 1:02d}:00", random.choice(doctores))
+        if indice.agregar(horario):
+            assert list(indice)[indice.posicion(horario)] is horario
+
+    for id_horario in random.sample([h.id_horario for h in indice], 40):
+        filas = [h.id_horario for h in indice]
+        eliminado = indice.eliminar(id_horario)
+        # Un horario recién eliminado da la fila que ocupaba
+        assert filas[indice.posicion(eliminado)] == id_horario
+
+
+def test_traslape_en_minutos_coincide_con_comparar_horas_en_texto():
+    def a_minutos(hora):
+        h, m = map(int, hora.split(':'))
+        return h * 60 + m
+
+    def traslapa_texto(a, b):
+        # Comparación como estaba antes en Horario.horario_ocupado
+        if a.doctor.id_doctor != b.doctor.id_doctor or a.dia != b.dia:
+            return False
+        return max(a_minutos(a.hora_inicio), a_minutos(b.hora_inicio)) < \
+            min(a_minutos(a.hora_fin), a_minutos(b.hora_fin))
+
+    random.seed(3)
+    doctores = [SimpleNamespace(id_doctor="D000"), SimpleNamespace(id_doctor="D001")]
+    for i in range(5_000):
+        inicio_a, inicio_b = random.randrange(8 * 60, 17 * 60), random.randrange(8 * 60, 17 * 60)
+        a = Horario(f"A{i}", "Lunes", minutos_a_hora(inicio_a), minutos_a_hora(inicio_a + 60), doctores[0])
+        b = Horario(f"B{i}", random.choice(["Lunes", "Martes"]), minutos_a_hora(inicio_b),
+                    minutos_a_hora(inicio_b + 45), random.choice(doctores))
+        assert a.horario_ocupado(b) == traslapa_texto(a, b)
@@ -0,0 +1,91 @@
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+import LibroSaldos as modulo
+from ControladorClinica import ControladorClinica
+
+
+def dui(i):
+    return f"{i:08d}-{i % 10}"
+
+
+@pytest.fixture(params=["numpy", "python"])
+def camino(request, monkeypatch):
+    """La conciliación compara las columnas con NumPy (si está instalado) o fila por fila"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(modulo, "cargar_numpy", lambda: None)
+    return request.param
+
+
+@pytest.fixture
+def clinica():
+    """300 pacientes con tratamientos, citas y facturas; la mitad de las facturas pagadas"""
+    aleatorio = random.Random(25)
+    doctora = SimpleNamespace(nombre="Daniela", apellido="Pineda")
+    clinica = ControladorClinica()
+    for i in range(300):
+        clinica.crear_paciente(f"nombre{i}", f"apellido{i}", 30, dui(i), "", "", aleatorio.choice((0.0, 15.5, 40.0)))
+        for _ in range(aleatorio.randint(0, 8)):
+            clinica.agregar_tratamiento_paciente(dui(i), SimpleNamespace(
+                descripcion="Limpieza", costo=aleatorio.choice((20.0, 35.5, 120.0, 0.1)), fecha_realizacion="",
+                estado="Completado", doctor=doctora))
+        for _ in range(aleatorio.randint(0, 4)):
+            clinica.agregar_cita_paciente(dui(i), SimpleNamespace(
+                id_cita="", hora_inicio="", hora_fin="", costo_cita=aleatorio.choice((25.0, 45.0, 0.2)),
+                estado="Pendiente", doctor=doctora))
+    for k in range(30):
+        titular = SimpleNamespace(nombre="", apellido="", dui=dui(k))
+        clinica.crear_factura(f"F{k}", titular, "01/07/2025", "Radiografía", "30.10", "Pendiente")
+    for k in range(0, 30, 2):
+        clinica.pagar_factura(f"F{k}")
+    return clinica
+
+
+def test_conciliar_encuentra_y_corrige_lo_alterado(clinica, camino):
+    assert clinica.conciliar_saldos().cuadra
+    libro = clinica.saldos
+    alterados = {dui(7): 1, dui(150): -3550, dui(299): 99}
+    for paciente, centavos in alterados.items():
+        libro.saldos[libro._filas[paciente]] += centavos
+    # Un tratamiento contado como cita: el saldo no cambia, pero los totales que muestra la ventana sí
+    movido = dui(3)
+    libro.tratamientos[libro._filas[movido]] -= 500
+    libro.citas[libro._filas[movido]] += 500
+    tratamientos_antes = libro.total_tratamientos(movido)
+
+    resumen = clinica.conciliar_saldos()
+    assert resumen.revisados == 300 and resumen.corregidos
+    assert sorted(d[0] for d in resumen.diferencias) == sorted([*alterados, movido])
+    assert libro.total_tratamientos(movido) == tratamientos_antes + Decimal("5.00")
+    assert clinica.conciliar_saldos().cuadra
+
+
+def test_conciliar_sin_corregir_no_toca_el_libro(clinica, camino):
+    libro = clinica.saldos
+    libro.saldos[libro._filas[dui(5)]] += 10
+    saldo = libro.saldo(dui(5))
+    assert [d[0] for d in clinica.conciliar_saldos(corregir=False).diferencias] == [dui(5)]
+    assert libro.saldo(dui(5)) == saldo
+
+
+def test_conciliar_agrega_pacientes_que_el_libro_no_tenia(clinica, camino):
+    libro = clinica.saldos
+    esperados = list(clinica._saldos_esperados()) + [("99999999-9", (0, 1000, 0, 0))]
+    assert libro.conciliar(esperados).diferencias[0][0] == "99999999-9"
+    assert libro.saldo("99999999-9") == Decimal("10.00")
+
+
+def test_pagar_factura_baja_el_saldo(clinica):
+    libro = clinica.saldos
+    paciente = clinica.obtener_paciente(dui(1))
+    cargos = sum((Decimal(str(m)) for m in [paciente['saldo_pendiente']]
+                  + [t.costo for t in paciente['historial_medico']]
+                  + [c.costo_cita for c in paciente['citas']]), Decimal(0))
+    assert libro.saldo(dui(1)) == cargos        # La factura F1 sigue pendiente: no cambia el saldo
+    assert libro.saldo(dui(0)) == libro.saldo_anterior(dui(0)) + libro.total_tratamientos(dui(0)) \
+        + libro.total_citas(dui(0)) - Decimal("30.10")
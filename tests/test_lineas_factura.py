@@ -0,0 +1,101 @@
+import random
+import sqlite3
+from array import array
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List
+
+import pytest
+
+import LineasFactura as modulo
+from LineasFactura import CENTAVO, LineasFactura, a_centavos, a_decimal
+
+CATALOGO = ["Limpieza dental general", "Resina dental", "Extracción simple", "Radiografía", "Consulta"]
+IMPUESTO, DESCUENTO = Decimal('0.13'), Decimal('0.05')
+
+
+def total_de_referencia(montos: Iterable[Decimal], impuesto: Decimal, descuento: Decimal) -> Decimal:
+    """La misma cuenta, línea por línea en Decimal, para comprobar que las columnas no se desvían"""
+    total = Decimal(0)
+    for monto in montos:
+        neto = monto - (monto * descuento).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+        total += neto + (neto * impuesto).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+    return total
+
+
+@pytest.fixture(params=["numpy", "array"])
+def camino(request, monkeypatch):
+    """Cada prueba corre con NumPy (si está instalado) y con el módulo array"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(modulo, "cargar_numpy", lambda: None)
+    return request.param
+
+
+@pytest.fixture
+def facturas():
+    """20,000 líneas desordenadas a propósito y los montos de referencia por factura"""
+    aleatorio = random.Random(22)
+    lineas = LineasFactura()
+    referencia: Dict[int, List[Decimal]] = {}
+    for _ in range(20_000):
+        id_factura = aleatorio.randrange(2_000)
+        monto = a_decimal(aleatorio.randrange(1, 5_000_00))
+        lineas.agregar(id_factura, aleatorio.choice(CATALOGO), monto)
+        referencia.setdefault(id_factura, []).append(monto)
+    return lineas, referencia
+
+
+def test_conversiones_a_centavos():
+    assert a_centavos("0.1") == a_centavos(0.1) == a_centavos(Decimal("0.10")) == 10
+    assert a_centavos("35.555") == 3556     # ROUND_HALF_UP
+    assert a_decimal(a_centavos(Decimal("1234567.89"))) == Decimal("1234567.89")
+    assert sum(map(a_centavos, (0.1, 0.2, 0.3))) == 60      # En float: 0.6000000000000001
+
+
+def test_total_sin_perder_un_centavo(camino, facturas):
+    lineas, referencia = facturas
+    assert lineas.total() == sum(sum(montos) for montos in referencia.values())
+
+
+@pytest.mark.parametrize("impuesto, descuento", [(0, 0), (IMPUESTO, 0), (IMPUESTO, DESCUENTO)])
+def test_totales_por_factura_identicos_a_decimal(camino, facturas, impuesto, descuento):
+    lineas, referencia = facturas
+    totales = lineas.totales_por_factura(impuesto, descuento)
+    assert totales.keys() == referencia.keys()
+    desviadas = [f for f, montos in referencia.items()
+                 if totales[f] != total_de_referencia(montos, Decimal(impuesto), Decimal(descuento))]
+    assert not desviadas, "Un total se desvió de la cuenta en Decimal"
+
+
+def test_monto_total_vuelve_igual_de_la_base(facturas):
+    # En SQLite la columna NUMERIC se guarda como REAL
+    lineas, _ = facturas
+    conexion = sqlite3.connect(":memory:")
+    conexion.execute("CREATE TABLE Factura (ID_Factura INTEGER PRIMARY KEY, Monto_Total NUMERIC NOT NULL)")
+    totales = lineas.totales_por_factura(IMPUESTO, DESCUENTO)
+    conexion.executemany("INSERT INTO Factura VALUES (?, ?)", ((f, str(t)) for f, t in totales.items()))
+    leidos = {f: a_decimal(a_centavos(monto)) for f, monto in conexion.execute("SELECT * FROM Factura")}
+    assert leidos == totales
+
+
+def test_agregar_columnas_igual_que_linea_por_linea(camino):
+    facturas, servicios, centavos = array('q', [3, 1, 3, 2]), array('l', [0, 4, 1, 0]), array('q', [2000, 3550, 1, 99])
+    columnas = LineasFactura()
+    columnas.agregar_columnas(facturas, servicios, centavos, CATALOGO)
+    una_por_una = LineasFactura()
+    for f, s, c in zip(facturas, servicios, centavos):
+        una_por_una.agregar(f, CATALOGO[s], a_decimal(c))
+    assert [columnas.linea(i) for i in range(len(columnas))] == [una_por_una.linea(i) for i in range(4)]
+    assert columnas.totales_por_factura(IMPUESTO, DESCUENTO) == una_por_una.totales_por_factura(IMPUESTO, DESCUENTO)
+
+
+def test_rechaza_montos_negativos(camino):
+    lineas = LineasFactura()
+    with pytest.raises(ValueError):
+        lineas.agregar(1, "Consulta", "-0.01")
+    with pytest.raises(ValueError):
+        lineas.agregar_columnas(array('q', [1]), array('l', [0]), array('q', [-1]), CATALOGO)
+    with pytest.raises(ValueError):
+        lineas.agregar_columnas(array('q', [1, 2]), array('l', [0]), array('q', [1]), CATALOGO)
+    assert len(lineas) == 0 and lineas.totales_por_factura() == {}
@@ -0,0 +1,28 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PoolConexiones import PoolConexiones
+
+
+def test_contador_de_creadas_cuadra_con_muchos_hilos():
+    hilos = 16
+    barrera = threading.Barrier(hilos)
+
+    def crear():
+        return sqlite3.connect(":memory:", check_same_thread=False)
+
+    pool = PoolConexiones(crear, min_conexiones=2, max_conexiones=hilos)
+
+    def prestar(_):
+        barrera.wait()   # Todos piden a la vez: varios abren conexión al mismo tiempo
+        with pool.conexion():
+            barrera.wait()
+
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        list(ejecutor.map(prestar, range(hilos)))
+
+    datos = pool.estadisticas()
+    pool.cerrar()
+    assert datos['total'] == hilos
+    assert datos['creadas'] == datos['fallos'] + 2 == hilos
@@ -0,0 +1,73 @@
+import pytest
+
+from RegistroUnico import ClaveDuplicadaError, RegistroUnico
+
+
+@pytest.fixture
+def registro():
+    registro = RegistroUnico()
+    agregados, rechazados = registro.agregar_lote(
+        {'dui': f"{i:08d}-{i % 10}", 'correo': f"paciente{i}@correo.com"} for i in range(1_000))
+    assert agregados == 1_000 and not rechazados
+    return registro
+
+
+def test_carga_masiva_rechaza_duplicados_del_mismo_lote():
+    registro = RegistroUnico()
+    agregados, rechazados = registro.agregar_lote([
+        {'dui': "00000001-1", 'correo': "a@correo.com"},
+        {'dui': "00000001-1", 'correo': "b@correo.com"},
+        {'dui': "00000002-2", 'correo': "a@correo.com"},
+        {'dui': "00000003-3", 'correo': ""},
+        {'dui': "00000004-4", 'correo': ""},       # El correo es opcional: vacío no choca
+    ])
+    assert agregados == 3 and len(registro) == 3
+    assert [(e.campo, e.valor) for _, e in rechazados] == [('dui', "00000001-1"), ('correo', "a@correo.com")]
+
+
+@pytest.mark.parametrize("duplicado, campo", [
+    ({'dui': "00000001-1", 'correo': ""}, 'dui'),
+    ({'dui': "12121212-1", 'correo': "paciente2@correo.com"}, 'correo'),
+])
+def test_rechaza_duplicados_por_dui_y_por_correo(registro, duplicado, campo):
+    with pytest.raises(ClaveDuplicadaError) as error:
+        registro.agregar(duplicado)
+    assert error.value.campo == campo
+    assert len(registro) == 1_000
+
+
+def test_el_dui_es_obligatorio(registro):
+    with pytest.raises(ValueError):
+        registro.agregar({'dui': "", 'correo': "nuevo@correo.com"})
+
+
+def test_actualizar_libera_el_correo_viejo_y_ocupa_el_nuevo(registro):
+    registro.actualizar("00000003-3", {'correo': "cambiado@correo.com"})
+    assert registro.buscar('correo', "paciente3@correo.com") is None
+    assert registro.buscar('correo', "cambiado@correo.com") is registro.obtener("00000003-3")
+    registro.agregar({'dui': "31313131-3", 'correo': "paciente3@correo.com"})
+    with pytest.raises(ClaveDuplicadaError):
+        registro.agregar({'dui': "41414141-4", 'correo': "cambiado@correo.com"})
+
+
+def test_actualizar_con_choque_no_cambia_nada(registro):
+    with pytest.raises(ClaveDuplicadaError):
+        registro.actualizar("00000003-3", {'correo': "paciente5@correo.com"})
+    assert registro.obtener("00000003-3")['correo'] == "paciente3@correo.com"
+    assert registro.buscar('correo', "paciente3@correo.com") is registro.obtener("00000003-3")
+    assert registro.buscar('correo', "paciente5@correo.com") is registro.obtener("00000005-5")
+
+
+def test_actualizar_una_clave_que_no_existe(registro):
+    with pytest.raises(KeyError):
+        registro.actualizar("99999999-9", {'correo': "x@correo.com"})
+
+
+def test_eliminar_libera_el_dui_y_el_correo(registro):
+    eliminado = registro.eliminar("00000004-4")
+    assert eliminado['correo'] == "paciente4@correo.com"
+    assert "00000004-4" not in registro and len(registro) == 999
+    assert registro.buscar('correo', "paciente4@correo.com") is None
+    assert all(p['dui'] != "00000004-4" for p in registro)
+    registro.agregar({'dui': "00000004-4", 'correo': "paciente4@correo.com"})
+    assert registro.eliminar("99999999-9") is None
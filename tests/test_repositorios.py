@@ -0,0 +1,44 @@
+import pytest
+
+from Repositorios import crear_repositorios
+
+
+@pytest.fixture
+def pacientes(pool_sqlite):
+    repositorio = crear_repositorios(pool_sqlite, marcador='?')['Paciente']
+    repositorio.insertar_lote([
+        ("Ana", "Ruiz", "1990-01-01", "00000001-1", "70000001", "ana@correo.com"),
+        ("Luis", "100% Sano", "1985-05-05", "00000002-2", "70000002", "luis@correo.com"),
+        ("Marta", "Solis", "1979-09-09", "00000003-3", "70000003", "marta_s@correo.com"),
+        ("Pedro", "Diaz", "2000-02-02", "00000004-4", "70000004", "martaxs@correo.com"),
+    ])
+    return repositorio
+
+
+@pytest.mark.parametrize("leer", [
+    lambda r: r.pagina(filtros={"Nombre = 'Ana' OR 1=1 --": 1}),
+    lambda r: r.pagina_ordenada(orden="Nombre; DROP TABLE Paciente"),
+    lambda r: r.pagina_ordenada(busqueda="a", columnas_busqueda=("Nombre", "1=1) OR (Correo")),
+    lambda r: r.actualizar(1, {"Nombre = 'X', Correo": "x@correo.com"}),
+])
+def test_columnas_fuera_de_la_tabla_se_rechazan(pacientes, leer):
+    with pytest.raises(ValueError, match="Columnas desconocidas en Paciente"):
+        leer(pacientes)
+    assert pacientes.contar() == 4
+
+
+def test_columnas_de_la_tabla_se_aceptan(pacientes):
+    assert pacientes.actualizar(1, {'Telefono': "71111111"}) == 1
+    assert [f[0] for f in pacientes.pagina(filtros={'Telefono': "71111111"})] == [1]
+    assert [f[0] for f in pacientes.pagina_ordenada('Apellido', descendente=True)] == [3, 1, 4, 2]
+
+
+@pytest.mark.parametrize("busqueda, esperados", [
+    ("100%", [2]),          # % no es comodín
+    ("marta_s", [3]),       # _ no es comodín: "martaxs" no coincide
+    ("!", []),
+    ("arta", [3, 4]),
+])
+def test_busqueda_toma_los_comodines_como_texto(pacientes, busqueda, esperados):
+    filas = pacientes.pagina_ordenada(busqueda=busqueda, columnas_busqueda=('Apellido', 'Correo'))
+    assert [f[0] for f in filas] == esperados
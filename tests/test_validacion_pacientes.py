@@ -0,0 +1,34 @@
+from RegistroUnico import RegistroUnico
+from ValidacionPacientes import ValidadorLotes
+
+
+def fila(i, **cambios):
+    return {'nombre': f"nombre{i}", 'apellido': f"apellido{i}", 'fecha_nacimiento': "1990-05-17",
+            'dui': f"{i:08d}-{i % 10}", 'telefono': "71234567", 'correo': f"P{i}@correo.com", **cambios}
+
+
+def test_duplicados_entre_lotes_y_dui_opcional():
+    validador = ValidadorLotes()
+    validas, errores = validador.validar([(2, fila(1)), (3, fila(2, dui="")), (4, fila(3, dui="123"))])
+    assert [numero for numero, _ in validas] == [2, 3]
+    assert [(numero, campo) for numero, campo, _ in errores] == [(4, 'dui')]
+
+    # El siguiente lote choca con lo aceptado en el anterior; el correo se compara ya normalizado
+    validas, errores = validador.validar([(5, fila(4, dui="00000001-1")), (6, fila(5, correo="p2@correo.com")),
+                                          (7, fila(6, dui=""))])
+    assert [numero for numero, _ in validas] == [7]
+    assert errores == [(5, 'dui', "Ya existe un paciente registrado con el DUI: 00000001-1"),
+                       (6, 'correo', "Ya existe un paciente registrado con el correo: p2@correo.com")]
+
+
+def test_liberar_y_registro_compartido():
+    registro = RegistroUnico(('correo', 'dui'))
+    registro.agregar({'correo': "p9@correo.com", 'dui': "00000009-9"})
+    validador = ValidadorLotes(registro)
+    (_, aceptada), = validador.validar([(2, fila(1))])[0]
+    assert validador.validar([(3, fila(9))])[1][0][1] == 'correo'
+
+    # Si la base rechaza la fila aceptada, se libera y el mismo paciente puede volver a entrar
+    validador.liberar(aceptada)
+    assert validador.validar([(4, fila(1))])[0]
+    assert len(registro) == 2